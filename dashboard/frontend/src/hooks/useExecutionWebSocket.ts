@@ -42,8 +42,8 @@ export function useExecutionWebSocket(options: UseExecutionWebSocketOptions = {}
       wsRef.current = null;
     }
 
-    // Build WebSocket URL
-    const wsUrl = taskId ? `${WS_BASE}/ws/${taskId}` : `${WS_BASE}/ws`;
+    // Build WebSocket URL (batched: each frame is an array of events)
+    const wsUrl = taskId ? `${WS_BASE}/ws/${taskId}?batch=true` : `${WS_BASE}/ws?batch=true`;
 
     try {
       const ws = new WebSocket(wsUrl);
@@ -59,8 +59,10 @@ export function useExecutionWebSocket(options: UseExecutionWebSocketOptions = {}
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data) as ExecutionEvent;
-          handleEvent(data);
+          const data = JSON.parse(event.data) as ExecutionEvent | ExecutionEvent[];
+          for (const item of Array.isArray(data) ? data : [data]) {
+            handleEvent(item);
+          }
         } catch (e) {
           console.error('[ExecutionWS] Failed to parse message:', e);
         }
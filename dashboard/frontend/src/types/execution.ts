@@ -52,6 +52,7 @@ export interface ActiveExecution {
   started_at: string;
   status: ActiveExecutionStatus;
   output_lines: string[];
+  output_seq?: number;  // Sequence number the next output line will get
   current_phase: string;
   approval_id?: string | null;
   pid?: number | null;
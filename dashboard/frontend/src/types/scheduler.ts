@@ -1,3 +1,13 @@
+export interface NotificationStats {
+  queued: number;
+  running: number;
+  sent: number;
+  failed: number;
+  wait_ms: number;
+  latency_ms: number;
+  max_latency_ms: number;
+}
+
 export interface SchedulerStatus {
   running: boolean;
   check_interval: number;
@@ -7,6 +17,10 @@ export interface SchedulerStatus {
   due_tasks: number;
   last_check: string | null;
   next_check: string | null;
+  alive: boolean;
+  source: 'daemon' | 'cron' | null;
+  lag_seconds: number | null;
+  notifications: NotificationStats | null;
 }
 
 export interface UpcomingRun {
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Benchmark compiled CRON schedules against croniter.
+
+Builds a set of task schedules like the ones users write and times, for
+each library, the "next N fires of every task in a window" query behind
+`codegeass scheduler upcoming`, plus single next/previous lookups.
+
+Usage:
+    python scripts/bench_cron_schedule.py [--tasks 1000] [--hours 24] [--runs 10]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from croniter import croniter
+
+from codegeass.core.cron_schedule import compile_cron, upcoming_fires
+
+
+def make_schedules(count: int, seed: int = 42) -> list[str]:
+    """Generate a realistic mix of CRON expressions."""
+    rng = random.Random(seed)
+    shapes = [
+        lambda: f"{rng.randint(0, 59)} {rng.randint(0, 23)} * * *",
+        lambda: f"{rng.randint(0, 59)} {rng.randint(6, 10)} * * 1-5",
+        lambda: f"*/{rng.choice([5, 10, 15, 30])} * * * *",
+        lambda: f"{rng.randint(0, 59)} */{rng.choice([2, 3, 4, 6])} * * *",
+        lambda: f"0 {rng.randint(0, 23)} {rng.randint(1, 28)} * *",
+        lambda: f"{rng.randint(0, 59)} {rng.randint(0, 23)} * * {rng.randint(0, 6)}",
+        lambda: f"30 9 1,15 * {rng.choice(['mon', 'fri'])}",
+        lambda: "@hourly",
+    ]
+    return [rng.choice(shapes)() for _ in range(count)]
+
+
+def croniter_upcoming(
+    schedules: list[str], start: datetime, end: datetime, limit: int
+) -> list[tuple[datetime, int]]:
+    """The windowed query as it was written against croniter."""
+    fires = []
+    for index, expression in enumerate(schedules):
+        cron = croniter(expression, start)
+        for _ in range(limit):
+            fire_at = cron.get_next(datetime)
+            if fire_at > end:
+                break
+            fires.append((fire_at, index))
+    fires.sort(key=lambda item: item[0])
+    return fires
+
+
+def best_of(runs: int, func: Callable[[], object]) -> float:
+    """Fastest wall time of `runs` calls, in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000, help="Number of task schedules")
+    parser.add_argument("--hours", type=int, default=24, help="Window for the upcoming query")
+    parser.add_argument("--limit", type=int, default=10, help="Fires per task in the window")
+    parser.add_argument("--runs", type=int, default=10, help="Repetitions; the best is kept")
+    args = parser.parse_args()
+
+    schedules = make_schedules(args.tasks)
+    start = datetime(2026, 3, 2, 8, 17, 30)
+    end = start + timedelta(hours=args.hours)
+    keyed = list(enumerate(schedules))
+
+    expected = croniter_upcoming(schedules, start, end, args.limit)
+    got = [(fire_at, index) for fire_at, index in upcoming_fires(keyed, start, end, args.limit)]
+    assert sorted(got) == sorted(expected), "compiled schedules disagree with croniter"
+
+    compile_cron.cache_clear()
+    cold = best_of(1, lambda: upcoming_fires(keyed, start, end, args.limit))
+    rows = [
+        (
+            "upcoming (window)",
+            best_of(args.runs, lambda: croniter_upcoming(schedules, start, end, args.limit)),
+            best_of(args.runs, lambda: upcoming_fires(keyed, start, end, args.limit)),
+        ),
+        (
+            "next fire",
+            best_of(args.runs, lambda: [croniter(s, start).get_next(datetime) for s in schedules]),
+            best_of(args.runs, lambda: [compile_cron(s).next_after(start) for s in schedules]),
+        ),
+        (
+            "previous fire",
+            best_of(args.runs, lambda: [croniter(s, start).get_prev(datetime) for s in schedules]),
+            best_of(args.runs, lambda: [compile_cron(s).prev_before(start) for s in schedules]),
+        ),
+    ]
+
+    print(f"{args.tasks} tasks, {args.hours}h window, {len(expected)} fires")
+    print(f"{'query':<20} {'croniter':>12} {'compiled':>12} {'speedup':>9}")
+    for name, baseline, compiled in rows:
+        print(f"{name:<20} {baseline:>10.1f}ms {compiled:>10.1f}ms {baseline / compiled:>8.1f}x")
+    print(f"{'upcoming (cold)':<20} {'':>12} {cold:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
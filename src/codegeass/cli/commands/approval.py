@@ -334,15 +334,17 @@ def cleanup_approvals(ctx: Context, expired: bool, old: int | None, yes: bool) -
 
     total_cleaned = 0
 
-    if expired:
-        count = ctx.approval_repo.cleanup_expired()
-        console.print(f"Marked [cyan]{count}[/cyan] approvals as expired")
-        total_cleaned += count
-
-    if old:
-        count = ctx.approval_repo.cleanup_old(old)
-        console.print(f"Removed [cyan]{count}[/cyan] old approvals")
-        total_cleaned += count
+    # Both cleanups in one write of approvals.yaml
+    with ctx.approval_repo.batch():
+        if expired:
+            count = ctx.approval_repo.cleanup_expired()
+            console.print(f"Marked [cyan]{count}[/cyan] approvals as expired")
+            total_cleaned += count
+
+        if old:
+            count = ctx.approval_repo.cleanup_old(old)
+            console.print(f"Removed [cyan]{count}[/cyan] old approvals")
+            total_cleaned += count
 
     if total_cleaned == 0:
         console.print("[green]Nothing to cleanup.[/green]")
@@ -138,8 +138,8 @@ def watch_execution(ctx: Context, execution_id: str | None, task: str | None) ->
     This command shows live output from an active execution.
     Press Ctrl+C to stop watching.
     """
-    import time
-
+    from codegeass.execution.event_bus import ExecutionEventBus
+    from codegeass.execution.events import ExecutionEventType
     from codegeass.execution.tracker import get_execution_tracker
 
     tracker = get_execution_tracker(ctx.data_dir)
@@ -173,25 +173,25 @@ def watch_execution(ctx: Context, execution_id: str | None, task: str | None) ->
     console.print(f"[bold]Watching:[/bold] {execution.task_name} ({execution.execution_id})")
     console.print("[dim]Press Ctrl+C to stop[/dim]\n")
 
-    last_line_count = 0
+    finished = {
+        ExecutionEventType.COMPLETED: "[green]Execution completed.[/green]",
+        ExecutionEventType.FAILED: "[red]Execution failed.[/red]",
+        ExecutionEventType.STOPPED: "[yellow]Execution stopped.[/yellow]",
+    }
 
+    # Replay the run's output kept on the bus, then follow it live
+    bus = ExecutionEventBus(ctx.data_dir / "events")
     try:
-        while True:
-            # Re-fetch execution to get latest state
-            execution = tracker.get_execution(execution.execution_id)
-
-            if not execution:
-                console.print("\n[green]Execution completed.[/green]")
+        for record in bus.subscribe(bus.first_offset):
+            event = record.event
+            if event.execution_id != execution.execution_id:
+                continue
+            if event.type == ExecutionEventType.OUTPUT:
+                console.print(event.data.get("line", ""))
+            elif event.type in finished:
+                console.print(f"\n{finished[event.type]}")
                 break
 
-            # Print new output lines
-            if len(execution.output_lines) > last_line_count:
-                for line in execution.output_lines[last_line_count:]:
-                    console.print(line)
-                last_line_count = len(execution.output_lines)
-
-            time.sleep(0.5)
-
     except KeyboardInterrupt:
         console.print("\n[yellow]Stopped watching.[/yellow]")
 
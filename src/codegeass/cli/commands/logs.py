@@ -231,3 +231,66 @@ def stats_logs(ctx: Context) -> None:
         console.print(
             f"\n[bold]Overall:[/bold] {total_runs} runs, {overall_rate:.0f}% success rate"
         )
+
+
+@logs.command("reindex")
+@pass_context
+def reindex_logs(ctx: Context) -> None:
+    """Rebuild the log index from existing JSONL files.
+
+    Run once after upgrading to index logs written by older versions.
+    New records are indexed automatically.
+    """
+    with console.status("Indexing execution logs..."):
+        count = ctx.log_repo.reindex()
+
+    console.print(f"[green]Indexed {count} log records in {ctx.logs_dir}[/green]")
+
+
+@logs.command("rebuild-stats")
+@pass_context
+def rebuild_stats(ctx: Context) -> None:
+    """Recompute execution statistics from the raw logs.
+
+    Statistics are normally updated as each run is logged; use this after
+    editing or restoring log files by hand.
+    """
+    with console.status("Rebuilding execution statistics..."):
+        count = ctx.log_repo.reindex()
+
+    stats = ctx.log_repo.get_overall_stats()
+    console.print(
+        f"[green]Rebuilt statistics from {count} log records "
+        f"({stats['total_runs']} runs, {stats['success_rate']:.0f}% success rate)[/green]"
+    )
+
+
+@logs.command("compact")
+@pass_context
+def compact_logs(ctx: Context) -> None:
+    """Apply the retention policy from settings.yaml now.
+
+    Rotates expired records into data/logs/archive/, trims per-task logs,
+    prunes old sessions and unreferenced transcripts, and enforces the size
+    cap. The scheduler also runs this every compact_interval_hours.
+    """
+    retention = ctx.log_retention
+    if not retention.policy.enabled:
+        console.print(
+            "[yellow]No retention limits configured. "
+            f"Add a 'retention' section to {ctx.settings_file}.[/yellow]"
+        )
+        return
+
+    with console.status("Compacting execution logs..."):
+        report = retention.compact()
+
+    freed = report.bytes_before - report.bytes_after
+    details = f"""[bold]Records archived:[/bold] {report.records_archived}
+[bold]Records deleted:[/bold] {report.records_deleted}
+[bold]Archive segments removed:[/bold] {report.segments_removed}
+[bold]Sessions removed:[/bold] {report.sessions_removed}
+[bold]Transcripts removed:[/bold] {report.blobs_removed}
+[bold]Size:[/bold] {report.bytes_before:,} -> {report.bytes_after:,} bytes ({freed:,} freed)"""
+
+    console.print(Panel(details, title="Log Compaction"))
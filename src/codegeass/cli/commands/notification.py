@@ -23,10 +23,14 @@ def _get_channel_repo(ctx: Context):
 
 def _get_notification_service(ctx: Context):
     """Get notification service from context."""
+    from codegeass.notifications.delivery import OutboxDelivery
     from codegeass.notifications.service import NotificationService
 
     channel_repo = _get_channel_repo(ctx)
-    return NotificationService(channel_repo)
+    delivery = OutboxDelivery.from_settings(
+        ctx.settings_file, ctx.notification_outbox, channel_repo
+    )
+    return NotificationService(channel_repo, delivery=delivery)
 
 
 @click.group()
@@ -343,3 +347,141 @@ def list_providers() -> None:
             table.add_row(provider_name, "-", f"[red]Error: {e}[/red]", "-", "-")
 
     console.print(table)
+
+
+@notification.group("outbox")
+def outbox() -> None:
+    """Inspect and replay queued and dead-lettered notifications."""
+    pass
+
+
+def _deliver_outbox(ctx: Context, wait: float) -> None:
+    """Deliver queued notifications and print what happened."""
+    service = _get_notification_service(ctx)
+    report = asyncio.run(service.deliver_outbox(max_wait=wait))
+    console.print(
+        f"Delivered {report.sent}, rescheduled {report.retried}, dead-lettered {report.dead}"
+    )
+    counts = service.outbox.counts()
+    if counts["pending"]:
+        console.print(f"[yellow]{counts['pending']} notification(s) still queued[/yellow]")
+
+
+@outbox.command("list")
+@click.option("--dead", "status", flag_value="dead", help="Only dead letters")
+@click.option("--pending", "status", flag_value="pending", help="Only queued notifications")
+@click.option("--limit", "-n", default=50, help="Maximum entries to show (default: 50)")
+@pass_context
+def list_outbox(ctx: Context, status: str | None, limit: int) -> None:
+    """List queued and dead-lettered notifications."""
+    entries = ctx.notification_outbox.find(status=status, limit=limit)
+
+    if not entries:
+        console.print("[green]Outbox is empty.[/green]")
+        return
+
+    table = Table(title="Notification Outbox")
+    table.add_column("ID", style="cyan")
+    table.add_column("Channel", style="green")
+    table.add_column("Task")
+    table.add_column("Event")
+    table.add_column("Status")
+    table.add_column("Attempts")
+    table.add_column("Next Attempt")
+    table.add_column("Last Error")
+
+    for entry in entries:
+        data = entry.to_dict()
+        entry_status = "[red]dead[/red]" if entry.status == "dead" else "[yellow]pending[/yellow]"
+        next_attempt = data["next_attempt_at"][:19].replace("T", " ")
+        if entry.status == "dead":
+            next_attempt = "-"
+        table.add_row(
+            str(entry.id),
+            entry.channel_id,
+            entry.task_id,
+            entry.event,
+            entry_status,
+            str(entry.attempts),
+            next_attempt,
+            (entry.last_error or "-")[:60],
+        )
+
+    console.print(table)
+    counts = ctx.notification_outbox.counts()
+    console.print(f"[dim]{counts['pending']} pending, {counts['dead']} dead[/dim]")
+
+
+@outbox.command("show")
+@click.argument("entry_id", type=int)
+@pass_context
+def show_outbox_entry(ctx: Context, entry_id: int) -> None:
+    """Show a queued notification, including its message."""
+    entry = ctx.notification_outbox.get(entry_id)
+
+    if not entry:
+        console.print(f"[red]Outbox entry not found: {entry_id}[/red]")
+        raise SystemExit(1)
+
+    data = entry.to_dict()
+    details = f"""[bold]Channel:[/bold] {entry.channel_id} ({entry.provider})
+[bold]Task:[/bold] {entry.task_id}
+[bold]Event:[/bold] {entry.event}
+[bold]Status:[/bold] {entry.status}
+[bold]Attempts:[/bold] {entry.attempts} ({entry.rate_limited} rate limited)
+[bold]Queued:[/bold] {data["created_at"]}
+[bold]Next Attempt:[/bold] {data["next_attempt_at"]}
+[bold]Last Error:[/bold] {entry.last_error or "-"}
+
+{entry.message}"""
+
+    console.print(Panel(details, title=f"Outbox Entry {entry.id}"))
+
+
+@outbox.command("replay")
+@click.argument("entry_ids", nargs=-1, type=int)
+@click.option("--all", "replay_all", is_flag=True, help="Replay every dead letter")
+@click.option("--no-deliver", is_flag=True, help="Only requeue; leave delivery to the scheduler")
+@pass_context
+def replay_outbox(
+    ctx: Context, entry_ids: tuple[int, ...], replay_all: bool, no_deliver: bool
+) -> None:
+    """Requeue dead-lettered notifications and deliver them."""
+    if not entry_ids and not replay_all:
+        console.print("[red]Give entry IDs or --all[/red]")
+        raise SystemExit(1)
+
+    count = ctx.notification_outbox.replay(None if replay_all else entry_ids)
+    console.print(f"[green]Requeued {count} notification(s)[/green]")
+
+    if count and not no_deliver:
+        _deliver_outbox(ctx, wait=0)
+
+
+@outbox.command("flush")
+@click.option(
+    "--wait",
+    "-w",
+    default=0.0,
+    help="Seconds to keep waiting for retries that are not due yet (default: 0)",
+)
+@pass_context
+def flush_outbox(ctx: Context, wait: float) -> None:
+    """Deliver queued notifications now."""
+    _deliver_outbox(ctx, wait)
+
+
+@outbox.command("purge")
+@click.argument("entry_ids", nargs=-1, type=int)
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation")
+@pass_context
+def purge_outbox(ctx: Context, entry_ids: tuple[int, ...], yes: bool) -> None:
+    """Delete dead letters (all of them unless IDs are given)."""
+    if not yes:
+        target = ", ".join(map(str, entry_ids)) if entry_ids else "all dead letters"
+        if not click.confirm(f"Delete {target}?"):
+            console.print("Cancelled")
+            return
+
+    count = ctx.notification_outbox.purge(entry_ids=entry_ids or None)
+    console.print(f"[green]Deleted {count} dead letter(s)[/green]")
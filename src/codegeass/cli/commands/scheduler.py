@@ -11,6 +11,10 @@ from rich.panel import Panel
 from rich.table import Table
 
 from codegeass.cli.main import Context, pass_context
+from codegeass.core.value_objects import ExecutionStatus
+from codegeass.notifications.dispatcher import get_notification_dispatcher
+from codegeass.scheduling.liveness import SOURCE_CRON
+from codegeass.scheduling.scheduler import DEFAULT_MISFIRE_THRESHOLD
 
 console = Console()
 
@@ -21,6 +25,35 @@ def scheduler() -> None:
     pass
 
 
+def misfire_threshold_options(command):
+    """Add --misfire-threshold and the deprecated --window to a command."""
+    command = click.option(
+        "--window",
+        "-w",
+        type=int,
+        hidden=True,
+        help="Deprecated: use --misfire-threshold",
+    )(command)
+    return click.option(
+        "--misfire-threshold",
+        type=click.IntRange(min=1),
+        default=int(DEFAULT_MISFIRE_THRESHOLD.total_seconds()),
+        show_default=True,
+        help="Seconds a scheduled run may be late before its misfire policy applies",
+    )(command)
+
+
+def _resolve_misfire_threshold(misfire_threshold: int, window: int | None) -> int:
+    """Apply a deprecated --window the way it used to work, with a warning."""
+    if window is None:
+        return misfire_threshold
+    console.print(
+        "[yellow]Warning: --window is deprecated and only took effect above the "
+        "misfire threshold; use --misfire-threshold instead.[/yellow]"
+    )
+    return max(misfire_threshold, window)
+
+
 @scheduler.command("status")
 @pass_context
 def scheduler_status(ctx: Context) -> None:
@@ -29,12 +62,29 @@ def scheduler_status(ctx: Context) -> None:
 
     details = f"""[bold]Current Time:[/bold] {status["current_time"][:19]}
 
+[bold]Scheduler:[/bold] {_format_liveness(status)}"""
+    if status["last_check"]:
+        details += f"""
+  Last tick: {status["last_check"][:19]}
+  Next tick: {(status["next_check"] or "unknown")[:19]}
+  Lag: {status["lag_seconds"]:.0f}s"""
+
+    details += f"""
+
 [bold]Tasks:[/bold]
   Enabled: {status["enabled_tasks"]}
   Disabled: {status["disabled_tasks"]}
 
 [bold]Due Now:[/bold] {", ".join(status["due_tasks"]) or "none"}"""
 
+    notifications = status["notifications"]
+    if notifications["sent"] or notifications["failed"] or notifications["queued"]:
+        details += (
+            f"\n\n[bold]Notifications:[/bold] {notifications['queued']} queued, "
+            f"{notifications['sent']} sent, {notifications['failed']} failed "
+            f"(avg {notifications['latency_ms']:.0f}ms)"
+        )
+
     console.print(Panel(details, title="Scheduler Status"))
 
     # Show next runs
@@ -50,41 +100,84 @@ def scheduler_status(ctx: Context) -> None:
         console.print(table)
 
 
+def _format_liveness(status: dict) -> str:
+    """Describe whether the scheduler is running and what runs it."""
+    if status["alive"]:
+        return f"[green]running[/green] ({status['source']})"
+    if status["running"]:
+        return "[yellow]installed[/yellow] (no recent tick)"
+    return "[red]not running[/red]"
+
+
 @scheduler.command("run")
 @click.option("--force", "-f", is_flag=True, help="Run all enabled tasks regardless of schedule")
 @click.option("--dry-run", is_flag=True, help="Show what would run without executing")
-@click.option(
-    "--window", "-w", default=60, help="Time window in seconds for due tasks (default: 60)"
-)
+@misfire_threshold_options
 @pass_context
-def run_scheduler(ctx: Context, force: bool, dry_run: bool, window: int) -> None:
+def run_scheduler(
+    ctx: Context, force: bool, dry_run: bool, misfire_threshold: int, window: int | None
+) -> None:
     """Run due tasks (or all tasks with --force)."""
+    misfire_threshold = _resolve_misfire_threshold(misfire_threshold, window)
+    if not force and not dry_run:
+        # This is the cron runner's tick; status reads it instead of probing cron
+        ctx.scheduler.liveness.beat(SOURCE_CRON)
+
     if force:
         tasks = ctx.task_repo.find_enabled()
         console.print(f"[bold]Running all {len(tasks)} enabled task(s)...[/bold]")
     else:
-        tasks = ctx.scheduler.find_due_tasks(window)
+        if dry_run:
+            tasks = ctx.scheduler.find_due_tasks(misfire_threshold)
+        else:
+            tasks = ctx.scheduler.claim_due_tasks(misfire_threshold)
         if not tasks:
             console.print("[yellow]No tasks due for execution.[/yellow]")
+            if not dry_run:
+                _run_maintenance(ctx)
             return
         console.print(f"[bold]Running {len(tasks)} due task(s)...[/bold]")
 
-    results = []
-    for task in tasks:
-        console.print(f"\n[cyan]Running: {task.name}[/cyan]")
-        result = ctx.scheduler.run_task(task, dry_run=dry_run)
-        results.append(result)
-
+    def print_result(task, result) -> None:
         if result.is_success:
-            console.print(f"  [green]✓ Success[/green] ({result.duration_seconds:.1f}s)")
+            console.print(f"  [green]✓[/green] {task.name} ({result.duration_seconds:.1f}s)")
         else:
-            console.print(f"  [red]✗ {result.status.value}[/red]")
+            console.print(f"  [red]✗[/red] {task.name}: {result.status.value}")
             if result.error:
                 console.print(f"    Error: {result.error[:100]}")
 
+    results = ctx.scheduler.run_tasks(tasks, dry_run=dry_run, on_result=print_result)
+
     # Summary
     success_count = sum(1 for r in results if r.is_success)
-    console.print(f"\n[bold]Summary:[/bold] {success_count}/{len(results)} succeeded")
+    skipped_count = sum(1 for r in results if r.status == ExecutionStatus.SKIPPED)
+    summary = f"{success_count}/{len(results)} succeeded"
+    if skipped_count and not dry_run:
+        summary += f", {skipped_count} skipped (already running)"
+    console.print(f"\n[bold]Summary:[/bold] {summary}")
+
+    if not dry_run:
+        _run_maintenance(ctx)
+
+
+def _run_maintenance(ctx: Context) -> None:
+    """Run scheduled log compaction and report it if it ran.
+
+    Also warms the worktree pools of projects with a run coming up, and
+    retries notifications an earlier run left in the outbox.
+    """
+    service = ctx.notification_service
+    if service is not None and service.outbox.counts()["pending"]:
+        # Runs on the dispatcher thread, which is flushed at exit
+        get_notification_dispatcher().submit("outbox", service.deliver_outbox())
+    ctx.scheduler.warm_worktrees()
+    report = ctx.scheduler.run_maintenance()
+    if report is not None:
+        removed = report.records_archived + report.records_deleted
+        console.print(
+            f"[dim]Compacted logs: {removed} record(s) rotated, "
+            f"{report.bytes_before - report.bytes_after} bytes freed[/dim]"
+        )
 
 
 @scheduler.command("upcoming")
@@ -115,17 +208,18 @@ def upcoming_tasks(ctx: Context, hours: int) -> None:
 
 
 @scheduler.command("due")
-@click.option("--window", "-w", default=60, help="Time window in seconds (default: 60)")
+@misfire_threshold_options
 @pass_context
-def due_tasks(ctx: Context, window: int) -> None:
+def due_tasks(ctx: Context, misfire_threshold: int, window: int | None) -> None:
     """Show tasks that are currently due for execution."""
-    tasks = ctx.scheduler.find_due_tasks(window)
+    misfire_threshold = _resolve_misfire_threshold(misfire_threshold, window)
+    tasks = ctx.scheduler.find_due_tasks(misfire_threshold)
 
     if not tasks:
-        console.print(f"[yellow]No tasks due within {window} second window.[/yellow]")
+        console.print("[yellow]No tasks due for execution.[/yellow]")
         return
 
-    table = Table(title=f"Due Tasks (window: {window}s)")
+    table = Table(title=f"Due Tasks (misfire threshold: {misfire_threshold}s)")
     table.add_column("Name", style="cyan")
     table.add_column("Schedule")
     table.add_column("Last Run")
@@ -242,43 +336,81 @@ def test_cron(ctx: Context, verbose: bool) -> None:
 @click.option(
     "--poll-interval", "-p", default=1.0, help="Polling interval in seconds (default: 1.0)"
 )
+@click.option(
+    "--tasks",
+    "run_tasks",
+    is_flag=True,
+    help="Also run scheduled tasks at their CRON times (replaces the cron runner)",
+)
 @pass_context
-def daemon_mode(ctx: Context, poll_interval: float) -> None:
+def daemon_mode(ctx: Context, poll_interval: float, run_tasks: bool) -> None:
     """Run daemon that handles Telegram callbacks for plan approvals.
 
     This command runs continuously and polls Telegram for button clicks
     (Approve/Discuss/Cancel) on plan approval messages.
 
+    With --tasks it also fires scheduled tasks itself: tasks are kept in a
+    queue ordered by next run time, run on time to the second, and the
+    schedule is reloaded as soon as schedules.yaml changes. Remove the cron
+    entry when using this mode.
+
     Use Ctrl+C to stop.
     """
+    import threading
+
     from codegeass.execution.plan_service import PlanApprovalService
     from codegeass.notifications.callback_handler import (
         CallbackHandler,
         TelegramCallbackServer,
     )
+    from codegeass.scheduling.daemon import SchedulerDaemon
 
     # Check prerequisites
-    if ctx.channel_repo is None:
+    if ctx.channel_repo is None and not run_tasks:
         console.print("[red]No notification channels configured.[/red]")
         console.print("Run 'codegeass notification add' first.")
         raise SystemExit(1)
 
-    if ctx.approval_repo is None:
+    if ctx.approval_repo is None and not run_tasks:
         console.print("[red]Could not initialize approval repository.[/red]")
         raise SystemExit(1)
 
     # Initialize services
-    plan_service = PlanApprovalService(ctx.approval_repo, ctx.channel_repo)
-    callback_handler = CallbackHandler(plan_service, ctx.channel_repo)
-    callback_server = TelegramCallbackServer(
-        callback_handler,
-        ctx.channel_repo,
-        poll_interval=poll_interval,
-    )
+    callback_server = None
+    if ctx.channel_repo is not None and ctx.approval_repo is not None:
+        plan_service = PlanApprovalService(ctx.approval_repo, ctx.channel_repo)
+        callback_handler = CallbackHandler(plan_service, ctx.channel_repo)
+        callback_server = TelegramCallbackServer(
+            callback_handler,
+            ctx.channel_repo,
+            poll_interval=poll_interval,
+        )
+
+    task_daemon = None
+    task_thread = None
+    if run_tasks:
+
+        def on_dispatch(task, future) -> None:
+            console.print(f"[cyan]▶ {task.name}[/cyan]")
+            future.add_done_callback(
+                lambda f: console.print(
+                    f"  {task.name}: {f.result().status.value} "
+                    f"({f.result().duration_seconds:.1f}s)"
+                )
+            )
+
+        task_daemon = SchedulerDaemon(
+            ctx.scheduler, ctx.task_repo, ctx.schedules_file, on_dispatch=on_dispatch
+        )
+        task_thread = threading.Thread(target=task_daemon.run, name="codegeass-scheduler")
 
     console.print("[bold green]CodeGeass Daemon Starting...[/bold green]")
-    console.print(f"Polling interval: {poll_interval}s")
-    console.print("Listening for Telegram callbacks (Approve/Discuss/Cancel)")
+    if callback_server is not None:
+        console.print(f"Polling interval: {poll_interval}s")
+        console.print("Listening for Telegram callbacks (Approve/Discuss/Cancel)")
+    if task_thread is not None:
+        console.print(f"Running scheduled tasks from {ctx.schedules_file}")
+        task_thread.start()
     console.print("Press Ctrl+C to stop.\n")
 
     # Handle graceful shutdown
@@ -287,16 +419,30 @@ def daemon_mode(ctx: Context, poll_interval: float) -> None:
 
     def signal_handler(sig, frame):
         console.print("\n[yellow]Shutting down daemon...[/yellow]")
-        callback_server.stop()
+        if callback_server is not None:
+            callback_server.stop()
+        if task_daemon is not None:
+            task_daemon.stop()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        loop.run_until_complete(callback_server.start())
+        if callback_server is not None:
+            loop.run_until_complete(callback_server.start())
+        elif task_thread is not None:
+            # Join in short slices so signals are handled promptly
+            while task_thread.is_alive():
+                task_thread.join(timeout=1.0)
     except KeyboardInterrupt:
         console.print("\n[yellow]Daemon stopped.[/yellow]")
     finally:
-        callback_server.stop()
+        if callback_server is not None:
+            callback_server.stop()
         loop.close()
+        if task_daemon is not None and task_thread is not None:
+            task_daemon.stop()
+            if task_thread.is_alive():
+                console.print("Waiting for running tasks to finish...")
+                task_thread.join()
@@ -7,6 +7,8 @@ from rich.console import Console
 
 from codegeass.cli.main import Context, pass_context
 from codegeass.core.entities import Task
+from codegeass.core.exceptions import ValidationError
+from codegeass.core.value_objects import MisfirePolicy, ResourceLimits
 from codegeass.scheduling.cron_parser import CronParser
 
 console = Console()
@@ -52,6 +54,25 @@ console = Console()
     default="claude",
     help="Code execution provider (claude, codex)",
 )
+@click.option(
+    "--limit",
+    "limits",
+    multiple=True,
+    metavar="KEY=VALUE",
+    help="Resource limit: memory_mb, cpu_seconds, max_processes, nice or io_class",
+)
+@click.option(
+    "--misfire",
+    type=click.Choice(MisfirePolicy.MODES),
+    default="run-once",
+    help="What to do about runs missed while no scheduler ran (default: run-once)",
+)
+@click.option(
+    "--max-catch-up",
+    type=int,
+    default=10,
+    help="With --misfire run-all, most missed runs to catch up on (default: 10)",
+)
 @pass_context
 def create_task(
     ctx: Context,
@@ -73,9 +94,14 @@ def create_task(
     plan_timeout: int,
     plan_max_iterations: int,
     code_source: str,
+    limits: tuple[str, ...],
+    misfire: str,
+    max_catch_up: int,
 ) -> None:
     """Create a new scheduled task."""
     _validate_inputs(skill, prompt, schedule, code_source, plan_mode)
+    resource_limits = build_resource_limits(limits)
+    misfire_policy = build_misfire_policy(misfire, max_catch_up)
 
     working_dir = working_dir.resolve()
     if not working_dir.exists():
@@ -114,6 +140,8 @@ def create_task(
         plan_mode=plan_mode,
         plan_timeout=plan_timeout,
         plan_max_iterations=plan_max_iterations,
+        resource_limits=resource_limits,
+        misfire_policy=misfire_policy,
     )
 
     ctx.task_repo.save(new_task)
@@ -125,6 +153,10 @@ def create_task(
     console.print(f"Code Source: {code_source}")
     if plan_mode:
         console.print(f"[cyan]Plan Mode: timeout={plan_timeout}s, iter={plan_max_iterations}[/]")
+    if resource_limits:
+        console.print(f"Resource Limits: {format_resource_limits(resource_limits)}")
+    if not misfire_policy.is_default:
+        console.print(f"Misfire Policy: {format_misfire_policy(misfire_policy)}")
 
 
 def _validate_inputs(
@@ -178,3 +210,59 @@ def _build_notifications(
         "events": events,
         "include_output": include_output,
     }
+
+
+def build_resource_limits(
+    options: tuple[str, ...], current: ResourceLimits | None = None
+) -> ResourceLimits | None:
+    """Build resource limits from KEY=VALUE options on top of the current ones.
+
+    A value of "none" removes that limit.
+    """
+    if not options:
+        return current
+
+    data = current.to_dict() if current else {}
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            console.print(f"[red]Error: Expected KEY=VALUE for --limit, got: {option}[/red]")
+            raise SystemExit(1)
+        if value.lower() == "none":
+            data.pop(key.strip(), None)
+        else:
+            data[key.strip()] = value.strip()
+
+    try:
+        limits = ResourceLimits.from_dict(data)
+    except ValidationError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise SystemExit(1)
+    return None if limits.is_empty else limits
+
+
+def format_resource_limits(limits: ResourceLimits) -> str:
+    """Format resource limits for display."""
+    return ", ".join(f"{key}={value}" for key, value in limits.to_dict().items())
+
+
+def build_misfire_policy(
+    mode: str | None, max_catch_up: int | None, current: MisfirePolicy | None = None
+) -> MisfirePolicy:
+    """Build a misfire policy from CLI options on top of the current one."""
+    current = current or MisfirePolicy()
+    try:
+        return MisfirePolicy(
+            mode=mode or current.mode,
+            max_catch_up=current.max_catch_up if max_catch_up is None else max_catch_up,
+        )
+    except ValidationError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise SystemExit(1) from e
+
+
+def format_misfire_policy(policy: MisfirePolicy) -> str:
+    """Format a misfire policy for display."""
+    if policy.mode == "run-all":
+        return f"run-all (up to {policy.max_catch_up} runs)"
+    return policy.mode
@@ -5,6 +5,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+from codegeass.cli.commands.task.create import format_misfire_policy, format_resource_limits
 from codegeass.cli.main import Context, pass_context
 from codegeass.scheduling.cron_parser import CronParser
 
@@ -98,6 +99,11 @@ def _build_task_details(t) -> str:
     if t.variables:
         details += f"\n[bold]Variables:[/bold] {t.variables}"
 
+    if t.resource_limits:
+        details += f"\n[bold]Resource Limits:[/bold] {format_resource_limits(t.resource_limits)}"
+
+    details += f"\n[bold]Misfire Policy:[/bold] {format_misfire_policy(t.misfire_policy)}"
+
     if t.notifications:
         details += _format_notifications(t.notifications)
 
@@ -4,7 +4,9 @@ import click
 from rich.console import Console
 from rich.panel import Panel
 
+from codegeass.cli.commands.task.create import build_misfire_policy, build_resource_limits
 from codegeass.cli.main import Context, pass_context
+from codegeass.core.value_objects import MisfirePolicy
 from codegeass.scheduling.cron_parser import CronParser
 
 console = Console()
@@ -23,6 +25,19 @@ console = Console()
 @click.option("--plan-timeout", type=int, help="Plan approval timeout in seconds")
 @click.option("--plan-max-iterations", type=int, help="Max discuss iterations")
 @click.option("--code-source", "-cs", help="Code execution provider (claude, codex)")
+@click.option(
+    "--limit",
+    "limits",
+    multiple=True,
+    metavar="KEY=VALUE",
+    help="Set a resource limit (KEY=none removes it)",
+)
+@click.option(
+    "--misfire",
+    type=click.Choice(MisfirePolicy.MODES),
+    help="What to do about runs missed while no scheduler ran",
+)
+@click.option("--max-catch-up", type=int, help="With --misfire run-all, most missed runs to run")
 @pass_context
 def update_task(
     ctx: Context,
@@ -38,6 +53,9 @@ def update_task(
     plan_timeout: int | None,
     plan_max_iterations: int | None,
     code_source: str | None,
+    limits: tuple[str, ...],
+    misfire: str | None,
+    max_catch_up: int | None,
 ) -> None:
     """Update an existing task."""
     t = ctx.task_repo.find_by_name(name)
@@ -55,6 +73,8 @@ def update_task(
     _update_basic_fields(t, prompt, skill, model, timeout, max_turns, autonomous)
     _update_plan_mode_fields(t, plan_mode, plan_timeout, plan_max_iterations)
     _update_code_source(t, code_source)
+    t.resource_limits = build_resource_limits(limits, t.resource_limits)
+    t.misfire_policy = build_misfire_policy(misfire, max_catch_up, t.misfire_policy)
     _validate_final_plan_mode(t)
 
     ctx.task_repo.update(t)
@@ -53,11 +53,13 @@ class Context:
         # Lazy-loaded components
         self._task_repo = None
         self._log_repo = None
+        self._blob_store = None
         self._skill_registry = None
         self._session_manager = None
         self._scheduler = None
         self._channel_repo = None
         self._approval_repo = None
+        self._notification_outbox = None
         self._notification_service = None
 
     @property
@@ -90,6 +92,7 @@ class Context:
             # Reset lazy-loaded components so they use new paths
             self._task_repo = None
             self._log_repo = None
+            self._blob_store = None
             self._skill_registry = None
             self._session_manager = None
             self._scheduler = None
@@ -134,6 +137,10 @@ class Context:
     def sessions_dir(self) -> Path:
         return self.data_dir / "sessions"
 
+    @property
+    def blobs_dir(self) -> Path:
+        return self.data_dir / "blobs"
+
     @property
     def task_repo(self):
         if self._task_repo is None:
@@ -147,9 +154,29 @@ class Context:
         if self._log_repo is None:
             from codegeass.storage.log_repository import LogRepository
 
-            self._log_repo = LogRepository(self.logs_dir)
+            self._log_repo = LogRepository(self.logs_dir, blob_store=self.blob_store)
         return self._log_repo
 
+    @property
+    def blob_store(self):
+        if self._blob_store is None:
+            from codegeass.storage.blob_store import BlobStore
+
+            self._blob_store = BlobStore(self.blobs_dir)
+        return self._blob_store
+
+    @property
+    def log_retention(self):
+        from codegeass.storage.log_retention import LogRetention, RetentionPolicy
+
+        return LogRetention(
+            self.logs_dir,
+            RetentionPolicy.from_settings(self.settings_file),
+            sessions_dir=self.sessions_dir,
+            blob_store=self.blob_store,
+            blobs_dir=self.blobs_dir,
+        )
+
     @property
     def skill_registry(self):
         if self._skill_registry is None:
@@ -191,7 +218,7 @@ class Context:
         if self._session_manager is None:
             from codegeass.execution.session import SessionManager
 
-            self._session_manager = SessionManager(self.sessions_dir)
+            self._session_manager = SessionManager(self.sessions_dir, blob_store=self.blob_store)
         return self._session_manager
 
     @property
@@ -213,24 +240,54 @@ class Context:
             self._approval_repo = PendingApprovalRepository(approvals_file)
         return self._approval_repo
 
+    @property
+    def notification_outbox(self):
+        if self._notification_outbox is None:
+            from codegeass.storage.notification_outbox import NotificationOutbox
+
+            outbox_file = self.data_dir / "notifications" / "outbox.db"
+            self._notification_outbox = NotificationOutbox(outbox_file)
+        return self._notification_outbox
+
     @property
     def notification_service(self):
         if self._notification_service is None and self.channel_repo is not None:
+            from codegeass.notifications.delivery import OutboxDelivery
             from codegeass.notifications.service import NotificationService
 
-            self._notification_service = NotificationService(self.channel_repo)
+            self._notification_service = NotificationService(
+                self.channel_repo,
+                delivery=OutboxDelivery.from_settings(
+                    self.settings_file, self.notification_outbox, self.channel_repo
+                ),
+            )
         return self._notification_service
 
     @property
     def scheduler(self):
         if self._scheduler is None:
+            from codegeass.execution.tracker import get_execution_tracker
+            from codegeass.execution.worktree_pool import WorktreePool
+            from codegeass.scheduling.liveness import SchedulerLiveness
             from codegeass.scheduling.scheduler import Scheduler
+            from codegeass.scheduling.task_pool import ConcurrencyLimits
+            from codegeass.storage.fire_ledger import FireLedger
 
+            limits = ConcurrencyLimits.from_settings(self.settings_file)
             self._scheduler = Scheduler(
                 task_repository=self.task_repo,
                 skill_registry=self.skill_registry,
                 session_manager=self.session_manager,
                 log_repository=self.log_repo,
+                max_concurrent=limits.max_concurrent,
+                retention=self.log_retention,
+                max_per_project=limits.per_project,
+                max_per_provider=limits.per_provider,
+                lock_dir=self.data_dir / "locks",
+                worktree_pool=WorktreePool.from_settings(self.settings_file),
+                fire_ledger=FireLedger(self.data_dir / "fire_ledger.json"),
+                liveness=SchedulerLiveness(self.data_dir),
+                tracker=get_execution_tracker(self.data_dir),
             )
 
             # Register notification handler if notifications are configured
@@ -384,6 +441,17 @@ paths:
 scheduler:
   check_interval: 60
   max_concurrent: 1
+  max_concurrent_per_project: 0
+  max_concurrent_per_provider: 0
+  worktree_pool_size: 2
+
+retention:
+  # 0 = no limit; set these to start removing old logs and sessions
+  max_age_days: 0
+  max_runs_per_task: 0
+  max_total_bytes: 0
+  archive: true
+  compact_interval_hours: 24
 """
         ctx.settings_file.write_text(default_settings)
         console.print(f"Created: {ctx.settings_file}")
@@ -1,5 +1,6 @@
 """Core domain layer - entities, value objects, and exceptions."""
 
+from codegeass.core.cron_schedule import CronSchedule, compile_cron, upcoming_fires
 from codegeass.core.entities import Prompt, Skill, Task, Template
 from codegeass.core.exceptions import (
     CodeGeassError,
@@ -11,7 +12,13 @@ from codegeass.core.exceptions import (
     TemplateNotFoundError,
     ValidationError,
 )
-from codegeass.core.value_objects import CronExpression, ExecutionResult, ExecutionStatus
+from codegeass.core.value_objects import (
+    CronExpression,
+    ExecutionResult,
+    ExecutionStatus,
+    MisfirePolicy,
+    ResourceLimits,
+)
 
 __all__ = [
     # Entities
@@ -23,6 +30,12 @@ __all__ = [
     "CronExpression",
     "ExecutionResult",
     "ExecutionStatus",
+    "MisfirePolicy",
+    "ResourceLimits",
+    # Schedules
+    "CronSchedule",
+    "compile_cron",
+    "upcoming_fires",
     # Exceptions
     "CodeGeassError",
     "ConfigurationError",
@@ -0,0 +1,375 @@
+"""CRON expressions compiled into bitsets.
+
+croniter re-parses an expression every time an iterator is built, and the
+scheduler, CLI and dashboard build several per task on every pass or
+request. CronSchedule parses an expression once into one integer bitmask
+per field (bit n set = value n allowed), and compiled schedules are cached
+by expression string. Next and previous fire times are found by jumping to
+the nearest set bit of each field, from month down to minute, instead of
+stepping through candidate times.
+
+Expressions using croniter extensions this compiler does not handle (L, W,
+#, a seconds field, ...) are delegated to croniter, so every expression
+croniter accepts keeps working.
+"""
+
+import calendar
+import heapq
+from collections.abc import Hashable, Iterable, Iterator
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from croniter import croniter
+
+from codegeass.core.exceptions import ValidationError
+
+# Aliases expanded before parsing
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# Compiled schedules kept in the cache
+CACHE_SIZE = 4096
+
+# (min, max) of each field: minute, hour, day of month, month, day of week
+_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+_MONTH_NAMES = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+_DAY_NAMES = {
+    name: number for number, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))
+}
+
+# A fire time this far past the start means the expression can never fire
+# (e.g. February 30th)
+_SEARCH_YEARS = 28
+
+_MINUTE = timedelta(minutes=1)
+
+# Masks of a day-of-month and a day-of-week field allowing every day
+_FULL_DAYS = ((1 << 32) - 1) & ~1
+_FULL_WEEK = (1 << 7) - 1
+
+
+class _UnsupportedError(Exception):
+    """Syntax the compiler leaves to croniter."""
+
+
+def _next_bit(mask: int, start: int) -> int | None:
+    """Lowest set bit of mask at or above start."""
+    high = mask >> start
+    if not high:
+        return None
+    return start + (high & -high).bit_length() - 1
+
+
+def _prev_bit(mask: int, start: int) -> int | None:
+    """Highest set bit of mask at or below start."""
+    low = mask & ((2 << start) - 1)
+    if not low:
+        return None
+    return low.bit_length() - 1
+
+
+def _parse_value(text: str, index: int) -> int:
+    names = _MONTH_NAMES if index == 3 else _DAY_NAMES if index == 4 else {}
+    value = names.get(text.lower())
+    if value is not None:
+        return value
+    if not text.isdigit():
+        raise _UnsupportedError(text)
+    return int(text)
+
+
+def _parse_field(text: str, index: int) -> int:
+    """Parse one field into a bitmask of the values it allows."""
+    low, high = _BOUNDS[index]
+    # Only explicit values and ranges use 7 for Sunday
+    star_high = 6 if index == 4 else high
+    mask = 0
+    for part in text.split(","):
+        step = 1
+        stepped = "/" in part
+        if stepped:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise _UnsupportedError(step_text)
+            step = int(step_text)
+
+        if part in ("*", "?"):
+            start, end = low, star_high
+        elif "-" in part:
+            first, last = part.split("-", 1)
+            start, end = _parse_value(first, index), _parse_value(last, index)
+        elif stepped:
+            # croniter wraps "N/S" around the range in ways cron does not
+            raise _UnsupportedError(part)
+        else:
+            start = end = _parse_value(part, index)
+
+        if not (low <= start <= high and low <= end <= high):
+            raise _UnsupportedError(part)
+        if start <= end:
+            values = range(start, end + 1, step)
+        else:
+            # Wrapping range, e.g. fri-mon
+            values = [*range(start, high + 1), *range(low, end + 1)][::step]
+        for value in values:
+            mask |= 1 << value
+
+    if index == 4 and mask & (1 << 7):
+        # 7 is another name for Sunday
+        mask = (mask | 1) & 0x7F
+    return mask
+
+
+class CronSchedule:
+    """A CRON expression compiled for fast next/previous fire lookups.
+
+    Get instances through compile_cron(), which caches them. Times are
+    naive datetimes at minute resolution, like croniter's.
+    """
+
+    __slots__ = (
+        "expression",
+        "minutes",
+        "hours",
+        "days",
+        "months",
+        "weekdays",
+        "_any_day",
+        "_any_weekday",
+        "_fallback",
+    )
+
+    def __init__(self, expression: str):
+        """Compile the expression.
+
+        Raises:
+            ValidationError: If the expression is invalid
+        """
+        self.expression = expression
+        self._fallback = False
+        normalized = CRON_ALIASES.get(expression.strip().lower(), expression)
+        fields = normalized.split()
+        try:
+            if len(fields) != 5:
+                raise _UnsupportedError(normalized)
+            masks = [_parse_field(text, index) for index, text in enumerate(fields)]
+            if (
+                fields[2] not in ("*", "?")
+                and fields[4] not in ("*", "?")
+                and (masks[2] == _FULL_DAYS or masks[4] == _FULL_WEEK)
+            ):
+                # croniter decides between "either day field" and "both" from
+                # its own expansion here; leave it to croniter
+                raise _UnsupportedError(normalized)
+        except (_UnsupportedError, ValueError):
+            if not croniter.is_valid(normalized):
+                raise ValidationError(f"Invalid CRON expression: {expression}") from None
+            self._fallback = True
+            masks = [0] * 5
+
+        self.minutes, self.hours, self.days, self.months, self.weekdays = masks
+        self._any_day = fields[2:3] in (["*"], ["?"])
+        self._any_weekday = fields[4:5] in (["*"], ["?"])
+        if not self._fallback and self.next_after(datetime(2000, 1, 1)) is None:
+            raise ValidationError(f"CRON expression never fires: {expression}")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    def _month_days(self, year: int, month: int) -> int:
+        """Bitmask of the days of a month the expression fires on."""
+        first_weekday, length = calendar.monthrange(year, month)
+        valid = ((2 << length) - 1) & ~1
+        if self._any_day and self._any_weekday:
+            return valid
+
+        # Rotate the weekday mask so bit 0 is the 1st, then repeat it over 5 weeks
+        shift = (first_weekday + 1) % 7  # Python counts from Monday, cron from Sunday
+        week = ((self.weekdays >> shift) | (self.weekdays << (7 - shift))) & 0x7F
+        by_weekday = (week * 0x10204081) << 1 & valid  # 0x10204081 = bits 0, 7, 14, 21, 28
+
+        if self._any_weekday:
+            return self.days & valid
+        if self._any_day:
+            return by_weekday
+        # Like cron, restricting both day fields matches either of them
+        return (self.days | by_weekday) & valid
+
+    def matches(self, moment: datetime) -> bool:
+        """Check if the expression fires at the minute of `moment`."""
+        if self._fallback:
+            return croniter.match(self.expression, moment)
+        return bool(
+            self.minutes >> moment.minute & 1
+            and self.hours >> moment.hour & 1
+            and self.months >> moment.month & 1
+            and self._month_days(moment.year, moment.month) >> moment.day & 1
+        )
+
+    def next_after(self, moment: datetime) -> datetime | None:
+        """First fire time strictly after `moment`, or None if there is none."""
+        if self._fallback:
+            return croniter(self.expression, moment).get_next(datetime)
+
+        start = moment.replace(second=0, microsecond=0) + _MINUTE
+        year, month, day, hour, minute = start.timetuple()[:5]
+        while year <= moment.year + _SEARCH_YEARS:
+            found = _next_bit(self.months, month)
+            if found is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if found != month:
+                month, day, hour, minute = found, 1, 0, 0
+
+            found = _next_bit(self._month_days(year, month), day)
+            if found is None:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            if found != day:
+                day, hour, minute = found, 0, 0
+
+            found = _next_bit(self.hours, hour)
+            if found is None:
+                hour = 24  # Roll over to the next matching day
+            elif found != hour:
+                hour, minute = found, 0
+            if hour < 24:
+                found = _next_bit(self.minutes, minute)
+                if found is not None:
+                    return start.replace(year=year, month=month, day=day, hour=hour, minute=found)
+                hour += 1
+                minute = 0
+                if hour < 24 and _next_bit(self.hours, hour) is not None:
+                    continue
+
+            # Nothing left today: move to the next day
+            next_day = datetime(year, month, day) + timedelta(days=1)
+            year, month, day, hour, minute = next_day.year, next_day.month, next_day.day, 0, 0
+        return None
+
+    def prev_before(self, moment: datetime) -> datetime | None:
+        """Last fire time strictly before `moment`, or None if there is none."""
+        if self._fallback:
+            return croniter(self.expression, moment).get_prev(datetime)
+
+        start = moment.replace(second=0, microsecond=0)
+        if start == moment:
+            start -= _MINUTE
+        year, month, day, hour, minute = start.timetuple()[:5]
+        while year >= moment.year - _SEARCH_YEARS:
+            found = _prev_bit(self.months, month)
+            if found is None:
+                year, month, day, hour, minute = year - 1, 12, 31, 23, 59
+                continue
+            if found != month:
+                month, day, hour, minute = found, 31, 23, 59
+            day = min(day, calendar.monthrange(year, month)[1])
+
+            found = _prev_bit(self._month_days(year, month), day)
+            if found is None:
+                year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+                day, hour, minute = 31, 23, 59
+                continue
+            if found != day:
+                day, hour, minute = found, 23, 59
+
+            found = _prev_bit(self.hours, hour)
+            if found is not None:
+                if found != hour:
+                    hour, minute = found, 59
+                found_minute = _prev_bit(self.minutes, minute)
+                if found_minute is not None:
+                    return start.replace(
+                        year=year, month=month, day=day, hour=hour, minute=found_minute
+                    )
+                if hour > 0 and _prev_bit(self.hours, hour - 1) is not None:
+                    hour, minute = hour - 1, 59
+                    continue
+
+            # Nothing earlier today: move to the previous day
+            prev_day = datetime(year, month, day) - timedelta(days=1)
+            year, month, day, hour, minute = prev_day.year, prev_day.month, prev_day.day, 23, 59
+        return None
+
+    def iter_after(self, moment: datetime) -> Iterator[datetime]:
+        """Fire times strictly after `moment`, in order."""
+        current = self.next_after(moment)
+        while current is not None:
+            yield current
+            current = self.next_after(current)
+
+    def next_n(self, moment: datetime, n: int) -> list[datetime]:
+        """The next n fire times strictly after `moment`."""
+        times = []
+        for fire_at in self.iter_after(moment):
+            if len(times) == n:
+                break
+            times.append(fire_at)
+        return times
+
+    def between(self, after: datetime, until: datetime, limit: int) -> list[datetime]:
+        """Up to `limit` fire times in (after, until], newest first."""
+        times: list[datetime] = []
+        # prev_before() keeps a partial minute, so this includes `until` itself
+        current = self.prev_before(until + timedelta(microseconds=1))
+        while current is not None and current > after and len(times) < limit:
+            times.append(current)
+            current = self.prev_before(current)
+        return times
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_cron(expression: str) -> CronSchedule:
+    """Compile a CRON expression, reusing an earlier compilation of the same string.
+
+    Raises:
+        ValidationError: If the expression is invalid
+    """
+    return CronSchedule(expression)
+
+
+def upcoming_fires(
+    schedules: Iterable[tuple[Hashable, str]],
+    start: datetime,
+    end: datetime,
+    limit_per_schedule: int | None = None,
+) -> list[tuple[datetime, Hashable]]:
+    """Fire times of many schedules in (start, end], merged in time order.
+
+    Args:
+        schedules: (key, expression) pairs, e.g. task IDs and their schedules
+        start: Window start (exclusive)
+        end: Window end (inclusive)
+        limit_per_schedule: Most fire times taken from each schedule
+
+    Returns:
+        (fire_time, key) pairs sorted by time; invalid expressions are skipped
+    """
+    streams = []
+    for key, expression in schedules:
+        try:
+            schedule = compile_cron(expression)
+        except ValidationError:
+            continue
+        times: list[tuple[datetime, Hashable]] = []
+        for fire_at in schedule.iter_after(start):
+            if fire_at > end or len(times) == limit_per_schedule:
+                break
+            times.append((fire_at, key))
+        streams.append(times)
+    return list(heapq.merge(*streams, key=lambda item: item[0]))
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any, Self
 
 from codegeass.core.exceptions import ValidationError
-from codegeass.core.value_objects import CronExpression
+from codegeass.core.value_objects import CronExpression, MisfirePolicy, ResourceLimits
 
 
 @dataclass
@@ -44,6 +44,12 @@ class Task:
     plan_timeout: int = 3600  # Approval timeout in seconds (default 1 hour)
     plan_max_iterations: int = 5  # Max discuss rounds before auto-cancel
 
+    # CPU, memory and process caps for the agent run
+    resource_limits: ResourceLimits | None = None
+
+    # What to do about schedule instants missed while no scheduler ran
+    misfire_policy: MisfirePolicy = field(default_factory=MisfirePolicy)
+
     def __post_init__(self) -> None:
         """Validate task configuration."""
         CronExpression(self.schedule)  # Validate CRON expression
@@ -98,6 +104,16 @@ class Task:
             plan_mode=data.get("plan_mode", False),
             plan_timeout=data.get("plan_timeout", 3600),
             plan_max_iterations=data.get("plan_max_iterations", 5),
+            resource_limits=(
+                ResourceLimits.from_dict(data["resource_limits"])
+                if data.get("resource_limits")
+                else None
+            ),
+            misfire_policy=(
+                MisfirePolicy.from_dict(data["misfire_policy"])
+                if data.get("misfire_policy")
+                else MisfirePolicy()
+            ),
         )
 
     def to_dict(self) -> dict:
@@ -126,6 +142,10 @@ class Task:
             result["plan_mode"] = self.plan_mode
             result["plan_timeout"] = self.plan_timeout
             result["plan_max_iterations"] = self.plan_max_iterations
+        if self.resource_limits and not self.resource_limits.is_empty:
+            result["resource_limits"] = self.resource_limits.to_dict()
+        if not self.misfire_policy.is_default:
+            result["misfire_policy"] = self.misfire_policy.to_dict()
         return result
 
     @property
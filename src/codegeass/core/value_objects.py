@@ -1,12 +1,11 @@
 """Value objects for CodeGeass domain."""
 
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Self
 
-from croniter import croniter
-
+from codegeass.core.cron_schedule import CronSchedule, compile_cron
 from codegeass.core.exceptions import ValidationError
 
 
@@ -33,6 +32,14 @@ class ExecutionResult:
     error: str | None = None
     exit_code: int | None = None
     metadata: dict | None = None  # Optional metadata (e.g., worktree_path for plan mode)
+    # Parsed clean_output, computed on first access and kept through serialization
+    parsed_output: str | None = field(default=None, compare=False, repr=False)
+    # Set when the full output lives in the blob store; `output` is then a preview
+    output_ref: str | None = None
+    output_size: int | None = None
+    # Likewise for clean_output, which is then a preview of the parsed text
+    clean_output_ref: str | None = None
+    clean_output_size: int | None = None
 
     @property
     def duration_seconds(self) -> float:
@@ -46,7 +53,17 @@ class ExecutionResult:
 
     @property
     def clean_output(self) -> str:
-        """Get human-readable output (parsed based on provider format)."""
+        """Get human-readable output (parsed based on provider format).
+
+        The provider output is parsed once per result and cached; results
+        loaded from logs reuse the stored value instead of re-parsing.
+        """
+        if self.parsed_output is None:
+            object.__setattr__(self, "parsed_output", self._parse_output())
+        return self.parsed_output
+
+    def _parse_output(self) -> str:
+        """Parse the raw provider output into human-readable text."""
         # Check provider from metadata to use correct parser
         provider = self.metadata.get("provider") if self.metadata else None
 
@@ -57,13 +74,13 @@ class ExecutionResult:
             return extract_clean_text(self.output)
         else:
             # Default to Claude stream-json parser
-            from codegeass.execution.output_parser import extract_clean_text
+            from codegeass.providers.claude.output_parser import extract_clean_text
 
             return extract_clean_text(self.output)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization."""
-        return {
+        data = {
             "task_id": self.task_id,
             "session_id": self.session_id,
             "status": self.status.value,
@@ -76,6 +93,13 @@ class ExecutionResult:
             "duration_seconds": self.duration_seconds,
             "metadata": self.metadata,
         }
+        if self.output_ref:
+            data["output_ref"] = self.output_ref
+            data["output_size"] = self.output_size
+        if self.clean_output_ref:
+            data["clean_output_ref"] = self.clean_output_ref
+            data["clean_output_size"] = self.clean_output_size
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -84,12 +108,17 @@ class ExecutionResult:
             task_id=data["task_id"],
             session_id=data.get("session_id"),
             status=ExecutionStatus(data["status"]),
-            output=data["output"],
+            output=data.get("output", ""),
             started_at=datetime.fromisoformat(data["started_at"]),
             finished_at=datetime.fromisoformat(data["finished_at"]),
             error=data.get("error"),
             exit_code=data.get("exit_code"),
             metadata=data.get("metadata"),
+            parsed_output=data.get("clean_output"),
+            output_ref=data.get("output_ref"),
+            output_size=data.get("output_size"),
+            clean_output_ref=data.get("clean_output_ref"),
+            clean_output_size=data.get("clean_output_size"),
         )
 
 
@@ -101,29 +130,21 @@ class CronExpression:
 
     def __post_init__(self) -> None:
         """Validate the CRON expression."""
-        if not self._is_valid(self.expression):
-            raise ValidationError(f"Invalid CRON expression: {self.expression}")
+        # Compiling validates; the compiled schedule is cached by expression
+        compile_cron(self.expression)
 
-    @staticmethod
-    def _is_valid(expression: str) -> bool:
-        """Check if CRON expression is valid."""
-        try:
-            croniter(expression)
-            return True
-        except (ValueError, KeyError):
-            return False
+    @property
+    def schedule(self) -> CronSchedule:
+        """Get the compiled schedule."""
+        return compile_cron(self.expression)
 
     def get_next(self, base_time: datetime | None = None) -> datetime:
         """Get next scheduled time from base_time (default: now)."""
-        base = base_time or datetime.now()
-        cron = croniter(self.expression, base)
-        return cron.get_next(datetime)
+        return self.schedule.next_after(base_time or datetime.now())
 
     def get_prev(self, base_time: datetime | None = None) -> datetime:
         """Get previous scheduled time from base_time (default: now)."""
-        base = base_time or datetime.now()
-        cron = croniter(self.expression, base)
-        return cron.get_prev(datetime)
+        return self.schedule.prev_before(base_time or datetime.now())
 
     def is_due(self, window_seconds: int = 60) -> bool:
         """Check if task is due within the time window."""
@@ -162,3 +183,144 @@ class CronExpression:
             return f"{day_str} at {hour}:{minute.zfill(2)}"
 
         return self.expression
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Per-task caps on the resources an agent run may use.
+
+    Every field is optional; None means no limit. memory_mb and
+    max_processes apply to the whole process tree when a cgroup v2 delegate
+    is configured, otherwise to each process (memory) or to the user's
+    processes started from the agent (process count). cpu_seconds caps the
+    CPU time of each process. nice (0-19) and io_class only ever lower the
+    run's priority.
+    """
+
+    IO_CLASSES = ("best-effort", "idle")
+
+    memory_mb: int | None = None
+    cpu_seconds: int | None = None
+    max_processes: int | None = None
+    nice: int | None = None
+    io_class: str | None = None
+
+    def __post_init__(self) -> None:
+        """Validate the limits."""
+        for name in ("memory_mb", "cpu_seconds", "max_processes"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValidationError(f"{name} must be positive: {value}")
+        if self.nice is not None and not 0 <= self.nice <= 19:
+            raise ValidationError(f"nice must be between 0 and 19: {self.nice}")
+        if self.io_class is not None and self.io_class not in self.IO_CLASSES:
+            raise ValidationError(
+                f"io_class must be one of {', '.join(self.IO_CLASSES)}: {self.io_class}"
+            )
+
+    @property
+    def is_empty(self) -> bool:
+        """Check if no limit is set."""
+        return not any(self.to_dict().values())
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for serialization, leaving out unset limits."""
+        values = {
+            "memory_mb": self.memory_mb,
+            "cpu_seconds": self.cpu_seconds,
+            "max_processes": self.max_processes,
+            "nice": self.nice,
+            "io_class": self.io_class,
+        }
+        return {key: value for key, value in values.items() if value is not None}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        """Create from dictionary.
+
+        Raises:
+            ValidationError: If a key is unknown or a value is invalid
+        """
+        unknown = set(data) - {"memory_mb", "cpu_seconds", "max_processes", "nice", "io_class"}
+        if unknown:
+            raise ValidationError(f"Unknown resource limits: {', '.join(sorted(unknown))}")
+        try:
+            return cls(
+                **{
+                    key: (value if key == "io_class" or value is None else int(value))
+                    for key, value in data.items()
+                }
+            )
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid resource limits: {e}") from e
+
+
+@dataclass(frozen=True)
+class MisfirePolicy:
+    """What a task does about schedule instants the scheduler did not fire on time.
+
+    An instant is missed once it is further behind than the scheduler's
+    misfire threshold (e.g. because no scheduler was running). skip drops
+    missed instants; run-once (the default) runs the task once however many
+    instants are pending; run-all runs it once per pending instant, for at
+    most max_catch_up of the most recent ones.
+    """
+
+    MODES = ("skip", "run-once", "run-all")
+
+    mode: str = "run-once"
+    max_catch_up: int = 10
+
+    def __post_init__(self) -> None:
+        """Validate the policy."""
+        if self.mode not in self.MODES:
+            raise ValidationError(
+                f"misfire mode must be one of {', '.join(self.MODES)}: {self.mode}"
+            )
+        if self.max_catch_up <= 0:
+            raise ValidationError(f"max_catch_up must be positive: {self.max_catch_up}")
+
+    @property
+    def is_default(self) -> bool:
+        """Check if this is the policy tasks get when none is set."""
+        return self == MisfirePolicy()
+
+    @property
+    def max_runs(self) -> int:
+        """Most runs a single scheduler pass can start for the task."""
+        return self.max_catch_up if self.mode == "run-all" else 1
+
+    def runs_for(self, pending: list[datetime], now: datetime, threshold: timedelta) -> int:
+        """Number of runs to start for the pending instants (newest first)."""
+        if not pending:
+            return 0
+        if self.mode == "skip":
+            return 1 if now - pending[0] <= threshold else 0
+        return min(len(pending), self.max_runs)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for serialization."""
+        result: dict = {"mode": self.mode}
+        if self.mode == "run-all":
+            result["max_catch_up"] = self.max_catch_up
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict | str) -> Self:
+        """Create from a dictionary, or from a bare mode name.
+
+        Raises:
+            ValidationError: If a key is unknown or a value is invalid
+        """
+        if isinstance(data, str):
+            data = {"mode": data}
+        unknown = set(data) - {"mode", "max_catch_up"}
+        if unknown:
+            raise ValidationError(f"Unknown misfire policy keys: {', '.join(sorted(unknown))}")
+        try:
+            return cls(
+                mode=str(data.get("mode", "run-once")),
+                max_catch_up=int(data.get("max_catch_up", 10)),
+            )
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid misfire policy: {e}") from e
@@ -44,12 +44,21 @@ class Settings:
     def get_schedules_path(self) -> Path:
         return self.config_dir / "schedules.yaml"
 
+    def get_settings_path(self) -> Path:
+        return self.config_dir / "settings.yaml"
+
     def get_logs_dir(self) -> Path:
         return self.data_dir / "logs"
 
     def get_sessions_dir(self) -> Path:
         return self.data_dir / "sessions"
 
+    def get_blobs_dir(self) -> Path:
+        return self.data_dir / "blobs"
+
+    def get_locks_dir(self) -> Path:
+        return self.data_dir / "locks"
+
 
 settings = Settings()
 
@@ -2,10 +2,15 @@
 
 
 from codegeass.execution.session import SessionManager
+from codegeass.execution.worktree_pool import WorktreePool
 from codegeass.factory.skill_resolver import ChainedSkillRegistry, Platform
+from codegeass.scheduling.liveness import SchedulerLiveness
 from codegeass.scheduling.scheduler import Scheduler
+from codegeass.scheduling.task_pool import ConcurrencyLimits
 from codegeass.storage.approval_repository import PendingApprovalRepository
+from codegeass.storage.blob_store import BlobStore
 from codegeass.storage.channel_repository import ChannelRepository
+from codegeass.storage.fire_ledger import FireLedger
 from codegeass.storage.log_repository import LogRepository
 from codegeass.storage.task_repository import TaskRepository
 
@@ -22,6 +27,7 @@ from .services import (
 # Singleton instances
 _task_repo: TaskRepository | None = None
 _log_repo: LogRepository | None = None
+_blob_store: BlobStore | None = None
 _channel_repo: ChannelRepository | None = None
 _approval_repo: PendingApprovalRepository | None = None
 _skill_registry: ChainedSkillRegistry | None = None
@@ -45,10 +51,18 @@ def get_log_repo() -> LogRepository:
     """Get or create LogRepository singleton."""
     global _log_repo
     if _log_repo is None:
-        _log_repo = LogRepository(settings.get_logs_dir())
+        _log_repo = LogRepository(settings.get_logs_dir(), blob_store=get_blob_store())
     return _log_repo
 
 
+def get_blob_store() -> BlobStore:
+    """Get or create BlobStore singleton for execution transcripts."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore(settings.get_blobs_dir())
+    return _blob_store
+
+
 def get_skill_registry() -> ChainedSkillRegistry:
     """Get or create ChainedSkillRegistry singleton."""
     global _skill_registry
@@ -65,7 +79,9 @@ def get_session_manager() -> SessionManager:
     """Get or create SessionManager singleton."""
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager(settings.get_sessions_dir())
+        _session_manager = SessionManager(
+            settings.get_sessions_dir(), blob_store=get_blob_store()
+        )
     return _session_manager
 
 
@@ -82,13 +98,20 @@ def get_scheduler() -> Scheduler:
     """Get or create Scheduler singleton."""
     global _scheduler
     if _scheduler is None:
+        limits = ConcurrencyLimits.from_settings(settings.get_settings_path())
         _scheduler = Scheduler(
             task_repository=get_task_repo(),
             skill_registry=get_skill_registry(),
             session_manager=get_session_manager(),
             log_repository=get_log_repo(),
-            max_concurrent=1,
+            max_concurrent=limits.max_concurrent,
             tracker=get_execution_tracker(),
+            max_per_project=limits.per_project,
+            max_per_provider=limits.per_provider,
+            lock_dir=settings.get_locks_dir(),
+            worktree_pool=WorktreePool.from_settings(settings.get_settings_path()),
+            fire_ledger=FireLedger(settings.data_dir / "fire_ledger.json"),
+            liveness=SchedulerLiveness(settings.data_dir),
         )
         # Register notification handler
         _setup_notification_handler(_scheduler)
@@ -151,12 +174,21 @@ def get_core_notification_service():
     """Get or create core NotificationService singleton.
 
     This is the core service used by the notification handler for task execution.
-    It preserves message_ids state across task start/complete notifications.
+    It queues notifications in the shared outbox under data/notifications/.
     """
     global _core_notification_service
     if _core_notification_service is None:
+        from codegeass.notifications.delivery import OutboxDelivery
         from codegeass.notifications.service import NotificationService as CoreNotificationService
-        _core_notification_service = CoreNotificationService(get_channel_repo())
+        from codegeass.storage.notification_outbox import NotificationOutbox
+
+        outbox = NotificationOutbox(settings.data_dir / "notifications" / "outbox.db")
+        _core_notification_service = CoreNotificationService(
+            get_channel_repo(),
+            delivery=OutboxDelivery.from_settings(
+                settings.get_settings_path(), outbox, get_channel_repo()
+            ),
+        )
     return _core_notification_service
 
 
@@ -122,6 +122,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 await _execution_broadcast_task
             except asyncio.CancelledError:
                 pass
+
+            from .websocket import get_connection_manager
+
+            await get_connection_manager().close()
         except Exception:
             pass
 
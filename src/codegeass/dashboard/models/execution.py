@@ -21,7 +21,8 @@ class ExecutionResult(BaseModel):
     task_name: str | None = None
     session_id: str | None = None
     status: ExecutionStatus
-    output: str = ""
+    output: str = ""  # Preview only when the transcript is in the blob store
+    output_size: int | None = None  # Size in bytes of the full stored transcript
     clean_output: str = ""  # Parsed human-readable output from stream-json
     error: str | None = None
     exit_code: int | None = None
@@ -14,6 +14,10 @@ class SchedulerStatus(BaseModel):
     due_tasks: int = 0
     last_check: str | None = None
     next_check: str | None = None
+    alive: bool = False
+    source: str | None = None
+    lag_seconds: float | None = None
+    notifications: dict[str, float] | None = None
 
 
 class UpcomingRun(BaseModel):
@@ -23,6 +23,17 @@ async def list_active_executions() -> list[dict[str, Any]]:
     return manager.get_active_executions()
 
 
+@router.get("/connections")
+async def get_connection_stats() -> dict[str, Any]:
+    """Get WebSocket delivery statistics.
+
+    Returns the number of connected clients and, per client, the queued,
+    sent and dropped message counts. Output and progress messages are
+    dropped when a client falls too far behind.
+    """
+    return get_connection_manager().get_stats()
+
+
 @router.get("/{execution_id}")
 async def get_execution(execution_id: str) -> dict[str, Any] | None:
     """Get details of a specific execution.
@@ -37,6 +48,22 @@ async def get_execution(execution_id: str) -> dict[str, Any] | None:
     return manager.get_execution(execution_id)
 
 
+@router.get("/{execution_id}/output")
+async def get_execution_output(execution_id: str, since: int = 0) -> dict[str, Any] | None:
+    """Get the buffered output of an execution, for catching up before streaming.
+
+    Args:
+        execution_id: The execution ID to look up
+        since: Sequence number of the first line wanted; output events carry
+            the sequence of their line, so clients resume without duplicates
+
+    Returns:
+        Lines with sequence numbers and the next sequence, or None if not active
+    """
+    manager = get_execution_manager()
+    return manager.get_output(execution_id, since)
+
+
 @router.get("/task/{task_id}")
 async def get_execution_by_task(task_id: str) -> dict[str, Any] | None:
     """Get the active execution for a specific task.
@@ -52,7 +79,7 @@ async def get_execution_by_task(task_id: str) -> dict[str, Any] | None:
 
 
 @router.websocket("/ws")
-async def websocket_all_executions(websocket: WebSocket) -> None:
+async def websocket_all_executions(websocket: WebSocket, batch: bool = False) -> None:
     """WebSocket endpoint for streaming all execution events.
 
     Clients receive real-time updates for all running executions.
@@ -62,17 +89,24 @@ async def websocket_all_executions(websocket: WebSocket) -> None:
     - execution.progress
     - execution.completed
     - execution.failed
+
+    With ?batch=true, each frame is a JSON array of the events of the last
+    50 ms instead of a single event.
+
+    Clients narrow what they receive by sending subscribe/unsubscribe
+    messages, e.g. {"action": "subscribe", "execution_id": "...",
+    "mode": "output", "max_lines_per_second": 20}; see
+    ConnectionManager.handle_message.
     """
     connection_manager = get_connection_manager()
-    await connection_manager.connect(websocket)
+    await connection_manager.connect(websocket, batch=batch)
 
     try:
         while True:
-            # Keep connection alive, handle any incoming messages
             try:
                 data = await websocket.receive_text()
-                # Could handle ping/pong or other client messages here
                 logger.debug(f"Received WebSocket message: {data}")
+                await connection_manager.handle_message(websocket, data)
             except WebSocketDisconnect:
                 break
     finally:
@@ -80,22 +114,27 @@ async def websocket_all_executions(websocket: WebSocket) -> None:
 
 
 @router.websocket("/ws/{task_id}")
-async def websocket_task_executions(websocket: WebSocket, task_id: str) -> None:
+async def websocket_task_executions(
+    websocket: WebSocket, task_id: str, batch: bool = False
+) -> None:
     """WebSocket endpoint for streaming execution events for a specific task.
 
-    Clients receive real-time updates only for the specified task.
+    Clients receive real-time updates only for the specified task, until
+    they send their own subscribe messages.
 
     Args:
         task_id: The task ID to subscribe to
+        batch: Send a JSON array of events per frame
     """
     connection_manager = get_connection_manager()
-    await connection_manager.connect(websocket, task_id=task_id)
+    await connection_manager.connect(websocket, task_id=task_id, batch=batch)
 
     try:
         while True:
             try:
                 data = await websocket.receive_text()
                 logger.debug(f"Received WebSocket message for task {task_id}: {data}")
+                await connection_manager.handle_message(websocket, data)
             except WebSocketDisconnect:
                 break
     finally:
@@ -26,18 +26,22 @@ async def get_upcoming_runs(
 
 @router.post("/run-due", response_model=list[ExecutionResult])
 async def run_due_tasks(
-    window_seconds: int = Query(60, ge=30, le=3600),
+    misfire_threshold: int | None = Query(
+        None, ge=60, le=86400, description="Seconds a run may be late before it counts as missed"
+    ),
     dry_run: bool = Query(False, description="Simulate execution"),
 ):
     """Run all due tasks."""
     service = get_scheduler_service()
-    return service.run_due_tasks(window_seconds=window_seconds, dry_run=dry_run)
+    return service.run_due_tasks(misfire_threshold=misfire_threshold, dry_run=dry_run)
 
 
 @router.get("/due")
 async def get_due_tasks(
-    window_seconds: int = Query(60, ge=30, le=3600),
+    misfire_threshold: int | None = Query(
+        None, ge=60, le=86400, description="Seconds a run may be late before it counts as missed"
+    ),
 ):
     """Get tasks that are currently due for execution."""
     service = get_scheduler_service()
-    return service.get_due_tasks(window_seconds=window_seconds)
+    return service.get_due_tasks(misfire_threshold=misfire_threshold)
@@ -2,10 +2,10 @@
 
 import asyncio
 import logging
-from collections.abc import Callable
+import os
 from typing import Any
 
-from codegeass.execution.events import ExecutionEvent
+from codegeass.execution.event_bus import DEFAULT_POLL_INTERVAL as BUS_POLL_INTERVAL
 from codegeass.execution.tracker import ExecutionTracker, get_execution_tracker
 
 from ..config import settings
@@ -17,8 +17,10 @@ logger = logging.getLogger(__name__)
 class ExecutionManager:
     """Service for managing execution monitoring.
 
-    Bridges the core ExecutionTracker with the WebSocket ConnectionManager
-    to provide real-time execution updates to dashboard clients.
+    Follows the cross-process execution event bus and relays every event
+    to WebSocket dashboard clients, so runs started by the cron runner or
+    the CLI are shown live alongside the dashboard's own. Events from other
+    processes are also mirrored into the tracker's active set.
     """
 
     def __init__(
@@ -34,33 +36,18 @@ class ExecutionManager:
         """
         self._tracker = tracker
         self._connection_manager = connection_manager
-        self._event_queue: asyncio.Queue[ExecutionEvent] = asyncio.Queue()
+        self._bus = tracker.event_bus
         self._running = False
-        self._unregister_callback: Callable[[], None] | None = None
 
     def start(self) -> None:
         """Start listening to execution events."""
         if self._running:
             return
-
-        # Register callback with tracker
-        def on_event(event: ExecutionEvent) -> None:
-            # Queue event for async processing
-            try:
-                self._event_queue.put_nowait(event)
-                print(f"[Execution Monitor] Event queued: {event.type.value} for {event.task_name}")
-            except asyncio.QueueFull:
-                logger.warning("Event queue full, dropping event")
-
-        self._unregister_callback = self._tracker.on_event(on_event)
         self._running = True
         logger.info("ExecutionManager started listening to events")
 
     def stop(self) -> None:
         """Stop listening to execution events."""
-        if self._unregister_callback:
-            self._unregister_callback()
-            self._unregister_callback = None
         self._running = False
         logger.info("ExecutionManager stopped")
 
@@ -71,32 +58,28 @@ class ExecutionManager:
         """
         logger.info("Starting execution broadcast loop")
         self.start()
+        offset = self._bus.head
 
         while self._running:
             try:
-                # Wait for next event with timeout
-                try:
-                    event = await asyncio.wait_for(
-                        self._event_queue.get(), timeout=1.0
-                    )
-                except TimeoutError:
+                records, offset = await asyncio.to_thread(self._bus.read, offset)
+                if not records:
+                    await asyncio.sleep(BUS_POLL_INTERVAL)
                     continue
 
-                # Convert event to dict for JSON serialization
-                event_data = event.to_dict()
+                for record in records:
+                    event = record.event
+                    if record.pid != os.getpid():
+                        self._tracker.apply_event(event)
 
-                conn_count = self._connection_manager.connection_count
-                print(f"[Execution Monitor] Broadcasting: {event.type.value} to {conn_count}")
+                    # Convert event to dict for JSON serialization
+                    event_data = event.to_dict()
+                    event_data["offset"] = record.offset
 
-                # Broadcast to all clients
-                await self._connection_manager.broadcast(event_data)
+                    # Queue for all clients (task-specific ones filter by task_id)
+                    await self._connection_manager.broadcast(event_data)
 
-                # Also send to task-specific clients
-                await self._connection_manager.send_to_task(
-                    event.task_id, event_data
-                )
-
-                logger.debug(f"Broadcasted event: {event.type.value}")
+                    logger.debug(f"Broadcasted event: {event.type.value}")
 
             except Exception as e:
                 logger.error(f"Error in broadcast loop: {e}")
@@ -125,6 +108,26 @@ class ExecutionManager:
         execution = self._tracker.get_execution(execution_id)
         return execution.to_dict() if execution else None
 
+    def get_output(self, execution_id: str, since: int = 0) -> dict[str, Any] | None:
+        """Get buffered output lines of an execution for catch-up.
+
+        Args:
+            execution_id: The execution ID
+            since: First line sequence number wanted
+
+        Returns:
+            The lines with their sequence numbers and the next sequence, or None
+        """
+        output = self._tracker.get_output_since(execution_id, since)
+        if output is None:
+            return None
+        lines, next_seq = output
+        return {
+            "execution_id": execution_id,
+            "lines": [{"seq": seq, "line": line} for seq, line in lines],
+            "next_seq": next_seq,
+        }
+
     def get_by_task(self, task_id: str) -> dict[str, Any] | None:
         """Get active execution for a task.
 
@@ -17,8 +17,12 @@ class LogService:
         self.log_repo = log_repo
         self.task_repo = task_repo
 
-    def _core_to_api(self, result: CoreResult) -> ExecutionResult:
-        """Convert core ExecutionResult to API model."""
+    def _core_to_api(self, result: CoreResult, full_output: bool = False) -> ExecutionResult:
+        """Convert core ExecutionResult to API model.
+
+        List views return the stored output previews; full_output loads the
+        complete transcript and parsed output from the blob store.
+        """
         # Get task name if available
         task_name = None
         task = self.task_repo.find_by_id(result.task_id)
@@ -30,8 +34,11 @@ class LogService:
             task_name=task_name,
             session_id=result.session_id,
             status=ExecutionStatus(result.status.value),
-            output=result.output,
-            clean_output=result.clean_output,
+            output=self.log_repo.load_output(result) if full_output else result.output,
+            output_size=result.output_size,
+            clean_output=(
+                self.log_repo.load_clean_output(result) if full_output else result.clean_output
+            ),
             error=result.error,
             exit_code=result.exit_code,
             started_at=result.started_at.isoformat(),
@@ -75,49 +82,33 @@ class LogService:
         """Get the latest log for a task."""
         result = self.log_repo.find_latest(task_id)
         if result:
-            return self._core_to_api(result)
+            return self._core_to_api(result, full_output=True)
         return None
 
     def get_overall_stats(self) -> LogStats:
         """Get overall log statistics."""
-        all_logs = self.log_repo.find_all(limit=10000)
-
-        total = len(all_logs)
-        successful = sum(1 for r in all_logs if r.status.value == "success")
-        failed = sum(1 for r in all_logs if r.status.value == "failure")
-        timeout = sum(1 for r in all_logs if r.status.value == "timeout")
-
-        success_rate = (successful / total * 100) if total > 0 else 0.0
-
-        durations = [r.duration_seconds for r in all_logs if r.duration_seconds]
-        avg_duration = sum(durations) / len(durations) if durations else 0.0
-
-        last_execution = None
-        if all_logs:
-            last_execution = max(r.finished_at for r in all_logs if r.finished_at)
-            if last_execution:
-                last_execution = last_execution.isoformat()
+        stats = self.log_repo.get_overall_stats()
 
         # Per-task breakdown
         by_task: dict[str, dict[str, Any]] = {}
         for task in self.task_repo.find_all():
-            stats = self.log_repo.get_task_stats(task.id)
+            task_stats = self.log_repo.get_task_stats(task.id)
             by_task[task.id] = {
                 "name": task.name,
-                "total": stats.get("total", 0),
-                "success": stats.get("success", 0),
-                "failure": stats.get("failure", 0),
-                "success_rate": stats.get("success_rate", 0.0),
+                "total": task_stats["total_runs"],
+                "success": task_stats["success_count"],
+                "failure": task_stats["failure_count"],
+                "success_rate": task_stats["success_rate"],
             }
 
         return LogStats(
-            total_executions=total,
-            successful=successful,
-            failed=failed,
-            timeout=timeout,
-            success_rate=success_rate,
-            avg_duration_seconds=avg_duration,
-            last_execution=last_execution,
+            total_executions=stats["total_runs"],
+            successful=stats["success_count"],
+            failed=stats["failure_count"],
+            timeout=stats["timeout_count"],
+            success_rate=stats["success_rate"],
+            avg_duration_seconds=stats["avg_duration"],
+            last_execution=stats["last_run"],
             by_task=by_task,
         )
 
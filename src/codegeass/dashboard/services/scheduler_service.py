@@ -39,7 +39,7 @@ class SchedulerService:
         status_data = self.scheduler.status()
         tasks = self.task_repo.find_all()
         enabled_tasks = [t for t in tasks if t.enabled]
-        due_tasks = self.scheduler.find_due_tasks(window_seconds=60)
+        due_tasks = self.scheduler.find_due_tasks()
 
         return SchedulerStatus(
             running=status_data.get("running", False),
@@ -50,6 +50,10 @@ class SchedulerService:
             due_tasks=len(due_tasks),
             last_check=status_data.get("last_check"),
             next_check=status_data.get("next_check"),
+            alive=status_data.get("alive", False),
+            source=status_data.get("source"),
+            lag_seconds=status_data.get("lag_seconds"),
+            notifications=status_data.get("notifications"),
         )
 
     def get_upcoming_runs(self, hours: int = 24) -> list[UpcomingRun]:
@@ -72,10 +76,10 @@ class SchedulerService:
         return upcoming
 
     def run_due_tasks(
-        self, window_seconds: int = 60, dry_run: bool = False
+        self, misfire_threshold: int | None = None, dry_run: bool = False
     ) -> list[ExecutionResult]:
         """Run all due tasks."""
-        results = self.scheduler.run_due(window_seconds=window_seconds, dry_run=dry_run)
+        results = self.scheduler.run_due(misfire_threshold=misfire_threshold, dry_run=dry_run)
 
         api_results = []
         for result in results:
@@ -103,9 +107,9 @@ class SchedulerService:
             return self._core_to_api_result(result, task_name)
         return None
 
-    def get_due_tasks(self, window_seconds: int = 60) -> list[dict[str, Any]]:
+    def get_due_tasks(self, misfire_threshold: int | None = None) -> list[dict[str, Any]]:
         """Get tasks that are due for execution."""
-        due = self.scheduler.find_due_tasks(window_seconds=window_seconds)
+        due = self.scheduler.find_due_tasks(misfire_threshold=misfire_threshold)
         return [
             {
                 "id": task.id,
@@ -216,12 +216,12 @@ class TaskService:
         stats = self.log_repo.get_task_stats(task_id)
         return TaskStats(
             task_id=task_id,
-            total_runs=stats.get("total", 0),
-            successful_runs=stats.get("success", 0),
-            failed_runs=stats.get("failure", 0),
-            timeout_runs=stats.get("timeout", 0),
-            success_rate=stats.get("success_rate", 0.0),
-            avg_duration_seconds=stats.get("avg_duration", 0.0),
+            total_runs=stats["total_runs"],
+            successful_runs=stats["success_count"],
+            failed_runs=stats["failure_count"],
+            timeout_runs=stats["timeout_count"],
+            success_rate=stats["success_rate"],
+            avg_duration_seconds=stats["avg_duration"],
             last_run=task.last_run,
             last_status=task.last_status,
         )
@@ -1,49 +1,193 @@
 """WebSocket connection manager for real-time execution monitoring."""
 
 import asyncio
+import contextlib
 import json
 import logging
-from typing import Any
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Literal
 
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# Droppable messages queued per client before new ones are dropped
+MAX_QUEUED_MESSAGES = 1000
+
+# Seconds batching clients wait to collect messages into one frame
+BATCH_INTERVAL = 0.05
+
+# Seconds a single send may take before the client is disconnected as stuck
+SEND_TIMEOUT = 10.0
+
+# Events that are never dropped, whatever the backlog
+LIFECYCLE_EVENTS = frozenset(
+    {
+        "execution.started",
+        "execution.completed",
+        "execution.failed",
+        "execution.waiting_approval",
+        "execution.stopped",
+    }
+)
+
+# Events delivered to "progress" subscriptions on top of lifecycle events
+PROGRESS_EVENTS = frozenset({"execution.progress"})
+
+# How much a subscription receives: lifecycle < progress < output
+SubscriptionMode = Literal["lifecycle", "progress", "output"]
+
+# What a subscription is keyed by: "all", "execution", "task" or "type"
+SubscriptionScope = Literal["all", "execution", "task", "type"]
+
+# Fields of an event each scope matches against
+_SCOPE_FIELDS: dict[str, str] = {
+    "execution": "execution_id",
+    "task": "task_id",
+    "type": "type",
+}
+
+
+@dataclass
+class Subscription:
+    """Which events a client wants, and how many output lines per second.
+
+    mode "lifecycle" delivers started/completed/failed/... only, "progress"
+    adds phase changes, and "output" adds output lines, at most
+    max_lines_per_second of them (0 for no cap). Lines over the cap are
+    dropped; clients can fetch them by sequence number from the output
+    endpoint.
+    """
+
+    scope: SubscriptionScope
+    value: str | None = None
+    mode: SubscriptionMode = "output"
+    max_lines_per_second: float = 0
+    _tokens: float = field(default=0.0, repr=False)
+    _refilled_at: float = field(default=0.0, repr=False)
+
+    @property
+    def key(self) -> tuple[str, str | None]:
+        """Index key of the subscription."""
+        return (self.scope, self.value)
+
+    def wants(self, event_type: str | None) -> bool:
+        """Check if the mode includes an event type (ignoring the rate cap)."""
+        if event_type in LIFECYCLE_EVENTS:
+            return True
+        if event_type in PROGRESS_EVENTS:
+            return self.mode in ("progress", "output")
+        return self.mode == "output"
+
+    def take_line(self, now: float) -> bool:
+        """Consume one output line from the rate budget. Returns False if over it."""
+        if not self.max_lines_per_second:
+            return True
+        rate = self.max_lines_per_second
+        if not self._refilled_at:
+            self._tokens = rate
+        else:
+            self._tokens = min(rate, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @classmethod
+    def from_message(cls, message: dict[str, Any]) -> "Subscription":
+        """Create from a client subscribe message.
+
+        Raises:
+            ValueError: If the message does not name exactly one scope or
+                has an unknown mode
+        """
+        scopes = [
+            (scope, message[name]) for scope, name in _SCOPE_FIELDS.items() if name in message
+        ]
+        if len(scopes) > 1:
+            raise ValueError("Subscribe to one of execution_id, task_id or type at a time")
+        scope, value = scopes[0] if scopes else ("all", None)
+
+        mode = message.get("mode", "output")
+        if mode not in ("lifecycle", "progress", "output"):
+            raise ValueError(f"Unknown mode: {mode}")
+        return cls(
+            scope=scope,  # type: ignore[arg-type]
+            value=str(value) if value is not None else None,
+            mode=mode,
+            max_lines_per_second=max(0.0, float(message.get("max_lines_per_second", 0))),
+        )
+
+
+@dataclass
+class _Client:
+    """A connected WebSocket with its own send queue and writer task."""
+
+    websocket: WebSocket
+    task_id: str | None
+    batch: bool
+    queue: deque[tuple[str, bool]] = field(default_factory=deque)  # (frame, droppable)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    droppable_queued: int = 0
+    sent: int = 0
+    dropped: int = 0
+    rate_limited: int = 0
+    writer: asyncio.Task[None] | None = None
+    subscriptions: dict[tuple[str, str | None], Subscription] = field(default_factory=dict)
+    # Subscription made on connect, replaced by the client's first own subscribe
+    implicit: bool = True
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time execution updates.
 
-    Thread-safe manager that handles:
-    - Multiple concurrent WebSocket connections
-    - Broadcasting events to all connected clients
-    - Filtering events by task ID for targeted streams
+    Each message is serialized once and queued for every interested client.
+    Every client has its own writer task, so a slow browser tab only delays
+    itself. Once a client has MAX_QUEUED_MESSAGES output or progress
+    messages waiting, further ones are dropped and counted; lifecycle
+    events (started, completed, failed, ...) are always delivered.
+
+    Clients connecting with batching enabled receive a JSON array of all
+    messages queued in the last BATCH_INTERVAL seconds per frame instead of
+    one frame per message.
+
+    Clients choose what they receive with subscribe/unsubscribe messages
+    (see handle_message). Until a client subscribes it receives everything
+    (or everything for its task). Events are routed through an index from
+    subscription key to subscribers, so an event only costs work for the
+    clients that want it, and is not serialized at all if nobody does.
     """
 
     def __init__(self) -> None:
         """Initialize the connection manager."""
-        # All active connections (for broadcast)
-        self._connections: list[WebSocket] = []
-        # Task-specific connections (task_id -> list of websockets)
-        self._task_connections: dict[str, list[WebSocket]] = {}
-        self._lock = asyncio.Lock()
+        self._clients: dict[WebSocket, _Client] = {}
+        # (scope, value) -> subscribers with their subscription
+        self._index: dict[tuple[str, str | None], dict[WebSocket, Subscription]] = {}
+        self._dropped_total = 0
 
-    async def connect(self, websocket: WebSocket, task_id: str | None = None) -> None:
+    async def connect(
+        self, websocket: WebSocket, task_id: str | None = None, batch: bool = False
+    ) -> None:
         """Accept and register a new WebSocket connection.
 
         Args:
             websocket: The WebSocket connection to register
             task_id: Optional task ID for filtered updates
+            batch: Send queued messages as one JSON array per frame
         """
         await websocket.accept()
 
-        async with self._lock:
-            self._connections.append(websocket)
-            if task_id:
-                if task_id not in self._task_connections:
-                    self._task_connections[task_id] = []
-                self._task_connections[task_id].append(websocket)
+        client = _Client(websocket=websocket, task_id=task_id, batch=batch)
+        client.writer = asyncio.create_task(self._write_loop(client))
+        self._clients[websocket] = client
+        self._add_subscription(
+            client, Subscription(scope="task", value=task_id) if task_id else Subscription("all")
+        )
 
-        logger.info(f"WebSocket connected (task_id={task_id}, total={len(self._connections)})")
+        logger.info(f"WebSocket connected (task_id={task_id}, total={len(self._clients)})")
 
     async def disconnect(self, websocket: WebSocket, task_id: str | None = None) -> None:
         """Remove a WebSocket connection.
@@ -52,81 +196,219 @@ class ConnectionManager:
             websocket: The WebSocket connection to remove
             task_id: Optional task ID for filtered updates
         """
-        async with self._lock:
-            if websocket in self._connections:
-                self._connections.remove(websocket)
-            if task_id and task_id in self._task_connections:
-                if websocket in self._task_connections[task_id]:
-                    self._task_connections[task_id].remove(websocket)
-                if not self._task_connections[task_id]:
-                    del self._task_connections[task_id]
+        client = self._remove_client(websocket)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await client.writer
 
-        logger.info(f"WebSocket disconnected (task_id={task_id}, total={len(self._connections)})")
+        logger.info(f"WebSocket disconnected (task_id={task_id}, total={len(self._clients)})")
 
-    async def broadcast(self, message: dict[str, Any]) -> None:
-        """Broadcast a message to all connected clients.
+    def _remove_client(self, websocket: WebSocket) -> _Client | None:
+        """Forget a client and drop all of its subscriptions from the index."""
+        client = self._clients.pop(websocket, None)
+        if client:
+            for key in list(client.subscriptions):
+                self._remove_subscription(client, key)
+        return client
 
-        Args:
-            message: The message to broadcast (will be JSON encoded)
+    def _add_subscription(self, client: _Client, subscription: Subscription) -> None:
+        """Register a subscription of a client in the index."""
+        client.subscriptions[subscription.key] = subscription
+        self._index.setdefault(subscription.key, {})[client.websocket] = subscription
+
+    def _remove_subscription(self, client: _Client, key: tuple[str, str | None]) -> bool:
+        """Remove a subscription of a client from the index."""
+        if client.subscriptions.pop(key, None) is None:
+            return False
+        subscribers = self._index.get(key)
+        if subscribers is not None:
+            subscribers.pop(client.websocket, None)
+            if not subscribers:
+                del self._index[key]
+        return True
+
+    async def handle_message(self, websocket: WebSocket, text: str) -> None:
+        """Handle a control message sent by a client.
+
+        Messages are JSON objects:
+            {"action": "subscribe", "execution_id" | "task_id" | "type": ...,
+             "mode": "lifecycle" | "progress" | "output", "max_lines_per_second": N}
+            {"action": "unsubscribe", "execution_id" | "task_id" | "type": ...}
+        Omitting the scope field subscribes to all events. A repeated
+        subscribe to the same scope replaces the earlier one. Each message is
+        answered with a subscription.ack or subscription.error message.
         """
-        data = json.dumps(message)
+        client = self._clients.get(websocket)
+        if client is None:
+            return
 
-        async with self._lock:
-            connections = list(self._connections)
+        try:
+            message = json.loads(text)
+            if not isinstance(message, dict):
+                raise ValueError("Expected a JSON object")
+            action = message.get("action")
+            subscription = Subscription.from_message(message)
+            if action == "subscribe":
+                if client.implicit:
+                    for key in list(client.subscriptions):
+                        self._remove_subscription(client, key)
+                    client.implicit = False
+                self._add_subscription(client, subscription)
+            elif action == "unsubscribe":
+                if not self._remove_subscription(client, subscription.key):
+                    raise ValueError("Not subscribed")
+            else:
+                raise ValueError(f"Unknown action: {action}")
+        except (ValueError, TypeError) as e:
+            reply = {"type": "subscription.error", "error": str(e)}
+        else:
+            reply = {
+                "type": "subscription.ack",
+                "action": action,
+                "scope": subscription.scope,
+                "value": subscription.value,
+                "mode": subscription.mode,
+            }
+        self._enqueue(client, json.dumps(reply), droppable=False)
 
-        disconnected: list[WebSocket] = []
-        for connection in connections:
-            try:
-                await connection.send_text(data)
-            except Exception as e:
-                logger.warning(f"Failed to send to WebSocket: {e}")
-                disconnected.append(connection)
+    def _enqueue(self, client: _Client, data: str, droppable: bool) -> None:
+        """Queue a serialized message for a client, dropping it if over the bound."""
+        if droppable:
+            if client.droppable_queued >= MAX_QUEUED_MESSAGES:
+                client.dropped += 1
+                self._dropped_total += 1
+                return
+            client.droppable_queued += 1
+        client.queue.append((data, droppable))
+        client.ready.set()
 
-        # Clean up disconnected connections
-        if disconnected:
-            async with self._lock:
-                for conn in disconnected:
-                    if conn in self._connections:
-                        self._connections.remove(conn)
+    async def broadcast(self, message: dict[str, Any]) -> None:
+        """Queue a message for every client subscribed to it.
 
-    async def send_to_task(self, task_id: str, message: dict[str, Any]) -> None:
-        """Send a message to clients subscribed to a specific task.
+        The message is JSON encoded once, and only if some client wants it.
 
         Args:
-            task_id: The task ID to send to
             message: The message to send (will be JSON encoded)
         """
-        async with self._lock:
-            task_connections = self._task_connections.get(task_id, [])
-            connections = list(task_connections)
-
-        if not connections:
+        if not self._index:
             return
 
+        event_type = message.get("type")
+        is_output = event_type not in LIFECYCLE_EVENTS and event_type not in PROGRESS_EVENTS
+        now = time.monotonic()
+
+        recipients: list[_Client] = []
+        accepted: set[WebSocket] = set()
+        limited: set[WebSocket] = set()
+        keys = [("all", None)] + [
+            (scope, message.get(name)) for scope, name in _SCOPE_FIELDS.items()
+        ]
+        for key in keys:
+            for websocket, subscription in self._index.get(key, {}).items():
+                client = self._clients.get(websocket)
+                if client is None or websocket in accepted or not subscription.wants(event_type):
+                    continue
+                if is_output and not subscription.take_line(now):
+                    limited.add(websocket)
+                    continue
+                accepted.add(websocket)
+                recipients.append(client)
+
+        for websocket in limited - accepted:
+            self._clients[websocket].rate_limited += 1
+
+        if not recipients:
+            return
         data = json.dumps(message)
-        disconnected: list[WebSocket] = []
-
-        for connection in connections:
-            try:
-                await connection.send_text(data)
-            except Exception as e:
-                logger.warning(f"Failed to send to task WebSocket: {e}")
-                disconnected.append(connection)
-
-        # Clean up disconnected connections
-        if disconnected:
-            async with self._lock:
-                for conn in disconnected:
-                    if task_id in self._task_connections:
-                        if conn in self._task_connections[task_id]:
-                            self._task_connections[task_id].remove(conn)
-                    if conn in self._connections:
-                        self._connections.remove(conn)
+        droppable = event_type not in LIFECYCLE_EVENTS
+        for client in recipients:
+            self._enqueue(client, data, droppable)
+
+    async def _write_loop(self, client: _Client) -> None:
+        """Send a client's queued messages as they arrive."""
+        try:
+            while True:
+                await client.ready.wait()
+                if client.batch:
+                    await asyncio.sleep(BATCH_INTERVAL)
+                client.ready.clear()
+
+                frames: list[str] = []
+                while client.queue:
+                    data, droppable = client.queue.popleft()
+                    if droppable:
+                        client.droppable_queued -= 1
+                    frames.append(data)
+                if not frames:
+                    continue
+
+                if client.batch:
+                    frames = ["[" + ",".join(frames) + "]"]
+                for frame in frames:
+                    await self._send(client.websocket, frame)
+                client.sent += len(frames)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to WebSocket, disconnecting: {e}")
+            self._remove_client(client.websocket)
+            with contextlib.suppress(Exception):
+                await client.websocket.close()
+
+    @staticmethod
+    async def _send(websocket: WebSocket, frame: str) -> None:
+        """Send one frame, failing if it takes longer than SEND_TIMEOUT.
+
+        Uses asyncio.wait rather than wait_for, which can swallow a
+        cancellation that races with the send completing.
+        """
+        send = asyncio.ensure_future(websocket.send_text(frame))
+        try:
+            done, _ = await asyncio.wait({send}, timeout=SEND_TIMEOUT)
+        finally:
+            if not send.done():
+                send.cancel()
+        if not done:
+            raise TimeoutError(f"send blocked for more than {SEND_TIMEOUT}s")
+        send.result()
+
+    async def close(self) -> None:
+        """Stop all writer tasks and forget every connection."""
+        for websocket in list(self._clients):
+            await self.disconnect(websocket)
 
     @property
     def connection_count(self) -> int:
         """Get the number of active connections."""
-        return len(self._connections)
+        return len(self._clients)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get delivery statistics, including dropped message counts."""
+        return {
+            "connections": len(self._clients),
+            "dropped_total": self._dropped_total,
+            "clients": [
+                {
+                    "task_id": client.task_id,
+                    "batch": client.batch,
+                    "queued": len(client.queue),
+                    "frames_sent": client.sent,
+                    "dropped": client.dropped,
+                    "rate_limited": client.rate_limited,
+                    "subscriptions": [
+                        {
+                            "scope": sub.scope,
+                            "value": sub.value,
+                            "mode": sub.mode,
+                            "max_lines_per_second": sub.max_lines_per_second,
+                        }
+                        for sub in client.subscriptions.values()
+                    ],
+                }
+                for client in self._clients.values()
+            ],
+        }
 
 
 # Global connection manager instance
@@ -1,5 +1,6 @@
 """Execution layer - Claude Code execution strategies and session management."""
 
+from codegeass.execution.event_bus import ExecutionEventBus, SpooledEvent
 from codegeass.execution.executor import ClaudeExecutor
 from codegeass.execution.plan_service import (
     PlanApprovalService,
@@ -18,6 +19,11 @@ from codegeass.execution.strategies import (
     SkillStrategy,
     get_claude_executable,
 )
+from codegeass.execution.supervisor import (
+    ProcessSupervisor,
+    SupervisedProcess,
+    get_process_supervisor,
+)
 from codegeass.execution.tracker import (
     ActiveExecution,
     ExecutionTracker,
@@ -42,6 +48,13 @@ __all__ = [
     "ActiveExecution",
     "ExecutionTracker",
     "get_execution_tracker",
+    # Event bus
+    "ExecutionEventBus",
+    "SpooledEvent",
+    # Process supervision
+    "ProcessSupervisor",
+    "SupervisedProcess",
+    "get_process_supervisor",
     # Plan service
     "PlanApprovalService",
     "get_plan_approval_service",
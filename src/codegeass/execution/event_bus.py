@@ -0,0 +1,230 @@
+"""Cross-process execution event bus backed by an append-only spool."""
+
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from codegeass.execution.events import ExecutionEvent
+from codegeass.storage.atomic import file_lock
+
+logger = logging.getLogger(__name__)
+
+# A segment stops accepting events once it reaches this size
+MAX_SEGMENT_BYTES = 8 * 1024 * 1024
+
+# Sealed segments kept for replay; older ones are deleted
+MAX_SEGMENTS = 4
+
+# Seconds between checks for new events while a subscriber is idle
+DEFAULT_POLL_INTERVAL = 0.1
+
+# Bytes read from a segment per call
+READ_CHUNK_BYTES = 1024 * 1024
+
+_SEGMENT_RE = re.compile(r"^(\d{20})\.jsonl$")
+
+
+@dataclass
+class SpooledEvent:
+    """An event read from the bus, with its position in the spool."""
+
+    offset: int
+    next_offset: int
+    pid: int
+    event: ExecutionEvent
+
+
+class ExecutionEventBus:
+    """Publishes execution events to every process on this machine.
+
+    Events are appended as JSON lines to segment files under spool_dir. A
+    segment is named after the global offset of its first byte, so an
+    offset identifies one event across all segments and subscribers can
+    resume from the offset they stopped at. Once a segment reaches
+    MAX_SEGMENT_BYTES, writers move on to the segment starting where it
+    ends, and only the newest MAX_SEGMENTS segments are kept.
+
+    Writers append under an fcntl lock, so events from the cron runner, the
+    CLI and the dashboard interleave without tearing. Readers need no lock:
+    they only consume complete lines.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path,
+        max_segment_bytes: int = MAX_SEGMENT_BYTES,
+        max_segments: int = MAX_SEGMENTS,
+    ):
+        """Initialize with the spool directory and segment limits."""
+        self._spool_dir = spool_dir
+        self._max_segment_bytes = max_segment_bytes
+        self._max_segments = max_segments
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+        self._base = 0
+
+    def _segment_path(self, base: int) -> Path:
+        """Get the file of the segment starting at a global offset."""
+        return self._spool_dir / f"{base:020d}.jsonl"
+
+    def _segments(self) -> list[int]:
+        """Get the base offsets of the existing segments, oldest first."""
+        try:
+            names = os.listdir(self._spool_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(int(m.group(1)) for name in names if (m := _SEGMENT_RE.match(name)))
+
+    @property
+    def first_offset(self) -> int:
+        """Offset of the oldest event still kept."""
+        segments = self._segments()
+        return segments[0] if segments else 0
+
+    @property
+    def head(self) -> int:
+        """Offset just past the last published event."""
+        segments = self._segments()
+        if not segments:
+            return 0
+        try:
+            return segments[-1] + self._segment_path(segments[-1]).stat().st_size
+        except FileNotFoundError:
+            return segments[-1]
+
+    def publish(self, event: ExecutionEvent) -> int:
+        """Append an event to the spool. Returns its offset."""
+        record = {"pid": os.getpid(), "event": event.to_dict()}
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock, file_lock(self._spool_dir / "events"):
+            fd = self._writable_segment()
+            offset = self._base + os.fstat(fd).st_size
+            os.write(fd, line)
+        return offset
+
+    def _writable_segment(self) -> int:
+        """Open the segment events are currently appended to. Must hold the locks."""
+        if self._fd is None:
+            self._spool_dir.mkdir(parents=True, exist_ok=True)
+            segments = self._segments()
+            self._open_segment(segments[-1] if segments else 0)
+
+        assert self._fd is not None
+        while (size := os.fstat(self._fd).st_size) >= self._max_segment_bytes:
+            # Sealed: its successor starts where it ends
+            next_base = self._base + size
+            if not self._segment_path(next_base).exists():
+                segments = self._segments()
+                if segments and segments[-1] > next_base:
+                    # We were behind another writer; its segment is the current one
+                    next_base = segments[-1]
+            os.close(self._fd)
+            self._fd = None
+            self._open_segment(next_base)
+            self._prune()
+        return self._fd
+
+    def _open_segment(self, base: int) -> None:
+        """Open a segment for appending, creating it if needed."""
+        self._fd = os.open(
+            self._segment_path(base), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        self._base = base
+
+    def _prune(self) -> None:
+        """Delete the oldest segments beyond max_segments."""
+        segments = self._segments()
+        for base in segments[: max(0, len(segments) - self._max_segments)]:
+            self._segment_path(base).unlink(missing_ok=True)
+
+    def read(self, offset: int, limit: int = 1000) -> tuple[list[SpooledEvent], int]:
+        """Read up to `limit` events published at or after `offset`.
+
+        An offset older than the oldest kept segment resumes at the oldest
+        event still available.
+
+        Returns:
+            The events and the offset to continue reading from
+        """
+        segments = self._segments()
+        if not segments:
+            return [], offset
+        if offset < segments[0]:
+            logger.warning(f"Events before offset {segments[0]} were pruned, skipping ahead")
+            offset = segments[0]
+        base = max(b for b in segments if b <= offset)
+
+        events: list[SpooledEvent] = []
+        while len(events) < limit:
+            try:
+                with open(self._segment_path(base), "rb") as f:
+                    f.seek(offset - base)
+                    data = f.read(READ_CHUNK_BYTES)
+                    if len(data) == READ_CHUNK_BYTES and not data.endswith(b"\n"):
+                        data += f.readline()  # Lines may be longer than a chunk
+            except FileNotFoundError:
+                break
+
+            end = data.rfind(b"\n")
+            if end < 0:
+                if not data and offset != base and self._segment_path(offset).exists():
+                    # Reached the end of a sealed segment
+                    base = offset
+                    continue
+                break
+
+            position = offset
+            for line in data[:end].split(b"\n"):
+                start, position = position, position + len(line) + 1
+                if len(events) >= limit:
+                    position = start
+                    break
+                try:
+                    record = json.loads(line)
+                    event = ExecutionEvent.from_dict(record["event"])
+                except (json.JSONDecodeError, KeyError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable event at offset {start}: {e}")
+                    continue
+                events.append(SpooledEvent(start, position, record.get("pid", 0), event))
+            offset = position
+
+        return events, offset
+
+    def subscribe(
+        self,
+        offset: int | None = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        stop: threading.Event | None = None,
+    ) -> Iterator[SpooledEvent]:
+        """Yield events as they are published, until `stop` is set.
+
+        Args:
+            offset: Offset to replay from (default: only new events)
+            poll_interval: Seconds to wait for new events while idle
+            stop: Event ending the subscription
+        """
+        # Resolved now, not on first iteration, so "new" means new from this call
+        start = self.head if offset is None else offset
+        return self._follow(start, poll_interval, stop or threading.Event())
+
+    def _follow(
+        self, offset: int, poll_interval: float, stop: threading.Event
+    ) -> Iterator[SpooledEvent]:
+        """Generator behind subscribe()."""
+        while not stop.is_set():
+            events, offset = self.read(offset)
+            yield from events
+            if not events:
+                stop.wait(poll_interval)
+
+    def close(self) -> None:
+        """Close the segment held open for publishing."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
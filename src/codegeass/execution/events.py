@@ -79,14 +79,15 @@ class ExecutionEvent:
         task_id: str,
         task_name: str,
         line: str,
+        seq: int | None = None,
     ) -> "ExecutionEvent":
-        """Create an OUTPUT event."""
+        """Create an OUTPUT event. `seq` numbers the line within the execution."""
         return cls(
             type=ExecutionEventType.OUTPUT,
             execution_id=execution_id,
             task_id=task_id,
             task_name=task_name,
-            data={"line": line},
+            data={"line": line, "seq": seq},
         )
 
     @classmethod
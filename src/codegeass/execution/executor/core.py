@@ -20,6 +20,7 @@ from codegeass.execution.executor.validation import (
 )
 from codegeass.execution.session import SessionManager
 from codegeass.execution.strategies import ResumeWithFeedbackStrategy
+from codegeass.execution.worktree_pool import WorktreePool, get_worktree_pool
 from codegeass.factory.registry import SkillRegistry
 from codegeass.providers import get_provider_registry
 from codegeass.storage.log_repository import LogRepository
@@ -48,11 +49,13 @@ class ClaudeExecutor:
         session_manager: SessionManager,
         log_repository: LogRepository,
         tracker: "ExecutionTracker | None" = None,
+        worktree_pool: WorktreePool | None = None,
     ):
         self._skill_registry = skill_registry
         self._session_manager = session_manager
         self._log_repository = log_repository
         self._tracker = tracker
+        self._worktree_pool = worktree_pool or get_worktree_pool()
         self._provider_registry = get_provider_registry()
         self._strategy_selector = StrategySelector(self._provider_registry)
 
@@ -69,7 +72,11 @@ class ClaudeExecutor:
         )
 
         is_plan_mode = force_plan_mode or task.plan_mode
-        env = create_execution_environment(task)
+        # Plan mode worktrees outlive this run until the plan is approved or
+        # cancelled, possibly from another process, so they are not pooled
+        env = create_execution_environment(
+            task, pool=None if is_plan_mode else self._worktree_pool
+        )
         session = self._create_session(task, dry_run, env)
 
         execution_id = self._start_tracking(task, session.id, dry_run)
@@ -229,6 +236,7 @@ class ClaudeExecutor:
             error=result.error,
             exit_code=result.exit_code,
             metadata=metadata,
+            parsed_output=result.parsed_output,
         )
 
     def _complete_session(self, session_id: str, result: ExecutionResult) -> None:
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from codegeass.core.entities import Task
 from codegeass.execution.worktree import WorktreeInfo, WorktreeManager
+from codegeass.execution.worktree_pool import WorktreePool
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +38,22 @@ class ExecutionEnvironment:
                 logger.warning(f"Failed to cleanup worktree: {e}")
 
 
-def create_execution_environment(task: Task) -> ExecutionEnvironment:
+def create_execution_environment(
+    task: Task, pool: WorktreePool | None = None
+) -> ExecutionEnvironment:
     """Create an isolated execution environment for a task.
 
-    Attempts to create a git worktree for isolation. If the project
-    is not a git repo or worktree creation fails, falls back to
-    using the original working directory.
+    Borrows a worktree from `pool` if given, otherwise creates a git
+    worktree for isolation. If the project is not a git repo or worktree
+    creation fails, falls back to using the original working directory.
     """
-    worktree_info = WorktreeManager.create_worktree(
-        project_dir=task.working_dir,
-        task_id=task.id,
-    )
+    if pool is not None:
+        worktree_info = pool.acquire(task.working_dir, task.id)
+    else:
+        worktree_info = WorktreeManager.create_worktree(
+            project_dir=task.working_dir,
+            task_id=task.id,
+        )
 
     if worktree_info:
         logger.info(f"Created isolated worktree for {task.name}: {worktree_info.path}")
@@ -0,0 +1,226 @@
+"""Resource limits for agent processes.
+
+Limits are enforced with a cgroup v2 when a delegated cgroup is configured
+through CODEGEASS_CGROUP_ROOT (e.g. a systemd service with Delegate=yes),
+which caps memory and process count for the whole process tree and measures
+its usage. Otherwise they fall back to setrlimit() in the child, which caps
+each process separately.
+"""
+
+import logging
+import os
+import resource
+import shutil
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from codegeass.core.value_objects import ResourceLimits
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming a delegated cgroup v2 directory to create run cgroups in
+CGROUP_ROOT_ENV = "CODEGEASS_CGROUP_ROOT"
+
+# Seconds between SIGXCPU and SIGKILL once a process exceeds its CPU time
+CPU_KILL_GRACE = 5
+
+# ionice class numbers
+_IO_CLASS_NUMBERS = {"best-effort": "2", "idle": "3"}
+
+_PROC = Path("/proc")
+
+
+def cgroup_root_from_env() -> Path | None:
+    """Get the delegated cgroup from the environment, if it is usable."""
+    value = os.environ.get(CGROUP_ROOT_ENV)
+    if not value:
+        return None
+    root = Path(value)
+    try:
+        controllers = (root / "cgroup.subtree_control").read_text().split()
+    except OSError as e:
+        logger.warning(f"Ignoring {CGROUP_ROOT_ENV}={value}: {e}")
+        return None
+    if not os.access(root, os.W_OK):
+        logger.warning(f"Ignoring {CGROUP_ROOT_ENV}={value}: not writable")
+        return None
+    missing = {"memory", "pids"} - set(controllers)
+    if missing:
+        logger.warning(
+            f"{CGROUP_ROOT_ENV}={value} does not delegate {', '.join(sorted(missing))}"
+        )
+    return root
+
+
+def _user_process_count() -> int:
+    """Count the processes of the current user (Linux only, 0 elsewhere)."""
+    if not _PROC.is_dir():
+        return 0
+    uid = os.getuid()
+    count = 0
+    for entry in _PROC.iterdir():
+        try:
+            if entry.name.isdigit() and entry.stat().st_uid == uid:
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def _rlimit(kind: int, soft: int, hard: int | None = None) -> tuple[int, tuple[int, int]]:
+    """An rlimit to set, never above the current hard limit (which can't be raised)."""
+    hard = soft if hard is None else hard
+    _, current = resource.getrlimit(kind)
+    if current != resource.RLIM_INFINITY:
+        hard = min(hard, current)
+    return kind, (min(soft, hard), hard)
+
+
+class ResourceLimiter:
+    """Applies the resource limits of one agent run.
+
+    Everything that can be computed ahead is computed in the parent; the
+    preexec_fn only makes system calls, as code running between fork() and
+    exec() in a threaded process must not take locks.
+    """
+
+    def __init__(self, limits: ResourceLimits, cgroup_root: Path | None = None):
+        """Prepare the limits, creating a run cgroup under cgroup_root if given."""
+        self.limits = limits
+        self.cgroup: Path | None = None
+        self._procs_fd: int | None = None
+        self._rlimits: list[tuple[int, tuple[int, int]]] = []
+        self._nice: int | None = None
+        self._usage: dict[str, float] = {}
+        # Mechanism enforcing the memory and process caps: "cgroup" or "rlimit"
+        self.enforced_by = "rlimit"
+
+        if cgroup_root is not None:
+            self._create_cgroup(cgroup_root)
+        self._prepare_rlimits()
+
+    def _create_cgroup(self, root: Path) -> None:
+        """Create a cgroup for the run and open it for the child to join."""
+        cgroup = root / f"codegeass-{uuid.uuid4().hex[:12]}"
+        try:
+            cgroup.mkdir()
+            if self.limits.memory_mb:
+                (cgroup / "memory.max").write_text(str(self.limits.memory_mb * 1024 * 1024))
+                swap = cgroup / "memory.swap.max"
+                if swap.exists():
+                    swap.write_text("0")
+            if self.limits.max_processes:
+                (cgroup / "pids.max").write_text(str(self.limits.max_processes))
+            self._procs_fd = os.open(cgroup / "cgroup.procs", os.O_WRONLY)
+        except OSError as e:
+            logger.warning(f"Cannot set up cgroup {cgroup}, using rlimits instead: {e}")
+            self.cgroup = cgroup
+            self.close()
+            self._usage = {}
+            return
+        self.cgroup = cgroup
+        self.enforced_by = "cgroup"
+
+    def _prepare_rlimits(self) -> None:
+        """Compute the rlimits and niceness the child will set."""
+        limits = self.limits
+        if limits.cpu_seconds:
+            hard = limits.cpu_seconds + CPU_KILL_GRACE
+            self._rlimits.append(_rlimit(resource.RLIMIT_CPU, limits.cpu_seconds, hard))
+        if not self.cgroup:
+            # RLIMIT_DATA rather than RLIMIT_AS: runtimes such as V8 reserve far
+            # more address space than they ever touch
+            if limits.memory_mb:
+                memory = limits.memory_mb * 1024 * 1024
+                self._rlimits.append(_rlimit(resource.RLIMIT_DATA, memory))
+            # RLIMIT_NPROC counts every process of the user, so allow the
+            # ones already running
+            if limits.max_processes and hasattr(resource, "RLIMIT_NPROC"):
+                nproc = _user_process_count() + limits.max_processes
+                self._rlimits.append(_rlimit(resource.RLIMIT_NPROC, nproc))
+        if limits.nice is not None:
+            # Only ever lower the priority: niceness cannot go back down unprivileged
+            self._nice = max(limits.nice, os.getpriority(os.PRIO_PROCESS, 0))
+
+    def wrap(self, command: list[str]) -> list[str]:
+        """Prefix the command with ionice if an I/O class is set."""
+        if not self.limits.io_class:
+            return command
+        ionice = shutil.which("ionice")
+        if not ionice:
+            logger.warning("ionice not found, ignoring io_class")
+            return command
+        return [ionice, "-c", _IO_CLASS_NUMBERS[self.limits.io_class], *command]
+
+    def preexec(self) -> Callable[[], None] | None:
+        """Function the child runs before exec, or None if there is nothing to do."""
+        procs_fd, rlimits, nice = self._procs_fd, self._rlimits, self._nice
+        if procs_fd is None and not rlimits and nice is None:
+            return None
+
+        def apply() -> None:
+            if procs_fd is not None:
+                os.write(procs_fd, b"0")
+            for kind, value in rlimits:
+                resource.setrlimit(kind, value)
+            if nice is not None:
+                os.setpriority(os.PRIO_PROCESS, 0, nice)
+
+        return apply
+
+    def spawned(self) -> None:
+        """Release what the child needed once it has started."""
+        if self._procs_fd is not None:
+            os.close(self._procs_fd)
+            self._procs_fd = None
+
+    def usage(self) -> dict[str, float]:
+        """Usage of the whole process tree measured by the cgroup."""
+        if not self.cgroup:
+            return self._usage
+        usage: dict[str, float] = {}
+        cpu = self._read_keyed("cpu.stat")
+        if "usage_usec" in cpu:
+            usage["tree_cpu_seconds"] = round(cpu["usage_usec"] / 1_000_000, 3)
+        peak = self._read_int("memory.peak")
+        if peak is not None:
+            usage["tree_peak_memory_bytes"] = peak
+        pids = self._read_int("pids.peak")
+        if pids is not None:
+            usage["tree_peak_processes"] = pids
+        events = self._read_keyed("memory.events")
+        if events.get("oom_kill"):
+            usage["oom_kills"] = events["oom_kill"]
+        return usage
+
+    def _read_int(self, name: str) -> int | None:
+        try:
+            return int((self.cgroup / name).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _read_keyed(self, name: str) -> dict[str, int]:
+        try:
+            lines = (self.cgroup / name).read_text().splitlines()
+        except OSError:
+            return {}
+        return {key: int(value) for key, value in (line.split() for line in lines)}
+
+    def close(self) -> None:
+        """Remove the run cgroup, killing anything still inside it."""
+        self.spawned()
+        if not self.cgroup:
+            return
+        self._usage = self.usage()
+        cgroup, self.cgroup = self.cgroup, None
+        try:
+            cgroup.rmdir()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            try:
+                (cgroup / "cgroup.kill").write_text("1")
+                cgroup.rmdir()
+            except OSError as e:
+                logger.warning(f"Cannot remove cgroup {cgroup}: {e}")
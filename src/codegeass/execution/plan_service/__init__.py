@@ -7,11 +7,17 @@ from codegeass.execution.plan_service.service import (
     get_plan_approval_service,
     reset_plan_approval_service,
 )
+from codegeass.execution.plan_service.worker_pool import (
+    ApprovalWorkerPool,
+    get_approval_worker_pool,
+)
 
 __all__ = [
     "ApprovalHandler",
     "ApprovalMessageSender",
+    "ApprovalWorkerPool",
     "PlanApprovalService",
+    "get_approval_worker_pool",
     "get_plan_approval_service",
     "reset_plan_approval_service",
 ]
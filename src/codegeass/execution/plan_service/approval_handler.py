@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import Callable
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -11,6 +13,10 @@ from codegeass.core.value_objects import ExecutionResult
 from codegeass.execution.output_parser import parse_stream_json
 from codegeass.execution.plan_approval import ApprovalStatus, PendingApproval
 from codegeass.execution.plan_service.message_sender import ApprovalMessageSender
+from codegeass.execution.plan_service.worker_pool import (
+    ApprovalWorkerPool,
+    get_approval_worker_pool,
+)
 from codegeass.execution.strategies import (
     ExecutionContext,
     ResumeWithApprovalStrategy,
@@ -26,16 +32,23 @@ logger = logging.getLogger(__name__)
 
 
 class ApprovalHandler:
-    """Handles approval, discuss, and cancel actions."""
+    """Handles approval, discuss, and cancel actions.
+
+    The agent runs behind approvals and discuss rounds are executed on the
+    approval worker pool, so the event loop calling these handlers stays
+    responsive while they run. Output streams to the tracker as usual.
+    """
 
     def __init__(
         self,
         approval_repo: PendingApprovalRepository,
         message_sender: ApprovalMessageSender,
+        workers: ApprovalWorkerPool | None = None,
     ):
-        """Initialize with repositories."""
+        """Initialize with repositories and the worker pool (the shared one by default)."""
         self._approvals = approval_repo
         self._messenger = message_sender
+        self._workers = workers or get_approval_worker_pool()
 
     async def handle_approval(self, approval_id: str) -> ExecutionResult | None:
         """Handle user approving a plan."""
@@ -48,6 +61,19 @@ class ApprovalHandler:
             logger.warning(f"Approval {approval_id} is not pending: {approval.status}")
             return None
 
+        # Claimed before the first await, so a second click cannot pass too
+        reservation = self._workers.try_reserve(approval_id)
+        if reservation is None:
+            logger.warning(f"Approval {approval_id} is still processing feedback")
+            return None
+
+        try:
+            return await self._run_approval(approval)
+        finally:
+            self._workers.release(approval_id, reservation)
+
+    async def _run_approval(self, approval: PendingApproval) -> ExecutionResult:
+        """Execute an approved plan and report the outcome."""
         approval.mark_approved()
         self._approvals.update(approval)
 
@@ -69,7 +95,7 @@ class ApprovalHandler:
                 approval, execution_dir, execution_id, tracker
             )
             await self._finalize_approval(tracker, execution_id, approval, result)
-            self._cleanup_worktree(approval)
+            await asyncio.to_thread(self._cleanup_worktree, approval)
             return result
 
         except Exception as e:
@@ -79,7 +105,7 @@ class ApprovalHandler:
             await self._messenger.update_approval_messages(
                 approval, status="Failed", details=f"Error: {e}"
             )
-            self._cleanup_worktree(approval)
+            await asyncio.to_thread(self._cleanup_worktree, approval)
             raise
 
     async def _execute_approved_plan(
@@ -109,7 +135,25 @@ class ApprovalHandler:
             tracker=tracker,
         )
 
-        return strategy.execute(context)
+        return await self._run_on_worker(approval, strategy.execute, context, tracker)
+
+    async def _run_on_worker(
+        self,
+        approval: PendingApproval,
+        execute: Callable[[ExecutionContext], ExecutionResult],
+        context: ExecutionContext,
+        tracker: ExecutionTracker,
+    ) -> ExecutionResult:
+        """Run a strategy on the worker pool, showing the queue position meanwhile."""
+        execution_id = context.execution_id
+
+        def on_queued(ahead: int) -> None:
+            if execution_id:
+                tracker.update_execution(
+                    execution_id, status="starting", phase=f"queued ({ahead} ahead)"
+                )
+
+        return await self._workers.run(approval.id, execute, context, on_queued=on_queued)
 
     async def _finalize_approval(
         self,
@@ -183,6 +227,21 @@ class ApprovalHandler:
             logger.warning(f"Approval {approval_id} has reached max iterations")
             return None
 
+        # Claimed before the first await, so a second message cannot pass too
+        reservation = self._workers.try_reserve(approval_id)
+        if reservation is None:
+            logger.warning(f"Approval {approval_id} is already processing feedback")
+            return None
+
+        try:
+            return await self._run_discuss(approval, feedback)
+        finally:
+            self._workers.release(approval_id, reservation)
+
+    async def _run_discuss(
+        self, approval: PendingApproval, feedback: str
+    ) -> PendingApproval | None:
+        """Run a discuss round with the user's feedback."""
         await self._messenger.update_approval_messages(
             approval,
             status="Processing",
@@ -236,7 +295,7 @@ class ApprovalHandler:
             tracker=tracker,
         )
 
-        result = strategy.execute(context)
+        result = await self._run_on_worker(approval, strategy.execute, context, tracker)
 
         if result.is_success:
             return await self._process_feedback_result(
@@ -310,7 +369,7 @@ class ApprovalHandler:
             )
             logger.info(f"Finished execution {existing_execution.execution_id} (cancelled)")
 
-        self._cleanup_worktree(approval)
+        await asyncio.to_thread(self._cleanup_worktree, approval)
         return True
 
     def _get_execution_dir(self, approval: PendingApproval) -> Path:
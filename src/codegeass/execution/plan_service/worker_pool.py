@@ -0,0 +1,146 @@
+"""Worker pool for running approved plans and discuss rounds off the event loop."""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Approval and discuss executions running at once; more wait in the queue
+DEFAULT_MAX_WORKERS = 2
+
+
+class ApprovalWorkerPool:
+    """Runs agent executions for approvals on worker threads.
+
+    Approval handlers are coroutines called from the dashboard and the
+    Telegram callback poller, but an agent run blocks for minutes. run()
+    hands the blocking call to a thread and awaits it, so the event loop
+    keeps serving WebSockets and callbacks meanwhile. At most max_workers
+    run at once; the rest queue in submission order. Each approval has at
+    most one execution queued or running.
+
+    Handlers await other work (message updates) before they submit, so they
+    claim the approval with try_reserve() first; submit() consumes the
+    reservation, and release() drops one that was never used.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize with the number of concurrent executions."""
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="codegeass-approval"
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future[Any]] = {}
+        self._running: set[str] = set()
+        # approval_id -> token of the caller that reserved it
+        self._reserved: dict[str, object] = {}
+
+    def is_busy(self, approval_id: str) -> bool:
+        """Check if an execution for the approval is reserved, queued or running."""
+        with self._lock:
+            return approval_id in self._inflight or approval_id in self._reserved
+
+    def try_reserve(self, approval_id: str) -> object | None:
+        """Claim an approval before submitting its execution.
+
+        Returns:
+            A token to pass to release(), or None if the approval is busy
+        """
+        with self._lock:
+            if approval_id in self._inflight or approval_id in self._reserved:
+                return None
+            token = object()
+            self._reserved[approval_id] = token
+            return token
+
+    def release(self, approval_id: str, token: object) -> None:
+        """Drop a reservation; a no-op once submit() has consumed it."""
+        with self._lock:
+            if self._reserved.get(approval_id) is token:
+                del self._reserved[approval_id]
+
+    def submit(
+        self,
+        approval_id: str,
+        fn: Callable[..., T],
+        *args: Any,
+        on_queued: Callable[[int], None] | None = None,
+    ) -> Future[T]:
+        """Queue a blocking call for an approval.
+
+        If every worker is busy, on_queued is called with the number of
+        executions ahead before the call can start. A reservation for the
+        approval is consumed.
+
+        Raises:
+            RuntimeError: If the approval already has an execution in flight
+        """
+        with self._lock:
+            if approval_id in self._inflight:
+                raise RuntimeError(f"Approval {approval_id} already has an execution in flight")
+            self._reserved.pop(approval_id, None)
+            ahead = len(self._inflight) - self.max_workers
+            future = self._executor.submit(self._call, approval_id, fn, *args)
+            self._inflight[approval_id] = future
+        # Called without the lock, so the callback may use the pool
+        if ahead >= 0 and on_queued:
+            on_queued(ahead)
+        future.add_done_callback(lambda _: self._done(approval_id))
+        return future
+
+    async def run(
+        self,
+        approval_id: str,
+        fn: Callable[..., T],
+        *args: Any,
+        on_queued: Callable[[int], None] | None = None,
+    ) -> T:
+        """Queue a blocking call for an approval and await its result."""
+        future = self.submit(approval_id, fn, *args, on_queued=on_queued)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, approval_id: str, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._running.add(approval_id)
+        logger.info(f"Starting execution for approval {approval_id}")
+        return fn(*args)
+
+    def _done(self, approval_id: str) -> None:
+        with self._lock:
+            self._inflight.pop(approval_id, None)
+            self._running.discard(approval_id)
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the pool's worker, running and queued counts."""
+        with self._lock:
+            running = len(self._running)
+            return {
+                "max_workers": self.max_workers,
+                "running": running,
+                "queued": len(self._inflight) - running,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, dropping queued executions."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool: ApprovalWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_approval_worker_pool() -> ApprovalWorkerPool:
+    """Get the approval worker pool singleton."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ApprovalWorkerPool()
+    return _pool
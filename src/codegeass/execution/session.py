@@ -7,6 +7,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from codegeass.storage.atomic import atomic_write
+from codegeass.storage.blob_store import BlobStore
+
 
 @dataclass
 class Session:
@@ -20,10 +23,13 @@ class Session:
     output: str = ""
     error: str | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Set when the full output lives in the blob store; `output` is then a preview
+    output_ref: str | None = None
+    output_size: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary."""
-        return {
+        data = {
             "id": self.id,
             "task_id": self.task_id,
             "started_at": self.started_at.isoformat(),
@@ -33,6 +39,10 @@ class Session:
             "error": self.error,
             "metadata": self.metadata,
         }
+        if self.output_ref:
+            data["output_ref"] = self.output_ref
+            data["output_size"] = self.output_size
+        return data
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Session":
@@ -48,16 +58,23 @@ class Session:
             output=data.get("output", ""),
             error=data.get("error"),
             metadata=data.get("metadata", {}),
+            output_ref=data.get("output_ref"),
+            output_size=data.get("output_size"),
         )
 
 
 class SessionManager:
-    """Manages execution sessions."""
+    """Manages execution sessions.
+
+    When a blob store is configured, large session outputs are stored there
+    and session files keep a preview plus a reference (see load_output).
+    """
 
-    def __init__(self, sessions_dir: Path):
-        """Initialize with sessions directory."""
+    def __init__(self, sessions_dir: Path, blob_store: BlobStore | None = None):
+        """Initialize with sessions directory and optional transcript blob store."""
         self._sessions_dir = sessions_dir
         self._sessions_dir.mkdir(parents=True, exist_ok=True)
+        self._blob_store = blob_store
         self._current_session: Session | None = None
 
     def _get_session_file(self, session_id: str) -> Path:
@@ -79,8 +96,10 @@ class SessionManager:
     def _save_session(self, session: Session) -> None:
         """Save session to disk."""
         session_file = self._get_session_file(session.id)
-        with open(session_file, "w") as f:
-            json.dump(session.to_dict(), f, indent=2)
+        data = session.to_dict()
+        if self._blob_store is not None:
+            data = self._blob_store.offload(data)
+        atomic_write(session_file, json.dumps(data, indent=2))
 
     def update_session(
         self,
@@ -98,6 +117,7 @@ class SessionManager:
             session.status = status
         if output is not None:
             session.output = output
+            session.output_ref = session.output_size = None
         if error is not None:
             session.error = error
 
@@ -115,6 +135,7 @@ class SessionManager:
         session.finished_at = datetime.now()
         session.status = status
         session.output = output
+        session.output_ref = session.output_size = None
         session.error = error
 
         self._save_session(session)
@@ -134,6 +155,12 @@ class SessionManager:
             data = json.load(f)
             return Session.from_dict(data)
 
+    def load_output(self, session: Session) -> str:
+        """Get the full output of a session, loading it from the blob store if needed."""
+        if self._blob_store is None:
+            return session.output
+        return self._blob_store.load(session.output, session.output_ref)
+
     def get_sessions_for_task(self, task_id: str, limit: int = 10) -> list[Session]:
         """Get sessions for a task."""
         sessions = []
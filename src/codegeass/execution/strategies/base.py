@@ -1,21 +1,59 @@
 """Base execution strategy with streaming support."""
 
+import codecs
 import json
 import logging
 import os
+import selectors
 import subprocess
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
 from codegeass.execution.strategies.context import ExecutionContext
+from codegeass.execution.supervisor import SupervisedProcess, get_process_supervisor
 
 if TYPE_CHECKING:
     from codegeass.execution.tracker import ExecutionTracker
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from a process pipe per system call
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Seconds between exit checks while a process produces no output
+EXIT_CHECK_INTERVAL = 1.0
+
+
+class _LineSplitter:
+    """Splits chunks of a UTF-8 byte stream into lines as they arrive."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial: list[str] = []
+
+    def feed(self, chunk: bytes) -> list[str]:
+        """Decode a chunk and return the lines it completes."""
+        text = self._decoder.decode(chunk)
+        if "\n" not in text:
+            self._partial.append(text)
+            return []
+
+        lines = text.split("\n")
+        lines[0] = "".join(self._partial) + lines[0]
+        tail = lines.pop()
+        self._partial = [tail] if tail else []
+        return [line.removesuffix("\r") for line in lines]
+
+    def close(self) -> list[str]:
+        """Return the final unterminated line, if any."""
+        text = "".join(self._partial) + self._decoder.decode(b"", final=True)
+        self._partial = []
+        return [text.removesuffix("\r")] if text else []
+
 
 class BaseStrategy(ABC):
     """Base class for execution strategies."""
@@ -32,8 +70,8 @@ class BaseStrategy(ABC):
     def execute(self, context: ExecutionContext) -> ExecutionResult:
         """Execute the command and return result.
 
-        If context.tracker is provided, uses streaming execution with Popen
-        to emit real-time output events. Otherwise uses blocking subprocess.run.
+        If context.tracker is provided, output is streamed to it as real-time
+        events. Otherwise it is only collected into the result.
         """
         if context.tracker and context.execution_id:
             return self._execute_streaming(context)
@@ -41,41 +79,63 @@ class BaseStrategy(ABC):
             return self._execute_blocking(context)
 
     def _execute_blocking(self, context: ExecutionContext) -> ExecutionResult:
-        """Execute using blocking subprocess.run (original behavior)."""
+        """Execute without a tracker, collecting output until the process exits.
+
+        Like the streaming path, the process runs under the supervisor in
+        its own process group, so a timeout stops the agent and every child
+        it started instead of only the direct child.
+        """
         started_at = datetime.now()
         command = self.build_command(context)
+        output_lines: list[str] = []
+        stderr_lines: list[str] = []
 
         try:
             env = os.environ.copy()
             env.pop("ANTHROPIC_API_KEY", None)
 
-            result = subprocess.run(
+            supervisor = get_process_supervisor()
+            process = supervisor.spawn(
                 command,
+                limits=context.task.resource_limits,
                 cwd=context.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=context.task.timeout or self.timeout,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 env=env,
             )
 
+            try:
+                timeout_seconds = context.task.timeout or self.timeout
+                deadline = time.monotonic() + timeout_seconds
+
+                return_code = self._pump_output(
+                    process, deadline, output_lines.append, stderr_lines.append
+                )
+                if return_code is None:
+                    raise subprocess.TimeoutExpired(command, timeout_seconds)
+            finally:
+                supervisor.release(process)
+                process.close()
+
             finished_at = datetime.now()
-            status = ExecutionStatus.SUCCESS if result.returncode == 0 else ExecutionStatus.FAILURE
+            status = ExecutionStatus.SUCCESS if return_code == 0 else ExecutionStatus.FAILURE
 
             return ExecutionResult(
                 task_id=context.task.id,
                 session_id=context.session_id,
                 status=status,
-                output=result.stdout,
+                output="\n".join(output_lines),
                 started_at=started_at,
                 finished_at=finished_at,
-                error=result.stderr if result.returncode != 0 else None,
-                exit_code=result.returncode,
+                error="\n".join(stderr_lines) if return_code != 0 else None,
+                exit_code=return_code,
+                metadata=self._usage_metadata(process),
             )
 
         except subprocess.TimeoutExpired:
-            return self._timeout_result(context, started_at)
+            return self._timeout_result(context, started_at, "\n".join(output_lines))
         except Exception as e:
-            return self._error_result(context, started_at, str(e))
+            return self._error_result(context, started_at, str(e), "\n".join(output_lines))
 
     def _execute_streaming(self, context: ExecutionContext) -> ExecutionResult:
         """Execute using streaming Popen to emit real-time output events."""
@@ -90,39 +150,40 @@ class BaseStrategy(ABC):
         output_lines: list[str] = []
         stderr_lines: list[str] = []
 
+        def on_stdout(line: str) -> None:
+            output_lines.append(line)
+            tracker.append_output(execution_id, line)
+            self._detect_phase(tracker, execution_id, line)
+
         try:
             env = os.environ.copy()
             env.pop("ANTHROPIC_API_KEY", None)
 
             tracker.update_execution(execution_id, status="running", phase="executing")
 
-            process = subprocess.Popen(
+            supervisor = get_process_supervisor()
+            process = supervisor.spawn(
                 command,
+                limits=context.task.resource_limits,
                 cwd=context.working_dir,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
                 env=env,
-                bufsize=1,
             )
 
-            tracker.set_pid(execution_id, process.pid)
-            timeout_seconds = context.task.timeout or self.timeout
-            deadline = datetime.now().timestamp() + timeout_seconds
+            try:
+                tracker.set_pid(execution_id, process.pid)
+                timeout_seconds = context.task.timeout or self.timeout
+                deadline = time.monotonic() + timeout_seconds
 
-            while True:
-                if datetime.now().timestamp() > deadline:
-                    process.kill()
-                    process.wait()
+                return_code = self._pump_output(process, deadline, on_stdout, stderr_lines.append)
+                if return_code is None:
                     tracker.update_execution(execution_id, status="finishing")
                     raise subprocess.TimeoutExpired(command, timeout_seconds)
-
-                return_code = process.poll()
-                self._read_process_output(process, output_lines, tracker, execution_id)
-                self._read_stderr(process, stderr_lines)
-
-                if return_code is not None:
-                    break
+            finally:
+                # Stops the agent on timeout or error, and any children it left
+                supervisor.release(process)
+                process.close()
 
             tracker.update_execution(execution_id, status="finishing")
             finished_at = datetime.now()
@@ -137,6 +198,7 @@ class BaseStrategy(ABC):
                 finished_at=finished_at,
                 error="\n".join(stderr_lines) if return_code != 0 and stderr_lines else None,
                 exit_code=return_code,
+                metadata=self._usage_metadata(process),
             )
 
         except subprocess.TimeoutExpired:
@@ -145,32 +207,73 @@ class BaseStrategy(ABC):
             logger.error(f"Streaming execution error: {e}")
             return self._error_result(context, started_at, str(e), "\n".join(output_lines))
 
-    def _read_process_output(
+    @staticmethod
+    def _usage_metadata(process: SupervisedProcess) -> dict | None:
+        """Result metadata with the resource usage and limits of a finished process."""
+        metadata = {}
+        usage = process.resource_usage()
+        if usage:
+            metadata["resource_usage"] = usage
+        if process.limiter:
+            metadata["resource_limits"] = {
+                **process.limiter.limits.to_dict(),
+                "enforced_by": process.limiter.enforced_by,
+            }
+        return metadata or None
+
+    def _pump_output(
         self,
-        process: subprocess.Popen,
-        output_lines: list[str],
-        tracker: "ExecutionTracker",
-        execution_id: str,
-    ) -> None:
-        """Read stdout from process and emit events."""
-        if process.stdout:
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                line = line.rstrip("\n")
-                output_lines.append(line)
-                tracker.append_output(execution_id, line)
-                self._detect_phase(tracker, execution_id, line)
-
-    def _read_stderr(self, process: subprocess.Popen, stderr_lines: list[str]) -> None:
-        """Read stderr from process."""
-        if process.stderr:
-            while True:
-                line = process.stderr.readline()
-                if not line:
+        process: SupervisedProcess,
+        deadline: float,
+        on_stdout: Callable[[str], None],
+        on_stderr: Callable[[str], None],
+    ) -> int | None:
+        """Stream stdout and stderr line by line until the process exits.
+
+        Both pipes are multiplexed with a selector and read in large
+        non-blocking chunks, so neither can fill up while the other is
+        quiet, and the thread sleeps in select() until output arrives, the
+        process exits or the deadline (a time.monotonic() value) passes.
+
+        Returns:
+            The exit code, or None if the deadline passed first
+        """
+        with selectors.DefaultSelector() as selector:
+            for stream, on_line in ((process.stdout, on_stdout), (process.stderr, on_stderr)):
+                if stream is not None:
+                    os.set_blocking(stream.fileno(), False)
+                    selector.register(stream, selectors.EVENT_READ, (on_line, _LineSplitter()))
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+
+                events = selector.select(min(remaining, EXIT_CHECK_INTERVAL))
+                if not events and process.poll() is not None:
+                    # Exited, but a child process still holds the pipes open;
+                    # keep the last line the process printed without a newline
+                    for key in selector.get_map().values():
+                        on_line, splitter = key.data
+                        for line in splitter.close():
+                            on_line(line)
                     break
-                stderr_lines.append(line.rstrip("\n"))
+
+                for key, _ in events:
+                    on_line, splitter = key.data
+                    try:
+                        chunk = os.read(key.fd, STREAM_CHUNK_SIZE)
+                    except BlockingIOError:
+                        continue
+                    if chunk:
+                        lines = splitter.feed(chunk)
+                    else:
+                        selector.unregister(key.fileobj)
+                        lines = splitter.close()
+                    for line in lines:
+                        on_line(line)
+
+        return process.wait(timeout=max(deadline - time.monotonic(), 0))
 
     def _detect_phase(
         self, tracker: "ExecutionTracker", execution_id: str, line: str
@@ -0,0 +1,368 @@
+"""Process supervisor for agent subprocesses.
+
+Agents spawn their own children (git, language servers, test runners). Each
+agent is started as the leader of a new session, so the whole tree shares a
+process group that can be signalled at once. Stopping sends SIGTERM to the
+group and escalates to SIGKILL after a grace period on a timer thread, so
+the caller never sleeps. Exit statuses are collected with wait4(), which
+also reports the CPU time and peak RSS of the run.
+"""
+
+import logging
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from codegeass.core.value_objects import ResourceLimits
+from codegeass.execution.limits import ResourceLimiter, cgroup_root_from_env
+
+logger = logging.getLogger(__name__)
+
+# Seconds between SIGTERM and SIGKILL when stopping a process group
+DEFAULT_STOP_GRACE = 5.0
+
+# Longest sleep between exit checks when pidfd is not available
+MAX_WAIT_INTERVAL = 0.05
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_PROC = Path("/proc")
+
+
+def _descendants(pid: int) -> set[int]:
+    """Find all descendants of a process by walking /proc (Linux only)."""
+    if not _PROC.is_dir():
+        return set()
+
+    children: dict[int, list[int]] = {}
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after its ")"
+        ppid = int(stat[stat.rfind(")") + 2 :].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    found: set[int] = set()
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            if child not in found:
+                found.add(child)
+                pending.append(child)
+    return found
+
+
+def _signal_group(pgid: int | None, sig: int, extra_pids: set[int] = frozenset()) -> bool:
+    """Signal a process group and any strays. Returns False if none existed."""
+    delivered = False
+    if pgid is not None:
+        try:
+            os.killpg(pgid, sig)
+            delivered = True
+        except ProcessLookupError:
+            pass
+        except PermissionError as e:
+            logger.warning(f"Cannot signal process group {pgid}: {e}")
+
+    for pid in extra_pids:
+        try:
+            os.kill(pid, sig)
+            delivered = True
+        except (ProcessLookupError, PermissionError):
+            pass
+    return delivered
+
+
+def _alive(pid: int, group: bool = False) -> bool:
+    """Check if a process, or any process of a group, still exists (zombies included)."""
+    try:
+        if group:
+            os.killpg(pid, 0)
+        else:
+            os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SupervisedProcess:
+    """An agent process started in its own process group.
+
+    Use poll() and wait() instead of the Popen methods: they reap the
+    process with wait4() and keep its resource usage.
+    """
+
+    def __init__(self, popen: subprocess.Popen, limiter: ResourceLimiter | None = None):
+        """Wrap a Popen started with start_new_session=True."""
+        self.popen = popen
+        self.limiter = limiter
+        self.pid = popen.pid
+        # The session leader's PID is also the group ID
+        self.pgid = popen.pid
+        self.returncode: int | None = None
+        self.rusage: Any = None
+        self._reap_lock = threading.Lock()
+
+    @property
+    def stdout(self) -> Any:
+        """The process stdout pipe."""
+        return self.popen.stdout
+
+    @property
+    def stderr(self) -> Any:
+        """The process stderr pipe."""
+        return self.popen.stderr
+
+    def poll(self) -> int | None:
+        """Reap the process if it has exited. Returns its exit code or None."""
+        if self.returncode is not None:
+            return self.returncode
+
+        with self._reap_lock:
+            if self.returncode is not None:
+                return self.returncode
+            try:
+                pid, status, rusage = os.wait4(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Reaped elsewhere; the status is lost
+                self._set_exited(self.popen.returncode or 0, None)
+                return self.returncode
+            if pid == 0:
+                return None
+            self._set_exited(os.waitstatus_to_exitcode(status), rusage)
+            return self.returncode
+
+    def _set_exited(self, returncode: int, rusage: Any) -> None:
+        self.returncode = returncode
+        self.rusage = rusage
+        # Keep Popen from trying to reap the process again
+        self.popen.returncode = returncode
+
+    def wait(self, timeout: float | None = None) -> int | None:
+        """Wait for the process to exit and reap it.
+
+        Sleeps on a pidfd where the platform has one, otherwise polls with
+        a backoff of up to MAX_WAIT_INTERVAL.
+
+        Returns:
+            The exit code, or None if the timeout passed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.poll() is not None:
+            return self.returncode
+
+        pidfd = self._open_pidfd()
+        try:
+            delay = 0.0005
+            while self.poll() is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                if pidfd is not None:
+                    with selectors.DefaultSelector() as selector:
+                        selector.register(pidfd, selectors.EVENT_READ)
+                        selector.select(remaining)
+                else:
+                    delay = min(delay * 2, MAX_WAIT_INTERVAL)
+                    time.sleep(delay if remaining is None else min(delay, remaining))
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+        return self.returncode
+
+    def _open_pidfd(self) -> int | None:
+        if not hasattr(os, "pidfd_open"):
+            return None
+        try:
+            return os.pidfd_open(self.pid)
+        except OSError:
+            return None
+
+    def signal_group(self, sig: int) -> bool:
+        """Send a signal to every process of the tree. Returns False if none is left."""
+        strays = set() if self.returncode is not None else _descendants(self.pid)
+        return _signal_group(self.pgid, sig, strays)
+
+    def group_alive(self) -> bool:
+        """Check if the leader or any other member of its group still runs."""
+        return self.poll() is None or _alive(self.pgid, group=True)
+
+    def resource_usage(self) -> dict[str, float] | None:
+        """CPU time and peak RSS of the process and the children it waited for.
+
+        With a cgroup, also the CPU time, peak memory and peak process count
+        of the whole tree (the tree_* keys).
+        """
+        if self.rusage is None:
+            return None
+        usage = {
+            "cpu_user_seconds": round(self.rusage.ru_utime, 3),
+            "cpu_system_seconds": round(self.rusage.ru_stime, 3),
+            "peak_rss_bytes": self.rusage.ru_maxrss * _MAXRSS_UNIT,
+        }
+        if self.limiter:
+            usage.update(self.limiter.usage())
+        return usage
+
+    def close(self) -> None:
+        """Close the pipes of the process."""
+        for stream in (self.popen.stdin, self.popen.stdout, self.popen.stderr):
+            if stream:
+                stream.close()
+
+
+class ProcessSupervisor:
+    """Starts, stops and reaps agent process trees.
+
+    stop() is for the thread that owns a process and waits for it;
+    terminate() is for anyone else (dashboard requests, CLI) and returns
+    immediately, leaving the SIGKILL escalation to a timer. terminate()
+    also works on PIDs started by other processes, as long as they were
+    started by a supervisor (so their PID is their process group).
+    """
+
+    def __init__(self, grace: float = DEFAULT_STOP_GRACE, cgroup_root: Path | None = None):
+        """Initialize the supervisor.
+
+        Args:
+            grace: Seconds between SIGTERM and SIGKILL when stopping
+            cgroup_root: Delegated cgroup v2 to enforce resource limits with
+        """
+        self.grace = grace
+        self.cgroup_root = cgroup_root
+        self._processes: dict[int, SupervisedProcess] = {}
+        self._lock = threading.Lock()
+
+    def spawn(
+        self, command: list[str], limits: ResourceLimits | None = None, **popen_kwargs: Any
+    ) -> SupervisedProcess:
+        """Start a command as the leader of a new session, within the given limits."""
+        limiter = None
+        if limits and not limits.is_empty:
+            limiter = ResourceLimiter(limits, self.cgroup_root)
+            command = limiter.wrap(command)
+            popen_kwargs["preexec_fn"] = limiter.preexec()
+
+        try:
+            popen = subprocess.Popen(command, start_new_session=True, **popen_kwargs)
+        except BaseException:
+            if limiter:
+                limiter.close()
+            raise
+        if limiter:
+            limiter.spawned()
+
+        process = SupervisedProcess(popen, limiter)
+        with self._lock:
+            self._processes[process.pid] = process
+        return process
+
+    def get(self, pid: int) -> SupervisedProcess | None:
+        """Get a process started by this supervisor."""
+        with self._lock:
+            return self._processes.get(pid)
+
+    @property
+    def active_count(self) -> int:
+        """Number of processes started and not yet released."""
+        with self._lock:
+            return len(self._processes)
+
+    def stop(self, process: SupervisedProcess, grace: float | None = None) -> int | None:
+        """Stop a process tree, waiting up to the grace period before SIGKILL.
+
+        Returns:
+            The exit code of the leader
+        """
+        grace = self.grace if grace is None else grace
+        deadline = time.monotonic() + grace
+        if process.group_alive() and process.signal_group(signal.SIGTERM):
+            process.wait(grace)
+            # Other members are not our children; all we can do is poll
+            while _alive(process.pgid, group=True) and time.monotonic() < deadline:
+                time.sleep(MAX_WAIT_INTERVAL)
+        if process.group_alive():
+            logger.info(f"Process group {process.pgid} ignored SIGTERM for {grace}s, killing")
+            process.signal_group(signal.SIGKILL)
+        return process.wait()
+
+    def release(self, process: SupervisedProcess) -> None:
+        """Finish with a process: reap it and stop children it left behind."""
+        if process.group_alive():
+            self.stop(process)
+        if process.limiter:
+            process.limiter.close()
+        with self._lock:
+            self._processes.pop(process.pid, None)
+
+    def terminate(self, pid: int, grace: float | None = None) -> bool:
+        """Send SIGTERM to a process tree and schedule SIGKILL. Never blocks.
+
+        Returns:
+            False if no process was found to signal
+        """
+        grace = self.grace if grace is None else grace
+        process = self.get(pid)
+        if process is not None:
+            delivered = process.signal_group(signal.SIGTERM)
+            pgid = process.pgid
+        else:
+            pgid = self._foreign_group(pid)
+            delivered = _signal_group(pgid, signal.SIGTERM, {pid} | _descendants(pid))
+        if not delivered:
+            return False
+
+        logger.info(f"Sent SIGTERM to PID {pid} and its children")
+        timer = threading.Timer(grace, self._escalate, args=(pid, pgid))
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def _foreign_group(self, pid: int) -> int | None:
+        """Group to signal for a PID this supervisor did not start, if any."""
+        try:
+            pgid = os.getpgid(pid)
+        except ProcessLookupError:
+            return None
+        # Only signal the group if the PID leads it, never our own group
+        return pgid if pgid == pid and pgid != os.getpgrp() else None
+
+    def _escalate(self, pid: int, pgid: int | None) -> None:
+        """SIGKILL whatever is left of a tree once its grace period is over."""
+        process = self.get(pid)
+        if process is not None:
+            if process.group_alive():
+                logger.info(f"Process group {pgid} still running, sending SIGKILL")
+                process.signal_group(signal.SIGKILL)
+            # Reap it ourselves in case its owner is gone
+            process.wait(MAX_WAIT_INTERVAL)
+        elif (pgid is not None and _alive(pgid, group=True)) or _alive(pid):
+            logger.info(f"PID {pid} still running, sending SIGKILL")
+            _signal_group(pgid, signal.SIGKILL, {pid} | _descendants(pid))
+
+
+_supervisor: ProcessSupervisor | None = None
+_supervisor_lock = threading.Lock()
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """Get the process supervisor singleton."""
+    global _supervisor
+    if _supervisor is None:
+        with _supervisor_lock:
+            if _supervisor is None:
+                _supervisor = ProcessSupervisor(cgroup_root=cgroup_root_from_env())
+    return _supervisor
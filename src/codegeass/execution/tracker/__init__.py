@@ -2,6 +2,7 @@
 
 from codegeass.execution.tracker.event_emitter import EventCallback, EventEmitter
 from codegeass.execution.tracker.execution import ActiveExecution
+from codegeass.execution.tracker.output_buffer import OutputBuffer
 from codegeass.execution.tracker.persistence import ExecutionPersistence
 from codegeass.execution.tracker.tracker import ExecutionTracker, get_execution_tracker
 
@@ -11,5 +12,6 @@ __all__ = [
     "EventEmitter",
     "ExecutionPersistence",
     "ExecutionTracker",
+    "OutputBuffer",
     "get_execution_tracker",
 ]
@@ -4,6 +4,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Literal
 
+from codegeass.execution.tracker.output_buffer import OutputBuffer
+
 
 @dataclass
 class ActiveExecution:
@@ -18,18 +20,19 @@ class ActiveExecution:
     session_id: str | None
     started_at: datetime
     status: Literal["starting", "running", "finishing", "waiting_approval", "stopped"] = "starting"
-    output_lines: list[str] = field(default_factory=list)
+    output: OutputBuffer = field(default_factory=OutputBuffer)
     current_phase: str = "initializing"
     approval_id: str | None = None
     pid: int | None = None
 
-    _max_output_lines: int = 1000
+    @property
+    def output_lines(self) -> list[str]:
+        """The most recent output lines kept in the buffer."""
+        return self.output.snapshot()
 
-    def append_output(self, line: str) -> None:
-        """Append output line to buffer, keeping only the last N lines."""
-        self.output_lines.append(line)
-        if len(self.output_lines) > self._max_output_lines:
-            self.output_lines = self.output_lines[-self._max_output_lines:]
+    def append_output(self, line: str, seq: int | None = None) -> int:
+        """Append output line to the buffer. Returns its sequence number."""
+        return self.output.append(line, seq)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -40,7 +43,8 @@ class ActiveExecution:
             "session_id": self.session_id,
             "started_at": self.started_at.isoformat(),
             "status": self.status,
-            "output_lines": self.output_lines[-20:],
+            "output_lines": self.output.snapshot(last=20),
+            "output_seq": self.output.next_seq,
             "current_phase": self.current_phase,
             "approval_id": self.approval_id,
             "pid": self.pid,
@@ -56,7 +60,9 @@ class ActiveExecution:
             session_id=data.get("session_id"),
             started_at=datetime.fromisoformat(data["started_at"]),
             status=data.get("status", "running"),
-            output_lines=data.get("output_lines", []),
+            output=OutputBuffer.from_lines(
+                data.get("output_lines", []), next_seq=data.get("output_seq")
+            ),
             current_phase=data.get("current_phase", "unknown"),
             approval_id=data.get("approval_id"),
             pid=data.get("pid"),
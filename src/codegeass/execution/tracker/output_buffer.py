@@ -0,0 +1,116 @@
+"""Bounded ring buffer for the live output of an execution."""
+
+from collections import deque
+from itertools import islice
+
+# Lines kept per execution
+DEFAULT_MAX_LINES = 1000
+
+# Total UTF-8 bytes kept per execution
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Longer lines are cut down to this many bytes
+DEFAULT_MAX_LINE_BYTES = 64 * 1024
+
+
+class OutputBuffer:
+    """Keeps the most recent output lines of an execution.
+
+    Lines are numbered with a sequence number that keeps increasing as old
+    lines are evicted, so a reader that has seen up to sequence N can ask
+    for since(N + 1) and receive exactly the lines it missed (or the oldest
+    ones still kept). Memory is bounded by both line count and total bytes;
+    appending and evicting are O(1).
+    """
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_MAX_LINES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+    ):
+        """Initialize with the line-count and byte bounds."""
+        self._max_lines = max_lines
+        self._max_bytes = max_bytes
+        self._max_line_bytes = max_line_bytes
+        self._lines: deque[tuple[str, int]] = deque()  # (line, size in bytes)
+        self._bytes = 0
+        self._next_seq = 0
+
+    @classmethod
+    def from_lines(cls, lines: list[str], next_seq: int | None = None) -> "OutputBuffer":
+        """Rebuild a buffer from saved lines, the last of which is next_seq - 1."""
+        buffer = cls()
+        if next_seq is not None:
+            buffer._next_seq = max(0, next_seq - len(lines))
+        for line in lines:
+            buffer.append(line)
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest line kept."""
+        return self._next_seq - len(self._lines)
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next appended line will get."""
+        return self._next_seq
+
+    @property
+    def size_bytes(self) -> int:
+        """Total UTF-8 size of the lines kept."""
+        return self._bytes
+
+    def append(self, line: str, seq: int | None = None) -> int:
+        """Add a line, evicting the oldest ones past the bounds. Returns its sequence.
+
+        Mirrors of another process's buffer pass the line's original `seq`:
+        lines already seen are ignored, and after a gap the buffer restarts
+        at `seq` so sequence numbers stay contiguous.
+        """
+        if seq is not None:
+            if seq < self._next_seq:
+                return seq
+            if seq > self._next_seq:
+                self._lines.clear()
+                self._bytes = 0
+                self._next_seq = seq
+
+        data = line.encode("utf-8", "replace")
+        size = len(data)
+        if size > self._max_line_bytes:
+            cut = data[: self._max_line_bytes]
+            line = cut.decode("utf-8", "ignore") + f" ... [{size - len(cut)} bytes truncated]"
+            size = len(line.encode("utf-8", "replace"))
+
+        self._lines.append((line, size))
+        self._bytes += size
+        while len(self._lines) > self._max_lines or (
+            self._bytes > self._max_bytes and len(self._lines) > 1
+        ):
+            _, evicted = self._lines.popleft()
+            self._bytes -= evicted
+
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def since(self, seq: int) -> list[tuple[int, str]]:
+        """Get (sequence, line) pairs for every kept line numbered seq or later."""
+        first = self.first_seq
+        start = max(seq, first) - first
+        return [
+            (first + start + i, line)
+            for i, (line, _) in enumerate(islice(self._lines, start, None))
+        ]
+
+    def snapshot(self, last: int | None = None) -> list[str]:
+        """Get the kept lines, or only the last `last` of them."""
+        if last is None:
+            return [line for line, _ in self._lines]
+        start = max(0, len(self._lines) - last)
+        return [line for line, _ in islice(self._lines, start, None)]
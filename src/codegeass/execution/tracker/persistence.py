@@ -1,59 +1,211 @@
 """Persistence logic for execution tracker."""
 
+import atexit
 import json
 import logging
+import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from codegeass.execution.tracker.execution import ActiveExecution
+from codegeass.storage.atomic import atomic_write
 
 logger = logging.getLogger(__name__)
 
+# Seconds a changed execution may wait before it is written
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Journal records written before the journal is folded into a checkpoint
+CHECKPOINT_RECORDS = 500
+
 
 class ExecutionPersistence:
-    """Handles persistence of active executions to disk."""
+    """Handles persistence of active executions to disk.
+
+    Changes are written behind: mark_dirty() and mark_removed() only record
+    which executions changed, and a timer writes them at most every
+    flush_interval seconds, so a burst of phase changes costs one write.
+    Callers flush() immediately for transitions that must not be lost.
 
-    def __init__(self, data_dir: Path):
-        """Initialize persistence with data directory."""
+    mark_dirty() snapshots the execution right away, so callers must hold
+    whatever lock guards the execution while calling it; the timer thread
+    only ever sees those snapshots.
+
+    On disk, active_executions.json is a checkpoint of all executions and
+    active_executions.journal holds one compact JSON record per change made
+    since. Once the journal reaches CHECKPOINT_RECORDS records it is folded
+    into a new checkpoint and truncated.
+    """
+
+    def __init__(self, data_dir: Path, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """Initialize persistence with data directory and write-behind interval."""
         self._data_dir = data_dir
         self._persistence_file = data_dir / "active_executions.json"
+        self._journal_file = data_dir / "active_executions.journal"
+        self._flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # execution_id -> snapshot of the changed execution, or None if it was removed
+        self._dirty: dict[str, dict[str, Any] | None] = {}
+        self._persisted: dict[str, dict[str, Any]] = {}
+        self._journal_records = 0
+        self._timer: threading.Timer | None = None
+        atexit.register(self.flush)
 
     def load(self) -> dict[str, ActiveExecution]:
-        """Load active executions from persistence file."""
-        if not self._persistence_file.exists():
-            return {}
+        """Load active executions from the checkpoint and journal."""
+        with self._lock:
+            self._persisted = {}
+            self._journal_records = 0
 
-        try:
-            with open(self._persistence_file) as f:
-                data = json.load(f)
+            if self._persistence_file.exists():
+                try:
+                    with open(self._persistence_file) as f:
+                        data = json.load(f)
+                    for exec_data in data.get("executions", []):
+                        self._persisted[exec_data["execution_id"]] = exec_data
+                except Exception as e:
+                    logger.warning(f"Failed to load active executions: {e}")
+
+            self._replay_journal()
 
             result = {}
-            for exec_data in data.get("executions", []):
-                execution = ActiveExecution.from_dict(exec_data)
+            for exec_data in self._persisted.values():
+                try:
+                    execution = ActiveExecution.from_dict(exec_data)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable active execution: {e}")
+                    continue
                 result[execution.execution_id] = execution
                 logger.info(f"Recovered active execution: {execution.execution_id}")
 
             return result
 
-        except Exception as e:
-            logger.warning(f"Failed to load active executions: {e}")
-            return {}
+    def _replay_journal(self) -> None:
+        """Apply the journal records written after the checkpoint."""
+        try:
+            with open(self._journal_file) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
 
-    def save(self, active: dict[str, ActiveExecution]) -> None:
-        """Persist active executions to file."""
+        for line in lines:
+            try:
+                record = json.loads(line)
+                if record["op"] == "put":
+                    self._persisted[record["execution"]["execution_id"]] = record["execution"]
+                else:
+                    self._persisted.pop(record["execution_id"], None)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # A torn final line from a crash mid-append
+                continue
+            self._journal_records += 1
+
+    def mark_dirty(self, execution: ActiveExecution) -> None:
+        """Snapshot an added or changed execution and schedule it to be written."""
         try:
-            self._data_dir.mkdir(parents=True, exist_ok=True)
-            data: dict[str, Any] = {
-                "executions": [ex.to_dict() for ex in active.values()],
-                "updated_at": datetime.now().isoformat(),
-            }
-            with open(self._persistence_file, "w") as f:
-                json.dump(data, f, indent=2)
+            exec_data = execution.to_dict()
         except Exception as e:
-            logger.warning(f"Failed to save active executions: {e}")
+            logger.warning(f"Failed to serialize execution {execution.execution_id}: {e}")
+            return
+        with self._lock:
+            self._dirty[execution.execution_id] = exec_data
+            self._schedule_flush()
+
+    def mark_removed(self, execution_id: str) -> None:
+        """Schedule a finished execution to be removed."""
+        with self._lock:
+            self._dirty[execution_id] = None
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Start the write-behind timer if it is not already pending."""
+        if self._flush_interval <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self._flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self) -> None:
+        """Timer callback writing the changes accumulated since it was started."""
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+
+            records = []
+            for execution_id, exec_data in self._dirty.items():
+                if exec_data is None:
+                    if self._persisted.pop(execution_id, None) is not None:
+                        records.append({"op": "del", "execution_id": execution_id})
+                else:
+                    self._persisted[execution_id] = exec_data
+                    records.append({"op": "put", "execution": exec_data})
+            self._dirty.clear()
+
+            try:
+                if self._journal_records + len(records) >= CHECKPOINT_RECORDS:
+                    self._checkpoint()
+                elif records:
+                    self._append_journal(records)
+            except Exception as e:
+                logger.warning(f"Failed to save active executions: {e}")
+
+    def _append_journal(self, records: list[dict[str, Any]]) -> None:
+        """Append change records to the journal in a single write."""
+        self._data_dir.mkdir(parents=True, exist_ok=True)
+        payload = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        ).encode("utf-8")
+        fd = os.open(self._journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        self._journal_records += len(records)
+
+    def _checkpoint(self) -> None:
+        """Write the full state as a checkpoint and empty the journal."""
+        self._data_dir.mkdir(parents=True, exist_ok=True)
+        data: dict[str, Any] = {
+            "executions": list(self._persisted.values()),
+            "updated_at": datetime.now().isoformat(),
+        }
+        atomic_write(self._persistence_file, json.dumps(data, indent=2))
+        # Replaying an old journal over the new checkpoint yields the same
+        # state, so a crash before this truncate is harmless
+        self._journal_file.unlink(missing_ok=True)
+        self._journal_records = 0
+
+    def save(self, active: dict[str, ActiveExecution]) -> None:
+        """Replace the persisted state with `active` and write a checkpoint now."""
+        with self._lock:
+            self._dirty.clear()
+            self._persisted = {ex.execution_id: ex.to_dict() for ex in active.values()}
+            try:
+                self._checkpoint()
+            except Exception as e:
+                logger.warning(f"Failed to save active executions: {e}")
 
     def clear(self) -> None:
-        """Delete the persistence file."""
-        if self._persistence_file.exists():
-            self._persistence_file.unlink()
+        """Delete the persistence files and drop pending changes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._dirty.clear()
+            self._persisted = {}
+            self._journal_records = 0
+            self._persistence_file.unlink(missing_ok=True)
+            self._journal_file.unlink(missing_ok=True)
@@ -1,20 +1,22 @@
 """Core execution tracker singleton."""
 
 import logging
-import os
-import signal
 import threading
-import time
 import uuid
 from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal
 
-from codegeass.execution.events import ExecutionEvent
+from codegeass.execution.event_bus import ExecutionEventBus
+from codegeass.execution.events import ExecutionEvent, ExecutionEventType
+from codegeass.execution.supervisor import get_process_supervisor
 from codegeass.execution.tracker.event_emitter import EventCallback, EventEmitter
 from codegeass.execution.tracker.execution import ActiveExecution
-from codegeass.execution.tracker.persistence import ExecutionPersistence
+from codegeass.execution.tracker.persistence import (
+    DEFAULT_FLUSH_INTERVAL,
+    ExecutionPersistence,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,14 @@ class ExecutionTracker:
 
     Thread-safe tracking of all active Claude Code executions.
     Emits events for real-time monitoring via WebSocket.
+
+    State is persisted write-behind: phase, status and PID updates are
+    coalesced and written every flush_interval seconds, while starts,
+    finishes and approval waits are written immediately.
+
+    Every event is also published to the cross-process event bus in
+    data/events, so other processes (dashboard, CLI) can follow runs
+    started here and mirror them with apply_event().
     """
 
     _instance: "ExecutionTracker | None" = None
@@ -39,7 +49,9 @@ class ExecutionTracker:
                     cls._instance = instance
         return cls._instance
 
-    def __init__(self, data_dir: Path | None = None) -> None:
+    def __init__(
+        self, data_dir: Path | None = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ) -> None:
         """Initialize the tracker."""
         if getattr(self, "_initialized", False):
             return
@@ -47,7 +59,9 @@ class ExecutionTracker:
         self._active: dict[str, ActiveExecution] = {}
         self._emitter = EventEmitter()
         self._data_lock = threading.RLock()
-        self._persistence = ExecutionPersistence(data_dir or Path.cwd() / "data")
+        data_dir = data_dir or Path.cwd() / "data"
+        self._persistence = ExecutionPersistence(data_dir, flush_interval=flush_interval)
+        self._bus = ExecutionEventBus(data_dir / "events")
         self._active = self._persistence.load()
         self._initialized = True
 
@@ -55,6 +69,54 @@ class ExecutionTracker:
         """Register an event callback."""
         return self._emitter.register(callback)
 
+    @property
+    def event_bus(self) -> ExecutionEventBus:
+        """The cross-process bus this tracker publishes to."""
+        return self._bus
+
+    def _publish(self, event: ExecutionEvent) -> None:
+        """Emit an event to local callbacks and the cross-process bus."""
+        self._emitter.emit(event)
+        try:
+            self._bus.publish(event)
+        except OSError as e:
+            logger.warning(f"Failed to publish event to bus: {e}")
+
+    def apply_event(self, event: ExecutionEvent) -> None:
+        """Mirror an event published by another process into the active set.
+
+        The publishing process owns and persists the execution; this only
+        updates the in-memory view so get_active() reflects it.
+        """
+        with self._data_lock:
+            execution = self._active.get(event.execution_id)
+            if event.type == ExecutionEventType.STARTED:
+                if execution is None:
+                    self._active[event.execution_id] = ActiveExecution(
+                        execution_id=event.execution_id,
+                        task_id=event.task_id,
+                        task_name=event.task_name,
+                        session_id=event.data.get("session_id"),
+                        started_at=event.timestamp,
+                        status="running",
+                    )
+            elif event.type in (
+                ExecutionEventType.COMPLETED,
+                ExecutionEventType.FAILED,
+                ExecutionEventType.STOPPED,
+            ):
+                self._active.pop(event.execution_id, None)
+            elif execution is None:
+                return
+            elif event.type == ExecutionEventType.OUTPUT:
+                execution.append_output(event.data.get("line", ""), event.data.get("seq"))
+            elif event.type == ExecutionEventType.PROGRESS:
+                execution.current_phase = event.data.get("phase") or execution.current_phase
+            elif event.type == ExecutionEventType.WAITING_APPROVAL:
+                execution.status = "waiting_approval"
+                execution.approval_id = event.data.get("approval_id")
+                execution.current_phase = "waiting for approval"
+
     def start_execution(
         self,
         task_id: str,
@@ -75,7 +137,8 @@ class ExecutionTracker:
 
         with self._data_lock:
             self._active[execution_id] = execution
-            self._persistence.save(self._active)
+            self._persistence.mark_dirty(execution)
+        self._persistence.flush()
 
         event = ExecutionEvent.started(
             execution_id=execution_id,
@@ -83,7 +146,7 @@ class ExecutionTracker:
             task_name=task_name,
             session_id=session_id,
         )
-        self._emitter.emit(event)
+        self._publish(event)
 
         logger.info(f"Started tracking execution {execution_id} for task {task_name}")
         print(f"[Tracker] Started execution {execution_id} for {task_name}")
@@ -107,7 +170,7 @@ class ExecutionTracker:
             if phase:
                 execution.current_phase = phase
 
-            self._persistence.save(self._active)
+            self._persistence.mark_dirty(execution)
 
         if phase:
             event = ExecutionEvent.progress(
@@ -116,7 +179,7 @@ class ExecutionTracker:
                 task_name=execution.task_name,
                 phase=phase,
             )
-            self._emitter.emit(event)
+            self._publish(event)
 
     def append_output(self, execution_id: str, line: str) -> None:
         """Append output line to an execution."""
@@ -124,15 +187,16 @@ class ExecutionTracker:
             execution = self._active.get(execution_id)
             if not execution:
                 return
-            execution.append_output(line)
+            seq = execution.append_output(line)
 
         event = ExecutionEvent.output(
             execution_id=execution_id,
             task_id=execution.task_id,
             task_name=execution.task_name,
             line=line,
+            seq=seq,
         )
-        self._emitter.emit(event)
+        self._publish(event)
 
     def set_pid(self, execution_id: str, pid: int) -> None:
         """Set the process ID for an execution."""
@@ -142,11 +206,17 @@ class ExecutionTracker:
                 logger.warning(f"Execution {execution_id} not found when setting PID")
                 return
             execution.pid = pid
-            self._persistence.save(self._active)
+            self._persistence.mark_dirty(execution)
         logger.info(f"Set PID {pid} for execution {execution_id}")
 
-    def stop_execution(self, execution_id: str) -> bool:
-        """Stop a running execution by killing its process."""
+    def stop_execution(self, execution_id: str, grace: float | None = None) -> bool:
+        """Stop a running execution by terminating its process tree.
+
+        Sends SIGTERM to the agent and all its children and returns right
+        away; whatever is still running after `grace` seconds (the
+        supervisor's default if None) is killed with SIGKILL in the
+        background.
+        """
         with self._data_lock:
             execution = self._active.get(execution_id)
             if not execution:
@@ -166,20 +236,10 @@ class ExecutionTracker:
             self._mark_stopped(execution_id, task_id, task_name, "No process to stop")
             return True
 
-        try:
-            os.kill(pid, signal.SIGTERM)
-            logger.info(f"Sent SIGTERM to PID {pid} for execution {execution_id}")
-            time.sleep(0.5)
-
-            try:
-                os.kill(pid, 0)
-                os.kill(pid, signal.SIGKILL)
-                logger.info(f"Sent SIGKILL to PID {pid}")
-            except OSError:
-                pass
-
-        except OSError as e:
-            logger.warning(f"Failed to kill PID {pid}: {e}")
+        if get_process_supervisor().terminate(pid, grace):
+            logger.info(f"Stopping PID {pid} for execution {execution_id}")
+        else:
+            logger.warning(f"Process {pid} of execution {execution_id} is already gone")
 
         self._mark_stopped(execution_id, task_id, task_name, "Stopped by user")
         return True
@@ -193,9 +253,10 @@ class ExecutionTracker:
             if execution:
                 duration = (datetime.now() - execution.started_at).total_seconds()
                 del self._active[execution_id]
-                self._persistence.save(self._active)
+                self._persistence.mark_removed(execution_id)
             else:
                 duration = 0.0
+        self._persistence.flush()
 
         event = ExecutionEvent.stopped(
             execution_id=execution_id,
@@ -204,7 +265,7 @@ class ExecutionTracker:
             reason=reason,
             duration_seconds=duration,
         )
-        self._emitter.emit(event)
+        self._publish(event)
         logger.info(f"Execution {execution_id} marked as stopped: {reason}")
 
     def stop_by_task(self, task_id: str) -> bool:
@@ -231,7 +292,8 @@ class ExecutionTracker:
 
             duration = (datetime.now() - execution.started_at).total_seconds()
             del self._active[execution_id]
-            self._persistence.save(self._active)
+            self._persistence.mark_removed(execution_id)
+        self._persistence.flush()
 
         if success:
             event = ExecutionEvent.completed(
@@ -250,7 +312,7 @@ class ExecutionTracker:
                 exit_code=exit_code,
             )
 
-        self._emitter.emit(event)
+        self._publish(event)
         logger.info(f"Finished execution {execution_id} (success={success})")
 
     def set_waiting_approval(
@@ -269,7 +331,8 @@ class ExecutionTracker:
             execution.status = "waiting_approval"
             execution.approval_id = approval_id
             execution.current_phase = "waiting for approval"
-            self._persistence.save(self._active)
+            self._persistence.mark_dirty(execution)
+        self._persistence.flush()
 
         event = ExecutionEvent.waiting_approval(
             execution_id=execution_id,
@@ -278,7 +341,7 @@ class ExecutionTracker:
             approval_id=approval_id,
             plan_text=plan_text,
         )
-        self._emitter.emit(event)
+        self._publish(event)
         logger.info(f"Execution {execution_id} waiting for approval: {approval_id}")
 
     def get_by_approval(self, approval_id: str) -> ActiveExecution | None:
@@ -299,6 +362,21 @@ class ExecutionTracker:
         with self._data_lock:
             return self._active.get(execution_id)
 
+    def get_output_since(
+        self, execution_id: str, seq: int = 0
+    ) -> tuple[list[tuple[int, str]], int] | None:
+        """Get the output lines numbered `seq` or later that are still buffered.
+
+        Returns:
+            (sequence, line) pairs and the sequence to ask for next, or None
+            if the execution is not active
+        """
+        with self._data_lock:
+            execution = self._active.get(execution_id)
+            if not execution:
+                return None
+            return execution.output.since(seq), execution.output.next_seq
+
     def get_by_task(self, task_id: str) -> ActiveExecution | None:
         """Get active execution for a task."""
         with self._data_lock:
@@ -331,10 +409,11 @@ class ExecutionTracker:
 
             for exec_id in to_remove:
                 del self._active[exec_id]
+                self._persistence.mark_removed(exec_id)
                 removed += 1
 
-            if removed > 0:
-                self._persistence.save(self._active)
+        if removed > 0:
+            self._persistence.flush()
 
         return removed
 
@@ -5,6 +5,7 @@ sessions from interfering with each other.
 """
 
 import logging
+import os
 import shutil
 import subprocess
 import uuid
@@ -16,6 +17,9 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Prefix of the per-project directories holding pooled worktrees
+POOL_DIR_PREFIX = "pool-"
+
 
 @dataclass
 class WorktreeInfo:
@@ -46,6 +50,9 @@ class WorktreeManager:
 
     WORKTREE_DIR_NAME = ".codegeass-worktrees"
 
+    # Base directory chosen for each project, so it is only probed once
+    _base_dirs: dict[Path, Path] = {}
+
     @classmethod
     def get_worktree_base_dir(cls, project_dir: Path) -> Path:
         """Get the base directory for worktrees.
@@ -53,16 +60,18 @@ class WorktreeManager:
         Tries to use a directory inside the project first,
         falls back to system temp if that's not writable.
         """
+        cached = cls._base_dirs.get(project_dir)
+        if cached is not None and cached.is_dir():
+            return cached
+
         # Try project-local directory first
         local_dir = project_dir / cls.WORKTREE_DIR_NAME
         try:
             local_dir.mkdir(parents=True, exist_ok=True)
-            # Test if writable
-            test_file = local_dir / ".test"
-            test_file.touch()
-            test_file.unlink()
-            return local_dir
-        except (PermissionError, OSError):
+            if os.access(local_dir, os.W_OK):
+                cls._base_dirs[project_dir] = local_dir
+                return local_dir
+        except OSError:
             pass
 
         # Fall back to temp directory
@@ -70,6 +79,7 @@ class WorktreeManager:
 
         temp_base = Path(tempfile.gettempdir()) / "codegeass-worktrees"
         temp_base.mkdir(parents=True, exist_ok=True)
+        cls._base_dirs[project_dir] = temp_base
         return temp_base
 
     @classmethod
@@ -104,6 +114,29 @@ class WorktreeManager:
             pass
         return "HEAD"
 
+    @classmethod
+    def resolve_head(cls, repo_dir: Path) -> tuple[str, str] | None:
+        """Get the commit and branch name of HEAD with a single git call.
+
+        Returns:
+            (commit, branch), with branch "HEAD" when detached, or None if
+            repo_dir is not a git repository or has no commits
+        """
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD"],
+                cwd=repo_dir,
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+        except Exception:
+            return None
+        lines = result.stdout.split()
+        if result.returncode != 0 or len(lines) != 2:
+            return None
+        return lines[0], lines[1]
+
     @classmethod
     def create_worktree(
         cls,
@@ -121,13 +154,13 @@ class WorktreeManager:
         Returns:
             WorktreeInfo if successful, None if failed or not a git repo
         """
-        if not cls.is_git_repo(project_dir):
-            logger.debug(f"Not a git repo: {project_dir}")
-            return None
-
-        # Get branch
+        # Get branch (an explicit one is checked by `git worktree add` itself)
         if not branch:
-            branch = cls.get_current_branch(project_dir)
+            head = cls.resolve_head(project_dir)
+            if head is None:
+                logger.debug(f"Not a git repo: {project_dir}")
+                return None
+            branch = head[1]
 
         # Generate unique worktree name
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -239,7 +272,8 @@ class WorktreeManager:
         cleaned = 0
 
         for path in base_dir.iterdir():
-            if not path.is_dir():
+            # Pooled worktrees are reused, not aged out (see WorktreePool)
+            if not path.is_dir() or path.name.startswith(POOL_DIR_PREFIX):
                 continue
 
             # Check modification time
@@ -0,0 +1,240 @@
+"""Pool of pre-warmed, reusable git worktrees per project.
+
+Creating a worktree checks out the whole tree, which takes tens of seconds
+on a large repository. The pool keeps up to `size` detached worktrees per
+project and reuses them: acquiring one resets it to the target commit with
+`git reset --hard` and `git clean -fdx`, which only touches the files that
+changed since its last run. Worktrees share the project's object store, so
+a slot costs one working tree on disk and no extra clone.
+
+Slots are claimed with an fcntl lock held for the duration of the run, so
+concurrent runs (threads or separate cron processes) never share one, and
+a crashed run frees its slot automatically. When every slot is busy, the
+run gets a throwaway worktree as before.
+"""
+
+import hashlib
+import logging
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from codegeass.execution.worktree import POOL_DIR_PREFIX, WorktreeInfo, WorktreeManager
+from codegeass.storage import atomic
+from codegeass.storage.atomic import try_lock_file, unlock_file
+
+logger = logging.getLogger(__name__)
+
+# Worktrees kept per project; 0 disables pooling
+DEFAULT_POOL_SIZE = 2
+
+# Seconds allowed for resetting a pooled worktree, and for checking out a new one
+RESET_TIMEOUT = 120
+CHECKOUT_TIMEOUT = 600
+
+
+@dataclass
+class PooledWorktree(WorktreeInfo):
+    """A worktree borrowed from the pool; cleanup() gives it back."""
+
+    pool: "WorktreePool | None" = None
+    lock_fd: int | None = None
+
+    def cleanup(self) -> bool:
+        """Return this worktree to the pool."""
+        if self.pool is not None:
+            self.pool.release(self)
+        return True
+
+
+def _git(args: list[str], cwd: Path, timeout: float) -> bool:
+    """Run a git command, logging its error output on failure."""
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, text=True, timeout=timeout
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"git {args[0]} in {cwd} failed: {e}")
+        return False
+    if result.returncode != 0:
+        logger.warning(f"git {args[0]} in {cwd} failed: {result.stderr.strip()}")
+        return False
+    return True
+
+
+class WorktreePool:
+    """Hands out clean, detached worktrees, reusing them across runs.
+
+    Slots live in `<worktree base dir>/pool-<project hash>/<n>`, each next
+    to an `<n>.lock` file that is locked while a run uses it and an
+    `<n>.dirty` marker from the moment a run gets it until it is reset.
+    Pooled worktrees are never removed, so a reused slot is ready as soon
+    as git has brought it to the target commit.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        """Initialize with the number of worktrees kept per project."""
+        # Without fcntl a lock cannot keep two runs out of the same slot
+        self.size = max(0, size) if atomic.fcntl is not None else 0
+        self._pool_dirs: dict[Path, Path] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings_file: Path) -> "WorktreePool":
+        """Create a pool sized by `scheduler.worktree_pool_size` in settings.yaml."""
+        if not settings_file.exists():
+            return cls()
+        try:
+            with open(settings_file) as f:
+                settings = yaml.safe_load(f) or {}
+            scheduler = settings.get("scheduler") or {}
+            return cls(int(scheduler.get("worktree_pool_size", DEFAULT_POOL_SIZE)))
+        except (yaml.YAMLError, TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Invalid worktree pool settings in {settings_file}: {e}")
+            return cls()
+
+    def pool_dir(self, project_dir: Path) -> Path:
+        """Get the directory holding the project's pooled worktrees."""
+        with self._lock:
+            pool_dir = self._pool_dirs.get(project_dir)
+        if pool_dir is None:
+            digest = hashlib.sha1(str(project_dir.resolve()).encode()).hexdigest()[:10]
+            base_dir = WorktreeManager.get_worktree_base_dir(project_dir)
+            pool_dir = base_dir / f"{POOL_DIR_PREFIX}{digest}"
+            with self._lock:
+                self._pool_dirs[project_dir] = pool_dir
+        return pool_dir
+
+    def acquire(self, project_dir: Path, task_id: str) -> WorktreeInfo | None:
+        """Get a clean worktree of the project's current HEAD.
+
+        Returns a PooledWorktree when a slot is free, a throwaway worktree
+        when every slot is busy, or None if the project is not a git
+        repository or no worktree could be created.
+        """
+        head = WorktreeManager.resolve_head(project_dir)
+        if head is None:
+            logger.debug(f"Not a git repo: {project_dir}")
+            return None
+        commit, branch = head
+
+        if self.size:
+            pool_dir = self.pool_dir(project_dir)
+            for slot in range(self.size):
+                fd = try_lock_file(pool_dir / f"{slot}.lock")
+                if fd is None:
+                    continue
+                path = pool_dir / str(slot)
+                if self._is_ready(path, commit) or self._prepare(project_dir, path, commit):
+                    # Whatever the run does, the slot needs a reset before reuse
+                    self._dirty_marker(path).touch()
+                    logger.info(f"Acquired pooled worktree {path} at {commit[:12]}")
+                    return PooledWorktree(
+                        path=path,
+                        original_dir=project_dir,
+                        branch_name=branch,
+                        task_id=task_id,
+                        created_at=datetime.now(),
+                        pool=self,
+                        lock_fd=fd,
+                    )
+                unlock_file(fd)
+            logger.info(f"No free pooled worktree for {project_dir}, creating one")
+
+        return WorktreeManager.create_worktree(project_dir, task_id, commit)
+
+    def release(self, worktree: PooledWorktree) -> None:
+        """Give a worktree back; the next acquire resets it."""
+        fd, worktree.lock_fd = worktree.lock_fd, None
+        if fd is not None:
+            unlock_file(fd)
+            logger.debug(f"Released pooled worktree {worktree.path}")
+
+    def warm(self, project_dir: Path) -> int:
+        """Bring every free slot of the project to its current HEAD.
+
+        Missing slots are checked out and used ones reset, so the next runs
+        start without touching git. Slots that are in use, or already clean
+        at HEAD, are skipped, which makes repeated warming cheap.
+
+        Returns:
+            Number of slots that are ready
+        """
+        if not self.size:
+            return 0
+        head = WorktreeManager.resolve_head(project_dir)
+        if head is None:
+            return 0
+        pool_dir = self.pool_dir(project_dir)
+        ready = 0
+        for slot in range(self.size):
+            fd = try_lock_file(pool_dir / f"{slot}.lock")
+            if fd is None:
+                continue
+            path = pool_dir / str(slot)
+            try:
+                if self._is_ready(path, head[0]) or self._prepare(project_dir, path, head[0]):
+                    ready += 1
+            finally:
+                unlock_file(fd)
+        logger.info(f"Warmed {ready} pooled worktree(s) for {project_dir}")
+        return ready
+
+    @staticmethod
+    def _dirty_marker(path: Path) -> Path:
+        """File marking a slot as handed to a run since it was last reset."""
+        return path.with_name(f"{path.name}.dirty")
+
+    def _is_ready(self, path: Path, commit: str) -> bool:
+        """Check if the slot is untouched since it was reset to `commit`."""
+        if self._dirty_marker(path).exists():
+            return False
+        try:
+            # A worktree's .git file points at its admin dir, whose HEAD holds
+            # the detached commit
+            gitdir = (path / ".git").read_text().removeprefix("gitdir:").strip()
+            head = (path / gitdir / "HEAD").read_text().strip()
+        except OSError:
+            return False
+        return head == commit
+
+    def _prepare(self, project_dir: Path, path: Path, commit: str) -> bool:
+        """Reset the slot at `path` to `commit`, checking it out if needed."""
+        if (path / ".git").is_file():
+            if _git(["reset", "--hard", "--quiet", commit], path, RESET_TIMEOUT) and _git(
+                ["clean", "-fdxq"], path, RESET_TIMEOUT
+            ):
+                self._dirty_marker(path).unlink(missing_ok=True)
+                return True
+            logger.warning(f"Recreating pooled worktree {path}")
+
+        # Drop whatever is left of the slot, including git's record of it
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
+        _git(["worktree", "prune"], project_dir, RESET_TIMEOUT)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not _git(
+            ["worktree", "add", "--detach", str(path), commit], project_dir, CHECKOUT_TIMEOUT
+        ):
+            return False
+        self._dirty_marker(path).unlink(missing_ok=True)
+        return True
+
+
+_pool: WorktreePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_worktree_pool() -> WorktreePool:
+    """Get the worktree pool singleton."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorktreePool()
+    return _pool
@@ -1,8 +1,10 @@
 """Callback handler for interactive notification buttons."""
 
+import asyncio
 import logging
+from collections.abc import Coroutine
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from codegeass.notifications.callbacks.models import PendingFeedback
 from codegeass.notifications.interactive import CallbackQuery
@@ -21,6 +23,10 @@ class CallbackHandler:
     - plan:approve:<id> -> handle approval
     - plan:discuss:<id> -> request feedback
     - plan:cancel:<id> -> handle cancellation
+
+    Approvals and feedback start agent runs that take minutes, so they are
+    dispatched as background tasks: the poller goes back to reading updates
+    at once, and the outcome is reported by editing the approval messages.
     """
 
     def __init__(
@@ -32,6 +38,24 @@ class CallbackHandler:
         self._channels = channel_repo
         self._pending_feedback: dict[str, PendingFeedback] = {}
         self._feedback_timeout = 300  # 5 minutes
+        self._background: set[asyncio.Task[Any]] = set()
+
+    def _dispatch(self, coro: Coroutine[Any, Any, Any], description: str) -> None:
+        """Run a coroutine in the background, logging its failure."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+
+        def done(task: asyncio.Task[Any]) -> None:
+            self._background.discard(task)
+            if not task.cancelled() and task.exception():
+                logger.error(f"Error {description}: {task.exception()}")
+
+        task.add_done_callback(done)
+
+    async def wait_idle(self) -> None:
+        """Wait for the background approvals and discuss rounds to finish."""
+        while self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
 
     async def handle_callback(
         self,
@@ -67,17 +91,22 @@ class CallbackHandler:
         """Handle approve button click."""
         try:
             await self._answer_callback(callback, credentials, "Approving plan...")
-            result = await self._plan_service.handle_approval(approval_id)
-
-            if result and result.is_success:
-                return True, "Plan approved and executed successfully!"
-            elif result:
-                return False, f"Execution failed: {result.error}"
-            return False, "Approval not found or already processed"
+            self._dispatch(self._run_approval(approval_id), "handling approval")
+            return True, "Plan approval queued"
         except Exception as e:
             logger.error(f"Error handling approval: {e}")
             return False, f"Error: {e}"
 
+    async def _run_approval(self, approval_id: str) -> None:
+        """Execute an approved plan and log the outcome."""
+        result = await self._plan_service.handle_approval(approval_id)
+        if result and result.is_success:
+            logger.info(f"Plan {approval_id} approved and executed successfully")
+        elif result:
+            logger.warning(f"Plan {approval_id} execution failed: {result.error}")
+        else:
+            logger.warning(f"Approval {approval_id} not found or already processed")
+
     async def _handle_discuss_request(
         self,
         callback: CallbackQuery,
@@ -158,14 +187,16 @@ class CallbackHandler:
 
         del self._pending_feedback[feedback_key]
 
-        try:
-            updated = await self._plan_service.handle_discuss(pending.approval_id, text)
-            if updated:
-                return True, "Feedback processed, new plan sent."
-            return False, "Failed to process feedback"
-        except Exception as e:
-            logger.error(f"Error processing feedback: {e}")
-            return False, f"Error: {e}"
+        self._dispatch(self._run_discuss(pending.approval_id, text), "processing feedback")
+        return True, "Feedback queued"
+
+    async def _run_discuss(self, approval_id: str, feedback: str) -> None:
+        """Revise a plan with feedback and log the outcome."""
+        updated = await self._plan_service.handle_discuss(approval_id, feedback)
+        if updated:
+            logger.info(f"Feedback for {approval_id} processed, new plan sent")
+        else:
+            logger.warning(f"Failed to process feedback for {approval_id}")
 
     def _cleanup_expired_feedback(self) -> None:
         """Remove expired feedback requests."""
@@ -50,6 +50,9 @@ class TelegramCallbackServer:
 
             await asyncio.sleep(self._poll_interval)
 
+        # Let approvals and discuss rounds started from buttons finish
+        await self._handler.wait_idle()
+
     def stop(self) -> None:
         """Stop the polling loop."""
         self._running = False
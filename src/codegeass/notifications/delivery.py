@@ -0,0 +1,396 @@
+"""Rate-limited, retrying delivery of queued notifications."""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from codegeass.notifications.exceptions import (
+    ChannelNotFoundError,
+    CredentialError,
+    ProviderError,
+    ProviderNotFoundError,
+)
+from codegeass.notifications.models import NotificationEvent
+from codegeass.notifications.registry import ProviderRegistry, get_provider_registry
+from codegeass.storage.channel_repository import ChannelRepository
+from codegeass.storage.notification_outbox import NotificationOutbox, OutboxEntry
+
+logger = logging.getLogger(__name__)
+
+# Deliveries in flight at once, across all channels
+MAX_IN_FLIGHT = 20
+
+# Events that end a task run; the run's message refs are dropped after them
+COMPLETION_EVENTS = frozenset(
+    {
+        NotificationEvent.TASK_SUCCESS.value,
+        NotificationEvent.TASK_FAILURE.value,
+        NotificationEvent.TASK_COMPLETE.value,
+    }
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket parameters: sustained messages per second and burst size."""
+
+    rate: float
+    burst: int = 1
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RateLimit":
+        """Create from a settings mapping."""
+        return cls(rate=float(data["rate"]), burst=max(1, int(data.get("burst", 1))))
+
+
+# Per-provider limits, applied to each channel (chat or webhook) separately.
+# Telegram allows about one message per second in a chat; Discord webhooks
+# take 5 requests per 2 seconds and 30 messages per minute; Teams webhooks
+# throttle at a few requests per second.
+DEFAULT_RATE_LIMITS = {
+    "telegram": RateLimit(rate=1.0, burst=1),
+    "discord": RateLimit(rate=0.5, burst=5),
+    "teams": RateLimit(rate=1.0, burst=4),
+}
+
+# Limit for providers without an entry above
+FALLBACK_RATE_LIMIT = RateLimit(rate=1.0, burst=1)
+
+
+class TokenBucket:
+    """Token bucket rate limiter, kept as a theoretical arrival time (GCRA).
+
+    reserve() books the next free slot and returns how long the caller has
+    to wait for it, so concurrent senders queue up at the sustained rate
+    after the initial burst. pause() pushes every slot back, for when a
+    provider answers 429 with a retry-after delay.
+    """
+
+    def __init__(self, limit: RateLimit, clock: Callable[[], float] = time.monotonic):
+        """Initialize with the limit and a monotonic clock."""
+        self.limit = limit
+        self._clock = clock
+        self._interval = 1.0 / limit.rate
+        self._tolerance = (limit.burst - 1) * self._interval
+        self._tat = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Book a slot and return the seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tat, now)
+            send_at = max(now, tat - self._tolerance)
+            self._tat = tat + self._interval
+            return send_at - now
+
+    async def acquire(self) -> None:
+        """Wait for a slot."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every slot for the given time, then resume at the sustained rate."""
+        with self._lock:
+            self._tat = max(self._tat, self._clock() + seconds + self._tolerance)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter, and when to give up."""
+
+    # Failed attempts before a notification is dead-lettered
+    max_attempts: int = 8
+    # Seconds before the first retry; doubles with each attempt
+    base_delay: float = 2.0
+    # Cap on the backoff between attempts
+    max_delay: float = 600.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait after the given (1-based) failed attempt.
+
+        A provider's retry-after wins over the backoff; either way a little
+        jitter keeps retries for different channels from lining up.
+        """
+        if retry_after is not None:
+            return retry_after + random.uniform(0, min(1.0, self.base_delay))
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(backoff / 2, backoff)
+
+
+@dataclass
+class DeliveryReport:
+    """Outcome counts of a delivery run."""
+
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """Convert to dictionary."""
+        return {"sent": self.sent, "retried": self.retried, "dead": self.dead}
+
+
+@dataclass
+class _Worker:
+    """The background delivery run on an event loop."""
+
+    loop: asyncio.AbstractEventLoop
+    wakeup: asyncio.Event
+    task: "asyncio.Task[DeliveryReport]"
+
+
+class OutboxDelivery:
+    """Delivers the notification outbox to the providers.
+
+    Each channel gets a token bucket from its provider's rate limit, so a
+    burst of completions is sent at the fastest rate the chat or webhook
+    accepts instead of tripping 429s. A failed send is retried with
+    exponential backoff and jitter; a 429's retry-after delay is honored
+    and also pauses the channel's bucket. Entries that fail permanently
+    (bad request, missing channel) or exhaust max_attempts are
+    dead-lettered. Rate-limited attempts do not count towards the limit.
+
+    wake() starts a background run on the current event loop that keeps
+    delivering, retries included, until the outbox is empty; wait() lets
+    the caller await the outcome of specific entries.
+    """
+
+    def __init__(
+        self,
+        outbox: NotificationOutbox,
+        channel_repo: ChannelRepository,
+        registry: ProviderRegistry | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limits: dict[str, RateLimit] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.outbox = outbox
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self._channels = channel_repo
+        self._registry = registry or get_provider_registry()
+        self._clock = clock
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._worker: _Worker | None = None
+        # Futures awaiting the final outcome (sent or dead) of an entry
+        self._waiters: dict[int, asyncio.Future[bool]] = {}
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings_file: Path,
+        outbox: NotificationOutbox,
+        channel_repo: ChannelRepository,
+    ) -> "OutboxDelivery":
+        """Create with retry and rate limit settings from settings.yaml."""
+        retry_policy, rate_limits = RetryPolicy(), {}
+        if settings_file.exists():
+            try:
+                with open(settings_file) as f:
+                    settings = (yaml.safe_load(f) or {}).get("notifications") or {}
+                retry_policy = RetryPolicy(
+                    max_attempts=int(settings.get("max_attempts", RetryPolicy.max_attempts)),
+                    base_delay=float(settings.get("retry_base_delay", RetryPolicy.base_delay)),
+                    max_delay=float(settings.get("retry_max_delay", RetryPolicy.max_delay)),
+                )
+                rate_limits = {
+                    provider: RateLimit.from_dict(limit)
+                    for provider, limit in (settings.get("rate_limits") or {}).items()
+                }
+            except (yaml.YAMLError, AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid notification settings in {settings_file}: {e}")
+        return cls(outbox, channel_repo, retry_policy=retry_policy, rate_limits=rate_limits)
+
+    def _bucket(self, entry: OutboxEntry) -> TokenBucket:
+        """Get the token bucket of an entry's channel."""
+        key = (entry.provider, entry.channel_id)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                limit = self.rate_limits.get(entry.provider, FALLBACK_RATE_LIMIT)
+                bucket = self._buckets[key] = TokenBucket(limit, self._clock)
+            return bucket
+
+    async def run(self, max_wait: float | None = 0.0) -> DeliveryReport:
+        """Deliver due entries until the outbox is empty.
+
+        Args:
+            max_wait: Seconds to keep waiting for retries that are not due
+                yet; 0 delivers what is due now, None runs until empty
+
+        Returns:
+            Counts of sent, rescheduled and dead-lettered entries
+        """
+        return await self._run(max_wait)
+
+    async def _run(
+        self, max_wait: float | None, wakeup: asyncio.Event | None = None
+    ) -> DeliveryReport:
+        report = DeliveryReport()
+        deadline = None if max_wait is None else time.time() + max_wait
+        in_flight: set[asyncio.Future[None]] = set()
+        try:
+            while True:
+                if wakeup is not None:
+                    wakeup.clear()
+                room = MAX_IN_FLIGHT - len(in_flight)
+                if room > 0:
+                    for entry in self.outbox.claim_due(limit=room):
+                        in_flight.add(asyncio.ensure_future(self._deliver(entry, report)))
+
+                # With every slot busy, only a finished delivery can make progress
+                timeout = None
+                if len(in_flight) < MAX_IN_FLIGHT:
+                    next_at = self.outbox.next_attempt_at()
+                    if next_at is not None and (deadline is None or next_at <= deadline):
+                        timeout = max(0.0, next_at - time.time())
+                    elif not in_flight:
+                        return report
+
+                waiting: set[asyncio.Future[Any]] = set(in_flight)
+                if wakeup is not None:
+                    waiting.add(asyncio.ensure_future(wakeup.wait()))
+                if not waiting:
+                    await asyncio.sleep(timeout or 0.0)
+                    continue
+                done, pending = await asyncio.wait(
+                    waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in pending - in_flight:
+                    future.cancel()
+                in_flight -= done
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def wake(self) -> None:
+        """Make sure a background run is delivering on the current event loop."""
+        loop = asyncio.get_running_loop()
+        worker = self._worker
+        if worker is not None and not worker.task.done():
+            if worker.loop is loop:
+                worker.wakeup.set()
+                return
+            if worker.loop.is_running():
+                worker.loop.call_soon_threadsafe(worker.wakeup.set)
+                return
+        wakeup = asyncio.Event()
+        task = loop.create_task(self._run_worker(wakeup))
+        self._worker = _Worker(loop=loop, wakeup=wakeup, task=task)
+
+    async def _run_worker(self, wakeup: asyncio.Event) -> DeliveryReport:
+        """Background run until the outbox is empty, woken up by new entries."""
+        try:
+            return await self._run(None, wakeup)
+        except Exception as e:
+            logger.error(f"Notification delivery stopped: {e}", exc_info=True)
+            return DeliveryReport()
+
+    async def wait(self, entry_ids: Iterable[int], timeout: float | None) -> dict[int, bool]:
+        """Wait until entries are delivered or dead-lettered.
+
+        Returns:
+            Dict mapping entry ID to whether it was delivered; entries still
+            queued at the timeout (or sent by another process) map to False
+        """
+        loop = asyncio.get_running_loop()
+        futures = {entry_id: loop.create_future() for entry_id in entry_ids}
+        with self._lock:
+            self._waiters.update(futures)
+        try:
+            if futures:
+                await asyncio.wait(futures.values(), timeout=timeout)
+        finally:
+            with self._lock:
+                for entry_id in futures:
+                    self._waiters.pop(entry_id, None)
+        return {entry_id: future.done() and future.result() for entry_id, future in futures.items()}
+
+    def _resolve(self, entry_id: int, delivered: bool) -> None:
+        """Hand an entry's final outcome to whoever is waiting for it."""
+        with self._lock:
+            future = self._waiters.pop(entry_id, None)
+        if future is not None:
+            future.get_loop().call_soon_threadsafe(_set_result, future, delivered)
+
+    async def _deliver(self, entry: OutboxEntry, report: DeliveryReport) -> None:
+        """Send one claimed entry and record the outcome."""
+        try:
+            channel, credentials = self._channels.get_channel_with_credentials(entry.channel_id)
+            provider = self._registry.get(entry.provider)
+        except (ChannelNotFoundError, CredentialError, ProviderNotFoundError) as e:
+            self._dead(entry, str(e), report)
+            return
+        if not channel.enabled:
+            self._dead(entry, f"Channel {entry.channel_id} is disabled", report)
+            return
+
+        try:
+            await self._bucket(entry).acquire()
+        except asyncio.CancelledError:
+            self.outbox.release(entry.id)
+            raise
+
+        message_id = self.outbox.get_message_ref(entry.task_id, entry.channel_id)
+        try:
+            result = await provider.send(channel, credentials, entry.message, message_id=message_id)
+        except ProviderError as e:
+            self._failed(entry, e, report)
+            return
+        except Exception as e:
+            self._failed(entry, ProviderError(entry.provider, str(e), cause=e), report)
+            return
+        if not result.get("success", False):
+            self._failed(entry, ProviderError(entry.provider, "Send was not accepted"), report)
+            return
+
+        # Later messages of the run edit this one; the run's last message clears it
+        if entry.event in COMPLETION_EVENTS:
+            self.outbox.clear_message_ref(entry.task_id, entry.channel_id)
+        elif result.get("message_id"):
+            self.outbox.set_message_ref(entry.task_id, entry.channel_id, result["message_id"])
+        self.outbox.mark_sent(entry.id)
+        report.sent += 1
+        self._resolve(entry.id, True)
+
+    def _failed(self, entry: OutboxEntry, error: ProviderError, report: DeliveryReport) -> None:
+        """Reschedule or dead-letter an entry after a failed send."""
+        attempt = entry.attempts + 1
+        rate_limited = error.retry_after is not None
+        if not error.retryable or (attempt >= self.retry_policy.max_attempts and not rate_limited):
+            self._dead(entry, str(error), report)
+            return
+        if rate_limited:
+            self._bucket(entry).pause(error.retry_after)
+        delay = self.retry_policy.delay(attempt, error.retry_after)
+        logger.warning(
+            f"Notification {entry.id} to {entry.channel_id} failed (attempt {attempt}), "
+            f"retrying in {delay:.1f}s: {error}"
+        )
+        self.outbox.reschedule(
+            entry.id, time.time() + delay, str(error), rate_limited=rate_limited
+        )
+        report.retried += 1
+
+    def _dead(self, entry: OutboxEntry, error: str, report: DeliveryReport) -> None:
+        """Dead-letter an entry."""
+        logger.error(f"Notification {entry.id} to {entry.channel_id} dead-lettered: {error}")
+        self.outbox.mark_dead(entry.id, error)
+        report.dead += 1
+        self._resolve(entry.id, False)
+
+
+def _set_result(future: "asyncio.Future[bool]", delivered: bool) -> None:
+    if not future.done():
+        future.set_result(delivered)
@@ -0,0 +1,177 @@
+"""Background dispatcher for notification callbacks."""
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single notification may take before it is abandoned
+DEFAULT_CALLBACK_TIMEOUT = 60.0
+
+# Seconds the process waits at exit for queued notifications to go out
+EXIT_FLUSH_TIMEOUT = 30.0
+
+# Latencies kept for the rolling statistics
+LATENCY_SAMPLES = 100
+
+
+class NotificationDispatcher:
+    """Runs notification coroutines on one long-lived event loop thread.
+
+    Scheduler callbacks (start, completion, plan approval) hand their
+    coroutine to submit() and return immediately, so a Telegram or Discord
+    round-trip never delays an agent start or holds a worker slot.
+
+    Work submitted under the same key (the task ID) runs strictly in
+    submission order: a completion waits for its start notification, which
+    is what lets it edit the start message by ID. Work for different keys
+    runs concurrently on the loop. The loop thread starts on first use, and
+    queued work is flushed when the process exits.
+    """
+
+    def __init__(self, callback_timeout: float = DEFAULT_CALLBACK_TIMEOUT):
+        """Initialize with the time limit for each notification."""
+        self.callback_timeout = callback_timeout
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # Per key, the future of its most recently queued notification (loop thread only)
+        self._tails: dict[Hashable, asyncio.Future[None]] = {}
+        self._pending = 0
+        self._running = 0
+        self._sent = 0
+        self._failed = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._waits: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread if it is not running. Caller holds the lock."""
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=loop.run_forever, name="codegeass-notify", daemon=True
+            )
+            self._thread.start()
+            self._loop = loop
+            atexit.register(self.flush, EXIT_FLUSH_TIMEOUT)
+        return self._loop
+
+    def submit(self, key: Hashable, work: Awaitable[Any]) -> Future[Any]:
+        """Queue a notification coroutine behind earlier work for the same key.
+
+        Args:
+            key: Ordering key, normally the task ID
+            work: Coroutine to run on the dispatcher's loop
+
+        Returns:
+            Future for the coroutine's result
+        """
+        with self._lock:
+            loop = self._ensure_loop()
+            self._pending += 1
+        return asyncio.run_coroutine_threadsafe(self._run(key, work, time.monotonic()), loop)
+
+    async def _run(self, key: Hashable, work: Awaitable[Any], queued_at: float) -> Any:
+        # Coroutines start in submission order, so the chain per key is FIFO
+        previous = self._tails.get(key)
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._tails[key] = done
+        started = False
+        try:
+            if previous is not None:
+                await previous
+            with self._lock:
+                self._running += 1
+                self._waits.append(time.monotonic() - queued_at)
+            started = True
+            try:
+                result = await asyncio.wait_for(work, self.callback_timeout)
+            except TimeoutError:
+                logger.error(f"Notification for {key} timed out after {self.callback_timeout}s")
+            except Exception as e:
+                logger.error(f"Notification for {key} failed: {e}", exc_info=True)
+            else:
+                with self._lock:
+                    self._sent += 1
+                return result
+            with self._lock:
+                self._failed += 1
+            return None
+        finally:
+            done.set_result(None)
+            if self._tails.get(key) is done:
+                del self._tails[key]
+            with self._lock:
+                if started:
+                    self._running -= 1
+                self._pending -= 1
+                self._latencies.append(time.monotonic() - queued_at)
+                if not self._pending:
+                    self._idle.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued notification has finished.
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def get_stats(self) -> dict[str, float]:
+        """Get queue depth, counts and recent latencies (in milliseconds).
+
+        `queued` counts notifications waiting for the loop or for earlier
+        work of their task; `wait_ms` is the time from submit() to start and
+        `latency_ms` from submit() to finish, averaged over recent ones.
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            waits = list(self._waits)
+            return {
+                "queued": self._pending - self._running,
+                "running": self._running,
+                "sent": self._sent,
+                "failed": self._failed,
+                "wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "latency_ms": (
+                    round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0
+                ),
+                "max_latency_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+            }
+
+    def shutdown(self, timeout: float | None = EXIT_FLUSH_TIMEOUT) -> None:
+        """Flush queued notifications and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        atexit.unregister(self.flush)
+        if not self.flush(timeout):
+            logger.warning("Stopping notification dispatcher with notifications still queued")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+
+
+_dispatcher: NotificationDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get the notification dispatcher singleton."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher()
+    return _dispatcher
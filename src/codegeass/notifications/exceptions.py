@@ -8,12 +8,26 @@ class NotificationError(CodeGeassError):
 
 
 class ProviderError(NotificationError):
-    """Raised when a provider operation fails."""
-
-    def __init__(self, provider: str, message: str, cause: Exception | None = None):
+    """Raised when a provider operation fails.
+
+    `retry_after` carries the delay (seconds) a rate-limited API asked for,
+    and `retryable` is False for errors a retry cannot fix (bad request,
+    revoked webhook, missing package).
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        message: str,
+        cause: Exception | None = None,
+        retry_after: float | None = None,
+        retryable: bool = True,
+    ):
         super().__init__(f"[{provider}] {message}", {"provider": provider})
         self.provider = provider
         self.cause = cause
+        self.retry_after = retry_after
+        self.retryable = retryable
 
 
 class ProviderNotFoundError(NotificationError):
@@ -24,8 +24,9 @@ class NotificationHandler:
     """Handler that connects the Scheduler to the NotificationService.
 
     This class provides async callback methods that the Scheduler calls
-    when task events occur. The Scheduler handles running the async callbacks
-    properly whether in sync or async context.
+    when task events occur. The Scheduler hands the coroutines to the
+    NotificationDispatcher, which sends them in order per task without
+    blocking execution.
 
     Also handles plan mode approval workflow by:
     1. Creating pending approvals when plan mode tasks complete their planning phase
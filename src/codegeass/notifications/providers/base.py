@@ -4,8 +4,12 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any
 
+from codegeass.notifications.exceptions import ProviderError
 from codegeass.notifications.models import Channel
 
+# HTTP statuses worth retrying besides 5xx: request timeout and rate limiting
+RETRYABLE_STATUSES = (408, 429)
+
 
 @dataclass
 class ProviderConfig:
@@ -132,3 +136,39 @@ class NotificationProvider(ABC):
             Formatted message
         """
         return message
+
+
+def http_error(
+    provider: str, response: Any, message: str, cause: Exception | None = None
+) -> ProviderError:
+    """Build a ProviderError for a failed webhook response.
+
+    Rate limits (429) carry the delay from the `Retry-After` header or the
+    JSON body's `retry_after` (Discord); other 4xx responses are permanent.
+
+    Args:
+        provider: Provider name
+        response: The httpx response
+        message: Error message
+        cause: Underlying exception, if any
+
+    Returns:
+        ProviderError to raise
+    """
+    status = response.status_code
+    retry_after = None
+    if status == 429:
+        try:
+            retry_after = float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                pass
+    return ProviderError(
+        provider,
+        message,
+        cause=cause,
+        retry_after=retry_after,
+        retryable=status >= 500 or status in RETRYABLE_STATUSES,
+    )
@@ -11,7 +11,11 @@ from typing import TYPE_CHECKING, Any
 
 from codegeass.notifications.exceptions import ProviderError
 from codegeass.notifications.models import Channel
-from codegeass.notifications.providers.base import NotificationProvider, ProviderConfig
+from codegeass.notifications.providers.base import (
+    NotificationProvider,
+    ProviderConfig,
+    http_error,
+)
 from codegeass.notifications.providers.discord_utils import (
     DiscordEmbedBuilder,
     DiscordHtmlFormatter,
@@ -121,6 +125,7 @@ class DiscordProvider(NotificationProvider):
                 self.name,
                 "httpx package not installed. Install with: pip install httpx",
                 cause=e,
+                retryable=False,
             )
 
         webhook_url = credentials["webhook_url"]
@@ -161,8 +166,9 @@ class DiscordProvider(NotificationProvider):
 
                 if 200 <= response.status_code < 300:
                     return {"success": True}
-                raise ProviderError(
+                raise http_error(
                     self.name,
+                    response,
                     f"Discord API returned status {response.status_code}: {response.text}",
                 )
         except Exception as e:
@@ -254,6 +260,7 @@ class DiscordProvider(NotificationProvider):
                 self.name,
                 "httpx package not installed. Install with: pip install httpx",
                 cause=e,
+                retryable=False,
             )
 
         webhook_url = credentials["webhook_url"]
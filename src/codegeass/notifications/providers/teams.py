@@ -15,7 +15,11 @@ import httpx
 
 from codegeass.notifications.exceptions import ProviderError
 from codegeass.notifications.models import Channel
-from codegeass.notifications.providers.base import NotificationProvider, ProviderConfig
+from codegeass.notifications.providers.base import (
+    NotificationProvider,
+    ProviderConfig,
+    http_error,
+)
 from codegeass.notifications.providers.teams_utils import (
     TeamsAdaptiveCardBuilder,
     TeamsHtmlFormatter,
@@ -148,8 +152,9 @@ class TeamsProvider(NotificationProvider):
 
             return {"success": True}
         except httpx.HTTPStatusError as e:
-            raise ProviderError(
+            raise http_error(
                 self.name,
+                e.response,
                 f"Teams API error: {e.response.status_code} - {e.response.text}",
                 cause=e,
             )
@@ -118,6 +118,7 @@ class TelegramProvider(NotificationProvider, InteractiveProvider):
                 "python-telegram-bot package not installed. "
                 "Install with: pip install python-telegram-bot",
                 cause=e,
+                retryable=False,
             )
 
         bot_token = credentials["bot_token"]
@@ -158,7 +159,7 @@ class TelegramProvider(NotificationProvider, InteractiveProvider):
                 )
                 return {"success": True, "message_id": sent_message.message_id}
         except Exception as e:
-            raise ProviderError(self.name, f"Failed to send message: {e}", cause=e)
+            raise _send_error(self.name, e)
 
     async def test_connection(
         self,
@@ -425,3 +426,25 @@ class TelegramProvider(NotificationProvider, InteractiveProvider):
 
         except Exception:
             return False
+
+
+def _send_error(provider: str, error: Exception) -> ProviderError:
+    """Wrap a python-telegram-bot error, keeping flood-control delays.
+
+    RetryAfter (HTTP 429) carries the wait Telegram asked for; BadRequest
+    and Forbidden (bad chat, bot removed, malformed text) are permanent.
+    """
+    from telegram.error import BadRequest, Forbidden, InvalidToken, RetryAfter
+
+    retry_after = None
+    if isinstance(error, RetryAfter):
+        # A timedelta in newer python-telegram-bot releases, seconds before
+        delay = error.retry_after
+        retry_after = float(getattr(delay, "total_seconds", lambda: delay)())
+    return ProviderError(
+        provider,
+        f"Failed to send message: {error}",
+        cause=error,
+        retry_after=retry_after,
+        retryable=not isinstance(error, BadRequest | Forbidden | InvalidToken),
+    )
@@ -1,9 +1,9 @@
 """Notification service for orchestrating notifications."""
 
-import asyncio
 import logging
 from typing import TYPE_CHECKING, Any
 
+from codegeass.notifications.delivery import DeliveryReport, OutboxDelivery
 from codegeass.notifications.exceptions import (
     ChannelNotFoundError,
     CredentialError,
@@ -13,6 +13,7 @@ from codegeass.notifications.formatter import MessageFormatter, get_message_form
 from codegeass.notifications.models import Channel, NotificationConfig, NotificationEvent
 from codegeass.notifications.registry import ProviderRegistry, get_provider_registry
 from codegeass.storage.channel_repository import ChannelRepository
+from codegeass.storage.notification_outbox import NotificationOutbox
 
 if TYPE_CHECKING:
     from codegeass.core.entities import Task
@@ -20,6 +21,10 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Seconds notify() waits for delivery before leaving its messages to the
+# background run; below the dispatcher's callback timeout
+NOTIFY_TIMEOUT = 45.0
+
 
 class NotificationService:
     """Main service for sending notifications.
@@ -28,7 +33,8 @@ class NotificationService:
     1. Receives notification requests with event, task, and result
     2. Determines which channels to notify based on task config
     3. Formats messages using MessageFormatter
-    4. Sends via appropriate providers
+    4. Queues them in the outbox, from which OutboxDelivery sends them
+       rate-limited and with retries
     """
 
     def __init__(
@@ -36,12 +42,20 @@ class NotificationService:
         channel_repo: ChannelRepository,
         registry: ProviderRegistry | None = None,
         formatter: MessageFormatter | None = None,
+        delivery: OutboxDelivery | None = None,
     ):
         self._channels = channel_repo
         self._registry = registry or get_provider_registry()
         self._formatter = formatter or get_message_formatter()
-        # Track message IDs for editing: {task_id: {channel_id: message_id}}
-        self._message_ids: dict[str, dict[str, int]] = {}
+        # The outbox also tracks message IDs for editing start messages
+        self._delivery = delivery or OutboxDelivery(
+            NotificationOutbox(), channel_repo, registry=self._registry
+        )
+
+    @property
+    def outbox(self) -> NotificationOutbox:
+        """The outbox notifications are queued in."""
+        return self._delivery.outbox
 
     async def notify(
         self,
@@ -52,6 +66,9 @@ class NotificationService:
     ) -> dict[str, bool]:
         """Send notifications for an event.
 
+        The messages are queued in the outbox first, so a failed or
+        rate-limited send is retried rather than lost.
+
         Args:
             event: The event that occurred
             task: The task that triggered the event
@@ -59,7 +76,8 @@ class NotificationService:
             notification_config: Override notification config (uses task.notifications if None)
 
         Returns:
-            Dict mapping channel_id to success status
+            Dict mapping channel_id to whether the message was delivered
+            within NOTIFY_TIMEOUT (it stays queued for retry otherwise)
         """
         # Get notification config from task if not provided
         if notification_config is None:
@@ -73,51 +91,49 @@ class NotificationService:
         if not notification_config.should_notify(event):
             return {}
 
-        # Send to all configured channels in parallel
-        tasks = []
+        outcome: dict[str, bool] = {}
+        entry_ids: dict[str, int] = {}
         for channel_id in notification_config.channels:
-            tasks.append(
-                self._send_to_channel(
-                    channel_id=channel_id,
-                    event=event,
-                    task=task,
-                    result=result,
-                    include_output=notification_config.include_output,
-                )
+            entry_id = self._enqueue(
+                channel_id=channel_id,
+                event=event,
+                task=task,
+                result=result,
+                include_output=notification_config.include_output,
             )
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Build result dict
-        outcome: dict[str, bool] = {}
-        for channel_id, send_result in zip(notification_config.channels, results):
-            if isinstance(send_result, Exception):
-                logger.error(f"Failed to notify channel {channel_id}: {send_result}")
+            if entry_id is None:
                 outcome[channel_id] = False
             else:
-                outcome[channel_id] = send_result
+                entry_ids[channel_id] = entry_id
+
+        if entry_ids:
+            self._delivery.wake()
+            delivered = await self._delivery.wait(entry_ids.values(), NOTIFY_TIMEOUT)
+            for channel_id, entry_id in entry_ids.items():
+                outcome[channel_id] = delivered[entry_id]
 
         return outcome
 
-    async def _send_to_channel(
+    def _enqueue(
         self,
         channel_id: str,
         event: NotificationEvent,
         task: "Task",
         result: "ExecutionResult | None",
         include_output: bool,
-    ) -> bool:
-        """Send notification to a single channel."""
+    ) -> int | None:
+        """Format a notification for one channel and queue it.
+
+        Returns:
+            The outbox entry ID, or None if the channel cannot be notified
+        """
         try:
-            # Get channel and credentials
-            channel, credentials = self._channels.get_channel_with_credentials(channel_id)
+            # Resolve credentials now so a misconfigured channel fails fast
+            channel, _ = self._channels.get_channel_with_credentials(channel_id)
 
             if not channel.enabled:
                 logger.debug(f"Channel {channel_id} is disabled, skipping")
-                return False
-
-            # Get provider
-            provider = self._registry.get(channel.provider)
+                return None
 
             # Format message for this provider
             message = self._formatter.format_for_provider(
@@ -128,43 +144,34 @@ class NotificationService:
                 include_output=include_output,
             )
 
-            # Check if we should edit an existing message
-            message_id = None
-            if task.id in self._message_ids and channel_id in self._message_ids[task.id]:
-                message_id = self._message_ids[task.id][channel_id]
-
-            # Send or edit
-            send_result = await provider.send(channel, credentials, message, message_id=message_id)
-
-            # Store message ID for future edits
-            if send_result.get("message_id"):
-                if task.id not in self._message_ids:
-                    self._message_ids[task.id] = {}
-                self._message_ids[task.id][channel_id] = send_result["message_id"]
-
-            # Clean up message IDs on completion events
-            if event in (
-                NotificationEvent.TASK_SUCCESS,
-                NotificationEvent.TASK_FAILURE,
-                NotificationEvent.TASK_COMPLETE,
-            ):
-                if task.id in self._message_ids:
-                    self._message_ids.pop(task.id, None)
-
-            return send_result.get("success", False)
+            return self.outbox.enqueue(
+                channel_id=channel_id,
+                provider=channel.provider,
+                task_id=task.id,
+                event=event.value,
+                message=message,
+            )
 
         except ChannelNotFoundError:
             logger.error(f"Channel not found: {channel_id}")
-            return False
+            return None
         except CredentialError as e:
             logger.error(f"Credentials missing for channel {channel_id}: {e}")
-            return False
-        except ProviderError as e:
-            logger.error(f"Provider error for channel {channel_id}: {e}")
-            return False
+            return None
         except Exception as e:
-            logger.error(f"Unexpected error sending to channel {channel_id}: {e}")
-            return False
+            logger.error(f"Unexpected error queueing notification for {channel_id}: {e}")
+            return None
+
+    async def deliver_outbox(self, max_wait: float | None = 0.0) -> DeliveryReport:
+        """Deliver queued notifications, e.g. ones left over by an earlier process.
+
+        Args:
+            max_wait: Seconds to keep waiting for retries that are not due yet
+
+        Returns:
+            Counts of sent, rescheduled and dead-lettered notifications
+        """
+        return await self._delivery.run(max_wait)
 
     async def test_channel(self, channel_id: str) -> tuple[bool, str]:
         """Test a notification channel.
@@ -2,68 +2,58 @@
 
 from datetime import datetime
 
-from croniter import croniter
-
+from codegeass.core.cron_schedule import CRON_ALIASES, CronSchedule, compile_cron
 from codegeass.core.exceptions import ValidationError
 
 
 class CronParser:
-    """Utility class for CRON expression operations."""
+    """Utility class for CRON expression operations.
+
+    Expressions are compiled once and cached (see core.cron_schedule), so
+    the helpers below are cheap to call repeatedly for the same schedule.
+    """
 
     # Common CRON expression patterns
-    PATTERNS = {
-        "@yearly": "0 0 1 1 *",
-        "@annually": "0 0 1 1 *",
-        "@monthly": "0 0 1 * *",
-        "@weekly": "0 0 * * 0",
-        "@daily": "0 0 * * *",
-        "@midnight": "0 0 * * *",
-        "@hourly": "0 * * * *",
-    }
+    PATTERNS = CRON_ALIASES
 
     @classmethod
     def normalize(cls, expression: str) -> str:
         """Normalize CRON expression, expanding aliases."""
         return cls.PATTERNS.get(expression.lower(), expression)
 
+    @classmethod
+    def compile(cls, expression: str) -> CronSchedule:
+        """Get the compiled schedule of an expression.
+
+        Raises:
+            ValidationError: If the expression is invalid
+        """
+        return compile_cron(cls.normalize(expression))
+
     @classmethod
     def validate(cls, expression: str) -> bool:
         """Validate a CRON expression."""
-        normalized = cls.normalize(expression)
         try:
-            croniter(normalized)
+            cls.compile(expression)
             return True
-        except (ValueError, KeyError):
+        except ValidationError:
             return False
 
     @classmethod
     def get_next(cls, expression: str, base_time: datetime | None = None) -> datetime:
         """Get next scheduled time."""
-        normalized = cls.normalize(expression)
-        if not cls.validate(normalized):
-            raise ValidationError(f"Invalid CRON expression: {expression}")
-
-        base = base_time or datetime.now()
-        cron = croniter(normalized, base)
-        return cron.get_next(datetime)
+        return cls.compile(expression).next_after(base_time or datetime.now())
 
     @classmethod
     def get_prev(cls, expression: str, base_time: datetime | None = None) -> datetime:
         """Get previous scheduled time."""
-        normalized = cls.normalize(expression)
-        if not cls.validate(normalized):
-            raise ValidationError(f"Invalid CRON expression: {expression}")
-
-        base = base_time or datetime.now()
-        cron = croniter(normalized, base)
-        return cron.get_prev(datetime)
+        return cls.compile(expression).prev_before(base_time or datetime.now())
 
     @classmethod
     def is_due(cls, expression: str, window_seconds: int = 60) -> bool:
         """Check if expression is due within the time window."""
-        normalized = cls.normalize(expression)
         now = datetime.now()
-        prev = cls.get_prev(normalized, now)
+        prev = cls.get_prev(expression, now)
         return (now - prev).total_seconds() <= window_seconds
 
     @classmethod
@@ -71,13 +61,14 @@ class CronParser:
         cls, expression: str, n: int, base_time: datetime | None = None
     ) -> list[datetime]:
         """Get next N scheduled times."""
-        normalized = cls.normalize(expression)
-        if not cls.validate(normalized):
-            raise ValidationError(f"Invalid CRON expression: {expression}")
+        return cls.compile(expression).next_n(base_time or datetime.now(), n)
 
-        base = base_time or datetime.now()
-        cron = croniter(normalized, base)
-        return [cron.get_next(datetime) for _ in range(n)]
+    @classmethod
+    def get_between(
+        cls, expression: str, after: datetime, until: datetime, limit: int
+    ) -> list[datetime]:
+        """Get up to `limit` scheduled times in (after, until], newest first."""
+        return cls.compile(expression).between(after, until, limit)
 
     @classmethod
     def describe(cls, expression: str) -> str:
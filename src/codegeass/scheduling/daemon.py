@@ -0,0 +1,278 @@
+"""Long-running scheduler loop driven by a next-fire-time heap."""
+
+import heapq
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from codegeass.core.entities import Task
+from codegeass.core.value_objects import ExecutionResult
+from codegeass.scheduling.cron_parser import CronParser
+from codegeass.scheduling.liveness import HEARTBEAT_INTERVAL, SOURCE_DAEMON
+from codegeass.scheduling.scheduler import Scheduler
+from codegeass.storage.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# How often schedules.yaml is checked for changes while sleeping (seconds)
+DEFAULT_WATCH_INTERVAL = 1.0
+
+# How often log maintenance is attempted (it has its own interval gate)
+MAINTENANCE_INTERVAL = timedelta(hours=1)
+
+# How often worktree pools are warmed for upcoming runs
+WARM_INTERVAL = timedelta(minutes=1)
+
+
+class SchedulerDaemon:
+    """Fires tasks at their CRON times from a single long-lived process.
+
+    Enabled tasks are kept in a min-heap of (next_fire_time, task_id). The
+    loop sleeps until the earliest fire time, submits every task that is
+    due to the scheduler's worker pool, and pushes each task back with its
+    following fire time. Sleeping is interrupted when schedules.yaml
+    changes (checked every watch_interval seconds) or stop() is called.
+
+    Unlike the cron runner, no fire time falls between ticks, and tasks,
+    skills and YAML are loaded once rather than on every run.
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        task_repository: TaskRepository,
+        schedules_file: Path,
+        watch_interval: float = DEFAULT_WATCH_INTERVAL,
+        clock: Callable[[], datetime] = datetime.now,
+        on_dispatch: Callable[[Task, Future[ExecutionResult]], None] | None = None,
+    ):
+        """Initialize the daemon.
+
+        Args:
+            scheduler: Scheduler whose worker pool runs the tasks
+            task_repository: Repository the schedule is loaded from
+            schedules_file: File watched for schedule changes
+            watch_interval: Seconds between checks of schedules_file
+            clock: Source of the current time (for tests)
+            on_dispatch: Called with each task and its result future when it fires
+        """
+        self._scheduler = scheduler
+        self._task_repo = task_repository
+        self._schedules_file = schedules_file
+        self._watch_interval = watch_interval
+        self._clock = clock
+        self._on_dispatch = on_dispatch
+        self._stop = threading.Event()
+        self._heap: list[tuple[datetime, str]] = []
+        self._schedules: dict[str, str] = {}  # task_id -> schedule the heap entry was built from
+        self._file_stamp: tuple[int, int, int] | None = None
+        self._last_maintenance: datetime | None = None
+        self._maintainer: threading.Thread | None = None
+        self._last_warm: datetime | None = None
+        self._warmer: threading.Thread | None = None
+        self._last_beat: datetime | None = None
+
+    def _stat_schedules(self) -> tuple[int, int, int] | None:
+        """Get the (mtime_ns, size, inode) stamp of schedules.yaml."""
+        try:
+            st = os.stat(self._schedules_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def reload(self) -> None:
+        """Rebuild the heap from the enabled tasks.
+
+        Tasks whose schedule did not change keep their pending fire time, so
+        a reload (e.g. after a run updates last_run) never skips or repeats a
+        fire. New or rescheduled tasks fire at their next time after now.
+        """
+        self._file_stamp = self._stat_schedules()
+        now = self._clock()
+        pending = {task_id: fire_at for fire_at, task_id in self._heap}
+
+        heap: list[tuple[datetime, str]] = []
+        schedules: dict[str, str] = {}
+        for task in self._task_repo.find_enabled():
+            fire_at = pending.get(task.id)
+            if fire_at is None or self._schedules.get(task.id) != task.schedule:
+                try:
+                    fire_at = CronParser.get_next(task.schedule, now)
+                except Exception as e:
+                    logger.warning(f"Skipping task {task.name}: {e}")
+                    continue
+            heap.append((fire_at, task.id))
+            schedules[task.id] = task.schedule
+
+        heapq.heapify(heap)
+        self._heap = heap
+        self._schedules = schedules
+        logger.info(f"Scheduler daemon loaded {len(heap)} task(s)")
+
+    @property
+    def next_fire(self) -> tuple[datetime, str] | None:
+        """The earliest (fire_time, task_id), or None if nothing is scheduled."""
+        return self._heap[0] if self._heap else None
+
+    def _schedules_changed(self) -> bool:
+        """Check if schedules.yaml changed since the last reload."""
+        return self._stat_schedules() != self._file_stamp
+
+    def tick(self) -> list[Task]:
+        """Dispatch every task whose fire time has passed.
+
+        Returns:
+            The tasks submitted to the worker pool
+        """
+        now = self._clock()
+        fired: list[Task] = []
+        lag = (now - self._heap[0][0]).total_seconds() if self.next_fire else 0.0
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, task_id = heapq.heappop(self._heap)
+            task = self._task_repo.find_by_id(task_id)
+            if task is None or not task.enabled:
+                self._schedules.pop(task_id, None)
+                continue
+
+            # Next fire strictly after both the fired time and now
+            next_fire = CronParser.get_next(task.schedule, max(fire_at, now))
+            heapq.heappush(self._heap, (next_fire, task_id))
+
+            # Another scheduler may have fired this instant already
+            runs = self._scheduler.claim_fires(task, now)
+            if not runs:
+                logger.info(f"Task {task.name} already fired for {fire_at.isoformat()}")
+                continue
+
+            logger.info(f"Firing task {task.name} (scheduled for {fire_at.isoformat()})")
+            self._dispatch(task, len(runs))
+            fired.append(task)
+
+        self._beat(now, lag_seconds=max(0.0, lag))
+        return fired
+
+    def catch_up(self) -> list[Task]:
+        """Dispatch the runs missed while no scheduler was running.
+
+        Each task's misfire policy decides how many runs its missed
+        instants get. Called once when the daemon starts.
+
+        Returns:
+            The tasks submitted to the worker pool, once per run
+        """
+        tasks = self._scheduler.claim_due_tasks(now=self._clock())
+        for task in tasks:
+            logger.info(f"Catching up on task {task.name}")
+            self._dispatch(task)
+        return tasks
+
+    def _dispatch(self, task: Task, runs: int = 1) -> None:
+        """Submit `runs` runs of the task to the worker pool."""
+        for _ in range(runs):
+            future = self._scheduler.submit_task(task)
+            if self._on_dispatch:
+                self._on_dispatch(task, future)
+
+    def _beat(self, now: datetime, lag_seconds: float | None = None, tick: bool = True) -> None:
+        """Write the daemon's heartbeat, with its next fire time as next tick."""
+        self._last_beat = now
+        next_fire = self.next_fire
+        try:
+            self._scheduler.liveness.beat(
+                SOURCE_DAEMON,
+                next_tick=next_fire[0] if next_fire else None,
+                lag_seconds=lag_seconds,
+                tick=tick,
+                now=now,
+            )
+        except OSError as e:
+            logger.warning(f"Could not write scheduler heartbeat: {e}")
+
+    def _maybe_beat(self) -> None:
+        """Refresh the heartbeat at most once per HEARTBEAT_INTERVAL while sleeping."""
+        now = self._clock()
+        if self._last_beat and now - self._last_beat < HEARTBEAT_INTERVAL:
+            return
+        self._beat(now, tick=False)
+
+    def _maybe_run_maintenance(self) -> None:
+        """Run log maintenance at most once per MAINTENANCE_INTERVAL.
+
+        Maintenance runs on a background thread, as compacting large logs
+        would otherwise hold up the fire times behind it.
+        """
+        now = self._clock()
+        if self._last_maintenance and now - self._last_maintenance < MAINTENANCE_INTERVAL:
+            return
+        if self._maintainer is not None and self._maintainer.is_alive():
+            return
+        self._last_maintenance = now
+        self._maintainer = threading.Thread(
+            target=self._scheduler.run_maintenance,
+            name="codegeass-log-maintenance",
+            daemon=True,
+        )
+        self._maintainer.start()
+
+    def _maybe_warm_worktrees(self) -> None:
+        """Warm worktree pools at most once per WARM_INTERVAL.
+
+        Warming runs on a background thread, as a first checkout of a large
+        repository would otherwise hold up the fire times behind it.
+        """
+        now = self._clock()
+        if self._last_warm and now - self._last_warm < WARM_INTERVAL:
+            return
+        if self._warmer is not None and self._warmer.is_alive():
+            return
+        self._last_warm = now
+        self._warmer = threading.Thread(
+            target=self._scheduler.warm_worktrees,
+            args=(now,),
+            name="codegeass-worktree-warm",
+            daemon=True,
+        )
+        self._warmer.start()
+
+    def _sleep(self) -> None:
+        """Sleep until the next fire time, a schedule change or stop()."""
+        while not self._stop.is_set():
+            self._maybe_beat()
+            self._maybe_run_maintenance()
+            self._maybe_warm_worktrees()
+            if self._schedules_changed():
+                self.reload()
+                self._beat(self._clock(), tick=False)
+                return
+            next_fire = self.next_fire
+            if next_fire is not None:
+                remaining = (next_fire[0] - self._clock()).total_seconds()
+                if remaining <= 0:
+                    return
+                timeout = min(remaining, self._watch_interval)
+            else:
+                timeout = self._watch_interval
+            self._stop.wait(timeout)
+
+    def run(self) -> None:
+        """Run until stop() is called. Waits for running tasks before returning."""
+        self.reload()
+        try:
+            self._beat(self._clock())
+            self.catch_up()
+            while not self._stop.is_set():
+                self._sleep()
+                if self._stop.is_set():
+                    break
+                self.tick()
+        finally:
+            self._scheduler.shutdown(wait=True)
+            self._scheduler.liveness.clear()
+
+    def stop(self) -> None:
+        """Ask the loop to exit (safe to call from signal handlers and other threads)."""
+        self._stop.set()
@@ -0,0 +1,354 @@
+"""Scheduler liveness: heartbeats from the runners and cached service probes.
+
+Asking the OS whether the scheduler service is installed means running
+`systemctl`, `launchctl` or `crontab`, which is too slow to do on every
+status request. Instead, whatever actually schedules tasks (the daemon, or
+`codegeass scheduler run` started by cron/systemd/launchd) writes a small
+heartbeat file each time it checks for due tasks. Status calls read that
+file, which tells both whether the scheduler is alive and how it is doing:
+when it last ticked, when it will tick next and how late it is running.
+
+The service probe is only needed when there is no fresh heartbeat, and its
+result is cached for a TTL, in memory and on disk, so separate CLI
+invocations share it.
+"""
+
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from codegeass.storage.atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Heartbeat sources
+SOURCE_DAEMON = "daemon"
+SOURCE_CRON = "cron"
+
+# How often a sleeping daemon refreshes its heartbeat
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+
+# A daemon heartbeat older than this means the daemon is gone
+DAEMON_STALE_AFTER = timedelta(minutes=2)
+
+# A cron runner without a known interval counts as stopped after this long
+CRON_STALE_AFTER = timedelta(minutes=20)
+
+# Slack allowed past the expected next tick before a runner counts as late
+TICK_GRACE = timedelta(seconds=90)
+
+# Longest gap between cron ticks taken as the runner's interval
+MAX_CRON_INTERVAL = timedelta(days=1)
+
+# How long a service probe result is reused
+DEFAULT_PROBE_TTL = timedelta(minutes=5)
+
+# Seconds each probe command may take
+PROBE_TIMEOUT = 5
+
+
+@dataclass
+class Heartbeat:
+    """Latest sign of life from a scheduler runner."""
+
+    source: str
+    pid: int
+    host: str
+    beat_at: datetime
+    last_tick: datetime
+    next_tick: datetime | None = None
+    lag_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for serialization."""
+        return {
+            "source": self.source,
+            "pid": self.pid,
+            "host": self.host,
+            "beat_at": self.beat_at.isoformat(),
+            "last_tick": self.last_tick.isoformat(),
+            "next_tick": self.next_tick.isoformat() if self.next_tick else None,
+            "lag_seconds": self.lag_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Heartbeat":
+        """Create from dictionary."""
+        next_tick = data.get("next_tick")
+        return cls(
+            source=data["source"],
+            pid=int(data["pid"]),
+            host=data.get("host", ""),
+            beat_at=datetime.fromisoformat(data["beat_at"]),
+            last_tick=datetime.fromisoformat(data["last_tick"]),
+            next_tick=datetime.fromisoformat(next_tick) if next_tick else None,
+            lag_seconds=float(data.get("lag_seconds", 0.0)),
+        )
+
+
+def probe_scheduler_service() -> bool:
+    """Check if a scheduler service is installed (launchd, systemd, or cron).
+
+    Runs one to three subprocesses; use SchedulerLiveness.is_installed()
+    for the cached result.
+    """
+    system = platform.system()
+    home = Path.home()
+
+    # macOS: Check launchd
+    if system == "Darwin":
+        plist_path = home / "Library" / "LaunchAgents" / "com.codegeass.scheduler.plist"
+        if plist_path.exists():
+            try:
+                result = subprocess.run(
+                    ["launchctl", "list"],
+                    capture_output=True,
+                    text=True,
+                    timeout=PROBE_TIMEOUT,
+                )
+                if "com.codegeass.scheduler" in result.stdout:
+                    return True
+            except Exception:
+                pass
+
+    # Linux: Check systemd
+    elif system == "Linux":
+        try:
+            result = subprocess.run(
+                ["systemctl", "--user", "is-active", "codegeass-scheduler.timer"],
+                capture_output=True,
+                text=True,
+                timeout=PROBE_TIMEOUT,
+            )
+            if result.returncode == 0:
+                return True
+        except Exception:
+            pass
+
+    # Fallback: Check cron
+    try:
+        result = subprocess.run(
+            ["crontab", "-l"], capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+        if result.returncode == 0 and "codegeass" in result.stdout:
+            return True
+    except Exception:
+        pass
+
+    return False
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check if a process with this PID exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class SchedulerLiveness:
+    """Tracks whether a scheduler is running, without spawning processes.
+
+    Runners call beat() on every tick; status() reads the heartbeat and
+    only falls back to the (cached) service probe when it is missing or
+    stale. Without a state directory, heartbeat and probe cache live in
+    memory, for one process.
+    """
+
+    def __init__(
+        self,
+        state_dir: Path | None = None,
+        probe_ttl: timedelta = DEFAULT_PROBE_TTL,
+        probe: Callable[[], bool] = probe_scheduler_service,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        """Initialize the liveness tracker.
+
+        Args:
+            state_dir: Directory holding the heartbeat and probe cache files
+            probe_ttl: How long a service probe result is reused
+            probe: Check for an installed scheduler service
+            clock: Source of the current time (for tests)
+        """
+        self._heartbeat_file = state_dir / "scheduler_heartbeat.json" if state_dir else None
+        self._probe_file = state_dir / "scheduler_probe.json" if state_dir else None
+        self._probe_ttl = probe_ttl
+        self._probe = probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._heartbeat: Heartbeat | None = None
+        self._probe_cache: tuple[datetime, bool] | None = None
+
+    def read(self) -> Heartbeat | None:
+        """Get the latest heartbeat, if any."""
+        if self._heartbeat_file is None:
+            return self._heartbeat
+        try:
+            return Heartbeat.from_dict(json.loads(self._heartbeat_file.read_text()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable heartbeat {self._heartbeat_file}: {e}")
+            return None
+
+    def _write(self, heartbeat: Heartbeat | None) -> None:
+        if self._heartbeat_file is None:
+            self._heartbeat = heartbeat
+        elif heartbeat is None:
+            self._heartbeat_file.unlink(missing_ok=True)
+        else:
+            atomic_write(self._heartbeat_file, json.dumps(heartbeat.to_dict(), indent=2))
+
+    def beat(
+        self,
+        source: str,
+        next_tick: datetime | None = None,
+        lag_seconds: float | None = None,
+        tick: bool = True,
+        now: datetime | None = None,
+    ) -> Heartbeat:
+        """Record that a runner is alive.
+
+        Args:
+            source: SOURCE_DAEMON or SOURCE_CRON
+            next_tick: When the runner will next check for due tasks. For a
+                cron runner it defaults to one observed interval from now.
+            lag_seconds: How late this tick ran. For a cron runner it
+                defaults to how far past its expected tick it ran.
+            tick: False to only refresh the heartbeat of a runner that is
+                waiting for its next tick
+            now: Time of the beat (default: now)
+
+        Returns:
+            The heartbeat written
+        """
+        now = now or self._clock()
+        with self._lock:
+            previous = self.read()
+            same_runner = previous is not None and previous.source == source
+
+            if not tick and same_runner:
+                heartbeat = Heartbeat(
+                    source=source,
+                    pid=os.getpid(),
+                    host=socket.gethostname(),
+                    beat_at=now,
+                    last_tick=previous.last_tick,
+                    next_tick=next_tick or previous.next_tick,
+                    lag_seconds=previous.lag_seconds,
+                )
+            else:
+                if source == SOURCE_CRON and same_runner:
+                    # cron ticks on a fixed interval we are not told; learn it
+                    interval = now - previous.last_tick
+                    if next_tick is None and timedelta(0) < interval <= MAX_CRON_INTERVAL:
+                        next_tick = now + interval
+                    if lag_seconds is None and previous.next_tick is not None:
+                        lag_seconds = max(0.0, (now - previous.next_tick).total_seconds())
+                heartbeat = Heartbeat(
+                    source=source,
+                    pid=os.getpid(),
+                    host=socket.gethostname(),
+                    beat_at=now,
+                    last_tick=now,
+                    next_tick=next_tick,
+                    lag_seconds=lag_seconds or 0.0,
+                )
+            self._write(heartbeat)
+        return heartbeat
+
+    def clear(self) -> None:
+        """Remove this process's heartbeat (e.g. when the daemon stops)."""
+        with self._lock:
+            heartbeat = self.read()
+            if heartbeat is not None and heartbeat.pid == os.getpid():
+                self._write(None)
+
+    def is_alive(self, heartbeat: Heartbeat, now: datetime | None = None) -> bool:
+        """Check if the runner behind a heartbeat is still running."""
+        now = now or self._clock()
+        if heartbeat.source == SOURCE_DAEMON:
+            if heartbeat.host == socket.gethostname() and not _pid_alive(heartbeat.pid):
+                return False
+            return now - heartbeat.beat_at <= DAEMON_STALE_AFTER
+        if heartbeat.next_tick is not None:
+            return now <= heartbeat.next_tick + TICK_GRACE
+        return now - heartbeat.last_tick <= CRON_STALE_AFTER
+
+    def _read_probe_cache(self) -> tuple[datetime, bool] | None:
+        if self._probe_cache is not None or self._probe_file is None:
+            return self._probe_cache
+        try:
+            data = json.loads(self._probe_file.read_text())
+            return datetime.fromisoformat(data["checked_at"]), bool(data["installed"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def is_installed(self, now: datetime | None = None) -> bool:
+        """Check if a scheduler service is installed, probing at most once per TTL."""
+        now = now or self._clock()
+        with self._lock:
+            cached = self._read_probe_cache()
+            if cached is not None and timedelta(0) <= now - cached[0] < self._probe_ttl:
+                self._probe_cache = cached
+                return cached[1]
+
+        installed = self._probe()
+        with self._lock:
+            self._probe_cache = (now, installed)
+            if self._probe_file is not None:
+                try:
+                    atomic_write(
+                        self._probe_file,
+                        json.dumps({"checked_at": now.isoformat(), "installed": installed}),
+                    )
+                except OSError as e:
+                    logger.debug(f"Could not cache scheduler probe: {e}")
+        return installed
+
+    def status(self, now: datetime | None = None) -> dict:
+        """Get the scheduler's liveness.
+
+        Returns dict with:
+        - running: Whether a runner is alive or a scheduler service is installed
+        - alive: Whether a runner has a fresh heartbeat
+        - source: Runner behind the heartbeat (daemon or cron), if any
+        - last_check: When the runner last checked for due tasks
+        - next_check: When it will check next, if known
+        - lag_seconds: How late the runner is (its last tick, or overdue now)
+        """
+        now = now or self._clock()
+        heartbeat = self.read()
+        alive = heartbeat is not None and self.is_alive(heartbeat, now)
+
+        lag = None
+        if heartbeat is not None:
+            lag = heartbeat.lag_seconds
+            if heartbeat.next_tick is not None and now > heartbeat.next_tick:
+                lag = max(lag, (now - heartbeat.next_tick).total_seconds())
+
+        return {
+            "running": alive or self.is_installed(now),
+            "alive": alive,
+            "source": heartbeat.source if heartbeat else None,
+            "last_check": heartbeat.last_tick.isoformat() if heartbeat else None,
+            "next_check": (
+                heartbeat.next_tick.isoformat() if heartbeat and heartbeat.next_tick else None
+            ),
+            "lag_seconds": round(lag, 1) if lag is not None else None,
+        }
@@ -1,36 +1,58 @@
 """Main scheduler for managing and executing due tasks."""
 
 import asyncio
+import logging
 from collections.abc import Awaitable, Callable
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from codegeass.core.cron_schedule import upcoming_fires
 from codegeass.core.entities import Task
-from codegeass.core.value_objects import ExecutionResult
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
 from codegeass.execution.executor import ClaudeExecutor
 from codegeass.execution.session import SessionManager
+from codegeass.execution.worktree_pool import WorktreePool, get_worktree_pool
 from codegeass.factory.registry import SkillRegistry
+from codegeass.notifications.dispatcher import (
+    EXIT_FLUSH_TIMEOUT,
+    NotificationDispatcher,
+    get_notification_dispatcher,
+)
 from codegeass.scheduling.cron_parser import CronParser
 from codegeass.scheduling.job import DryRunJob, TaskJob
+from codegeass.scheduling.liveness import SchedulerLiveness
+from codegeass.scheduling.task_pool import ConcurrencyLimits, ResultCallback, SingleFlight, TaskPool
+from codegeass.storage.fire_ledger import FireLedger
 from codegeass.storage.log_repository import LogRepository
+from codegeass.storage.log_retention import LogRetention, RetentionReport
 from codegeass.storage.task_repository import TaskRepository
 
 if TYPE_CHECKING:
     from codegeass.execution.tracker import ExecutionTracker
 
+logger = logging.getLogger(__name__)
+
 # Type for callbacks that can be sync or async
 StartCallback = Callable[[Task], None | Awaitable[None]]
 CompleteCallback = Callable[[Task, ExecutionResult], None | Awaitable[None]]
 PlanApprovalCallback = Callable[[Task, ExecutionResult], None | Awaitable[None]]
 
+# Worktree pools are warmed for projects with a run due within this long
+WORKTREE_WARM_AHEAD = timedelta(minutes=10)
+
+# Schedule instants further behind than this count as missed (see MisfirePolicy).
+# Above the CRON runner's 15-minute interval, so its normal lag is not a misfire.
+DEFAULT_MISFIRE_THRESHOLD = timedelta(minutes=30)
+
 
 class Scheduler:
     """Main scheduler for executing due tasks.
 
     Responsible for:
     - Finding tasks due for execution
-    - Managing execution concurrency
+    - Managing execution concurrency (see TaskPool and SingleFlight)
     - Coordinating with executor
     - Tracking execution history
     """
@@ -43,6 +65,15 @@ class Scheduler:
         log_repository: LogRepository,
         max_concurrent: int = 1,
         tracker: "ExecutionTracker | None" = None,
+        retention: LogRetention | None = None,
+        max_per_project: int = 0,
+        max_per_provider: int = 0,
+        lock_dir: Path | None = None,
+        worktree_pool: WorktreePool | None = None,
+        fire_ledger: FireLedger | None = None,
+        misfire_threshold: timedelta = DEFAULT_MISFIRE_THRESHOLD,
+        liveness: SchedulerLiveness | None = None,
+        notifier: NotificationDispatcher | None = None,
     ):
         """Initialize scheduler with dependencies.
 
@@ -53,12 +84,40 @@ class Scheduler:
             log_repository: Repository for storing execution logs
             max_concurrent: Maximum concurrent executions (default 1)
             tracker: Optional execution tracker for real-time monitoring
+            retention: Optional log retention, compacted by run_maintenance
+            max_per_project: Maximum concurrent executions per project (0 = no cap)
+            max_per_provider: Maximum concurrent executions per provider (0 = no cap)
+            lock_dir: Directory for per-task lock files that keep a task from
+                overlapping itself across processes
+            worktree_pool: Pool runs borrow their worktrees from (default: shared pool)
+            fire_ledger: Ledger of fired schedule instants, shared with other
+                scheduler processes (default: in memory)
+            misfire_threshold: How late a schedule instant may be before it
+                counts as missed
+            liveness: Heartbeat and service state tracker for status()
+                (default: in memory)
+            notifier: Dispatcher that runs async callbacks off the task's
+                thread (default: shared dispatcher)
         """
         self._task_repo = task_repository
         self._skill_registry = skill_registry
         self._session_manager = session_manager
         self._log_repo = log_repository
         self._max_concurrent = max_concurrent
+        self._retention = retention
+        self._pool = TaskPool(
+            ConcurrencyLimits(
+                max_concurrent=max(1, max_concurrent),
+                per_project=max_per_project,
+                per_provider=max_per_provider,
+            )
+        )
+        self._single_flight = SingleFlight(lock_dir)
+        self._worktree_pool = worktree_pool or get_worktree_pool()
+        self._fire_ledger = fire_ledger or FireLedger()
+        self._misfire_threshold = misfire_threshold
+        self._liveness = liveness or SchedulerLiveness()
+        self._notifier = notifier or get_notification_dispatcher()
 
         # Create executor with optional tracker
         self._executor = ClaudeExecutor(
@@ -66,6 +125,7 @@ class Scheduler:
             session_manager=session_manager,
             log_repository=log_repository,
             tracker=tracker,
+            worktree_pool=self._worktree_pool,
         )
 
         # Callbacks (can be sync or async)
@@ -90,30 +150,122 @@ class Scheduler:
         self._on_task_complete = on_complete
         self._on_plan_approval = on_plan_approval
 
-    def _run_callback(self, callback_result) -> None:
-        """Run a callback result, handling async if needed.
+    def _run_callback(self, task: Task, callback_result) -> None:
+        """Hand an async callback's coroutine to the notification dispatcher.
 
-        Ensures async callbacks complete before returning, which is critical
-        for notification message editing (message_id must be stored before
-        the completion notification is sent).
+        The coroutine runs on the dispatcher's thread, so the task does not
+        wait for it. Callbacks of one task still run in order, which keeps
+        notification message editing working (the start message's ID is
+        stored before the completion notification is sent).
         """
         if asyncio.iscoroutine(callback_result):
-            # Check if we're in an async context
+            self._notifier.submit(task.id, callback_result)
+
+    def _threshold(self, misfire_threshold: int | None) -> timedelta:
+        """Get the misfire threshold to use, overridden in seconds when given."""
+        if misfire_threshold is None:
+            return self._misfire_threshold
+        return timedelta(seconds=misfire_threshold)
+
+    def find_due_tasks(self, misfire_threshold: int | None = None) -> list[Task]:
+        """Find tasks with schedule instants to run, without claiming them.
+
+        Args:
+            misfire_threshold: Seconds an instant may be late before it counts
+                as missed (default: the scheduler's threshold)
+        """
+        now = datetime.now()
+        threshold = self._threshold(misfire_threshold)
+        due = []
+        for task in self._task_repo.find_enabled():
+            last_fired = self._fire_ledger.last_fired(task.id) or self._seed(task, now, threshold)
             try:
-                asyncio.get_running_loop()
-                # Already in async context, run in a new thread with its own loop
-                import concurrent.futures
+                pending = CronParser.get_between(
+                    task.schedule, last_fired, now, task.misfire_policy.max_runs
+                )
+            except Exception:
+                continue
+            if task.misfire_policy.runs_for(pending, now, threshold):
+                due.append(task)
+        return due
+
+    def claim_due_tasks(
+        self, misfire_threshold: int | None = None, now: datetime | None = None
+    ) -> list[Task]:
+        """Claim the schedule instants due up to now and get the runs to start.
+
+        A task appears once per run its misfire policy asks for, so run-all
+        tasks catching up on missed instants may appear several times.
+
+        Args:
+            misfire_threshold: Seconds an instant may be late before it counts
+                as missed (default: the scheduler's threshold)
+            now: Current time (defaults to datetime.now())
+        """
+        now = now or datetime.now()
+        tasks = self._task_repo.find_all()
+        due: list[Task] = []
+        for task in tasks:
+            if task.enabled:
+                due.extend([task] * len(self.claim_fires(task, now, misfire_threshold)))
+        self._fire_ledger.prune({task.id for task in tasks})
+        return due
+
+    def claim_fires(
+        self, task: Task, now: datetime | None = None, misfire_threshold: int | None = None
+    ) -> list[datetime]:
+        """Claim the task's schedule instants up to now that no scheduler has fired.
 
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(asyncio.run, callback_result)
-                    future.result(timeout=30)  # Wait for completion
-            except RuntimeError:
-                # No running loop, safe to use asyncio.run
-                asyncio.run(callback_result)
+        The claim goes through the fire ledger, so when several schedulers
+        (or a restarted one) look at the same instant, only one gets it.
+        The task's misfire policy then decides how many runs the claimed
+        instants are worth.
+
+        Args:
+            task: Task to claim instants for
+            now: Current time (defaults to datetime.now())
+            misfire_threshold: Seconds an instant may be late before it counts
+                as missed (default: the scheduler's threshold)
 
-    def find_due_tasks(self, window_seconds: int = 60) -> list[Task]:
-        """Find tasks due for execution."""
-        return self._task_repo.find_due(window_seconds)
+        Returns:
+            The instants to run the task for, oldest first (empty if none)
+        """
+        now = now or datetime.now()
+        threshold = self._threshold(misfire_threshold)
+        policy = task.misfire_policy
+        try:
+            latest = CronParser.get_between(task.schedule, datetime.min, now, 1)
+        except Exception as e:
+            logger.warning(f"Skipping task {task.name}: {e}")
+            return []
+        if not latest:
+            return []
+
+        last_fired = self._fire_ledger.claim(task.id, latest[0], self._seed(task, now, threshold))
+        if last_fired is None:
+            return []
+
+        pending = CronParser.get_between(task.schedule, last_fired, now, policy.max_runs)
+        runs = policy.runs_for(pending, now, threshold)
+        if now - pending[-1] > threshold:
+            logger.info(
+                f"Task {task.name} missed schedule instants since {last_fired.isoformat()}; "
+                f"running it {runs} time(s) (misfire policy {policy.mode})"
+            )
+        return list(reversed(pending[:runs]))
+
+    def _seed(self, task: Task, now: datetime, threshold: timedelta) -> datetime:
+        """Last fired instant assumed for a task the fire ledger has not seen.
+
+        That is its last run, or else the misfire threshold ago, so a task
+        created shortly before the scheduler first sees it still fires.
+        """
+        if task.last_run:
+            try:
+                return datetime.fromisoformat(task.last_run)
+            except ValueError:
+                pass
+        return now - threshold
 
     def run_task(self, task: Task, dry_run: bool = False) -> ExecutionResult:
         """Run a single task.
@@ -128,11 +280,33 @@ class Scheduler:
             dry_run: If True, only show what would run
 
         Returns:
-            ExecutionResult from execution or plan mode
+            ExecutionResult from execution or plan mode, or a SKIPPED result
+            if the task is already running
         """
+        if dry_run:
+            return self._run_task(task, dry_run=True)
+
+        if not self._single_flight.acquire(task.id):
+            now = datetime.now()
+            return ExecutionResult(
+                task_id=task.id,
+                session_id=None,
+                status=ExecutionStatus.SKIPPED,
+                output="",
+                started_at=now,
+                finished_at=now,
+                error="Task is already running",
+            )
+        try:
+            return self._run_task(task, dry_run=False)
+        finally:
+            self._single_flight.release(task.id)
+
+    def _run_task(self, task: Task, dry_run: bool) -> ExecutionResult:
+        """Run a single task (see run_task)."""
         if self._on_task_start:
             result = self._on_task_start(task)
-            self._run_callback(result)
+            self._run_callback(task, result)
 
         if dry_run:
             job = DryRunJob(task, self._executor)
@@ -144,19 +318,23 @@ class Scheduler:
             job = TaskJob(task, self._executor)
             result = job.run()
 
-        # Update task state in repository
+        # Record the run on the stored task in one locked read-modify-write,
+        # so edits made to schedules.yaml while the task ran are kept
         task.update_last_run(result.status.value)
-        self._task_repo.update(task)
+        with self._task_repo.batch():
+            stored = self._task_repo.find_by_id(task.id) or task
+            stored.last_run, stored.last_status = task.last_run, task.last_status
+            self._task_repo.update(stored)
 
         # For plan mode tasks, call on_plan_approval instead of on_complete
         if task.plan_mode and not dry_run:
             if self._on_plan_approval:
                 callback_result = self._on_plan_approval(task, result)
-                self._run_callback(callback_result)
+                self._run_callback(task, callback_result)
         else:
             if self._on_task_complete:
                 callback_result = self._on_task_complete(task, result)
-                self._run_callback(callback_result)
+                self._run_callback(task, callback_result)
 
         return result
 
@@ -174,22 +352,31 @@ class Scheduler:
         """
         return self._executor.execute_plan_mode(task)
 
-    def run_due(self, window_seconds: int = 60, dry_run: bool = False) -> list[ExecutionResult]:
+    def run_due(
+        self, misfire_threshold: int | None = None, dry_run: bool = False
+    ) -> list[ExecutionResult]:
         """Run all tasks due for execution.
 
+        Each schedule instant is claimed in the fire ledger first, so it runs
+        once even if another scheduler process runs at the same time.
+
         Args:
-            window_seconds: Time window to check for due tasks
+            misfire_threshold: Seconds an instant may be late before it counts
+                as missed (default: the scheduler's threshold)
             dry_run: If True, only show what would run
 
         Returns:
             List of execution results
         """
-        due_tasks = self.find_due_tasks(window_seconds)
-        results = []
+        if dry_run:
+            tasks = self.find_due_tasks(misfire_threshold)
+        else:
+            tasks = self.claim_due_tasks(misfire_threshold)
+        results = self.run_tasks(tasks, dry_run=dry_run)
 
-        for task in due_tasks:
-            result = self.run_task(task, dry_run=dry_run)
-            results.append(result)
+        if not dry_run:
+            self.run_maintenance()
+            self.warm_worktrees()
 
         return results
 
@@ -202,14 +389,102 @@ class Scheduler:
         Returns:
             List of execution results
         """
-        tasks = self._task_repo.find_enabled()
-        results = []
+        return self.run_tasks(self._task_repo.find_enabled(), dry_run=dry_run)
 
-        for task in tasks:
-            result = self.run_task(task, dry_run=dry_run)
-            results.append(result)
+    def run_tasks(
+        self,
+        tasks: list[Task],
+        dry_run: bool = False,
+        on_result: ResultCallback | None = None,
+    ) -> list[ExecutionResult]:
+        """Run tasks concurrently, up to max_concurrent at a time.
 
-        return results
+        Per-project and per-provider caps apply, and a task never overlaps
+        itself (see run_task).
+
+        Args:
+            tasks: Tasks to run
+            dry_run: If True, only show what would run
+            on_result: Called on the calling thread as each task finishes
+
+        Returns:
+            List of execution results, in the order of `tasks`
+        """
+        return self._pool.map(
+            tasks, lambda task: self.run_task(task, dry_run=dry_run), on_result=on_result
+        )
+
+    def submit_task(self, task: Task, dry_run: bool = False) -> Future[ExecutionResult]:
+        """Queue a task on the worker pool without waiting for it.
+
+        The same concurrency caps as run_tasks apply.
+
+        Returns:
+            Future resolving to the task's execution result
+        """
+        return self._pool.submit(task, lambda t: self.run_task(t, dry_run=dry_run))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool, waiting for running tasks if `wait` is True.
+
+        When waiting, also waits for their notifications to be sent.
+        """
+        self._pool.shutdown(wait=wait)
+        if wait:
+            self._notifier.flush(EXIT_FLUSH_TIMEOUT)
+
+    def run_maintenance(self) -> RetentionReport | None:
+        """Compact logs if the retention policy's interval has elapsed.
+
+        Called after each scheduler tick. Failures are logged and never
+        affect task execution.
+
+        Returns:
+            The compaction report, or None if compaction did not run
+        """
+        if self._retention is None:
+            return None
+        try:
+            return self._retention.compact_if_due()
+        except OSError as e:
+            logger.warning(f"Log compaction failed: {e}")
+            return None
+
+    def warm_worktrees(
+        self, now: datetime | None = None, ahead: timedelta = WORKTREE_WARM_AHEAD
+    ) -> int:
+        """Warm the worktree pools of projects with a run due soon.
+
+        Looks at each enabled task's next CRON fire time, so the checkout
+        for a large repository happens ahead of the run instead of at its
+        start. Plan mode tasks don't use the pool and are skipped. Failures
+        are logged and never affect task execution.
+
+        Args:
+            now: Current time (defaults to datetime.now())
+            ahead: How far ahead to look for due runs
+
+        Returns:
+            Number of projects warmed
+        """
+        now = now or datetime.now()
+        projects: list[Path] = []
+        for task in self._task_repo.find_enabled():
+            if task.plan_mode or task.working_dir in projects:
+                continue
+            try:
+                next_run = CronParser.get_next(task.schedule, now)
+            except Exception:
+                continue
+            if next_run - now <= ahead:
+                projects.append(task.working_dir)
+
+        for project_dir in projects:
+            try:
+                self._worktree_pool.warm(project_dir)
+            except Exception as e:
+                logger.warning(f"Warming worktrees for {project_dir} failed: {e}")
+        return len(projects)
 
     def run_by_name(self, name: str, dry_run: bool = False) -> ExecutionResult | None:
         """Run a task by name.
@@ -227,62 +502,26 @@ class Scheduler:
 
         return self.run_task(task, dry_run=dry_run)
 
-    def _is_scheduler_running(self) -> bool:
-        """Check if scheduler is running (launchd, systemd, or cron)."""
-        import platform
-        import subprocess
-
-        system = platform.system()
-        home = Path.home()
-
-        # macOS: Check launchd
-        if system == "Darwin":
-            plist_path = home / "Library" / "LaunchAgents" / "com.codegeass.scheduler.plist"
-            if plist_path.exists():
-                try:
-                    result = subprocess.run(
-                        ["launchctl", "list"],
-                        capture_output=True,
-                        text=True,
-                    )
-                    if "com.codegeass.scheduler" in result.stdout:
-                        return True
-                except Exception:
-                    pass
-
-        # Linux: Check systemd
-        elif system == "Linux":
-            try:
-                result = subprocess.run(
-                    ["systemctl", "--user", "is-active", "codegeass-scheduler.timer"],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode == 0:
-                    return True
-            except Exception:
-                pass
-
-        # Fallback: Check cron
-        try:
-            result = subprocess.run(["crontab", "-l"], capture_output=True, text=True)
-            if result.returncode == 0 and "codegeass" in result.stdout:
-                return True
-        except Exception:
-            pass
-
-        return False
+    @property
+    def liveness(self) -> SchedulerLiveness:
+        """Heartbeat and service state of whatever runs this scheduler."""
+        return self._liveness
 
     def status(self) -> dict:
         """Get scheduler status.
 
         Returns dict with:
-        - running: Whether the scheduler cron job is installed
+        - running: Whether a scheduler is alive or its service is installed
+        - alive, source, last_check, next_check, lag_seconds: See
+          SchedulerLiveness.status()
         - enabled_tasks: Count of enabled tasks
         - disabled_tasks: Count of disabled tasks
         - plan_mode_tasks: Count of tasks with plan_mode enabled
         - due_tasks: List of currently due task names
         - next_runs: Dict of task names to next run times
+        - max_concurrent: Maximum concurrent executions
+        - notifications: Notification queue depth and latency (see
+          NotificationDispatcher.get_stats())
         """
         all_tasks = self._task_repo.find_all()
         enabled = [t for t in all_tasks if t.enabled]
@@ -295,17 +534,16 @@ class Scheduler:
             next_time = CronParser.get_next(task.schedule)
             next_runs[task.name] = next_time.isoformat()
 
-        # Check if scheduler is running (launchd, systemd, or cron)
-        running = self._is_scheduler_running()
-
         return {
-            "running": running,
+            **self._liveness.status(),
+            "notifications": self._notifier.get_stats(),
             "enabled_tasks": len(enabled),
             "disabled_tasks": len(disabled),
             "plan_mode_tasks": len(plan_mode),
             "due_tasks": [t.name for t in due],
             "next_runs": next_runs,
             "current_time": datetime.now().isoformat(),
+            "max_concurrent": self._max_concurrent,
         }
 
     def get_upcoming(self, hours: int = 24) -> list[dict]:
@@ -313,29 +551,30 @@ class Scheduler:
 
         Returns list of dicts with task name and scheduled time.
         """
-        from datetime import timedelta
-
-        tasks = self._task_repo.find_enabled()
+        tasks = {task.id: task for task in self._task_repo.find_enabled()}
         now = datetime.now()
-        cutoff = now + timedelta(hours=hours)
+        fires = upcoming_fires(
+            ((task.id, task.schedule) for task in tasks.values()),
+            now,
+            now + timedelta(hours=hours),
+            limit_per_schedule=10,
+        )
 
+        descriptions: dict[str, str] = {}
         upcoming = []
-        for task in tasks:
-            next_runs = CronParser.get_next_n(task.schedule, 10, now)
-            for run_time in next_runs:
-                if run_time <= cutoff:
-                    upcoming.append(
-                        {
-                            "task_name": task.name,
-                            "task_id": task.id,
-                            "scheduled_at": run_time.isoformat(),
-                            "schedule": task.schedule,
-                            "schedule_desc": CronParser.describe(task.schedule),
-                        }
-                    )
-
-        # Sort by scheduled time
-        upcoming.sort(key=lambda x: x["scheduled_at"])
+        for run_time, task_id in fires:
+            task = tasks[task_id]
+            if task_id not in descriptions:
+                descriptions[task_id] = CronParser.describe(task.schedule)
+            upcoming.append(
+                {
+                    "task_name": task.name,
+                    "task_id": task.id,
+                    "scheduled_at": run_time.isoformat(),
+                    "schedule": task.schedule,
+                    "schedule_desc": descriptions[task_id],
+                }
+            )
         return upcoming
 
     def generate_crontab_entry(self, runner_script: Path) -> str:
@@ -0,0 +1,285 @@
+"""Bounded worker pool for running scheduled tasks concurrently."""
+
+import logging
+import threading
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from codegeass.core.entities import Task
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
+from codegeass.storage.atomic import try_lock_file, unlock_file
+
+logger = logging.getLogger(__name__)
+
+ResultCallback = Callable[[Task, ExecutionResult], None]
+
+
+@dataclass
+class ConcurrencyLimits:
+    """Concurrency caps, read from the `scheduler` section of settings.yaml.
+
+    per_project and per_provider of 0 mean no cap beyond max_concurrent.
+    Tasks belong to the project of their working_dir and to the provider
+    named by their code_source.
+    """
+
+    max_concurrent: int = 1
+    per_project: int = 0
+    per_provider: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ConcurrencyLimits":
+        """Create from the scheduler settings dictionary."""
+        return cls(
+            max_concurrent=max(1, int(data.get("max_concurrent", 1))),
+            per_project=int(data.get("max_concurrent_per_project", 0)),
+            per_provider=int(data.get("max_concurrent_per_provider", 0)),
+        )
+
+    @classmethod
+    def from_settings(cls, settings_file: Path) -> "ConcurrencyLimits":
+        """Load the limits from settings.yaml, falling back to defaults."""
+        if not settings_file.exists():
+            return cls()
+        try:
+            with open(settings_file) as f:
+                settings = yaml.safe_load(f) or {}
+            return cls.from_dict(settings.get("scheduler") or {})
+        except (yaml.YAMLError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid scheduler settings in {settings_file}: {e}")
+            return cls()
+
+
+@dataclass
+class _PoolItem:
+    """A submitted task waiting for or holding a worker."""
+
+    task: Task
+    run: Callable[[Task], ExecutionResult]
+    future: Future[ExecutionResult]
+
+
+class TaskPool:
+    """Runs tasks on a bounded thread pool.
+
+    At most max_concurrent tasks run at once, and no more than the per-project
+    and per-provider caps for any one project or provider. A task never runs
+    twice at the same time: a duplicate waits for the running copy.
+    Tasks that cannot start yet stay queued in order; the next startable task
+    is dispatched as soon as a worker finishes.
+
+    The pool is long-lived: submit() can be called at any time (the daemon
+    submits as schedules fire) until shutdown(), and map() runs a batch to
+    completion.
+    """
+
+    def __init__(self, limits: ConcurrencyLimits):
+        """Initialize with the concurrency limits to enforce."""
+        self._limits = limits
+        self._lock = threading.Lock()
+        self._pending: list[_PoolItem] = []
+        self._running_ids: set[str] = set()
+        self._projects: Counter[str] = Counter()
+        self._providers: Counter[str] = Counter()
+        self._active = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._closed = False
+
+    @staticmethod
+    def project_key(task: Task) -> str:
+        """Key identifying the project a task runs in."""
+        return str(task.working_dir)
+
+    @staticmethod
+    def provider_key(task: Task) -> str:
+        """Key identifying the provider a task runs on."""
+        return task.code_source
+
+    @property
+    def active_count(self) -> int:
+        """Number of tasks currently running."""
+        return self._active
+
+    @property
+    def pending_count(self) -> int:
+        """Number of tasks waiting for a worker or a cap."""
+        return len(self._pending)
+
+    def _can_start(self, task: Task) -> bool:
+        """Check if a task fits within the caps given what is running."""
+        if task.id in self._running_ids:
+            return False
+        if (
+            self._limits.per_project
+            and self._projects[self.project_key(task)] >= self._limits.per_project
+        ):
+            return False
+        if (
+            self._limits.per_provider
+            and self._providers[self.provider_key(task)] >= self._limits.per_provider
+        ):
+            return False
+        return True
+
+    def _dispatch_locked(self) -> None:
+        """Start every queued task that fits. Must hold self._lock."""
+        if self._closed:
+            return
+        for item in list(self._pending):
+            if self._active >= self._limits.max_concurrent:
+                break
+            if not self._can_start(item.task):
+                continue
+            self._pending.remove(item)
+            self._active += 1
+            self._running_ids.add(item.task.id)
+            self._projects[self.project_key(item.task)] += 1
+            self._providers[self.provider_key(item.task)] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._limits.max_concurrent, thread_name_prefix="codegeass-task"
+                )
+            self._executor.submit(self._run_item, item)
+
+    def _run_item(self, item: _PoolItem) -> None:
+        """Run one task on a worker thread, then hand the slot to the next."""
+        started_at = datetime.now()
+        try:
+            result = item.run(item.task)
+        except Exception as e:
+            logger.exception(f"Task {item.task.name} raised outside its job")
+            result = ExecutionResult(
+                task_id=item.task.id,
+                session_id=None,
+                status=ExecutionStatus.FAILURE,
+                output="",
+                started_at=started_at,
+                finished_at=datetime.now(),
+                error=str(e),
+            )
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._running_ids.discard(item.task.id)
+                self._projects[self.project_key(item.task)] -= 1
+                self._providers[self.provider_key(item.task)] -= 1
+                self._dispatch_locked()
+        item.future.set_result(result)
+
+    def submit(
+        self, task: Task, run: Callable[[Task], ExecutionResult]
+    ) -> Future[ExecutionResult]:
+        """Queue `run(task)` and return a future for its result.
+
+        Raises:
+            RuntimeError: If the pool has been shut down
+        """
+        future: Future[ExecutionResult] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit tasks after the pool has shut down")
+            self._pending.append(_PoolItem(task=task, run=run, future=future))
+            self._dispatch_locked()
+        return future
+
+    def map(
+        self,
+        tasks: list[Task],
+        run: Callable[[Task], ExecutionResult],
+        on_result: ResultCallback | None = None,
+    ) -> list[ExecutionResult]:
+        """Run `run(task)` for every task and return the results in input order.
+
+        Args:
+            tasks: Tasks to run
+            run: Function executing one task (called on a worker thread)
+            on_result: Called on the calling thread as each task finishes
+
+        Returns:
+            One result per task, in the order of `tasks`. Tasks dropped by a
+            shutdown before they started get a SKIPPED result.
+        """
+        futures = [self.submit(task, run) for task in tasks]
+        tasks_by_future = dict(zip(futures, tasks, strict=True))
+        for future in as_completed(futures):
+            if on_result and not future.cancelled():
+                on_result(tasks_by_future[future], future.result())
+        return [
+            self._cancelled_result(task) if future.cancelled() else future.result()
+            for task, future in zip(tasks, futures, strict=True)
+        ]
+
+    @staticmethod
+    def _cancelled_result(task: Task) -> ExecutionResult:
+        """Result for a task dropped from the queue by shutdown()."""
+        now = datetime.now()
+        return ExecutionResult(
+            task_id=task.id,
+            session_id=None,
+            status=ExecutionStatus.SKIPPED,
+            output="",
+            started_at=now,
+            finished_at=now,
+            error="Scheduler shut down before the task started",
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads once running tasks finish. Queued tasks are dropped.
+
+        The pool cannot be used afterwards: submit() raises and finishing
+        tasks no longer start queued ones.
+        """
+        with self._lock:
+            self._closed = True
+            for item in self._pending:
+                item.future.cancel()
+                # Wakes as_completed() waiters, which cancel() alone does not
+                item.future.set_running_or_notify_cancel()
+            self._pending.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class SingleFlight:
+    """Ensures a task never overlaps itself, within and across processes.
+
+    Within a process, running task ids are tracked in memory. If a lock
+    directory is given, a non-blocking fcntl lock on {lock_dir}/{task_id}.lock
+    also excludes runs started by other processes (cron runner, dashboard).
+    """
+
+    def __init__(self, lock_dir: Path | None = None):
+        """Initialize with an optional directory for cross-process lock files."""
+        self._lock_dir = lock_dir
+        self._running: set[str] = set()
+        self._guard = threading.Lock()
+        self._fds: dict[str, int] = {}
+
+    def acquire(self, task_id: str) -> bool:
+        """Try to mark a task as running. Returns False if it already is."""
+        with self._guard:
+            if task_id in self._running:
+                return False
+            if self._lock_dir is not None:
+                fd = try_lock_file(self._lock_dir / f"{task_id}.lock")
+                if fd is None:
+                    return False
+                self._fds[task_id] = fd
+            self._running.add(task_id)
+            return True
+
+    def release(self, task_id: str) -> None:
+        """Mark a task as no longer running."""
+        with self._guard:
+            self._running.discard(task_id)
+            fd = self._fds.pop(task_id, None)
+            if fd is not None:
+                unlock_file(fd)
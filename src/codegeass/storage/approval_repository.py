@@ -1,5 +1,6 @@
 """Repository for pending plan approvals using YAML storage."""
 
+from contextlib import AbstractContextManager
 from datetime import datetime
 from pathlib import Path
 
@@ -21,13 +22,18 @@ class PendingApprovalRepository:
         """Initialize with path to approvals.yaml."""
         self._backend = YAMLListBackend(approvals_file, list_key="approvals")
 
+    def batch(self) -> AbstractContextManager[None]:
+        """Group several updates into one locked read-modify-write of approvals.yaml."""
+        return self._backend.transaction()
+
     def save(self, approval: PendingApproval) -> None:
         """Save a new approval or update existing one."""
-        existing = self.find_by_id(approval.id)
-        if existing:
-            self.update(approval)
-        else:
-            self._backend.append(approval.to_dict())
+        with self._backend.transaction():
+            existing = self.find_by_id(approval.id)
+            if existing:
+                self.update(approval)
+            else:
+                self._backend.append(approval.to_dict())
 
     def find_by_id(self, approval_id: str) -> PendingApproval | None:
         """Find approval by ID."""
@@ -82,13 +88,14 @@ class PendingApprovalRepository:
 
     def delete_by_task_id(self, task_id: str) -> int:
         """Delete all approvals for a task. Returns count deleted."""
-        items = self._backend.read_all()
-        original_len = len(items)
-        items = [item for item in items if item.get("task_id") != task_id]
-        deleted = original_len - len(items)
-        if deleted > 0:
-            self._backend.write_all(items)
-        return deleted
+        with self._backend.transaction():
+            items = self._backend.read_all()
+            original_len = len(items)
+            items = [item for item in items if item.get("task_id") != task_id]
+            deleted = original_len - len(items)
+            if deleted > 0:
+                self._backend.write_all(items)
+            return deleted
 
     def cleanup_expired(self) -> int:
         """Mark expired approvals and return count of newly expired.
@@ -96,13 +103,14 @@ class PendingApprovalRepository:
         This checks all pending approvals and marks them as expired if past timeout.
         """
         expired_count = 0
-        pending = self.find_pending()
 
-        for approval in pending:
-            if approval.is_expired:
-                approval.mark_expired()
-                self.update(approval)
-                expired_count += 1
+        # One write for all newly expired approvals
+        with self._backend.transaction():
+            for approval in self.find_pending():
+                if approval.is_expired:
+                    approval.mark_expired()
+                    self.update(approval)
+                    expired_count += 1
 
         return expired_count
 
@@ -116,45 +124,46 @@ class PendingApprovalRepository:
 
         cutoff = cutoff - timedelta(days=days)
 
-        items = self._backend.read_all()
-        original_len = len(items)
-
-        # Keep items that are either:
-        # 1. Still pending (not completed/cancelled/expired)
-        # 2. Newer than cutoff
-        terminal_statuses = {
-            ApprovalStatus.COMPLETED.value,
-            ApprovalStatus.CANCELLED.value,
-            ApprovalStatus.EXPIRED.value,
-            ApprovalStatus.FAILED.value,
-        }
-
-        kept_items = []
-        for item in items:
-            status = item.get("status", "")
-            created_at = item.get("created_at", "")
-
-            if status not in terminal_statuses:
-                # Keep pending/approved/executing items
-                kept_items.append(item)
-            elif created_at:
-                # Keep terminal items newer than cutoff
-                try:
-                    created = datetime.fromisoformat(created_at)
-                    if created >= cutoff:
+        with self._backend.transaction():
+            items = self._backend.read_all()
+            original_len = len(items)
+
+            # Keep items that are either:
+            # 1. Still pending (not completed/cancelled/expired)
+            # 2. Newer than cutoff
+            terminal_statuses = {
+                ApprovalStatus.COMPLETED.value,
+                ApprovalStatus.CANCELLED.value,
+                ApprovalStatus.EXPIRED.value,
+                ApprovalStatus.FAILED.value,
+            }
+
+            kept_items = []
+            for item in items:
+                status = item.get("status", "")
+                created_at = item.get("created_at", "")
+
+                if status not in terminal_statuses:
+                    # Keep pending/approved/executing items
+                    kept_items.append(item)
+                elif created_at:
+                    # Keep terminal items newer than cutoff
+                    try:
+                        created = datetime.fromisoformat(created_at)
+                        if created >= cutoff:
+                            kept_items.append(item)
+                    except ValueError:
+                        # Invalid date, keep it
                         kept_items.append(item)
-                except ValueError:
-                    # Invalid date, keep it
+                else:
+                    # No date, keep it
                     kept_items.append(item)
-            else:
-                # No date, keep it
-                kept_items.append(item)
 
-        removed = original_len - len(kept_items)
-        if removed > 0:
-            self._backend.write_all(kept_items)
+            removed = original_len - len(kept_items)
+            if removed > 0:
+                self._backend.write_all(kept_items)
 
-        return removed
+            return removed
 
     def find_pending_for_message(
         self, provider: str, chat_id: str, message_id: int | str
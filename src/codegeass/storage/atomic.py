@@ -0,0 +1,140 @@
+"""Atomic file replacement and advisory locking for state files."""
+
+import os
+import stat
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Process umask, read once (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush a directory entry so a rename survives a crash."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, data: str | bytes, mode: int | None = None) -> None:
+    """Replace a file's contents atomically.
+
+    The data is written to a temporary file in the same directory, fsynced
+    and renamed over `path`, so readers see either the old or the new file,
+    never a truncated one.
+
+    Args:
+        path: File to write
+        data: New contents (str is encoded as UTF-8)
+        mode: Permission bits. Defaults to the existing file's mode, or the
+            umask default for new files.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
+class _PathLock:
+    """Per-process state of the lock on one file."""
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.fd: int | None = None
+
+
+_path_locks: dict[Path, _PathLock] = {}
+_path_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on `path` for a read-modify-write cycle.
+
+    The lock is an fcntl lock on a sidecar file (.{name}.lock), since `path`
+    itself is replaced on every atomic write. It excludes other processes and
+    other threads of this process, and is reentrant within a thread.
+    """
+    lock_file = path.absolute().with_name(f".{path.name}.lock")
+    with _path_locks_guard:
+        entry = _path_locks.setdefault(lock_file, _PathLock())
+
+    with entry.lock:
+        if entry.depth == 0:
+            lock_file.parent.mkdir(parents=True, exist_ok=True)
+            entry.fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                try:
+                    fcntl.flock(entry.fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(entry.fd)
+                    entry.fd = None
+                    raise
+        entry.depth += 1
+        try:
+            yield
+        finally:
+            entry.depth -= 1
+            if entry.depth == 0 and entry.fd is not None:
+                os.close(entry.fd)  # Releases the fcntl lock
+                entry.fd = None
+
+
+def try_lock_file(lock_file: Path) -> int | None:
+    """Take a non-blocking exclusive fcntl lock on `lock_file`.
+
+    Returns the open descriptor holding the lock (release it with
+    unlock_file), or None if another holder has it. The lock is tied to the
+    descriptor, so a second attempt from the same process also fails.
+    """
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def unlock_file(fd: int) -> None:
+    """Release a lock taken with try_lock_file."""
+    os.close(fd)
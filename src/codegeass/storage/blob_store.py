@@ -0,0 +1,122 @@
+"""Content-addressed, compressed storage for large execution transcripts."""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Values up to this many characters stay inline in log and session rows
+INLINE_LIMIT = 4096
+
+# Characters of the original value kept inline as a preview once offloaded
+PREVIEW_CHARS = 500
+
+
+class BlobStore:
+    """Stores text blobs gzip-compressed under their SHA-256 digest.
+
+    Layout: {blobs_dir}/{digest[:2]}/{digest}.gz
+
+    Identical transcripts (e.g. the same output referenced from a log row and
+    a session file) are stored once. Blobs are written to a temporary file
+    and renamed into place, so readers never see a partial blob.
+    """
+
+    def __init__(self, blobs_dir: Path):
+        """Initialize with path to the blobs directory."""
+        self._blobs_dir = blobs_dir
+
+    def _get_blob_file(self, ref: str) -> Path:
+        """Get the file path for a blob reference."""
+        return self._blobs_dir / ref[:2] / f"{ref}.gz"
+
+    def put(self, text: str) -> str:
+        """Store text and return its reference (SHA-256 hex digest)."""
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        blob_file = self._get_blob_file(ref)
+        if blob_file.exists():
+            return ref
+
+        blob_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=blob_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, blob_file)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        return ref
+
+    def get(self, ref: str) -> str | None:
+        """Load a blob by reference. Returns None if it does not exist."""
+        try:
+            return gzip.decompress(self._get_blob_file(ref).read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def exists(self, ref: str) -> bool:
+        """Check if a blob exists."""
+        return self._get_blob_file(ref).exists()
+
+    def delete(self, ref: str) -> bool:
+        """Delete a blob. Returns True if it existed."""
+        blob_file = self._get_blob_file(ref)
+        if blob_file.exists():
+            blob_file.unlink()
+            return True
+        return False
+
+    def modified_at(self, ref: str) -> float:
+        """Get the modification time of a blob as a timestamp (0.0 if missing)."""
+        try:
+            return self._get_blob_file(ref).stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def refs(self) -> Iterator[str]:
+        """Iterate over the references of all stored blobs."""
+        if not self._blobs_dir.exists():
+            return
+        for blob_file in self._blobs_dir.glob("*/*.gz"):
+            yield blob_file.name.removesuffix(".gz")
+
+    def offload(self, data: dict[str, Any], key: str = "output") -> dict[str, Any]:
+        """Move a large text value of a row into the store.
+
+        Returns a copy of the row where `key` holds a short preview and
+        `{key}_ref` / `{key}_size` point at the full value. Small values and
+        rows that are already offloaded are returned unchanged.
+        """
+        text = data.get(key) or ""
+        if data.get(f"{key}_ref") or len(text) <= INLINE_LIMIT:
+            return data
+
+        return {
+            **data,
+            key: text[:PREVIEW_CHARS],
+            f"{key}_ref": self.put(text),
+            f"{key}_size": len(text.encode("utf-8")),
+        }
+
+    def load(self, text: str, ref: str | None) -> str:
+        """Resolve a possibly offloaded value.
+
+        Returns the full value for a reference, or `text` (the inline value
+        or preview) if there is no reference or the blob is missing.
+        """
+        if not ref:
+            return text
+        full = self.get(ref)
+        if full is None:
+            logger.warning(f"Output blob {ref} is missing, returning preview")
+            return text
+        return full
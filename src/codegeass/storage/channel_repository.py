@@ -39,8 +39,10 @@ class ChannelRepository:
         notifications_file: Path,
         credential_manager: CredentialManager | None = None,
     ):
-        self._backend = YAMLListBackend(notifications_file, list_key="channels")
         self._defaults_backend = YAMLBackend(notifications_file)
+        self._backend = YAMLListBackend(
+            notifications_file, list_key="channels", backend=self._defaults_backend
+        )
         self._creds = credential_manager or get_credential_manager()
 
     def find_all(self) -> list[Channel]:
@@ -68,11 +70,9 @@ class ChannelRepository:
 
     def save(self, channel: Channel) -> None:
         """Save a channel (create or update)."""
-        existing = self._backend.find_by_key("id", channel.id)
-        if existing:
-            self._backend.update_by_key("id", channel.id, channel.to_dict())
-        else:
-            self._backend.append(channel.to_dict())
+        with self._backend.transaction():
+            if not self._backend.update_by_key("id", channel.id, channel.to_dict()):
+                self._backend.append(channel.to_dict())
 
     def delete(self, channel_id: str) -> bool:
         """Delete a channel by ID.
@@ -83,21 +83,23 @@ class ChannelRepository:
 
     def enable(self, channel_id: str) -> bool:
         """Enable a channel."""
-        channel = self.find_by_id(channel_id)
-        if channel:
-            channel.enabled = True
-            self.save(channel)
-            return True
-        return False
+        with self._backend.transaction():
+            channel = self.find_by_id(channel_id)
+            if channel:
+                channel.enabled = True
+                self.save(channel)
+                return True
+            return False
 
     def disable(self, channel_id: str) -> bool:
         """Disable a channel."""
-        channel = self.find_by_id(channel_id)
-        if channel:
-            channel.enabled = False
-            self.save(channel)
-            return True
-        return False
+        with self._backend.transaction():
+            channel = self.find_by_id(channel_id)
+            if channel:
+                channel.enabled = False
+                self.save(channel)
+                return True
+            return False
 
     def get_defaults(self) -> NotificationDefaults:
         """Get default notification settings."""
@@ -106,9 +108,10 @@ class ChannelRepository:
 
     def save_defaults(self, defaults: NotificationDefaults) -> None:
         """Save default notification settings."""
-        data = self._defaults_backend.read()
-        data["defaults"] = defaults.to_dict()
-        self._defaults_backend.write(data)
+        with self._defaults_backend.transaction():
+            data = self._defaults_backend.read()
+            data["defaults"] = defaults.to_dict()
+            self._defaults_backend.write(data)
 
     def get_channel_with_credentials(self, channel_id: str) -> tuple[Channel, dict[str, str]]:
         """Get a channel with its resolved credentials.
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-import yaml
+from codegeass.storage.yaml_backend import YAMLBackend
 
 # Default location for CodeGeass home directory
 CODEGEASS_HOME = Path.home() / ".codegeass"
@@ -25,6 +25,8 @@ class CredentialManager:
 
     def __init__(self, credentials_file: Path = CREDENTIALS_FILE):
         self._file = credentials_file
+        # Owner read/write only
+        self._backend = YAMLBackend(credentials_file, mode=0o600)
         self._ensure_dir()
 
     def _ensure_dir(self) -> None:
@@ -33,22 +35,12 @@ class CredentialManager:
 
     def _read(self) -> dict[str, dict[str, str]]:
         """Read credentials file."""
-        if not self._file.exists():
-            return {}
-
-        with open(self._file) as f:
-            content = yaml.safe_load(f)
-            return content if content else {}
+        return self._backend.read()
 
     def _write(self, data: dict[str, dict[str, str]]) -> None:
-        """Write credentials file."""
+        """Write credentials file atomically with owner-only permissions."""
         self._ensure_dir()
-
-        with open(self._file, "w") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-
-        # Set restrictive permissions (owner read/write only)
-        self._file.chmod(0o600)
+        self._backend.write(data)
 
     def get(self, key: str) -> dict[str, str] | None:
         """Retrieve credentials for a key.
@@ -69,9 +61,10 @@ class CredentialManager:
             key: Credential key
             credentials: Dict of credential fields
         """
-        data = self._read()
-        data[key] = credentials
-        self._write(data)
+        with self._backend.transaction():
+            data = self._read()
+            data[key] = credentials
+            self._write(data)
 
     def delete(self, key: str) -> bool:
         """Delete credentials for a key.
@@ -82,12 +75,13 @@ class CredentialManager:
         Returns:
             True if deleted, False if not found
         """
-        data = self._read()
-        if key in data:
-            del data[key]
-            self._write(data)
-            return True
-        return False
+        with self._backend.transaction():
+            data = self._read()
+            if key in data:
+                del data[key]
+                self._write(data)
+                return True
+            return False
 
     def exists(self, key: str) -> bool:
         """Check if credentials exist for a key."""
@@ -107,13 +101,14 @@ class CredentialManager:
         Returns:
             True if updated, False if key not found
         """
-        data = self._read()
-        if key not in data:
-            return False
+        with self._backend.transaction():
+            data = self._read()
+            if key not in data:
+                return False
 
-        data[key].update(updates)
-        self._write(data)
-        return True
+            data[key].update(updates)
+            self._write(data)
+            return True
 
     def rename(self, old_key: str, new_key: str) -> bool:
         """Rename a credential key.
@@ -125,13 +120,14 @@ class CredentialManager:
         Returns:
             True if renamed, False if old_key not found or new_key exists
         """
-        data = self._read()
-        if old_key not in data or new_key in data:
-            return False
+        with self._backend.transaction():
+            data = self._read()
+            if old_key not in data or new_key in data:
+                return False
 
-        data[new_key] = data.pop(old_key)
-        self._write(data)
-        return True
+            data[new_key] = data.pop(old_key)
+            self._write(data)
+            return True
 
 
 # Global instance
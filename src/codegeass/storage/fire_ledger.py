@@ -0,0 +1,89 @@
+"""Ledger of the schedule instants each task has fired."""
+
+import json
+import logging
+import threading
+from contextlib import AbstractContextManager
+from datetime import datetime
+from pathlib import Path
+
+from codegeass.storage.atomic import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class FireLedger:
+    """Records, per task, the latest schedule instant a scheduler has fired.
+
+    Every scheduler (the CRON runner, the daemon, the dashboard) claims an
+    instant here before running the task for it, so an instant runs once
+    even across restarts and overlapping runners. A claim is a locked
+    read-modify-write of a small JSON file mapping task IDs to ISO
+    timestamps. Without a path the ledger lives in memory, for one process.
+    """
+
+    def __init__(self, path: Path | None = None):
+        """Initialize with the ledger file (None keeps the ledger in memory)."""
+        self._path = path
+        self._lock = threading.Lock()
+        self._memory: dict[str, str] = {}
+
+    def _read(self) -> dict[str, str]:
+        if self._path is None:
+            return dict(self._memory)
+        try:
+            data = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fire ledger {self._path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, entries: dict[str, str]) -> None:
+        if self._path is None:
+            self._memory = entries
+            return
+        atomic_write(self._path, json.dumps(entries, indent=2, sort_keys=True))
+
+    def _locked(self) -> AbstractContextManager[object]:
+        if self._path is None:
+            return self._lock
+        return file_lock(self._path)
+
+    def last_fired(self, task_id: str) -> datetime | None:
+        """Get the latest instant fired for the task, if any."""
+        value = self._read().get(task_id)
+        return datetime.fromisoformat(value) if value else None
+
+    def claim(self, task_id: str, instant: datetime, seed: datetime) -> datetime | None:
+        """Claim every instant of the task up to and including `instant`.
+
+        Args:
+            task_id: Task the instant belongs to
+            instant: Latest schedule instant to claim
+            seed: Last fired instant assumed for a task not in the ledger yet
+
+        Returns:
+            The last fired instant before this claim (or seed), or None if
+            `instant` was already claimed, in which case nothing changes
+        """
+        with self._locked():
+            entries = self._read()
+            previous = entries.get(task_id)
+            last = datetime.fromisoformat(previous) if previous else seed
+            if instant <= last:
+                return None
+            entries[task_id] = instant.isoformat()
+            self._write(entries)
+        return last
+
+    def prune(self, task_ids: set[str]) -> int:
+        """Drop the entries of tasks not in `task_ids`. Returns how many were dropped."""
+        with self._locked():
+            entries = self._read()
+            kept = {task_id: value for task_id, value in entries.items() if task_id in task_ids}
+            if len(kept) == len(entries):
+                return 0
+            self._write(kept)
+        return len(entries) - len(kept)
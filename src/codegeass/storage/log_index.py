@@ -0,0 +1,333 @@
+"""SQLite offset index for execution log JSONL files."""
+
+import bisect
+import json
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Bump when the schema changes; the index is derived data and is rebuilt lazily
+SCHEMA_VERSION = 2
+
+# Upper bounds (seconds) of the duration histogram buckets; a final bucket
+# collects everything longer
+HISTOGRAM_BOUNDS = (10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Number of most recent runs covered by the rolling duration histogram
+HISTOGRAM_WINDOW = 100
+
+_TABLES = ("log_files", "log_records", "log_aggregates")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_files (
+    name TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS log_records (
+    file TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (file, offset)
+);
+CREATE TABLE IF NOT EXISTS log_aggregates (
+    file TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    status_counts TEXT NOT NULL,
+    duration_sum REAL NOT NULL,
+    duration_sq_sum REAL NOT NULL,
+    last_started_at TEXT,
+    last_status TEXT,
+    histogram TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_records_started
+    ON log_records (file, started_at);
+CREATE INDEX IF NOT EXISTS idx_log_records_status
+    ON log_records (file, status, started_at);
+CREATE INDEX IF NOT EXISTS idx_log_records_task
+    ON log_records (file, task_id, started_at);
+"""
+
+# (offset, length, task_id, status, started_at, duration)
+IndexEntry = tuple[int, int, str, str, str, float]
+
+
+class LogIndex:
+    """Offset index over the JSONL execution logs.
+
+    The JSONL files stay the source of truth; the index maps each record to
+    its byte offset and length together with the fields used for filtering
+    (task_id, status, started_at). Queries run against SQLite B-tree indexes
+    and only the selected records are read back from disk.
+
+    The index catches up lazily: before a file is queried, any bytes appended
+    since the last sync (by this or another process) are scanned and indexed.
+    A file that shrank or was replaced is re-indexed from the start.
+
+    Each file also has a small aggregate row (status counts, duration sum and
+    sum of squares, last run, rolling duration histogram) updated in the same
+    transaction that indexes new records, so statistics are a single-row read.
+    """
+
+    def __init__(self, db_file: Path):
+        """Initialize with path to the SQLite database file."""
+        self._db_file = db_file
+        self._db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection in autocommit mode."""
+        with closing(sqlite3.connect(self._db_file, timeout=30, isolation_level=None)) as conn:
+            yield conn
+
+    def sync(self, log_file: Path) -> None:
+        """Index any records appended to a log file since the last sync."""
+        name = log_file.name
+        try:
+            stat = log_file.stat()
+        except FileNotFoundError:
+            stat = None
+
+        with self._connect() as conn:
+            if stat is not None and self._is_current(conn, name, stat.st_ino, stat.st_size):
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync_locked(conn, log_file, stat)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _is_current(self, conn: sqlite3.Connection, name: str, inode: int, size: int) -> bool:
+        """Check whether the indexed state of a file matches its stat."""
+        row = conn.execute("SELECT inode, size FROM log_files WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == inode and row[1] == size
+
+    def _sync_locked(self, conn: sqlite3.Connection, log_file: Path, stat: Any) -> None:
+        """Bring one file's index up to date. Caller holds the write lock."""
+        name = log_file.name
+        row = conn.execute("SELECT inode, size FROM log_files WHERE name = ?", (name,)).fetchone()
+
+        if stat is None:
+            if row is not None:
+                self._drop_locked(conn, name)
+            return
+
+        start = 0
+        if row is not None:
+            inode, size = row
+            if inode == stat.st_ino and size <= stat.st_size:
+                start = size
+            else:
+                self._drop_locked(conn, name)
+
+        entries, end = self._scan(log_file, start)
+        conn.executemany(
+            "INSERT OR REPLACE INTO log_records "
+            "(file, offset, length, task_id, status, started_at, duration) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(name, *entry) for entry in entries],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO log_files (name, inode, size) VALUES (?, ?, ?)",
+            (name, stat.st_ino, end),
+        )
+        if entries:
+            self._update_aggregate(conn, name, entries)
+
+    def _update_aggregate(
+        self, conn: sqlite3.Connection, name: str, entries: list[IndexEntry]
+    ) -> None:
+        """Fold newly indexed entries into a file's aggregate row."""
+        row = conn.execute(
+            "SELECT total, status_counts, duration_sum, duration_sq_sum, "
+            "last_started_at, last_status FROM log_aggregates WHERE file = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            total, status_counts, duration_sum, duration_sq_sum = 0, {}, 0.0, 0.0
+            last_started_at, last_status = None, None
+        else:
+            total, counts_json, duration_sum, duration_sq_sum, last_started_at, last_status = row
+            status_counts = json.loads(counts_json)
+
+        for _, _, _, status, started_at, duration in entries:
+            total += 1
+            status_counts[status] = status_counts.get(status, 0) + 1
+            duration_sum += duration
+            duration_sq_sum += duration * duration
+            if last_started_at is None or started_at >= last_started_at:
+                last_started_at, last_status = started_at, status
+
+        # The histogram covers the most recent runs, so recompute it from the
+        # last HISTOGRAM_WINDOW indexed records rather than accumulating
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for (duration,) in conn.execute(
+            "SELECT duration FROM log_records WHERE file = ? ORDER BY offset DESC LIMIT ?",
+            (name, HISTOGRAM_WINDOW),
+        ):
+            histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+
+        conn.execute(
+            "INSERT OR REPLACE INTO log_aggregates (file, total, status_counts, duration_sum, "
+            "duration_sq_sum, last_started_at, last_status, histogram) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                name,
+                total,
+                json.dumps(status_counts),
+                duration_sum,
+                duration_sq_sum,
+                last_started_at,
+                last_status,
+                json.dumps(histogram),
+            ),
+        )
+
+    def get_aggregate(self, log_file: Path) -> dict[str, Any] | None:
+        """Return the aggregate row for a log file, or None if it has no records."""
+        self.sync(log_file)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT total, status_counts, duration_sum, duration_sq_sum, "
+                "last_started_at, last_status, histogram FROM log_aggregates WHERE file = ?",
+                (log_file.name,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "total": row[0],
+            "status_counts": json.loads(row[1]),
+            "duration_sum": row[2],
+            "duration_sq_sum": row[3],
+            "last_started_at": row[4],
+            "last_status": row[5],
+            "histogram": json.loads(row[6]),
+        }
+
+    @staticmethod
+    def _scan(log_file: Path, start: int) -> tuple[list[IndexEntry], int]:
+        """Scan complete lines from a byte offset.
+
+        Returns the index entries found and the offset just past the last
+        complete line. A trailing partial line (a write in progress) is left
+        for the next sync.
+        """
+        entries: list[IndexEntry] = []
+        offset = start
+
+        with open(log_file, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                entry = _parse_entry(line)
+                if entry is not None:
+                    entries.append((offset, len(line), *entry))
+                offset += len(line)
+
+        return entries, offset
+
+    def query(
+        self,
+        log_file: Path,
+        task_id: str | None = None,
+        status: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[int, int]]:
+        """Return (offset, length) of matching records, most recent first."""
+        self.sync(log_file)
+
+        sql = "SELECT offset, length FROM log_records WHERE file = ?"
+        params: list[Any] = [log_file.name]
+        if task_id is not None:
+            sql += " AND task_id = ?"
+            params.append(task_id)
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status)
+        if start is not None:
+            sql += " AND started_at >= ?"
+            params.append(start.isoformat())
+        if end is not None:
+            sql += " AND started_at <= ?"
+            params.append(end.isoformat())
+        sql += " ORDER BY started_at DESC, offset DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            return [(row[0], row[1]) for row in conn.execute(sql, params)]
+
+    def drop(self, log_file: Path) -> None:
+        """Remove all index entries for a log file."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._drop_locked(conn, log_file.name)
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _drop_locked(conn: sqlite3.Connection, name: str) -> None:
+        """Delete a file's index entries. Caller holds the write lock."""
+        conn.execute("DELETE FROM log_records WHERE file = ?", (name,))
+        conn.execute("DELETE FROM log_files WHERE name = ?", (name,))
+        conn.execute("DELETE FROM log_aggregates WHERE file = ?", (name,))
+
+    def rebuild(self, log_files: list[Path]) -> int:
+        """Rebuild the index from scratch. Returns the number of records indexed."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in _TABLES:
+                    conn.execute(f"DELETE FROM {table}")
+                for log_file in log_files:
+                    try:
+                        stat = log_file.stat()
+                    except FileNotFoundError:
+                        continue
+                    self._sync_locked(conn, log_file, stat)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            return conn.execute("SELECT COUNT(*) FROM log_records").fetchone()[0]
+
+
+def _parse_entry(line: bytes) -> tuple[str, str, str, float] | None:
+    """Extract (task_id, status, started_at, duration) from a raw JSONL line."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        data = json.loads(line)
+        duration = data.get("duration_seconds")
+        if duration is None:
+            started = datetime.fromisoformat(data["started_at"])
+            duration = (datetime.fromisoformat(data["finished_at"]) - started).total_seconds()
+        return data["task_id"], data["status"], data["started_at"], float(duration)
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError):
+        return None
@@ -1,10 +1,22 @@
 """Execution log repository using JSON files."""
 
+import bisect
+import heapq
 import json
+import logging
+import math
+import sqlite3
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
+from codegeass.storage.atomic import file_lock
+from codegeass.storage.blob_store import BlobStore
+from codegeass.storage.log_index import HISTOGRAM_BOUNDS, HISTOGRAM_WINDOW, LogIndex
+from codegeass.storage.reverse_reader import iter_lines_reversed
+
+logger = logging.getLogger(__name__)
 
 
 class LogRepository:
@@ -12,12 +24,31 @@ class LogRepository:
 
     Stores logs in JSON Lines format (one JSON object per line).
     Each task has its own log file: {task_id}.jsonl
+
+    When a blob store is configured, large raw and parsed outputs are stored
+    there and log rows keep a preview plus a reference (see load_output and
+    load_clean_output).
+
+    Queries go through a SQLite offset index (index.db) so that only the
+    requested records are read and decoded. If the index cannot be used,
+    queries fall back to reading the JSONL files backwards from EOF.
     """
 
-    def __init__(self, logs_dir: Path):
-        """Initialize with path to logs directory."""
+    INDEX_FILE = "index.db"
+
+    def __init__(
+        self, logs_dir: Path, use_index: bool = True, blob_store: BlobStore | None = None
+    ):
+        """Initialize with path to logs directory and optional transcript blob store."""
         self._logs_dir = logs_dir
         self._logs_dir.mkdir(parents=True, exist_ok=True)
+        self._blob_store = blob_store
+        self._index: LogIndex | None = None
+        if use_index:
+            try:
+                self._index = LogIndex(self._logs_dir / self.INDEX_FILE)
+            except sqlite3.Error as e:
+                logger.warning(f"Log index unavailable, falling back to file scans: {e}")
 
     def _get_log_file(self, task_id: str) -> Path:
         """Get log file path for a task."""
@@ -29,19 +60,80 @@ class LogRepository:
 
     def save(self, result: ExecutionResult) -> None:
         """Save an execution result."""
-        # Save to task-specific file
+        data = result.to_dict()
+        if self._blob_store is not None:
+            data = self._blob_store.offload(data)
+            data = self._blob_store.offload(data, key="clean_output")
+
+        # Serialize once; the same line goes to both files
+        line = json.dumps(data) + "\n"
+
+        # Save to task-specific file; the lock keeps log compaction from
+        # replacing the file while the line is appended
         task_log = self._get_log_file(result.task_id)
-        with open(task_log, "a") as f:
-            f.write(json.dumps(result.to_dict()) + "\n")
+        with file_lock(task_log), open(task_log, "a") as f:
+            f.write(line)
 
         # Also save to aggregated file
         all_log = self._get_all_log_file()
-        with open(all_log, "a") as f:
-            f.write(json.dumps(result.to_dict()) + "\n")
+        with file_lock(all_log), open(all_log, "a") as f:
+            f.write(line)
 
-    def find_by_task_id(self, task_id: str, limit: int = 10) -> list[ExecutionResult]:
-        """Find execution results for a task, most recent first."""
-        log_file = self._get_log_file(task_id)
+        # Index right away so the per-task and global aggregates stay current
+        if self._index is not None:
+            try:
+                self._index.sync(task_log)
+                self._index.sync(all_log)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to index execution log: {e}")
+
+    def _query(
+        self,
+        log_file: Path,
+        task_id: str | None = None,
+        status: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[ExecutionResult] | None:
+        """Query a log file through the index.
+
+        Returns None if the index is disabled or fails, so callers can fall
+        back to a full scan.
+        """
+        if self._index is None:
+            return None
+        try:
+            positions = self._index.query(log_file, task_id, status, start, end, limit)
+        except sqlite3.Error as e:
+            logger.warning(f"Log index query failed, falling back to file scan: {e}")
+            return None
+        return self._read_at(log_file, positions)
+
+    @staticmethod
+    def _read_at(log_file: Path, positions: list[tuple[int, int]]) -> list[ExecutionResult]:
+        """Read and decode the records at the given (offset, length) positions."""
+        results: list[ExecutionResult] = []
+        if not positions:
+            return results
+
+        try:
+            with open(log_file, "rb") as f:
+                for offset, length in positions:
+                    f.seek(offset)
+                    try:
+                        data = json.loads(f.read(length))
+                        results.append(ExecutionResult.from_dict(data))
+                    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, ValueError):
+                        continue
+        except FileNotFoundError:
+            return []
+
+        return results
+
+    @staticmethod
+    def _scan(log_file: Path) -> list[ExecutionResult]:
+        """Read every record of a log file, most recent first."""
         if not log_file.exists():
             return []
 
@@ -56,9 +148,65 @@ class LogRepository:
                     except (json.JSONDecodeError, KeyError):
                         continue
 
-        # Sort by started_at descending and limit
+        # Sort by started_at descending
         results.sort(key=lambda r: r.started_at, reverse=True)
-        return results[:limit]
+        return results
+
+    def _tail(self, log_file: Path, limit: int) -> list[ExecutionResult]:
+        """Read the `limit` most recent records by walking the file backwards.
+
+        Records are appended when a run finishes, so reading backwards visits
+        them in descending finished_at order. Once `limit` candidates are held
+        and the current record finished before the oldest candidate started,
+        no earlier record can start later, and reading stops. If the file is
+        not in append order, fall back to a full scan and sort.
+        """
+        if limit <= 0 or not log_file.exists():
+            return []
+
+        # Min-heap of (started_at, seq, result) holding the best candidates
+        candidates: list[tuple[datetime, int, ExecutionResult]] = []
+        last_finished: datetime | None = None
+
+        for seq, line in enumerate(iter_lines_reversed(log_file)):
+            try:
+                result = ExecutionResult.from_dict(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, ValueError):
+                continue
+
+            if last_finished is not None and result.finished_at > last_finished:
+                return self._scan(log_file)[:limit]
+            last_finished = result.finished_at
+
+            if len(candidates) < limit:
+                heapq.heappush(candidates, (result.started_at, -seq, result))
+            elif result.finished_at <= candidates[0][0]:
+                break
+            elif result.started_at > candidates[0][0]:
+                heapq.heapreplace(candidates, (result.started_at, -seq, result))
+
+        return [item[2] for item in sorted(candidates, reverse=True)]
+
+    def load_output(self, result: ExecutionResult) -> str:
+        """Get the full raw output of a result, loading it from the blob store if needed."""
+        if self._blob_store is None:
+            return result.output
+        return self._blob_store.load(result.output, result.output_ref)
+
+    def load_clean_output(self, result: ExecutionResult) -> str:
+        """Get the full parsed output of a result, loading it from the blob store if needed."""
+        if self._blob_store is None:
+            return result.clean_output
+        return self._blob_store.load(result.clean_output, result.clean_output_ref)
+
+    def find_by_task_id(self, task_id: str, limit: int = 10) -> list[ExecutionResult]:
+        """Find execution results for a task, most recent first."""
+        log_file = self._get_log_file(task_id)
+        results = self._query(log_file, limit=limit)
+        if results is not None:
+            return results
+
+        return self._tail(log_file, limit)
 
     def find_latest(self, task_id: str) -> ExecutionResult | None:
         """Find the latest execution result for a task."""
@@ -68,26 +216,18 @@ class LogRepository:
     def find_all(self, limit: int = 100) -> list[ExecutionResult]:
         """Find all execution results, most recent first."""
         all_log = self._get_all_log_file()
-        if not all_log.exists():
-            return []
-
-        results = []
-        with open(all_log) as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        data = json.loads(line)
-                        results.append(ExecutionResult.from_dict(data))
-                    except (json.JSONDecodeError, KeyError):
-                        continue
+        results = self._query(all_log, limit=limit)
+        if results is not None:
+            return results
 
-        # Sort by started_at descending and limit
-        results.sort(key=lambda r: r.started_at, reverse=True)
-        return results[:limit]
+        return self._tail(all_log, limit)
 
     def find_by_status(self, status: str, limit: int = 100) -> list[ExecutionResult]:
         """Find execution results by status."""
+        results = self._query(self._get_all_log_file(), status=status, limit=limit)
+        if results is not None:
+            return results
+
         all_results = self.find_all(limit=limit * 10)  # Fetch more to filter
         filtered = [r for r in all_results if r.status.value == status]
         return filtered[:limit]
@@ -96,6 +236,11 @@ class LogRepository:
         self, start: datetime, end: datetime, task_id: str | None = None
     ) -> list[ExecutionResult]:
         """Find execution results within a date range."""
+        log_file = self._get_log_file(task_id) if task_id else self._get_all_log_file()
+        results = self._query(log_file, start=start, end=end)
+        if results is not None:
+            return results
+
         if task_id:
             results = self.find_by_task_id(task_id, limit=10000)
         else:
@@ -103,43 +248,112 @@ class LogRepository:
 
         return [r for r in results if start <= r.started_at <= end]
 
-    def get_task_stats(self, task_id: str) -> dict:
-        """Get execution statistics for a task."""
-        results = self.find_by_task_id(task_id, limit=1000)
+    def _get_aggregate(self, log_file: Path) -> dict[str, Any] | None:
+        """Read a file's aggregate from the index, computing it by scan if unavailable."""
+        if self._index is not None:
+            try:
+                return self._index.get_aggregate(log_file)
+            except sqlite3.Error as e:
+                logger.warning(f"Log index stats failed, falling back to file scan: {e}")
 
+        results = self._tail(log_file, 1000)
         if not results:
+            return None
+
+        status_counts: dict[str, int] = {}
+        for r in results:
+            status_counts[r.status.value] = status_counts.get(r.status.value, 0) + 1
+        durations = [r.duration_seconds for r in results]
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for duration in durations[:HISTOGRAM_WINDOW]:
+            histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+
+        return {
+            "total": len(results),
+            "status_counts": status_counts,
+            "duration_sum": sum(durations),
+            "duration_sq_sum": sum(d * d for d in durations),
+            "last_started_at": results[0].started_at.isoformat(),
+            "last_status": results[0].status.value,
+            "histogram": histogram,
+        }
+
+    @staticmethod
+    def _summarize(aggregate: dict[str, Any] | None) -> dict:
+        """Turn an aggregate into the stats dict returned to callers."""
+        if not aggregate or not aggregate["total"]:
             return {
                 "total_runs": 0,
                 "success_count": 0,
                 "failure_count": 0,
+                "timeout_count": 0,
+                "status_counts": {},
                 "success_rate": 0.0,
                 "avg_duration": 0.0,
+                "duration_stddev": 0.0,
+                "duration_histogram": [],
                 "last_run": None,
                 "last_status": None,
             }
 
-        success_count = sum(1 for r in results if r.status == ExecutionStatus.SUCCESS)
-        failure_count = sum(1 for r in results if r.status == ExecutionStatus.FAILURE)
-        durations = [r.duration_seconds for r in results]
+        total = aggregate["total"]
+        counts = aggregate["status_counts"]
+        success_count = counts.get(ExecutionStatus.SUCCESS.value, 0)
+        mean = aggregate["duration_sum"] / total
+        variance = max(aggregate["duration_sq_sum"] / total - mean * mean, 0.0)
+        bounds: list[int | None] = [*HISTOGRAM_BOUNDS, None]
 
         return {
-            "total_runs": len(results),
+            "total_runs": total,
             "success_count": success_count,
-            "failure_count": failure_count,
-            "success_rate": success_count / len(results) * 100 if results else 0.0,
-            "avg_duration": sum(durations) / len(durations) if durations else 0.0,
-            "last_run": results[0].started_at.isoformat() if results else None,
-            "last_status": results[0].status.value if results else None,
+            "failure_count": counts.get(ExecutionStatus.FAILURE.value, 0),
+            "timeout_count": counts.get(ExecutionStatus.TIMEOUT.value, 0),
+            "status_counts": counts,
+            "success_rate": success_count / total * 100,
+            "avg_duration": mean,
+            "duration_stddev": math.sqrt(variance),
+            "duration_histogram": [
+                {"max_seconds": bound, "count": count}
+                for bound, count in zip(bounds, aggregate["histogram"], strict=True)
+            ],
+            "last_run": aggregate["last_started_at"],
+            "last_status": aggregate["last_status"],
         }
 
+    def get_task_stats(self, task_id: str) -> dict:
+        """Get execution statistics for a task.
+
+        Served from the aggregate maintained as records are indexed, so the
+        cost does not grow with the task's history. The duration histogram
+        covers the last HISTOGRAM_WINDOW runs.
+        """
+        return self._summarize(self._get_aggregate(self._get_log_file(task_id)))
+
+    def get_overall_stats(self) -> dict:
+        """Get execution statistics across all tasks."""
+        return self._summarize(self._get_aggregate(self._get_all_log_file()))
+
     def clear_task_logs(self, task_id: str) -> bool:
         """Clear all logs for a task. Returns True if logs existed."""
         log_file = self._get_log_file(task_id)
         if log_file.exists():
             log_file.unlink()
+            if self._index is not None:
+                self._index.drop(log_file)
             return True
         return False
 
     def tail(self, task_id: str, lines: int = 20) -> list[ExecutionResult]:
         """Get the most recent N execution results for a task."""
         return self.find_by_task_id(task_id, limit=lines)
+
+    def reindex(self) -> int:
+        """Rebuild the log index and statistics from the existing JSONL files.
+
+        Used as a one-shot migration for log directories written before the
+        index existed, and to recompute the aggregates from the raw logs.
+        Returns the number of records indexed.
+        """
+        if self._index is None:
+            raise RuntimeError("Log index is disabled for this repository")
+        return self._index.rebuild(sorted(self._logs_dir.glob("*.jsonl")))
@@ -0,0 +1,363 @@
+"""Retention, rotation and compaction for execution logs and sessions."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from codegeass.storage.atomic import file_lock
+from codegeass.storage.blob_store import BlobStore
+
+logger = logging.getLogger(__name__)
+
+# Blobs younger than this are never collected; a run may have stored its
+# transcript but not yet written the row that references it
+BLOB_GRACE_SECONDS = 3600
+
+
+@dataclass
+class RetentionPolicy:
+    """Retention limits, read from the `retention` section of settings.yaml.
+
+    A value of 0 disables the corresponding limit. The defaults keep
+    everything, so nothing is removed until a policy is configured.
+    """
+
+    max_age_days: int = 0
+    max_runs_per_task: int = 0
+    max_total_bytes: int = 0
+    archive: bool = True
+    compact_interval_hours: int = 24
+
+    @property
+    def enabled(self) -> bool:
+        """Check if any limit is configured."""
+        return bool(self.max_age_days or self.max_runs_per_task or self.max_total_bytes)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RetentionPolicy":
+        """Create from a settings dictionary."""
+        return cls(
+            max_age_days=int(data.get("max_age_days", 0)),
+            max_runs_per_task=int(data.get("max_runs_per_task", 0)),
+            max_total_bytes=int(data.get("max_total_bytes", 0)),
+            archive=bool(data.get("archive", True)),
+            compact_interval_hours=int(data.get("compact_interval_hours", 24)),
+        )
+
+    @classmethod
+    def from_settings(cls, settings_file: Path) -> "RetentionPolicy":
+        """Load the policy from settings.yaml, falling back to defaults."""
+        if not settings_file.exists():
+            return cls()
+        try:
+            with open(settings_file) as f:
+                settings = yaml.safe_load(f) or {}
+            return cls.from_dict(settings.get("retention") or {})
+        except (yaml.YAMLError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid retention settings in {settings_file}: {e}")
+            return cls()
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of a compaction run."""
+
+    records_archived: int = 0
+    records_deleted: int = 0
+    segments_removed: int = 0
+    sessions_removed: int = 0
+    blobs_removed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """Convert to dictionary."""
+        return {
+            "records_archived": self.records_archived,
+            "records_deleted": self.records_deleted,
+            "segments_removed": self.segments_removed,
+            "sessions_removed": self.sessions_removed,
+            "blobs_removed": self.blobs_removed,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+        }
+
+
+@dataclass
+class _LogLine:
+    """A raw JSONL record with the fields retention decisions need."""
+
+    raw: bytes
+    started_at: datetime
+    # Blob references of the offloaded output and clean_output
+    refs: tuple[str, ...]
+
+    @property
+    def digest(self) -> bytes:
+        return hashlib.sha1(self.raw).digest()
+
+
+class LogRetention:
+    """Applies a RetentionPolicy to the logs, sessions and transcript blobs.
+
+    Compaction:
+    1. Per-task files keep records newer than max_age_days, capped at the
+       newest max_runs_per_task.
+    2. all.jsonl drops the same records plus anything past max_age_days.
+       Dropped records are moved to monthly gzip segments in logs/archive/
+       (archive: true) or deleted.
+    3. Session files older than max_age_days are removed.
+    4. Transcript blobs no longer referenced by a live log row or session
+       are removed. Archived rows keep only their output preview.
+    5. If the total still exceeds max_total_bytes, the oldest archive
+       segments are removed.
+
+    Live files are rewritten to a temp file and renamed over the original;
+    lines appended while compaction runs are carried over before the rename.
+    """
+
+    ARCHIVE_DIR = "archive"
+    STAMP_FILE = ".last_compaction"
+
+    def __init__(
+        self,
+        logs_dir: Path,
+        policy: RetentionPolicy,
+        sessions_dir: Path | None = None,
+        blob_store: BlobStore | None = None,
+        blobs_dir: Path | None = None,
+    ):
+        """Initialize with the directories the policy applies to."""
+        self._logs_dir = logs_dir
+        self._archive_dir = logs_dir / self.ARCHIVE_DIR
+        self._policy = policy
+        self._sessions_dir = sessions_dir
+        self._blob_store = blob_store
+        self._blobs_dir = blobs_dir
+
+    @property
+    def policy(self) -> RetentionPolicy:
+        """The policy being applied."""
+        return self._policy
+
+    def is_due(self, now: datetime | None = None) -> bool:
+        """Check if scheduled compaction should run now."""
+        if not self._policy.enabled:
+            return False
+        stamp = self._logs_dir / self.STAMP_FILE
+        if not stamp.exists():
+            return True
+        now = now or datetime.now()
+        last = datetime.fromtimestamp(stamp.stat().st_mtime)
+        return now - last >= timedelta(hours=self._policy.compact_interval_hours)
+
+    def compact_if_due(self) -> RetentionReport | None:
+        """Run compaction if the configured interval has elapsed."""
+        if not self.is_due():
+            return None
+        return self.compact()
+
+    def compact(self, now: datetime | None = None) -> RetentionReport:
+        """Apply the retention policy. Returns what was removed."""
+        now = now or datetime.now()
+        cutoff = None
+        if self._policy.max_age_days:
+            cutoff = now - timedelta(days=self._policy.max_age_days)
+        report = RetentionReport(bytes_before=self._total_bytes())
+        live_refs: set[str] = set()
+
+        # 1. Per-task files
+        removed: set[bytes] = set()
+        for log_file in sorted(self._logs_dir.glob("*.jsonl")):
+            if log_file.name == "all.jsonl":
+                continue
+            lines, scanned = self._read_lines(log_file)
+            kept = self._select_task_lines(lines, cutoff)
+            kept_ids = {id(line) for line in kept}
+            dropped = [line for line in lines if id(line) not in kept_ids]
+            removed.update(line.digest for line in dropped)
+            live_refs.update(ref for line in kept for ref in line.refs)
+            if dropped:
+                self._rewrite(log_file, kept, scanned)
+
+        # 2. Aggregated file, archiving what is dropped
+        all_log = self._logs_dir / "all.jsonl"
+        if all_log.exists():
+            lines, scanned = self._read_lines(all_log)
+            kept, dropped = [], []
+            for line in lines:
+                expired = cutoff is not None and line.started_at < cutoff
+                (dropped if expired or line.digest in removed else kept).append(line)
+            live_refs.update(ref for line in kept for ref in line.refs)
+            if dropped:
+                if self._policy.archive:
+                    self._archive(dropped)
+                    report.records_archived += len(dropped)
+                else:
+                    report.records_deleted += len(dropped)
+                self._rewrite(all_log, kept, scanned)
+
+        # 3. Sessions
+        if self._sessions_dir is not None:
+            report.sessions_removed = self._prune_sessions(cutoff, live_refs)
+
+        # 4. Transcript blobs
+        if self._blob_store is not None:
+            report.blobs_removed = self._collect_blobs(live_refs)
+
+        # 5. Size cap
+        if self._policy.max_total_bytes:
+            report.segments_removed = self._enforce_size_cap()
+
+        report.bytes_after = self._total_bytes()
+        (self._logs_dir / self.STAMP_FILE).touch()
+        logger.info(f"Log compaction finished: {report.to_dict()}")
+        return report
+
+    def _select_task_lines(self, lines: list[_LogLine], cutoff: datetime | None) -> list[_LogLine]:
+        """Choose the records a per-task file keeps, in file order."""
+        kept = [line for line in lines if cutoff is None or line.started_at >= cutoff]
+        limit = self._policy.max_runs_per_task
+        if limit and len(kept) > limit:
+            newest = sorted(kept, key=lambda line: line.started_at, reverse=True)[:limit]
+            newest_ids = {id(line) for line in newest}
+            kept = [line for line in kept if id(line) in newest_ids]
+        return kept
+
+    @staticmethod
+    def _read_lines(log_file: Path) -> tuple[list[_LogLine], int]:
+        """Read complete records from a log file.
+
+        Returns the records and the byte offset just past the last complete
+        line. Unparseable lines are kept as-is with a far-future timestamp so
+        compaction never deletes data it does not understand.
+        """
+        data = log_file.read_bytes()
+        scanned = data.rfind(b"\n") + 1
+        lines = []
+        for raw in data[:scanned].splitlines(keepends=True):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+                started_at = datetime.fromisoformat(record["started_at"])
+                refs = tuple(
+                    ref for ref in (record.get("output_ref"), record.get("clean_output_ref")) if ref
+                )
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError):
+                started_at, refs = datetime.max, ()
+            lines.append(_LogLine(raw=raw, started_at=started_at, refs=refs))
+        return lines, scanned
+
+    @staticmethod
+    def _rewrite(log_file: Path, kept: list[_LogLine], scanned: int) -> None:
+        """Atomically replace a log file with the kept records.
+
+        Bytes appended after `scanned` (by runs finishing during compaction)
+        are copied over unchanged before the rename. The file's lock is held
+        from that copy until the rename, so LogRepository.save() cannot append
+        to the old file in between.
+        """
+        tmp_file = log_file.with_name(f".{log_file.name}.compact")
+        with file_lock(log_file):
+            with open(tmp_file, "wb") as out:
+                out.writelines(line.raw for line in kept)
+                with open(log_file, "rb") as src:
+                    src.seek(scanned)
+                    shutil.copyfileobj(src, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_file, log_file)
+
+    def _archive(self, lines: list[_LogLine]) -> None:
+        """Append records to monthly gzip segments (archive/YYYY-MM.jsonl.gz)."""
+        self._archive_dir.mkdir(parents=True, exist_ok=True)
+        by_month: dict[str, list[bytes]] = {}
+        for line in lines:
+            if line.started_at == datetime.max:
+                month = "unknown"
+            else:
+                month = line.started_at.strftime("%Y-%m")
+            by_month.setdefault(month, []).append(line.raw)
+
+        # Each call appends a new gzip member; readers see one concatenated stream
+        for month, raws in by_month.items():
+            with gzip.open(self._archive_dir / f"{month}.jsonl.gz", "ab") as f:
+                f.writelines(raws)
+
+    def _prune_sessions(self, cutoff: datetime | None, live_refs: set[str]) -> int:
+        """Remove expired session files and collect refs of the remaining ones."""
+        assert self._sessions_dir is not None
+        removed = 0
+        cutoff_ts = cutoff.timestamp() if cutoff else None
+        for session_file in self._sessions_dir.glob("*.json"):
+            try:
+                if cutoff_ts is not None and session_file.stat().st_mtime < cutoff_ts:
+                    session_file.unlink()
+                    removed += 1
+                    continue
+                if self._blob_store is not None:
+                    with open(session_file) as f:
+                        ref = json.load(f).get("output_ref")
+                    if ref:
+                        live_refs.add(ref)
+            except (OSError, json.JSONDecodeError, AttributeError):
+                continue
+        return removed
+
+    def _collect_blobs(self, live_refs: set[str]) -> int:
+        """Remove blobs that nothing live references."""
+        assert self._blob_store is not None
+        removed = 0
+        grace_cutoff = time.time() - BLOB_GRACE_SECONDS
+        for ref in list(self._blob_store.refs()):
+            if ref in live_refs:
+                continue
+            if self._blob_store.modified_at(ref) > grace_cutoff:
+                continue
+            if self._blob_store.delete(ref):
+                removed += 1
+        return removed
+
+    def _enforce_size_cap(self) -> int:
+        """Remove the oldest archive segments until under max_total_bytes."""
+        removed = 0
+        segments = sorted(self._archive_dir.glob("*.jsonl.gz"))
+        total = self._total_bytes()
+        for segment in segments:
+            if total <= self._policy.max_total_bytes:
+                break
+            total -= segment.stat().st_size
+            segment.unlink()
+            removed += 1
+        if total > self._policy.max_total_bytes:
+            logger.warning(
+                f"Log storage is {total} bytes after compaction, above max_total_bytes "
+                f"({self._policy.max_total_bytes}); lower max_age_days or max_runs_per_task"
+            )
+        return removed
+
+    def _total_bytes(self) -> int:
+        """Total size of logs, archive segments, sessions and blobs."""
+        dirs = [self._logs_dir, self._sessions_dir, self._blobs_dir]
+        total = 0
+        for directory in dirs:
+            if directory is None or not directory.exists():
+                continue
+            for path in directory.rglob("*"):
+                try:
+                    if path.is_file():
+                        total += path.stat().st_size
+                except OSError:
+                    continue
+        return total
@@ -0,0 +1,361 @@
+"""SQLite outbox for notifications awaiting delivery."""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Bump when the schema changes; queued notifications are dropped on upgrade
+SCHEMA_VERSION = 2
+
+# Seconds a claimed entry stays invisible to other deliverers; an entry whose
+# deliverer died mid-send becomes due again once its claim expires
+CLAIM_SECONDS = 120.0
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+_TABLES = ("outbox", "message_refs")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    rate_limited INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS message_refs (
+    task_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    PRIMARY KEY (task_id, channel_id)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due
+    ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_chain
+    ON outbox (task_id, channel_id, status, id);
+"""
+
+_COLUMNS = (
+    "id, channel_id, provider, task_id, event, message, status, attempts, "
+    "created_at, next_attempt_at, last_error, rate_limited"
+)
+
+# Condition selecting entries with no earlier pending entry for the same task
+# and channel (bind the pending status)
+_CHAIN_HEAD = (
+    "NOT EXISTS (SELECT 1 FROM outbox p WHERE p.task_id = o.task_id "
+    "AND p.channel_id = o.channel_id AND p.status = ? AND p.id < o.id)"
+)
+
+
+@dataclass
+class OutboxEntry:
+    """A notification queued for one channel."""
+
+    id: int
+    channel_id: str
+    provider: str
+    task_id: str
+    event: str
+    message: str
+    status: str
+    attempts: int
+    created_at: float
+    next_attempt_at: float
+    last_error: str | None = None
+    # Sends refused by the provider's rate limit; these are not attempts
+    rate_limited: int = 0
+
+    @classmethod
+    def _from_row(cls, row: tuple[Any, ...]) -> "OutboxEntry":
+        return cls(*row)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "channel_id": self.channel_id,
+            "provider": self.provider,
+            "task_id": self.task_id,
+            "event": self.event,
+            "message": self.message,
+            "status": self.status,
+            "attempts": self.attempts,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "next_attempt_at": datetime.fromtimestamp(self.next_attempt_at).isoformat(),
+            "last_error": self.last_error,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class NotificationOutbox:
+    """Durable queue of formatted notifications, one row per channel.
+
+    Entries stay in the outbox until a provider accepts them: delivered
+    entries are deleted, failed ones are rescheduled, and entries that can
+    never be delivered are kept as dead letters for inspection and replay.
+
+    Entries for the same task and channel form a chain that is delivered
+    strictly in order, so a completion is never sent before the start
+    message it edits. The message IDs those edits need are stored alongside
+    the queue, which lets a retry in a later process still edit the
+    original message.
+
+    Several processes (cron runner, daemon, dashboard) may deliver from the
+    same outbox; claim_due() leases entries so each is sent by one of them.
+    Without a database file the outbox lives in memory for this process.
+    """
+
+    def __init__(self, db_file: Path | None = None):
+        """Initialize with path to the SQLite database file (None for in-memory)."""
+        self._db_file = db_file
+        self._lock = threading.Lock()
+        self._memory: sqlite3.Connection | None = None
+        if db_file is None:
+            self._memory = sqlite3.connect(
+                ":memory:", isolation_level=None, check_same_thread=False
+            )
+        else:
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+
+    @property
+    def db_file(self) -> Path | None:
+        """Path to the database file, None when in memory."""
+        return self._db_file
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection in autocommit mode."""
+        if self._memory is not None:
+            with self._lock:
+                yield self._memory
+            return
+        with closing(sqlite3.connect(self._db_file, timeout=30, isolation_level=None)) as conn:
+            yield conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction holding the database write lock."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(
+        self,
+        channel_id: str,
+        provider: str,
+        task_id: str,
+        event: str,
+        message: str,
+        now: float | None = None,
+    ) -> int:
+        """Queue a formatted message for a channel.
+
+        Returns:
+            The new entry's ID
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (channel_id, provider, task_id, event, message, status, "
+                "created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (channel_id, provider, task_id, event, message, STATUS_PENDING, now, now),
+            )
+            return int(cursor.lastrowid)
+
+    def claim_due(
+        self,
+        now: float | None = None,
+        limit: int = 50,
+        claim_seconds: float = CLAIM_SECONDS,
+    ) -> list[OutboxEntry]:
+        """Claim the due entries at the head of their task/channel chains.
+
+        An entry is only due once every earlier pending entry of its chain
+        has been delivered (or dead-lettered), and is hidden from other
+        deliverers for claim_seconds.
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM outbox o "
+                "WHERE status = ? AND next_attempt_at <= ? AND claimed_until <= ? "
+                f"AND {_CHAIN_HEAD} ORDER BY next_attempt_at, id LIMIT ?",
+                (STATUS_PENDING, now, now, STATUS_PENDING, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET claimed_until = ? WHERE id = ?",
+                [(now + claim_seconds, row[0]) for row in rows],
+            )
+        return [OutboxEntry._from_row(row) for row in rows]
+
+    def mark_sent(self, entry_id: int) -> None:
+        """Remove a delivered entry."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def reschedule(
+        self, entry_id: int, next_attempt_at: float, error: str, rate_limited: bool = False
+    ) -> None:
+        """Record a failed send and release the claim until the next attempt.
+
+        A rate-limited send is counted separately and leaves attempts, the
+        count the retry limit applies to, unchanged.
+        """
+        counter = "rate_limited" if rate_limited else "attempts"
+        with self._transaction() as conn:
+            conn.execute(
+                f"UPDATE outbox SET {counter} = {counter} + 1, next_attempt_at = ?, "
+                "claimed_until = 0, last_error = ? WHERE id = ?",
+                (next_attempt_at, error, entry_id),
+            )
+
+    def release(self, entry_id: int) -> None:
+        """Give up a claim without counting an attempt."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE outbox SET claimed_until = 0 WHERE id = ?", (entry_id,))
+
+    def mark_dead(self, entry_id: int, error: str) -> None:
+        """Move an entry to the dead letters."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, claimed_until = 0, "
+                "last_error = ? WHERE id = ?",
+                (STATUS_DEAD, error, entry_id),
+            )
+
+    def get(self, entry_id: int) -> OutboxEntry | None:
+        """Get an entry by ID."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM outbox WHERE id = ?", (entry_id,)
+            ).fetchone()
+        return OutboxEntry._from_row(row) if row else None
+
+    def find(self, status: str | None = None, limit: int | None = None) -> list[OutboxEntry]:
+        """List entries oldest first, optionally filtered by status."""
+        query = f"SELECT {_COLUMNS} FROM outbox"
+        params: list[Any] = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [OutboxEntry._from_row(row) for row in conn.execute(query, params)]
+
+    def next_attempt_at(self) -> float | None:
+        """Earliest time claim_due() can return an entry, None if none are pending."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(MAX(next_attempt_at, claimed_until)) FROM outbox o "
+                f"WHERE status = ? AND {_CHAIN_HEAD}",
+                (STATUS_PENDING, STATUS_PENDING),
+            ).fetchone()
+        return row[0]
+
+    def counts(self) -> dict[str, int]:
+        """Count entries by status."""
+        counts = {STATUS_PENDING: 0, STATUS_DEAD: 0}
+        with self._connect() as conn:
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ):
+                counts[status] = count
+        return counts
+
+    def replay(self, entry_ids: Iterable[int] | None = None, now: float | None = None) -> int:
+        """Requeue dead letters (all of them when no IDs are given).
+
+        Returns:
+            Number of entries requeued
+        """
+        now = time.time() if now is None else now
+        query = (
+            "UPDATE outbox SET status = ?, attempts = 0, rate_limited = 0, next_attempt_at = ?, "
+            "claimed_until = 0 WHERE status = ?"
+        )
+        params: list[Any] = [STATUS_PENDING, now, STATUS_DEAD]
+        query, params = _filter_ids(query, params, entry_ids)
+        with self._transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def purge(self, status: str = STATUS_DEAD, entry_ids: Iterable[int] | None = None) -> int:
+        """Delete entries with a status (all of them when no IDs are given).
+
+        Returns:
+            Number of entries deleted
+        """
+        query, params = _filter_ids("DELETE FROM outbox WHERE status = ?", [status], entry_ids)
+        with self._transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def get_message_ref(self, task_id: str, channel_id: str) -> int | str | None:
+        """Get the provider message ID a task's next message to a channel should edit."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT message_id FROM message_refs WHERE task_id = ? AND channel_id = ?",
+                (task_id, channel_id),
+            ).fetchone()
+        if row is None:
+            return None
+        # Telegram message IDs are integers
+        return int(row[0]) if row[0].isdigit() else row[0]
+
+    def set_message_ref(self, task_id: str, channel_id: str, message_id: Any) -> None:
+        """Remember the message sent to a channel for a task's later edits."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO message_refs (task_id, channel_id, message_id) "
+                "VALUES (?, ?, ?)",
+                (task_id, channel_id, str(message_id)),
+            )
+
+    def clear_message_ref(self, task_id: str, channel_id: str) -> None:
+        """Forget a task's message in a channel once its run is over."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM message_refs WHERE task_id = ? AND channel_id = ?",
+                (task_id, channel_id),
+            )
+
+
+def _filter_ids(
+    query: str, params: list[Any], entry_ids: Iterable[int] | None
+) -> tuple[str, list[Any]]:
+    """Restrict a statement to the given entry IDs, if any."""
+    if entry_ids is None:
+        return query, params
+    ids = list(entry_ids)
+    query += f" AND id IN ({', '.join('?' * len(ids))})"
+    return query, params + ids
@@ -3,9 +3,8 @@
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from codegeass.core.entities import Project
+from codegeass.storage.yaml_backend import YAMLBackend
 
 
 class ProjectRepository:
@@ -25,13 +24,15 @@ class ProjectRepository:
             registry_file: Path to the registry file. Defaults to ~/.codegeass/projects.yaml
         """
         self._file = registry_file or self.DEFAULT_REGISTRY_PATH
+        self._backend = YAMLBackend(self._file)
 
     # Default enabled platforms
     DEFAULT_PLATFORMS = ["claude", "codex"]
 
     def _read(self) -> dict[str, Any]:
         """Read the registry file."""
-        if not self._file.exists():
+        content = self._backend.read()
+        if not content:
             return {
                 "version": self.CURRENT_VERSION,
                 "default_project": None,
@@ -39,27 +40,14 @@ class ProjectRepository:
                 "shared_skills_dir": str(Path.home() / ".codegeass" / "skills"),
                 "projects": [],
             }
-
-        with open(self._file) as f:
-            content = yaml.safe_load(f)
-            if not content:
-                return {
-                    "version": self.CURRENT_VERSION,
-                    "default_project": None,
-                    "enabled_platforms": self.DEFAULT_PLATFORMS.copy(),
-                    "shared_skills_dir": str(Path.home() / ".codegeass" / "skills"),
-                    "projects": [],
-                }
-            # Ensure enabled_platforms exists for backward compatibility
-            if "enabled_platforms" not in content:
-                content["enabled_platforms"] = self.DEFAULT_PLATFORMS.copy()
-            return content
+        # Ensure enabled_platforms exists for backward compatibility
+        if "enabled_platforms" not in content:
+            content["enabled_platforms"] = self.DEFAULT_PLATFORMS.copy()
+        return content
 
     def _write(self, data: dict[str, Any]) -> None:
         """Write the registry file."""
-        self._file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._file, "w") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        self._backend.write(data)
 
     def find_all(self) -> list[Project]:
         """Find all registered projects."""
@@ -104,21 +92,22 @@ class ProjectRepository:
 
     def save(self, project: Project) -> None:
         """Save a new project or update existing one."""
-        data = self._read()
-        projects = data.get("projects", [])
-
-        # Check if project already exists (by ID)
-        for i, item in enumerate(projects):
-            if item.get("id") == project.id:
-                projects[i] = project.to_dict()
-                data["projects"] = projects
-                self._write(data)
-                return
-
-        # Add new project
-        projects.append(project.to_dict())
-        data["projects"] = projects
-        self._write(data)
+        with self._backend.transaction():
+            data = self._read()
+            projects = data.get("projects", [])
+
+            # Check if project already exists (by ID)
+            for i, item in enumerate(projects):
+                if item.get("id") == project.id:
+                    projects[i] = project.to_dict()
+                    data["projects"] = projects
+                    self._write(data)
+                    return
+
+            # Add new project
+            projects.append(project.to_dict())
+            data["projects"] = projects
+            self._write(data)
 
     def delete(self, project_id: str) -> bool:
         """Delete a project by ID. Returns True if deleted.
@@ -126,20 +115,21 @@ class ProjectRepository:
         Note: This only removes the project from the registry.
         The actual project files are not deleted.
         """
-        data = self._read()
-        projects = data.get("projects", [])
-        original_len = len(projects)
+        with self._backend.transaction():
+            data = self._read()
+            projects = data.get("projects", [])
+            original_len = len(projects)
 
-        projects = [item for item in projects if item.get("id") != project_id]
+            projects = [item for item in projects if item.get("id") != project_id]
 
-        if len(projects) < original_len:
-            data["projects"] = projects
-            # Clear default if deleted project was default
-            if data.get("default_project") == project_id:
-                data["default_project"] = None
-            self._write(data)
-            return True
-        return False
+            if len(projects) < original_len:
+                data["projects"] = projects
+                # Clear default if deleted project was default
+                if data.get("default_project") == project_id:
+                    data["default_project"] = None
+                self._write(data)
+                return True
+            return False
 
     def delete_by_name(self, name: str) -> bool:
         """Delete a project by name. Returns True if deleted."""
@@ -166,13 +156,14 @@ class ProjectRepository:
         Raises:
             ValueError: If project with given ID doesn't exist
         """
-        project = self.find_by_id(project_id)
-        if not project:
-            raise ValueError(f"Project not found: {project_id}")
+        with self._backend.transaction():
+            project = self.find_by_id(project_id)
+            if not project:
+                raise ValueError(f"Project not found: {project_id}")
 
-        data = self._read()
-        data["default_project"] = project_id
-        self._write(data)
+            data = self._read()
+            data["default_project"] = project_id
+            self._write(data)
 
     def set_default_project_by_name(self, name: str) -> None:
         """Set the default project by name.
@@ -187,9 +178,10 @@ class ProjectRepository:
 
     def clear_default_project(self) -> None:
         """Clear the default project setting."""
-        data = self._read()
-        data["default_project"] = None
-        self._write(data)
+        with self._backend.transaction():
+            data = self._read()
+            data["default_project"] = None
+            self._write(data)
 
     def get_shared_skills_dir(self) -> Path | None:
         """Get the shared skills directory path."""
@@ -202,9 +194,10 @@ class ProjectRepository:
 
     def set_shared_skills_dir(self, path: Path) -> None:
         """Set the shared skills directory path."""
-        data = self._read()
-        data["shared_skills_dir"] = str(path.resolve())
-        self._write(data)
+        with self._backend.transaction():
+            data = self._read()
+            data["shared_skills_dir"] = str(path.resolve())
+            self._write(data)
 
     def exists(self) -> bool:
         """Check if the registry file exists."""
@@ -216,21 +209,23 @@ class ProjectRepository:
 
     def enable(self, project_id: str) -> bool:
         """Enable a project. Returns True if successful."""
-        project = self.find_by_id(project_id)
-        if project:
-            project.enabled = True
-            self.save(project)
-            return True
-        return False
+        with self._backend.transaction():
+            project = self.find_by_id(project_id)
+            if project:
+                project.enabled = True
+                self.save(project)
+                return True
+            return False
 
     def disable(self, project_id: str) -> bool:
         """Disable a project. Returns True if successful."""
-        project = self.find_by_id(project_id)
-        if project:
-            project.enabled = False
-            self.save(project)
-            return True
-        return False
+        with self._backend.transaction():
+            project = self.find_by_id(project_id)
+            if project:
+                project.enabled = False
+                self.save(project)
+                return True
+            return False
 
     # Platform management methods
 
@@ -245,9 +240,10 @@ class ProjectRepository:
         Args:
             platforms: List of platform names (e.g., ['claude', 'codex'])
         """
-        data = self._read()
-        data["enabled_platforms"] = platforms
-        self._write(data)
+        with self._backend.transaction():
+            data = self._read()
+            data["enabled_platforms"] = platforms
+            self._write(data)
 
     def enable_platform(self, platform: str) -> bool:
         """Enable a platform. Returns True if platform was added.
@@ -258,13 +254,14 @@ class ProjectRepository:
         Returns:
             True if platform was added, False if already enabled
         """
-        platforms = self.get_enabled_platforms()
-        platform = platform.lower()
-        if platform not in platforms:
-            platforms.append(platform)
-            self.set_enabled_platforms(platforms)
-            return True
-        return False
+        with self._backend.transaction():
+            platforms = self.get_enabled_platforms()
+            platform = platform.lower()
+            if platform not in platforms:
+                platforms.append(platform)
+                self.set_enabled_platforms(platforms)
+                return True
+            return False
 
     def disable_platform(self, platform: str) -> bool:
         """Disable a platform. Returns True if platform was removed.
@@ -275,13 +272,14 @@ class ProjectRepository:
         Returns:
             True if platform was removed, False if not enabled
         """
-        platforms = self.get_enabled_platforms()
-        platform = platform.lower()
-        if platform in platforms:
-            platforms.remove(platform)
-            self.set_enabled_platforms(platforms)
-            return True
-        return False
+        with self._backend.transaction():
+            platforms = self.get_enabled_platforms()
+            platform = platform.lower()
+            if platform in platforms:
+                platforms.remove(platform)
+                self.set_enabled_platforms(platforms)
+                return True
+            return False
 
     def is_platform_enabled(self, platform: str) -> bool:
         """Check if a platform is enabled.
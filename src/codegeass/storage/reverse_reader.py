@@ -0,0 +1,43 @@
+"""Backwards line reader for append-only JSONL files."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+# Bytes read per seek when walking a file backwards from EOF
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(path: Path, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file from last to first.
+
+    Reads fixed-size blocks backwards from EOF, so the cost of reading the
+    last N lines depends on their size, not on the size of the file. Lines
+    spanning several blocks are assembled without re-copying earlier blocks.
+    Trailing newlines are not included in the yielded lines.
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        pending: list[bytes] = []  # Pieces of the line being assembled, last piece first
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+
+            end = len(block)
+            newline = block.rfind(b"\n", 0, end)
+            while newline != -1:
+                pending.append(block[newline + 1 : end])
+                line = b"".join(reversed(pending))
+                pending = []
+                if line.strip():
+                    yield line
+                end = newline
+                newline = block.rfind(b"\n", 0, end)
+            pending.append(block[:end])
+
+        line = b"".join(reversed(pending))
+        if line.strip():
+            yield line
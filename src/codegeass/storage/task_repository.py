@@ -1,5 +1,6 @@
 """Task repository implementation using YAML backend."""
 
+from contextlib import AbstractContextManager
 from pathlib import Path
 
 from codegeass.core.entities import Task
@@ -13,13 +14,18 @@ class TaskRepository:
         """Initialize with path to schedules.yaml."""
         self._backend = YAMLListBackend(schedules_file, list_key="tasks")
 
+    def batch(self) -> AbstractContextManager[None]:
+        """Group several updates into one locked read-modify-write of schedules.yaml."""
+        return self._backend.transaction()
+
     def save(self, task: Task) -> None:
         """Save a new task or update existing one."""
-        existing = self.find_by_id(task.id)
-        if existing:
-            self.update(task)
-        else:
-            self._backend.append(task.to_dict())
+        with self._backend.transaction():
+            existing = self.find_by_id(task.id)
+            if existing:
+                self.update(task)
+            else:
+                self._backend.append(task.to_dict())
 
     def find_by_id(self, task_id: str) -> Task | None:
         """Find task by ID."""
@@ -59,18 +65,20 @@ class TaskRepository:
 
     def enable(self, task_id: str) -> bool:
         """Enable a task. Returns True if successful."""
-        task = self.find_by_id(task_id)
-        if task:
-            task.enabled = True
-            self.update(task)
-            return True
-        return False
+        with self._backend.transaction():
+            task = self.find_by_id(task_id)
+            if task:
+                task.enabled = True
+                self.update(task)
+                return True
+            return False
 
     def disable(self, task_id: str) -> bool:
         """Disable a task. Returns True if successful."""
-        task = self.find_by_id(task_id)
-        if task:
-            task.enabled = False
-            self.update(task)
-            return True
-        return False
+        with self._backend.transaction():
+            task = self.find_by_id(task_id)
+            if task:
+                task.enabled = False
+                self.update(task)
+                return True
+            return False
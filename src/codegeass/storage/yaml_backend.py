@@ -1,32 +1,138 @@
 """YAML file backend for configuration storage."""
 
+import copy
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from codegeass.storage.atomic import atomic_write, file_lock
+
+# libyaml's loader is an order of magnitude faster when available
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# (st_mtime_ns, st_size, st_ino) identifying the file contents last loaded
+FileStamp = tuple[int, int, int]
+
 
 class YAMLBackend:
-    """Low-level YAML file operations."""
+    """Low-level YAML file operations.
+
+    Keeps the parsed file in memory and re-reads it only when its mtime,
+    size or inode changes, so repeated reads of an unchanged file are served
+    without parsing. Writes are write-through: the in-memory image is
+    replaced with the written data.
+
+    Writes replace the file atomically while holding an advisory file lock.
+    Read-modify-write cycles and groups of updates run inside transaction(),
+    which holds the lock throughout and writes the file once at the end.
+    """
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, mode: int | None = None):
+        """Initialize with the file path and optional permission bits for new files."""
         self.file_path = file_path
+        self._mode = mode
+        self._lock = threading.RLock()
+        self._image: dict[str, Any] = {}
+        self._stamp: FileStamp | None = None
+        self._valid = False
+        self._version = 0
+        self._depth = 0
+        self._dirty = False
+
+    def _stat(self) -> FileStamp | None:
+        """Get the current stamp of the file, or None if it does not exist."""
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load(self) -> dict[str, Any]:
+        """Get the cached image of the file, reloading it if the file changed.
+
+        The returned dict is shared; callers must not mutate it. Use read()
+        for a private copy.
+        """
+        with self._lock:
+            if self._dirty:
+                # Staged in the current transaction, newer than the file
+                return self._image
+            stamp = self._stat()
+            if stamp != self._stamp or not self._valid:
+                if stamp is None:
+                    self._image = {}
+                else:
+                    with open(self.file_path) as f:
+                        content = yaml.load(f, Loader=_SafeLoader)
+                    self._image = content if content else {}
+                self._stamp = stamp
+                self._valid = True
+                self._version += 1
+            return self._image
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock guarding the cached image, for multi-step read-modify-write."""
+        return self._lock
+
+    @property
+    def version(self) -> int:
+        """Counter incremented whenever the cached image is replaced."""
+        return self._version
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the file lock and batch all writes made inside into one.
+
+        Reads inside the transaction see staged writes. If the block raises,
+        staged writes are discarded. Transactions nest; only the outermost
+        one writes.
+        """
+        with self._lock, file_lock(self.file_path):
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                if self._depth == 1 and self._dirty:
+                    self._dirty = False
+                    self._valid = False
+                raise
+            else:
+                if self._depth == 1 and self._dirty:
+                    self._flush()
+            finally:
+                self._depth -= 1
+
+    def _flush(self) -> None:
+        """Write the staged image to disk."""
+        text = yaml.dump(
+            self._image, default_flow_style=False, sort_keys=False, allow_unicode=True
+        )
+        try:
+            atomic_write(self.file_path, text, mode=self._mode)
+        except BaseException:
+            self._valid = False
+            raise
+        finally:
+            self._dirty = False
+        self._stamp = self._stat()
+        self._valid = True
 
     def read(self) -> dict[str, Any]:
         """Read YAML file and return contents as dict."""
-        if not self.file_path.exists():
-            return {}
-
-        with open(self.file_path) as f:
-            content = yaml.safe_load(f)
-            return content if content else {}
+        return copy.deepcopy(self.load())
 
     def write(self, data: dict[str, Any]) -> None:
         """Write dict to YAML file."""
-        self.file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(self.file_path, "w") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        with self.transaction():
+            self._image = copy.deepcopy(data)
+            self._dirty = True
+            self._version += 1
 
     def exists(self) -> bool:
         """Check if file exists."""
@@ -34,61 +140,116 @@ class YAMLBackend:
 
     def delete(self) -> bool:
         """Delete the file if it exists."""
-        if self.file_path.exists():
-            self.file_path.unlink()
-            return True
-        return False
+        with self.transaction():
+            self._dirty = False
+            self._image = {}
+            self._stamp = None
+            self._valid = True
+            self._version += 1
+            if self.file_path.exists():
+                self.file_path.unlink()
+                return True
+            return False
 
 
 class YAMLListBackend:
-    """YAML backend for list-based storage (schedules.yaml)."""
+    """YAML backend for list-based storage (schedules.yaml).
 
-    def __init__(self, file_path: Path, list_key: str = "tasks"):
+    Lookups by key go through per-key indexes over the cached image, built
+    on first use and discarded whenever the image changes.
+    """
+
+    def __init__(
+        self, file_path: Path, list_key: str = "tasks", backend: YAMLBackend | None = None
+    ):
         self.file_path = file_path
         self.list_key = list_key
-        self._backend = YAMLBackend(file_path)
+        # Share the backend with other views of the same file to share its cache
+        self._backend = backend or YAMLBackend(file_path)
+        self._indexes: dict[str, dict[Any, int]] = {}
+        self._indexed_version = -1
+
+    def _items(self) -> list[dict[str, Any]]:
+        """Get the cached (shared) list of items."""
+        return self._backend.load().get(self.list_key) or []
+
+    def _index(self, key: str) -> dict[Any, int]:
+        """Get the value -> position index for a key. Must hold the backend lock."""
+        items = self._items()
+        if self._indexed_version != self._backend.version:
+            self._indexes = {}
+            self._indexed_version = self._backend.version
+
+        index = self._indexes.get(key)
+        if index is None:
+            index = {}
+            for i, item in enumerate(items):
+                value = item.get(key)
+                try:
+                    index.setdefault(value, i)  # First match wins, as in a linear scan
+                except TypeError:
+                    continue
+            self._indexes[key] = index
+        return index
+
+    def _position(self, key: str, value: Any) -> int | None:
+        """Find the position of the first item matching key-value."""
+        try:
+            return self._index(key).get(value)
+        except TypeError:
+            # Unhashable value: fall back to a scan
+            for i, item in enumerate(self._items()):
+                if item.get(key) == value:
+                    return i
+            return None
 
     def read_all(self) -> list[dict[str, Any]]:
         """Read all items from the list."""
-        data = self._backend.read()
-        return data.get(self.list_key, [])
+        with self._backend.lock:
+            return copy.deepcopy(self._items())
+
+    def transaction(self) -> AbstractContextManager[None]:
+        """Lock the file and batch the writes made inside into one (see YAMLBackend)."""
+        return self._backend.transaction()
 
     def write_all(self, items: list[dict[str, Any]]) -> None:
         """Write all items to the list."""
-        data = self._backend.read()
-        data[self.list_key] = items
-        self._backend.write(data)
+        with self._backend.transaction():
+            data = dict(self._backend.load())
+            data[self.list_key] = items
+            self._backend.write(data)
 
     def append(self, item: dict[str, Any]) -> None:
         """Append an item to the list."""
-        items = self.read_all()
-        items.append(item)
-        self.write_all(items)
+        with self._backend.transaction():
+            self.write_all([*self._items(), item])
 
     def find_by_key(self, key: str, value: Any) -> dict[str, Any] | None:
         """Find an item by key-value match."""
-        for item in self.read_all():
-            if item.get(key) == value:
-                return item
-        return None
+        with self._backend.lock:
+            position = self._position(key, value)
+            if position is None:
+                return None
+            return copy.deepcopy(self._items()[position])
 
     def update_by_key(self, key: str, value: Any, new_item: dict[str, Any]) -> bool:
         """Update an item matching key-value. Returns True if found and updated."""
-        items = self.read_all()
-        for i, item in enumerate(items):
-            if item.get(key) == value:
-                items[i] = new_item
-                self.write_all(items)
-                return True
-        return False
+        with self._backend.transaction():
+            position = self._position(key, value)
+            if position is None:
+                return False
+            items = list(self._items())
+            items[position] = new_item
+            self.write_all(items)
+            return True
 
     def delete_by_key(self, key: str, value: Any) -> bool:
         """Delete an item matching key-value. Returns True if found and deleted."""
-        items = self.read_all()
-        original_len = len(items)
-        items = [item for item in items if item.get(key) != value]
+        with self._backend.transaction():
+            items = self._items()
+            kept = [item for item in items if item.get(key) != value]
 
-        if len(items) < original_len:
-            self.write_all(items)
-            return True
-        return False
+            if len(kept) < len(items):
+                self.write_all(kept)
+                return True
+            return False
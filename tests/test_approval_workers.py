@@ -0,0 +1,233 @@
+"""Tests for running approval executions on the worker pool."""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
+from codegeass.execution.plan_approval import ApprovalStatus, PendingApproval
+from codegeass.execution.plan_service import approval_handler as handler_module
+from codegeass.execution.plan_service.approval_handler import ApprovalHandler
+from codegeass.execution.plan_service.worker_pool import ApprovalWorkerPool
+from codegeass.execution.tracker import ExecutionTracker
+
+
+async def count_ticks(stop: asyncio.Event) -> int:
+    """Count how often the event loop gets to run us until stopped."""
+    ticks = 0
+    while not stop.is_set():
+        ticks += 1
+        await asyncio.sleep(0.01)
+    return ticks
+
+
+class TestApprovalWorkerPool:
+    """Tests for ApprovalWorkerPool."""
+
+    async def test_run_leaves_event_loop_free(self):
+        pool = ApprovalWorkerPool(max_workers=1)
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(count_ticks(stop))
+
+        result = await pool.run("a1", lambda: time.sleep(0.3) or "done")
+        stop.set()
+
+        assert result == "done"
+        assert await ticker >= 10
+        pool.shutdown()
+
+    async def test_queue_respects_concurrency_limit(self):
+        pool = ApprovalWorkerPool(max_workers=1)
+        release = threading.Event()
+        queued: list[int] = []
+
+        first = pool.submit("a1", release.wait)
+        second = pool.submit("a2", lambda: "second", on_queued=queued.append)
+        await asyncio.sleep(0.05)
+
+        assert queued == [0]
+        assert pool.get_stats() == {"max_workers": 1, "running": 1, "queued": 1}
+
+        release.set()
+        assert await asyncio.wrap_future(second) == "second"
+        assert first.done()
+        assert pool.get_stats()["queued"] == 0
+        pool.shutdown()
+
+    async def test_on_queued_may_use_the_pool(self):
+        pool = ApprovalWorkerPool(max_workers=1)
+        release = threading.Event()
+        stats: list[dict] = []
+        pool.submit("a1", release.wait)
+        await asyncio.sleep(0.05)
+
+        # Would deadlock if on_queued ran under the pool's lock
+        submitter = threading.Thread(
+            target=pool.submit,
+            args=("a2", lambda: None),
+            kwargs={"on_queued": lambda _: stats.append(pool.get_stats())},
+            daemon=True,
+        )
+        submitter.start()
+        submitter.join(timeout=5)
+
+        assert not submitter.is_alive()
+        assert stats == [{"max_workers": 1, "running": 1, "queued": 1}]
+        release.set()
+        pool.shutdown()
+
+    async def test_one_execution_per_approval(self):
+        pool = ApprovalWorkerPool(max_workers=2)
+        release = threading.Event()
+        pool.submit("a1", release.wait)
+
+        assert pool.is_busy("a1")
+        with pytest.raises(RuntimeError):
+            pool.submit("a1", release.wait)
+
+        release.set()
+        pool.shutdown()
+        assert not pool.is_busy("a1")
+
+    async def test_reservation_is_consumed_by_submit(self):
+        pool = ApprovalWorkerPool()
+        token = pool.try_reserve("a1")
+
+        assert token is not None
+        assert pool.is_busy("a1")
+        assert pool.try_reserve("a1") is None
+
+        await pool.run("a1", lambda: None)
+        # Consumed by submit, so releasing afterwards cannot free a later claim
+        later = pool.try_reserve("a1")
+        pool.release("a1", token)
+        assert pool.is_busy("a1")
+
+        pool.release("a1", later)
+        assert not pool.is_busy("a1")
+        pool.shutdown()
+
+    async def test_exceptions_propagate(self):
+        pool = ApprovalWorkerPool()
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await pool.run("a1", fail)
+        pool.shutdown()
+
+
+class FakeApprovals:
+    def __init__(self, approval: PendingApproval):
+        self.approval = approval
+
+    def find_by_id(self, approval_id: str) -> PendingApproval | None:
+        return self.approval if approval_id == self.approval.id else None
+
+    def update(self, approval: PendingApproval) -> None:
+        pass
+
+
+class FakeMessenger:
+    async def update_approval_messages(self, approval, status: str, details: str) -> None:
+        # Yield like a real network call would
+        await asyncio.sleep(0)
+
+    async def remove_old_message_buttons(self, approval) -> None:
+        pass
+
+
+class SlowStrategy:
+    """Stands in for the resume strategies; records the thread it ran on."""
+
+    threads: list[str] = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def execute(self, context) -> ExecutionResult:
+        SlowStrategy.threads.append(threading.current_thread().name)
+        time.sleep(0.3)
+        now = datetime.now()
+        return ExecutionResult(
+            task_id=context.task.id,
+            session_id=context.session_id,
+            status=ExecutionStatus.SUCCESS,
+            output='{"type": "result", "result": "Done", "session_id": "s2"}',
+            started_at=now,
+            finished_at=now,
+        )
+
+
+class TestApprovalHandler:
+    """Tests for ApprovalHandler dispatching to the worker pool."""
+
+    @pytest.fixture
+    def tracker(self, tmp_path):
+        ExecutionTracker._instance = None
+        tracker = ExecutionTracker(tmp_path / "data")
+        yield tracker
+        ExecutionTracker._instance = None
+
+    @pytest.fixture
+    def handler(self, tmp_path, tracker, monkeypatch):
+        monkeypatch.setattr(handler_module, "ResumeWithApprovalStrategy", SlowStrategy)
+        monkeypatch.setattr(handler_module, "ResumeWithFeedbackStrategy", SlowStrategy)
+        SlowStrategy.threads = []
+        approval = PendingApproval.create(
+            task_id="task-1",
+            task_name="Task",
+            session_id="s1",
+            plan_text="Plan",
+            working_dir=str(tmp_path),
+        )
+        pool = ApprovalWorkerPool(max_workers=1)
+        yield ApprovalHandler(FakeApprovals(approval), FakeMessenger(), pool), approval
+        pool.shutdown()
+
+    async def test_approval_runs_on_worker(self, handler, tracker):
+        handler, approval = handler
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(count_ticks(stop))
+
+        result = await handler.handle_approval(approval.id)
+        stop.set()
+
+        assert result.is_success
+        assert approval.status == ApprovalStatus.COMPLETED
+        assert SlowStrategy.threads[0].startswith("codegeass-approval")
+        assert await ticker >= 10
+        assert tracker.get_by_approval(approval.id) is None
+
+    async def test_concurrent_discuss_is_rejected(self, handler, tracker):
+        handler, approval = handler
+
+        first = asyncio.create_task(handler.handle_discuss(approval.id, "more tests"))
+        await asyncio.sleep(0.05)
+        second = await handler.handle_discuss(approval.id, "again")
+
+        assert second is None
+        updated = await first
+        assert updated.iteration == 1
+        assert len(SlowStrategy.threads) == 1
+
+    async def test_simultaneous_calls_are_rejected_before_awaiting(self, handler, tracker):
+        handler, approval = handler
+
+        updated, second, approved = await asyncio.gather(
+            handler.handle_discuss(approval.id, "more tests"),
+            handler.handle_discuss(approval.id, "again"),
+            handler.handle_approval(approval.id),
+        )
+
+        assert second is None
+        assert approved is None
+        assert updated.iteration == 1
+        assert len(SlowStrategy.threads) == 1
+        execution = tracker.get_by_approval(approval.id)
+        assert not execution.current_phase.startswith("Error")
+        assert not handler._workers.is_busy(approval.id)
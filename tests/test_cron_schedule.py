@@ -0,0 +1,138 @@
+"""Tests for compiled CRON schedules."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from croniter import croniter
+
+from codegeass.core.cron_schedule import compile_cron, upcoming_fires
+from codegeass.core.exceptions import ValidationError
+
+EXPRESSIONS = [
+    "* * * * *",
+    "0 9 * * mon-fri",
+    "30 8 1 jan,jul *",
+    "0 0 * * fri-mon",
+    "0 22-2 * * *",
+    "*/15 * * * *",
+    "5-50/15 */3 * * *",
+    "0 0 29 2 *",
+    "0 0 31 */2 *",
+    "0 9 1,15 * 1",
+    "0 9 */2 * 1",
+    "0 9 1-7 * 1",
+    "0 9 2 * 0-6",
+    "5 4 * * 0,7",
+    "0 9 ? * 7",
+    "@daily",
+    "@weekly",
+    # Left to croniter
+    "0 9 L * *",
+    "0 9 * * 1#2",
+]
+
+
+def random_field(rng: random.Random, low: int, high: int) -> str:
+    shape = rng.randrange(5)
+    if shape == 0:
+        return "*"
+    if shape == 1:
+        return f"*/{rng.randint(1, high - low + 1)}"
+    start = rng.randint(low, high - 1)
+    end = rng.randint(start + 1, high)
+    if shape == 2:
+        return f"{start}-{end}"
+    if shape == 3:
+        return f"{start}-{end}/{rng.randint(1, 4)}"
+    return ",".join(str(rng.randint(low, high)) for _ in range(rng.randint(1, 3)))
+
+
+def croniter_next(expression: str, base: datetime, n: int) -> list[datetime]:
+    cron = croniter(expression, base)
+    return [cron.get_next(datetime) for _ in range(n)]
+
+
+def croniter_prev(expression: str, base: datetime, n: int) -> list[datetime]:
+    cron = croniter(expression, base)
+    return [cron.get_prev(datetime) for _ in range(n)]
+
+
+class TestCronSchedule:
+    """Tests for CronSchedule."""
+
+    @pytest.mark.parametrize("expression", EXPRESSIONS)
+    def test_matches_croniter(self, expression):
+        schedule = compile_cron(expression)
+        for base in (datetime(2024, 2, 27, 13, 7, 12), datetime(2025, 12, 31, 23, 59)):
+            assert schedule.next_n(base, 8) == croniter_next(expression, base, 8)
+            times, current = [], base
+            for _ in range(8):
+                current = schedule.prev_before(current)
+                times.append(current)
+            assert times == croniter_prev(expression, base, 8)
+
+    def test_matches_croniter_on_random_expressions(self):
+        rng = random.Random(7)
+        checked = 0
+        while checked < 300:
+            expression = " ".join(
+                random_field(rng, low, high)
+                for low, high in ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+            )
+            try:
+                expected = croniter_next(expression, datetime(2024, 5, 1, 10, 30), 4)
+            except Exception:
+                continue  # croniter cannot find a fire time either
+            assert compile_cron(expression).next_n(datetime(2024, 5, 1, 10, 30), 4) == expected
+            checked += 1
+
+    def test_is_cached(self):
+        assert compile_cron("0 9 * * *") is compile_cron("0 9 * * *")
+
+    @pytest.mark.parametrize(
+        "expression", ["invalid", "60 9 * * *", "0 25 * * *", "0 9 * * 8", "*/0 * * * *"]
+    )
+    def test_invalid(self, expression):
+        with pytest.raises(ValidationError):
+            compile_cron(expression)
+
+    def test_never_fires(self):
+        with pytest.raises(ValidationError, match="never fires"):
+            compile_cron("0 0 30 2 *")
+
+    def test_matches(self):
+        schedule = compile_cron("0 9 * * 1-5")
+
+        assert schedule.matches(datetime(2026, 1, 5, 9, 0, 30))
+        assert not schedule.matches(datetime(2026, 1, 4, 9, 0))
+        assert not schedule.matches(datetime(2026, 1, 5, 9, 1))
+
+    def test_between(self):
+        schedule = compile_cron("0 * * * *")
+        until = datetime(2026, 1, 1, 12, 0)
+
+        assert schedule.between(until - timedelta(hours=3), until, 10) == [
+            datetime(2026, 1, 1, 12, 0),
+            datetime(2026, 1, 1, 11, 0),
+            datetime(2026, 1, 1, 10, 0),
+        ]
+        assert len(schedule.between(until - timedelta(days=1), until, 2)) == 2
+
+
+def test_upcoming_fires():
+    start = datetime(2026, 1, 5, 8, 0)
+
+    fires = upcoming_fires(
+        [("a", "0 9 * * *"), ("b", "*/30 * * * *"), ("bad", "invalid")],
+        start,
+        start + timedelta(hours=2),
+        limit_per_schedule=3,
+    )
+
+    assert fires == [
+        (datetime(2026, 1, 5, 8, 30), "b"),
+        (datetime(2026, 1, 5, 9, 0), "a"),
+        (datetime(2026, 1, 5, 9, 0), "b"),
+        (datetime(2026, 1, 5, 9, 30), "b"),
+    ]
@@ -236,3 +236,27 @@ class TestExecutionResult:
         assert restored.status == result.status
         assert restored.error == result.error
         assert restored.exit_code == result.exit_code
+
+    def test_clean_output_parsed_once(self):
+        from datetime import datetime
+        from unittest.mock import patch
+
+        result = ExecutionResult(
+            task_id="test",
+            session_id=None,
+            status=ExecutionStatus.SUCCESS,
+            output='{"type": "result", "result": "All done"}',
+            started_at=datetime(2024, 1, 1, 12, 0, 0),
+            finished_at=datetime(2024, 1, 1, 12, 0, 30),
+        )
+
+        with patch(
+            "codegeass.providers.claude.output_parser.extract_clean_text",
+            return_value="All done",
+        ) as parse:
+            data = result.to_dict()
+            result.to_dict()
+            restored = ExecutionResult.from_dict(data)
+
+            assert restored.clean_output == "All done"
+            assert parse.call_count == 1
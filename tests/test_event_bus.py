@@ -0,0 +1,209 @@
+"""Tests for the cross-process execution event bus."""
+
+import multiprocessing
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+
+from codegeass.execution.event_bus import ExecutionEventBus
+from codegeass.execution.events import ExecutionEvent, ExecutionEventType
+from codegeass.execution.tracker import ExecutionTracker
+
+
+def output_event(execution_id: str, line: str) -> ExecutionEvent:
+    return ExecutionEvent.output(
+        execution_id=execution_id, task_id="task-1", task_name="Task", line=line
+    )
+
+
+def publish_lines(spool_dir, worker: int, count: int) -> None:
+    """Publish events from a separate process (module-level for spawn)."""
+    bus = ExecutionEventBus(spool_dir, max_segment_bytes=4096, max_segments=100)
+    for i in range(count):
+        bus.publish(output_event(f"w{worker}", str(i)))
+
+
+class TestExecutionEventBus:
+    """Tests for ExecutionEventBus."""
+
+    @pytest.fixture
+    def bus(self, tmp_path):
+        return ExecutionEventBus(tmp_path / "events")
+
+    def test_empty_bus(self, bus):
+        assert bus.head == 0
+        assert bus.read(0) == ([], 0)
+
+    def test_publish_and_replay_from_offset(self, bus):
+        offsets = [bus.publish(output_event("a", str(i))) for i in range(5)]
+
+        events, next_offset = bus.read(0)
+        assert [e.event.data["line"] for e in events] == ["0", "1", "2", "3", "4"]
+        assert [e.offset for e in events] == offsets
+        assert events[0].pid == os.getpid()
+        assert next_offset == bus.head
+
+        events, _ = bus.read(offsets[3])
+        assert [e.event.data["line"] for e in events] == ["3", "4"]
+
+    def test_read_limit_resumes(self, bus):
+        for i in range(5):
+            bus.publish(output_event("a", str(i)))
+
+        first, offset = bus.read(0, limit=2)
+        rest, _ = bus.read(offset)
+
+        assert [e.event.data["line"] for e in first + rest] == ["0", "1", "2", "3", "4"]
+
+    def test_partial_line_is_not_consumed(self, bus, tmp_path):
+        bus.publish(output_event("a", "done"))
+        head = bus.head
+        with open(tmp_path / "events" / f"{0:020d}.jsonl", "ab") as f:
+            f.write(b'{"pid":1,"event":')
+
+        events, offset = bus.read(0)
+
+        assert len(events) == 1
+        assert offset == head
+
+    def test_segments_rotate_and_prune(self, tmp_path):
+        bus = ExecutionEventBus(tmp_path / "events", max_segment_bytes=1024, max_segments=3)
+        for i in range(100):
+            bus.publish(output_event("a", str(i)))
+
+        segments = sorted((tmp_path / "events").glob("*.jsonl"))
+        assert len(segments) == 3
+        assert bus.first_offset == int(segments[0].stem)
+
+        # Offsets are global: reading from 0 resumes at the oldest kept event
+        events, offset = bus.read(0)
+        lines = [int(e.event.data["line"]) for e in events]
+        assert lines == list(range(lines[0], 100))
+        assert offset == bus.head
+
+    def test_writers_follow_each_other_across_segments(self, tmp_path):
+        spool_dir = tmp_path / "events"
+        first = ExecutionEventBus(spool_dir, max_segment_bytes=1024, max_segments=100)
+        second = ExecutionEventBus(spool_dir, max_segment_bytes=1024, max_segments=100)
+        for i in range(60):
+            (first if i % 3 else second).publish(output_event("a", str(i)))
+
+        events, _ = ExecutionEventBus(spool_dir).read(0)
+
+        assert [e.event.data["line"] for e in events] == [str(i) for i in range(60)]
+
+    def test_processes_publish_without_tearing(self, tmp_path):
+        spool_dir = tmp_path / "events"
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=publish_lines, args=(spool_dir, worker, 50))
+            for worker in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+
+        events, _ = ExecutionEventBus(spool_dir).read(0, limit=10_000)
+
+        for worker in range(3):
+            lines = [e.event.data["line"] for e in events if e.event.execution_id == f"w{worker}"]
+            assert lines == [str(i) for i in range(50)]
+
+    def test_subscribe_follows_new_events(self, bus):
+        bus.publish(output_event("a", "old"))
+        stop = threading.Event()
+        received: list[str] = []
+
+        subscription = bus.subscribe(poll_interval=0.01, stop=stop)
+
+        def consume():
+            for record in subscription:
+                received.append(record.event.data["line"])
+                if len(received) == 2:
+                    stop.set()
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        bus.publish(output_event("a", "new-1"))
+        bus.publish(output_event("a", "new-2"))
+        thread.join(timeout=5)
+        stop.set()
+
+        assert received == ["new-1", "new-2"]
+
+
+class TestTrackerEvents:
+    """Tests for tracker publishing and mirroring of bus events."""
+
+    @pytest.fixture
+    def tracker(self, tmp_path):
+        ExecutionTracker._instance = None
+        tracker = ExecutionTracker(tmp_path / "data")
+        yield tracker
+        ExecutionTracker._instance = None
+
+    def test_tracker_publishes_events(self, tracker):
+        execution_id = tracker.start_execution("task-1", "Task")
+        tracker.append_output(execution_id, "hello")
+        tracker.finish_execution(execution_id, success=True)
+
+        events, _ = tracker.event_bus.read(0)
+
+        assert [e.event.type for e in events] == [
+            ExecutionEventType.STARTED,
+            ExecutionEventType.OUTPUT,
+            ExecutionEventType.COMPLETED,
+        ]
+
+    def test_apply_event_mirrors_remote_execution(self, tracker):
+        started = ExecutionEvent.started("remote-1", "task-9", "Remote", session_id="s1")
+        started.timestamp = datetime(2024, 1, 15, 9, 0)
+        tracker.apply_event(started)
+        tracker.apply_event(output_event("remote-1", "line"))
+        tracker.apply_event(
+            ExecutionEvent.progress("remote-1", "task-9", "Remote", phase="tool: Bash")
+        )
+
+        execution = tracker.get_execution("remote-1")
+        assert execution.output_lines == ["line"]
+        assert execution.current_phase == "tool: Bash"
+        assert execution.started_at == datetime(2024, 1, 15, 9, 0)
+
+        tracker.apply_event(
+            ExecutionEvent.completed("remote-1", "task-9", "Remote", 0, 1.0)
+        )
+        assert tracker.get_execution("remote-1") is None
+
+    def test_cli_scheduler_runs_reach_the_bus(self, tmp_path, monkeypatch):
+        from codegeass.cli.main import Context
+        from codegeass.core.entities import Task
+        from codegeass.execution.strategies import HeadlessStrategy
+
+        ExecutionTracker._instance = None
+        monkeypatch.setattr(
+            HeadlessStrategy,
+            "build_command",
+            lambda self, context: [sys.executable, "-c", "print('hello')"],
+        )
+        ctx = Context()
+        ctx.config_dir = tmp_path / "config"
+        ctx.data_dir = tmp_path / "data"
+        task = Task.create(name="cron", schedule="* * * * *", working_dir=tmp_path, prompt="hi")
+        ctx.task_repo.save(task)
+
+        try:
+            result = ctx.scheduler.run_task(task)
+        finally:
+            ExecutionTracker._instance = None
+
+        # A separate bus instance (e.g. the dashboard's) sees the run
+        events, _ = ExecutionEventBus(ctx.data_dir / "events").read(0)
+        types = [e.event.type for e in events if e.event.task_id == task.id]
+        assert result.exit_code == 0
+        assert types[0] == ExecutionEventType.STARTED
+        assert ExecutionEventType.OUTPUT in types
+        assert types[-1] == ExecutionEventType.COMPLETED
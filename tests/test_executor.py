@@ -1,18 +1,22 @@
 """Tests for execution layer."""
 
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 import pytest
 
 from codegeass.core.entities import Skill, Task
-from codegeass.core.value_objects import ExecutionStatus
+from codegeass.core.value_objects import ExecutionStatus, ResourceLimits
 from codegeass.execution.strategies import (
     ExecutionContext,
     HeadlessStrategy,
     AutonomousStrategy,
     SkillStrategy,
 )
+from codegeass.execution.strategies.base import BaseStrategy
+from tests.test_supervisor import alive, wait_until
 
 
 class TestExecutionStrategies:
@@ -187,112 +191,197 @@ class TestStrategyExecution:
             yield
 
     @pytest.fixture
-    def mock_subprocess(self):
-        """Mock subprocess.run."""
-        with patch("codegeass.execution.strategies.base.subprocess.run") as mock:
-            mock.return_value = MagicMock(
-                returncode=0,
-                stdout='{"result": "success"}',
-                stderr="",
+    def run_script(self):
+        """Make HeadlessStrategy run a Python script instead of Claude."""
+
+        def use(script: str):
+            return patch.object(
+                HeadlessStrategy, "build_command", return_value=[sys.executable, "-c", script]
             )
-            yield mock
 
-    def test_execute_success(self, mock_subprocess, tmp_path):
+        return use
+
+    def make_context(self, tmp_path, timeout: int = 300) -> ExecutionContext:
         task = Task.create(
             name="test",
             schedule="0 9 * * *",
             working_dir=tmp_path,
             prompt="Test",
+            timeout=timeout,
         )
-        context = ExecutionContext(
+        return ExecutionContext(
             task=task,
             skill=None,
             prompt="Test",
             working_dir=tmp_path,
         )
 
-        strategy = HeadlessStrategy()
-        result = strategy.execute(context)
+    def test_execute_success(self, run_script, tmp_path):
+        context = self.make_context(tmp_path)
+
+        with run_script("print('{\"result\": \"success\"}')"):
+            result = HeadlessStrategy().execute(context)
 
         assert result.status == ExecutionStatus.SUCCESS
-        assert result.task_id == task.id
+        assert result.task_id == context.task.id
         assert '{"result": "success"}' in result.output
 
-    def test_execute_failure(self, mock_subprocess, tmp_path):
-        mock_subprocess.return_value = MagicMock(
-            returncode=1,
-            stdout="",
-            stderr="Error: something went wrong",
+    def test_execute_failure(self, run_script, tmp_path):
+        context = self.make_context(tmp_path)
+        script = "import sys; sys.stderr.write('Error: something went wrong'); sys.exit(1)"
+
+        with run_script(script):
+            result = HeadlessStrategy().execute(context)
+
+        assert result.status == ExecutionStatus.FAILURE
+        assert result.exit_code == 1
+        assert result.error == "Error: something went wrong"
+
+    def test_execute_timeout_kills_process_tree(self, run_script, tmp_path):
+        context = self.make_context(tmp_path, timeout=1)
+        child_file = tmp_path / "child.pid"
+        script = (
+            "import subprocess, sys, time; "
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+            f"open({str(child_file)!r}, 'w').write(str(child.pid)); "
+            "print('started', flush=True); time.sleep(60)"
         )
 
+        started = time.monotonic()
+        with run_script(script):
+            result = HeadlessStrategy().execute(context)
+
+        assert result.status == ExecutionStatus.TIMEOUT
+        assert "timed out" in result.error.lower()
+        assert result.output == "started"
+        assert time.monotonic() - started < 10
+        child = int(child_file.read_text())
+        assert wait_until(lambda: not alive(child))
+
+    def test_execute_applies_limits_and_reports_usage(self, run_script, tmp_path):
+        context = self.make_context(tmp_path)
+        context.task.resource_limits = ResourceLimits(cpu_seconds=120)
+        script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"
+
+        with run_script(script):
+            result = HeadlessStrategy().execute(context)
+
+        assert result.output == "120"
+        assert result.metadata["resource_usage"]["peak_rss_bytes"] > 0
+        assert result.metadata["resource_limits"] == {"cpu_seconds": 120, "enforced_by": "rlimit"}
+
+    def test_execute_unsets_api_key(self, run_script, tmp_path):
+        """Verify that ANTHROPIC_API_KEY is not passed to subprocess."""
+        import os
+
+        context = self.make_context(tmp_path)
+        script = "import os; print(os.environ.get('ANTHROPIC_API_KEY', 'unset'))"
+
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}), run_script(script):
+            result = HeadlessStrategy().execute(context)
+
+        assert result.output == "unset"
+
+
+class PythonStrategy(BaseStrategy):
+    """Strategy running a Python snippet instead of Claude."""
+
+    def __init__(self, script: str):
+        super().__init__()
+        self.script = script
+
+    def build_command(self, context: ExecutionContext) -> list[str]:
+        return [sys.executable, "-c", self.script]
+
+
+class TestStreamingExecution:
+    """Tests for streaming execution with a tracker."""
+
+    def run(self, tmp_path, script: str, timeout: int = 30, **task_kwargs):
         task = Task.create(
             name="test",
             schedule="0 9 * * *",
             working_dir=tmp_path,
             prompt="Test",
+            timeout=timeout,
+            **task_kwargs,
         )
+        tracker = MagicMock()
         context = ExecutionContext(
             task=task,
             skill=None,
             prompt="Test",
             working_dir=tmp_path,
+            execution_id="exec-1",
+            tracker=tracker,
         )
+        return PythonStrategy(script).execute(context), tracker
 
-        strategy = HeadlessStrategy()
-        result = strategy.execute(context)
-
-        assert result.status == ExecutionStatus.FAILURE
-        assert result.error is not None
-
-    def test_execute_timeout(self, tmp_path):
-        import subprocess
-
-        with patch("codegeass.execution.strategies.base.subprocess.run") as mock:
-            mock.side_effect = subprocess.TimeoutExpired(cmd="claude", timeout=300)
-
-            task = Task.create(
-                name="test",
-                schedule="0 9 * * *",
-                working_dir=tmp_path,
-                prompt="Test",
-                timeout=300,
-            )
-            context = ExecutionContext(
-                task=task,
-                skill=None,
-                prompt="Test",
-                working_dir=tmp_path,
-            )
-
-            strategy = HeadlessStrategy()
-            result = strategy.execute(context)
+    def test_streams_lines(self, tmp_path):
+        script = "import sys; sys.stdout.write('one\\r\\ntwo\\n' + 'x' * 200000 + '\\nlast')"
+        result, tracker = self.run(tmp_path, script)
 
-            assert result.status == ExecutionStatus.TIMEOUT
-            assert "timed out" in result.error.lower()
-
-    def test_execute_unsets_api_key(self, mock_subprocess, tmp_path):
-        """Verify that ANTHROPIC_API_KEY is not passed to subprocess."""
-        import os
-
-        # Set a dummy API key
-        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
-            task = Task.create(
-                name="test",
-                schedule="0 9 * * *",
-                working_dir=tmp_path,
-                prompt="Test",
-            )
-            context = ExecutionContext(
-                task=task,
-                skill=None,
-                prompt="Test",
-                working_dir=tmp_path,
-            )
+        assert result.status == ExecutionStatus.SUCCESS
+        assert result.output.split("\n") == ["one", "two", "x" * 200000, "last"]
+        streamed = [c.args[1] for c in tracker.append_output.call_args_list]
+        assert streamed == ["one", "two", "x" * 200000, "last"]
+
+    def test_full_stderr_does_not_block(self, tmp_path):
+        # More stderr than a pipe buffer holds while stdout stays quiet
+        script = (
+            "import sys; sys.stderr.write('e' * 1000000 + '\\n'); sys.stderr.flush(); "
+            "print('done'); sys.exit(3)"
+        )
+        result, _ = self.run(tmp_path, script, timeout=10)
 
-            strategy = HeadlessStrategy()
-            strategy.execute(context)
+        assert result.status == ExecutionStatus.FAILURE
+        assert result.exit_code == 3
+        assert result.output == "done"
+        assert result.error == "e" * 1000000
+
+    def test_reports_resource_usage(self, tmp_path):
+        result, _ = self.run(tmp_path, "print(sum(range(100000)))")
+
+        usage = result.metadata["resource_usage"]
+        assert usage["peak_rss_bytes"] > 0
+        assert usage["cpu_user_seconds"] >= 0
+        assert "resource_limits" not in result.metadata
+
+    def test_applies_task_resource_limits(self, tmp_path):
+        script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"
+        limits = ResourceLimits(cpu_seconds=120)
+        result, _ = self.run(tmp_path, script, resource_limits=limits)
+
+        assert result.output == "120"
+        assert result.metadata["resource_limits"] == {"cpu_seconds": 120, "enforced_by": "rlimit"}
+
+    def test_multibyte_split_across_chunks(self, tmp_path):
+        script = "print('é' * 100000)"
+        result, _ = self.run(tmp_path, script)
+
+        assert result.output == "é" * 100000
+
+    def test_keeps_last_line_when_child_holds_pipes(self, tmp_path):
+        # The child inherits stdout and outlives the parent, so the pipe never closes
+        script = (
+            "import subprocess, sys; "
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); "
+            "sys.stdout.write('first\\nlast'); sys.stdout.flush()"
+        )
+        started = time.monotonic()
+        result, tracker = self.run(tmp_path, script)
 
-            # Check that subprocess was called with env that doesn't have API key
-            call_kwargs = mock_subprocess.call_args.kwargs
-            env = call_kwargs.get("env", {})
-            assert "ANTHROPIC_API_KEY" not in env
+        assert result.status == ExecutionStatus.SUCCESS
+        assert result.output == "first\nlast"
+        streamed = [c.args[1] for c in tracker.append_output.call_args_list]
+        assert streamed == ["first", "last"]
+        assert time.monotonic() - started < 10
+
+    def test_timeout_kills_process(self, tmp_path):
+        script = "import time; print('started', flush=True); time.sleep(30)"
+        started = time.monotonic()
+        result, _ = self.run(tmp_path, script, timeout=1)
+
+        assert result.status == ExecutionStatus.TIMEOUT
+        assert result.output == "started"
+        assert time.monotonic() - started < 10
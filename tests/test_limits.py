@@ -0,0 +1,130 @@
+"""Tests for per-task resource limits."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from codegeass.core.entities import Task
+from codegeass.core.exceptions import ValidationError
+from codegeass.core.value_objects import ResourceLimits
+from codegeass.execution.limits import ResourceLimiter
+from codegeass.execution.supervisor import ProcessSupervisor
+
+REPORT_LIMITS = (
+    "import json, os, resource; print(json.dumps({"
+    "'cpu': resource.getrlimit(resource.RLIMIT_CPU), "
+    "'data': resource.getrlimit(resource.RLIMIT_DATA), "
+    "'nice': os.getpriority(os.PRIO_PROCESS, 0)}))"
+)
+
+
+def run(limits: ResourceLimits, script: str, cgroup_root: Path | None = None):
+    supervisor = ProcessSupervisor(cgroup_root=cgroup_root)
+    process = supervisor.spawn(
+        [sys.executable, "-c", script],
+        limits=limits,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    output = process.stdout.read().decode()
+    process.wait(30)
+    supervisor.release(process)
+    process.close()
+    return process, output
+
+
+class TestResourceLimits:
+    """Tests for the ResourceLimits value object."""
+
+    def test_round_trip_through_task(self, tmp_path):
+        limits = ResourceLimits(memory_mb=2048, max_processes=64, io_class="idle")
+        task = Task.create(
+            name="t", schedule="0 9 * * *", working_dir=tmp_path, prompt="p",
+            resource_limits=limits,
+        )
+
+        data = task.to_dict()
+
+        assert data["resource_limits"] == {
+            "memory_mb": 2048,
+            "max_processes": 64,
+            "io_class": "idle",
+        }
+        assert Task.from_dict(data).resource_limits == limits
+
+    def test_task_without_limits(self, tmp_path):
+        task = Task.create(name="t", schedule="0 9 * * *", working_dir=tmp_path, prompt="p")
+
+        assert "resource_limits" not in task.to_dict()
+        assert Task.from_dict(task.to_dict()).resource_limits is None
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"memory_mb": 0},
+            {"nice": -5},
+            {"io_class": "realtime"},
+            {"cpu_seconds": "lots"},
+            {"memory": 100},
+        ],
+    )
+    def test_invalid_limits(self, data):
+        with pytest.raises(ValidationError):
+            ResourceLimits.from_dict(data)
+
+
+class TestResourceLimiter:
+    """Tests for applying limits to agent processes."""
+
+    def test_rlimits_and_nice_are_applied(self):
+        limits = ResourceLimits(memory_mb=512, cpu_seconds=60, nice=10)
+        process, output = run(limits, REPORT_LIMITS)
+
+        reported = json.loads(output)
+        assert reported["cpu"] == [60, 65]
+        assert reported["data"][0] == 512 * 1024 * 1024
+        assert reported["nice"] >= 10
+        assert process.limiter.enforced_by == "rlimit"
+
+    def test_memory_limit_stops_allocation(self):
+        script = "bytearray(400 * 1024 * 1024); print('allocated')"
+        process, output = run(ResourceLimits(memory_mb=100), script)
+
+        assert process.returncode != 0
+        assert "allocated" not in output
+
+    def test_unlimited_run_has_no_limiter(self):
+        process, output = run(ResourceLimits(), "print('ok')")
+
+        assert output.strip() == "ok"
+        assert process.limiter is None
+
+    def test_unusable_cgroup_falls_back_to_rlimits(self, tmp_path):
+        # A plain directory: the run cgroup has no cgroup.procs to join
+        limits = ResourceLimits(memory_mb=512)
+        limiter = ResourceLimiter(limits, cgroup_root=tmp_path)
+
+        assert limiter.enforced_by == "rlimit"
+        assert limiter.cgroup is None
+        assert limiter.preexec() is not None
+        limiter.close()
+
+    def test_cgroup_usage(self, tmp_path):
+        limiter = ResourceLimiter(ResourceLimits(cpu_seconds=10))
+        limiter.cgroup = tmp_path
+        (tmp_path / "cpu.stat").write_text("usage_usec 2500000\nuser_usec 2000000\n")
+        (tmp_path / "memory.peak").write_text("104857600\n")
+        (tmp_path / "pids.peak").write_text("12\n")
+        (tmp_path / "memory.events").write_text("low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n")
+
+        limiter.close()
+
+        assert limiter.usage() == {
+            "tree_cpu_seconds": 2.5,
+            "tree_peak_memory_bytes": 104857600,
+            "tree_peak_processes": 12,
+            "oom_kills": 1,
+        }
@@ -0,0 +1,273 @@
+"""Tests for the execution log repository."""
+
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
+from codegeass.execution.session import SessionManager
+from codegeass.storage.blob_store import INLINE_LIMIT, PREVIEW_CHARS, BlobStore
+from codegeass.storage.log_repository import LogRepository
+from codegeass.storage.reverse_reader import iter_lines_reversed
+
+
+def make_result(
+    task_id: str, minutes: int, status: ExecutionStatus = ExecutionStatus.SUCCESS
+) -> ExecutionResult:
+    """Create a result that started `minutes` after a fixed base time."""
+    started = datetime(2024, 1, 15, 9, 0, 0) + timedelta(minutes=minutes)
+    return ExecutionResult(
+        task_id=task_id,
+        session_id=None,
+        status=status,
+        output=f"run {minutes}",
+        started_at=started,
+        finished_at=started + timedelta(seconds=30),
+    )
+
+
+class TestLogRepository:
+    """Tests for indexed LogRepository queries."""
+
+    @pytest.fixture(params=[True, False], ids=["indexed", "scan"])
+    def repo(self, request, tmp_path):
+        return LogRepository(tmp_path / "logs", use_index=request.param)
+
+    def test_find_by_task_id_most_recent_first(self, repo):
+        for minutes in (1, 3, 5):
+            repo.save(make_result("a", minutes))
+        repo.save(make_result("b", 10))
+
+        results = repo.find_by_task_id("a", limit=2)
+
+        assert [r.output for r in results] == ["run 5", "run 3"]
+        assert repo.find_latest("a").output == "run 5"
+
+    def test_find_all_and_status(self, repo):
+        repo.save(make_result("a", 1))
+        repo.save(make_result("b", 2, ExecutionStatus.FAILURE))
+        repo.save(make_result("a", 3))
+
+        assert [r.output for r in repo.find_all()] == ["run 3", "run 2", "run 1"]
+        failures = repo.find_by_status("failure")
+        assert [r.task_id for r in failures] == ["b"]
+
+    def test_find_by_date_range(self, repo):
+        for minutes in range(5):
+            repo.save(make_result("a", minutes))
+
+        start = datetime(2024, 1, 15, 9, 1)
+        end = datetime(2024, 1, 15, 9, 3)
+        results = repo.find_by_date_range(start, end)
+
+        assert [r.output for r in results] == ["run 3", "run 2", "run 1"]
+
+    def test_task_stats(self, repo):
+        repo.save(make_result("a", 1))
+        repo.save(make_result("a", 2, ExecutionStatus.FAILURE))
+        repo.save(make_result("b", 3, ExecutionStatus.TIMEOUT))
+
+        stats = repo.get_task_stats("a")
+
+        assert stats["total_runs"] == 2
+        assert stats["success_count"] == 1
+        assert stats["failure_count"] == 1
+        assert stats["success_rate"] == 50.0
+        assert stats["avg_duration"] == 30.0
+        assert stats["duration_stddev"] == pytest.approx(0.0, abs=1e-6)
+        assert stats["last_status"] == "failure"
+        assert stats["last_run"] == "2024-01-15T09:02:00"
+        assert {"max_seconds": 30, "count": 2} in stats["duration_histogram"]
+        assert repo.get_overall_stats()["timeout_count"] == 1
+        assert repo.get_task_stats("missing")["total_runs"] == 0
+
+    def test_clear_task_logs(self, repo):
+        repo.save(make_result("a", 1))
+
+        assert repo.clear_task_logs("a") is True
+        assert repo.find_by_task_id("a") == []
+        assert repo.clear_task_logs("a") is False
+
+
+class TestLogIndex:
+    """Tests for index catch-up and migration."""
+
+    def test_indexes_records_appended_externally(self, tmp_path):
+        repo = LogRepository(tmp_path)
+        repo.save(make_result("a", 1))
+        assert len(repo.find_all()) == 1
+
+        # Another process (or an older version) appends directly to the files
+        line = json.dumps(make_result("a", 2).to_dict()) + "\n"
+        for name in ("a.jsonl", "all.jsonl"):
+            with open(tmp_path / name, "a") as f:
+                f.write(line)
+
+        assert [r.output for r in repo.find_all()] == ["run 2", "run 1"]
+        assert repo.find_latest("a").output == "run 2"
+
+    def test_orders_by_start_time_regardless_of_file_order(self, tmp_path):
+        repo = LogRepository(tmp_path)
+        for minutes in (5, 1, 3):
+            repo.save(make_result("a", minutes))
+
+        assert [r.output for r in repo.find_by_task_id("a")] == ["run 5", "run 3", "run 1"]
+
+    def test_ignores_partial_trailing_line(self, tmp_path):
+        repo = LogRepository(tmp_path)
+        repo.save(make_result("a", 1))
+        with open(tmp_path / "all.jsonl", "a") as f:
+            f.write('{"task_id": "a", "sta')
+
+        assert len(repo.find_all()) == 1
+
+    def test_reindex_migrates_existing_logs(self, tmp_path):
+        legacy = LogRepository(tmp_path, use_index=False)
+        for minutes in range(3):
+            legacy.save(make_result("a", minutes))
+
+        repo = LogRepository(tmp_path)
+
+        assert repo.reindex() == 6  # three records in a.jsonl and all.jsonl
+        assert [r.output for r in repo.tail("a", lines=2)] == ["run 2", "run 1"]
+
+    def test_stats_follow_cleared_and_rebuilt_logs(self, tmp_path):
+        repo = LogRepository(tmp_path)
+        for minutes in range(3):
+            repo.save(make_result("a", minutes))
+        assert repo.get_overall_stats()["total_runs"] == 3
+
+        repo.clear_task_logs("a")
+        assert repo.get_task_stats("a")["total_runs"] == 0
+
+        (tmp_path / "index.db").unlink()
+        assert LogRepository(tmp_path).get_overall_stats()["total_runs"] == 3
+
+    def test_rewritten_file_is_reindexed(self, tmp_path):
+        repo = LogRepository(tmp_path)
+        for minutes in range(3):
+            repo.save(make_result("a", minutes))
+        assert len(repo.find_by_task_id("a")) == 3
+
+        (tmp_path / "a.jsonl").write_text(json.dumps(make_result("a", 9).to_dict()) + "\n")
+
+        assert [r.output for r in repo.find_by_task_id("a")] == ["run 9"]
+
+
+class TestReverseTail:
+    """Tests for the backwards tail path used without the index."""
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64 * 1024])
+    def test_iter_lines_reversed(self, tmp_path, block_size):
+        path = tmp_path / "lines.jsonl"
+        path.write_bytes(b"first\n\n" + b"x" * 100 + b"\nlast\n")
+
+        lines = list(iter_lines_reversed(path, block_size=block_size))
+
+        assert lines == [b"last", b"x" * 100, b"first"]
+
+    def test_stops_before_reading_whole_file(self, tmp_path):
+        repo = LogRepository(tmp_path, use_index=False)
+        for minutes in range(50):
+            repo.save(make_result("a", minutes))
+
+        with patch(
+            "codegeass.storage.log_repository.json.loads", side_effect=json.loads
+        ) as loads:
+            results = repo.tail("a", lines=3)
+
+        assert [r.output for r in results] == ["run 49", "run 48", "run 47"]
+        assert loads.call_count == 4
+
+    def test_out_of_order_file_falls_back_to_sort(self, tmp_path):
+        repo = LogRepository(tmp_path, use_index=False)
+        for minutes in (5, 1, 3, 2):
+            repo.save(make_result("a", minutes))
+
+        results = repo.tail("a", lines=2)
+
+        assert [r.output for r in results] == ["run 5", "run 3"]
+
+    def test_overlapping_runs_use_start_time_order(self, tmp_path):
+        repo = LogRepository(tmp_path, use_index=False)
+        base = datetime(2024, 1, 15, 9, 0)
+        # Long run started first but finished (and was appended) last
+        short = ExecutionResult(
+            task_id="a", session_id=None, status=ExecutionStatus.SUCCESS, output="short",
+            started_at=base + timedelta(minutes=30), finished_at=base + timedelta(minutes=31),
+        )
+        long = ExecutionResult(
+            task_id="a", session_id=None, status=ExecutionStatus.SUCCESS, output="long",
+            started_at=base, finished_at=base + timedelta(minutes=60),
+        )
+        repo.save(short)
+        repo.save(long)
+
+        assert repo.find_latest("a").output == "short"
+
+
+class TestBlobStorage:
+    """Tests for out-of-line transcript storage."""
+
+    @pytest.fixture
+    def blob_store(self, tmp_path):
+        return BlobStore(tmp_path / "blobs")
+
+    def test_large_output_is_offloaded_and_deduplicated(self, tmp_path, blob_store):
+        repo = LogRepository(tmp_path / "logs", blob_store=blob_store)
+        transcript = "x" * (INLINE_LIMIT + 1)
+        result = replace(make_result("a", 1), output=transcript)
+
+        repo.save(result)
+        repo.save(result)
+
+        row = json.loads((tmp_path / "logs" / "a.jsonl").read_text().splitlines()[0])
+        assert len(row["output"]) == PREVIEW_CHARS
+        assert row["output_size"] == len(transcript)
+        assert len(list(blob_store.refs())) == 1
+
+        loaded = repo.find_latest("a")
+        assert loaded.output == transcript[:PREVIEW_CHARS]
+        assert repo.load_output(loaded) == transcript
+
+    def test_large_transcript_leaves_no_large_field_in_row(self, tmp_path, blob_store):
+        repo = LogRepository(tmp_path / "logs", blob_store=blob_store)
+        answer = "z" * (INLINE_LIMIT * 3)
+        transcript = json.dumps({"type": "result", "result": answer})
+        repo.save(replace(make_result("a", 1), output=transcript))
+
+        for log_file in ("a.jsonl", "all.jsonl"):
+            row = json.loads((tmp_path / "logs" / log_file).read_text())
+            assert all(len(json.dumps(value)) <= INLINE_LIMIT for value in row.values())
+            assert row["clean_output_size"] == len(answer)
+
+        loaded = repo.find_latest("a")
+        assert loaded.clean_output == answer[:PREVIEW_CHARS]
+        assert repo.load_clean_output(loaded) == answer
+        assert repo.load_output(loaded) == transcript
+
+    def test_small_output_stays_inline(self, tmp_path, blob_store):
+        repo = LogRepository(tmp_path / "logs", blob_store=blob_store)
+        repo.save(make_result("a", 1))
+
+        loaded = repo.find_latest("a")
+
+        assert loaded.output_ref is None
+        assert repo.load_output(loaded) == "run 1"
+        assert list(blob_store.refs()) == []
+
+    def test_session_output_shares_blob(self, tmp_path, blob_store):
+        sessions = SessionManager(tmp_path / "sessions", blob_store=blob_store)
+        transcript = "y" * (INLINE_LIMIT * 2)
+        session = sessions.create_session("a")
+
+        sessions.complete_session(session.id, "success", output=transcript)
+        blob_store.put(transcript)
+
+        stored = sessions.get_session(session.id)
+        assert stored.output_ref is not None
+        assert sessions.load_output(stored) == transcript
+        assert len(list(blob_store.refs())) == 1
@@ -0,0 +1,182 @@
+"""Tests for log retention and compaction."""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus
+from codegeass.storage.blob_store import INLINE_LIMIT, BlobStore
+from codegeass.storage.log_repository import LogRepository
+from codegeass.storage.log_retention import LogRetention, RetentionPolicy
+
+NOW = datetime(2024, 6, 30, 12, 0, 0)
+
+
+def make_result(task_id: str, days_ago: int, output: str | None = None) -> ExecutionResult:
+    """Create a result that started `days_ago` days before NOW."""
+    started = NOW - timedelta(days=days_ago)
+    return ExecutionResult(
+        task_id=task_id,
+        session_id=None,
+        status=ExecutionStatus.SUCCESS,
+        output=output or f"{task_id} {days_ago}d",
+        started_at=started,
+        finished_at=started + timedelta(seconds=30),
+    )
+
+
+def read_archive(path) -> list[dict]:
+    with gzip.open(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestRetentionPolicy:
+    """Tests for loading the retention policy."""
+
+    def test_defaults_keep_everything(self, tmp_path):
+        policy = RetentionPolicy.from_settings(tmp_path / "missing.yaml")
+
+        assert not policy.enabled
+
+    def test_shipped_settings_keep_everything(self):
+        settings = Path(__file__).parent.parent / "config" / "settings.yaml"
+
+        assert not RetentionPolicy.from_settings(settings).enabled
+
+    def test_from_settings(self, tmp_path):
+        settings = tmp_path / "settings.yaml"
+        settings.write_text("retention:\n  max_age_days: 30\n  archive: false\n")
+
+        policy = RetentionPolicy.from_settings(settings)
+
+        assert policy.enabled
+        assert policy.max_age_days == 30
+        assert policy.archive is False
+        assert policy.compact_interval_hours == 24
+
+
+class TestLogRetention:
+    """Tests for LogRetention.compact."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        return LogRepository(tmp_path / "logs")
+
+    def test_expired_records_are_archived(self, tmp_path, repo):
+        for days_ago in (120, 40, 1):
+            repo.save(make_result("a", days_ago))
+        retention = LogRetention(tmp_path / "logs", RetentionPolicy(max_age_days=90))
+
+        report = retention.compact(now=NOW)
+
+        assert report.records_archived == 1
+        assert [r.output for r in repo.find_all()] == ["a 1d", "a 40d"]
+        assert [r.output for r in repo.find_by_task_id("a")] == ["a 1d", "a 40d"]
+        assert repo.get_overall_stats()["total_runs"] == 2
+        archived = read_archive(tmp_path / "logs" / "archive" / "2024-03.jsonl.gz")
+        assert [row["output"] for row in archived] == ["a 120d"]
+
+    def test_max_runs_per_task(self, tmp_path, repo):
+        for days_ago in (5, 4, 3, 2, 1):
+            repo.save(make_result("a", days_ago))
+        repo.save(make_result("b", 9))
+        policy = RetentionPolicy(max_runs_per_task=2, archive=False)
+
+        report = LogRetention(tmp_path / "logs", policy).compact(now=NOW)
+
+        assert report.records_deleted == 3
+        assert [r.output for r in repo.find_by_task_id("a")] == ["a 1d", "a 2d"]
+        assert [r.output for r in repo.find_all()] == ["a 1d", "a 2d", "b 9d"]
+        assert not (tmp_path / "logs" / "archive").exists()
+
+    def test_keeps_lines_appended_after_scan(self, tmp_path):
+        log_file = tmp_path / "a.jsonl"
+        old = json.dumps(make_result("a", 200).to_dict()) + "\n"
+        new = json.dumps(make_result("a", 0).to_dict()) + "\n"
+        log_file.write_text(old)
+        _, scanned = LogRetention._read_lines(log_file)
+
+        with open(log_file, "a") as f:
+            f.write(new)
+        LogRetention._rewrite(log_file, [], scanned)
+
+        assert log_file.read_text() == new
+
+    def test_save_during_rewrite_is_not_lost(self, tmp_path, repo, monkeypatch):
+        repo.save(make_result("a", 200))
+        log_file = tmp_path / "logs" / "a.jsonl"
+        _, scanned = LogRetention._read_lines(log_file)
+        copy = shutil.copyfileobj
+        saver = threading.Thread(target=repo.save, args=(make_result("a", 0),))
+
+        def copy_then_save(src, dst):
+            copy(src, dst)
+            # A run finishing between the tail copy and the rename
+            saver.start()
+            saver.join(0.2)
+
+        monkeypatch.setattr("codegeass.storage.log_retention.shutil.copyfileobj", copy_then_save)
+        LogRetention._rewrite(log_file, [], scanned)
+        saver.join()
+
+        assert [r.output for r in repo.find_by_task_id("a")] == ["a 0d"]
+
+    def test_prunes_sessions_and_unreferenced_blobs(self, tmp_path):
+        blob_store = BlobStore(tmp_path / "blobs")
+        repo = LogRepository(tmp_path / "logs", blob_store=blob_store)
+        sessions_dir = tmp_path / "sessions"
+        sessions_dir.mkdir()
+        old_session = sessions_dir / "old.json"
+        old_session.write_text("{}")
+        old_ts = (NOW - timedelta(days=100)).timestamp()
+        os.utime(old_session, (old_ts, old_ts))
+
+        repo.save(make_result("a", 120, output="o" * (INLINE_LIMIT + 1)))
+        repo.save(make_result("a", 1, output="n" * (INLINE_LIMIT + 1)))
+        kept_ref = repo.find_latest("a").output_ref
+        # Make both blobs older than the collection grace period
+        for ref in blob_store.refs():
+            blob_file = tmp_path / "blobs" / ref[:2] / f"{ref}.gz"
+            os.utime(blob_file, (time.time() - 7200, time.time() - 7200))
+
+        retention = LogRetention(
+            tmp_path / "logs",
+            RetentionPolicy(max_age_days=90),
+            sessions_dir=sessions_dir,
+            blob_store=blob_store,
+        )
+        report = retention.compact(now=NOW)
+
+        assert report.sessions_removed == 1
+        assert report.blobs_removed == 1
+        assert list(blob_store.refs()) == [kept_ref]
+
+    def test_size_cap_removes_oldest_segments(self, tmp_path, repo):
+        for days_ago in (150, 120, 1):
+            repo.save(make_result("a", days_ago))
+        logs_dir = tmp_path / "logs"
+        LogRetention(logs_dir, RetentionPolicy(max_age_days=90)).compact(now=NOW)
+        assert len(list((logs_dir / "archive").glob("*.gz"))) == 2
+
+        policy = RetentionPolicy(max_age_days=90, max_total_bytes=1)
+        report = LogRetention(logs_dir, policy).compact(now=NOW)
+
+        assert report.segments_removed == 2
+        assert repo.find_latest("a").output == "a 1d"
+
+    def test_is_due_follows_interval(self, tmp_path, repo):
+        repo.save(make_result("a", 1))
+        retention = LogRetention(tmp_path / "logs", RetentionPolicy(max_age_days=90))
+
+        assert retention.is_due()
+        assert retention.compact_if_due() is not None
+        assert not retention.is_due()
+        assert retention.is_due(now=datetime.now() + timedelta(hours=25))
+        assert not LogRetention(tmp_path / "logs", RetentionPolicy()).is_due()
@@ -0,0 +1,102 @@
+"""Tests for the background notification dispatcher."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from codegeass.notifications.dispatcher import NotificationDispatcher
+from codegeass.scheduling.scheduler import Scheduler
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = NotificationDispatcher(callback_timeout=2)
+    yield dispatcher
+    dispatcher.shutdown(timeout=5)
+
+
+async def record(events: list[str], name: str, delay: float = 0.0) -> str:
+    await asyncio.sleep(delay)
+    events.append(name)
+    return name
+
+
+class TestNotificationDispatcher:
+    """Tests for NotificationDispatcher."""
+
+    def test_submit_does_not_block(self, dispatcher):
+        events: list[str] = []
+        started = time.monotonic()
+
+        future = dispatcher.submit("task-1", record(events, "start", delay=0.3))
+
+        assert time.monotonic() - started < 0.1
+        assert future.result(timeout=5) == "start"
+        assert events == ["start"]
+
+    def test_same_key_runs_in_order(self, dispatcher):
+        events: list[str] = []
+
+        dispatcher.submit("task-1", record(events, "start 1", delay=0.2))
+        dispatcher.submit("task-2", record(events, "start 2"))
+        dispatcher.submit("task-1", record(events, "complete 1"))
+        assert dispatcher.flush(timeout=5)
+
+        # task-2 is not held up by task-1, but task-1's completion waits for its start
+        assert events == ["start 2", "start 1", "complete 1"]
+
+    def test_failures_do_not_break_the_chain(self, dispatcher):
+        events: list[str] = []
+
+        async def fail():
+            raise RuntimeError("provider down")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        dispatcher.submit("task-1", fail())
+        dispatcher.submit("task-1", hang())
+        dispatcher.submit("task-1", record(events, "complete"))
+        assert dispatcher.flush(timeout=5)
+
+        assert events == ["complete"]
+        stats = dispatcher.get_stats()
+        assert stats["failed"] == 2
+        assert stats["sent"] == 1
+
+    def test_stats(self, dispatcher):
+        release = threading.Event()
+
+        async def wait_for_release():
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+        dispatcher.submit("task-1", wait_for_release())
+        dispatcher.submit("task-1", record([], "next"))
+        time.sleep(0.1)
+
+        stats = dispatcher.get_stats()
+        assert stats["running"] == 1
+        assert stats["queued"] == 1
+
+        release.set()
+        assert dispatcher.flush(timeout=5)
+        stats = dispatcher.get_stats()
+        assert stats["queued"] == stats["running"] == 0
+        assert stats["sent"] == 2
+        assert stats["max_latency_ms"] >= 100
+
+
+def test_scheduler_hands_coroutines_to_dispatcher(dispatcher):
+    events: list[str] = []
+    scheduler = SimpleNamespace(_notifier=dispatcher)
+    task = SimpleNamespace(id="task-1")
+
+    Scheduler._run_callback(scheduler, task, record(events, "start", delay=0.2))
+    Scheduler._run_callback(scheduler, task, None)  # Sync callbacks already ran
+
+    assert events == []
+    assert dispatcher.flush(timeout=5)
+    assert events == ["start"]
@@ -0,0 +1,314 @@
+"""Tests for the notification outbox and its rate-limited delivery."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from codegeass.notifications.delivery import (
+    OutboxDelivery,
+    RateLimit,
+    RetryPolicy,
+    TokenBucket,
+)
+from codegeass.notifications.exceptions import ChannelNotFoundError, ProviderError
+from codegeass.notifications.models import Channel, NotificationEvent
+from codegeass.notifications.service import NotificationService
+from codegeass.storage.notification_outbox import STATUS_DEAD, STATUS_PENDING, NotificationOutbox
+
+
+class FakeChannels:
+    """Channel repository serving in-memory channels."""
+
+    def __init__(self, *channels: Channel):
+        self._channels = {channel.id: channel for channel in channels}
+
+    def get_channel_with_credentials(self, channel_id: str):
+        if channel_id not in self._channels:
+            raise ChannelNotFoundError(channel_id)
+        return self._channels[channel_id], {}
+
+
+class FakeProvider:
+    """Provider recording sends, failing with queued errors first."""
+
+    def __init__(self, errors: list[Exception] | None = None):
+        self.errors = list(errors or [])
+        self.sent: list[tuple[float, str, object]] = []
+        self._next_id = 100
+
+    async def send(self, channel, credentials, message, message_id=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((time.monotonic(), message, message_id))
+        self._next_id += 1
+        return {"success": True, "message_id": message_id or self._next_id}
+
+
+def make_channel(provider: str = "fake", channel_id: str = "ch1") -> Channel:
+    return Channel(id=channel_id, name=channel_id, provider=provider, credential_key="k", config={})
+
+
+def make_delivery(
+    provider: FakeProvider,
+    rate: RateLimit = RateLimit(rate=1000.0, burst=1000),
+    retry_policy: RetryPolicy | None = None,
+    outbox: NotificationOutbox | None = None,
+) -> OutboxDelivery:
+    return OutboxDelivery(
+        outbox or NotificationOutbox(),
+        FakeChannels(make_channel()),
+        registry=SimpleNamespace(get=lambda name: provider),
+        retry_policy=retry_policy or RetryPolicy(base_delay=0.01, max_delay=0.05),
+        rate_limits={"fake": rate},
+    )
+
+
+def enqueue(outbox: NotificationOutbox, task_id: str, event: str = "task_success") -> int:
+    return outbox.enqueue("ch1", "fake", task_id, event, f"{task_id} {event}")
+
+
+class TestNotificationOutbox:
+    """Tests for the SQLite outbox."""
+
+    def test_chain_is_delivered_in_order(self, tmp_path):
+        outbox = NotificationOutbox(tmp_path / "outbox.db")
+        start = enqueue(outbox, "t1", "task_start")
+        complete = enqueue(outbox, "t1")
+        other = enqueue(outbox, "t2")
+
+        # The completion waits behind its start; the claim hides both heads
+        assert [e.id for e in outbox.claim_due()] == [start, other]
+        assert outbox.claim_due() == []
+
+        outbox.mark_sent(start)
+        outbox.release(other)
+        assert [e.id for e in outbox.claim_due()] == [complete, other]
+
+    def test_dead_letters_unblock_chain_and_replay(self, tmp_path):
+        outbox = NotificationOutbox(tmp_path / "outbox.db")
+        start = enqueue(outbox, "t1", "task_start")
+        complete = enqueue(outbox, "t1")
+
+        outbox.claim_due()
+        outbox.mark_dead(start, "bad request")
+        assert [e.id for e in outbox.claim_due()] == [complete]
+        assert outbox.counts() == {STATUS_PENDING: 1, STATUS_DEAD: 1}
+
+        assert outbox.replay([start]) == 1
+        entry = outbox.get(start)
+        assert entry.status == STATUS_PENDING
+        assert entry.attempts == 0
+        assert entry.last_error == "bad request"
+
+        outbox.mark_dead(start, "again")
+        assert outbox.purge() == 1
+        assert outbox.get(start) is None
+
+    def test_reschedule_and_next_attempt(self, tmp_path):
+        outbox = NotificationOutbox(tmp_path / "outbox.db")
+        entry_id = enqueue(outbox, "t1")
+        outbox.claim_due()
+
+        retry_at = time.time() + 60
+        outbox.reschedule(entry_id, retry_at, "timeout")
+
+        assert outbox.claim_due() == []
+        assert outbox.next_attempt_at() == pytest.approx(retry_at)
+        assert outbox.get(entry_id).attempts == 1
+
+    def test_rate_limited_reschedule_keeps_attempts(self, tmp_path):
+        outbox = NotificationOutbox(tmp_path / "outbox.db")
+        entry_id = enqueue(outbox, "t1")
+
+        for _ in range(3):
+            outbox.reschedule(entry_id, time.time(), "429", rate_limited=True)
+        outbox.reschedule(entry_id, time.time(), "timeout")
+
+        entry = outbox.get(entry_id)
+        assert entry.status == STATUS_PENDING
+        assert (entry.attempts, entry.rate_limited) == (1, 3)
+
+    def test_message_refs(self, tmp_path):
+        outbox = NotificationOutbox(tmp_path / "outbox.db")
+        outbox.set_message_ref("t1", "ch1", 42)
+        outbox.set_message_ref("t2", "ch1", "abc")
+
+        # A second process sees the refs
+        reopened = NotificationOutbox(tmp_path / "outbox.db")
+        assert reopened.get_message_ref("t1", "ch1") == 42
+        assert reopened.get_message_ref("t2", "ch1") == "abc"
+
+        reopened.clear_message_ref("t1", "ch1")
+        assert outbox.get_message_ref("t1", "ch1") is None
+
+
+class TestRateLimitAndRetry:
+    """Tests for the token bucket and retry policy."""
+
+    def test_token_bucket_burst_then_rate(self):
+        now = [0.0]
+        bucket = TokenBucket(RateLimit(rate=2.0, burst=3), clock=lambda: now[0])
+
+        assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+
+        now[0] = 10.0
+        bucket.pause(5.0)
+        assert bucket.reserve() == pytest.approx(5.0)
+        assert bucket.reserve() == pytest.approx(5.5)
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(base_delay=2.0, max_delay=10.0)
+
+        assert 1.0 <= policy.delay(1) <= 2.0
+        assert 4.0 <= policy.delay(3) <= 8.0
+        assert 5.0 <= policy.delay(10) <= 10.0
+        assert 30.0 <= policy.delay(1, retry_after=30.0) <= 31.0
+
+
+class TestOutboxDelivery:
+    """Tests for OutboxDelivery."""
+
+    async def test_burst_is_sent_at_the_rate_limit(self):
+        provider = FakeProvider()
+        delivery = make_delivery(provider, rate=RateLimit(rate=200.0, burst=5))
+        for i in range(100):
+            enqueue(delivery.outbox, f"t{i}")
+
+        report = await delivery.run()
+
+        assert report.sent == 100
+        assert delivery.outbox.counts()[STATUS_PENDING] == 0
+        assert {message for _, message, _ in provider.sent} == {
+            f"t{i} task_success" for i in range(100)
+        }
+        # 95 messages beyond the burst at 200/s take at least 0.475s
+        elapsed = provider.sent[-1][0] - provider.sent[0][0]
+        assert elapsed >= 0.45
+        # Never more than burst + rate * t messages by time t
+        first = provider.sent[0][0]
+        for count, (sent_at, _, _) in enumerate(provider.sent, start=1):
+            assert count <= 5 + 200.0 * (sent_at - first) + 1
+
+    async def test_rate_limited_sends_honor_retry_after(self):
+        provider = FakeProvider(
+            errors=[ProviderError("fake", "429", retry_after=0.2) for _ in range(5)]
+        )
+        # Rate limiting never dead-letters, even past max_attempts
+        delivery = make_delivery(provider, retry_policy=RetryPolicy(2, base_delay=0.01))
+        enqueue(delivery.outbox, "t1")
+        started = time.monotonic()
+
+        report = await delivery.run(max_wait=None)
+
+        assert report.sent == 1
+        assert report.dead == 0
+        assert report.retried == 5
+        assert provider.sent[0][0] - started >= 5 * 0.2
+
+    async def test_rate_limits_do_not_use_up_retries(self):
+        errors = [ProviderError("fake", "429", retry_after=0.01) for _ in range(3)]
+        provider = FakeProvider(errors=errors + [ProviderError("fake", "timeout")])
+        delivery = make_delivery(provider, retry_policy=RetryPolicy(3, base_delay=0.01))
+        entry_id = enqueue(delivery.outbox, "t1")
+
+        # Three 429s then one transient error: the entry is still retried
+        report = await delivery.run(max_wait=None)
+
+        assert (report.sent, report.retried, report.dead) == (1, 4, 0)
+        assert delivery.outbox.get(entry_id) is None
+
+    async def test_backoff_then_dead_letter(self):
+        provider = FakeProvider(errors=[ProviderError("fake", "500") for _ in range(3)])
+        delivery = make_delivery(provider, retry_policy=RetryPolicy(3, 0.01, 0.02))
+        entry_id = enqueue(delivery.outbox, "t1")
+
+        report = await delivery.run(max_wait=None)
+
+        assert (report.sent, report.retried, report.dead) == (0, 2, 1)
+        entry = delivery.outbox.get(entry_id)
+        assert entry.status == STATUS_DEAD
+        assert entry.attempts == 3
+
+        # Replayed dead letters go out once the provider recovers
+        delivery.outbox.replay()
+        assert (await delivery.run()).sent == 1
+
+    async def test_permanent_errors_are_dead_lettered(self):
+        provider = FakeProvider(errors=[ProviderError("fake", "400", retryable=False)])
+        delivery = make_delivery(provider)
+        entry_id = enqueue(delivery.outbox, "t1")
+        missing = delivery.outbox.enqueue("gone", "fake", "t2", "task_success", "x")
+
+        report = await delivery.run(max_wait=None)
+
+        assert report.dead == 2
+        assert delivery.outbox.get(entry_id).attempts == 1
+        assert "Channel not found" in delivery.outbox.get(missing).last_error
+
+    async def test_completion_edits_start_message(self):
+        provider = FakeProvider(errors=[ProviderError("fake", "timeout")])
+        delivery = make_delivery(provider)
+        enqueue(delivery.outbox, "t1", "task_start")
+        enqueue(delivery.outbox, "t1", "task_success")
+
+        await delivery.run(max_wait=None)
+
+        # The start is retried first; the completion edits it
+        (_, _, start_ref), (_, _, complete_ref) = provider.sent
+        assert start_ref is None
+        assert complete_ref == 101
+        assert delivery.outbox.get_message_ref("t1", "ch1") is None
+
+
+class TestNotificationServiceOutbox:
+    """Tests for NotificationService queueing through the outbox."""
+
+    @pytest.fixture
+    def task(self):
+        return SimpleNamespace(
+            id="t1",
+            name="nightly",
+            notifications={"channels": ["ch1", "missing"], "events": ["task_start"]},
+        )
+
+    async def test_notify_waits_for_delivery(self, task):
+        provider = FakeProvider(errors=[ProviderError("fake", "timeout")])
+        delivery = make_delivery(provider)
+        service = NotificationService(
+            FakeChannels(make_channel()),
+            registry=SimpleNamespace(get=lambda name: provider),
+            formatter=SimpleNamespace(format_for_provider=lambda **kwargs: "started"),
+            delivery=delivery,
+        )
+
+        result = await service.notify(NotificationEvent.TASK_START, task)
+
+        assert result == {"ch1": True, "missing": False}
+        assert provider.sent[0][1] == "started"
+        assert delivery.outbox.counts() == {STATUS_PENDING: 0, STATUS_DEAD: 0}
+
+    async def test_undelivered_messages_stay_queued(self, task, monkeypatch):
+        monkeypatch.setattr("codegeass.notifications.service.NOTIFY_TIMEOUT", 0.1)
+        provider = FakeProvider(errors=[ProviderError("fake", "down") for _ in range(3)])
+        delivery = make_delivery(provider, retry_policy=RetryPolicy(8, 0.3, 0.3))
+        service = NotificationService(
+            FakeChannels(make_channel()),
+            registry=SimpleNamespace(get=lambda name: provider),
+            formatter=SimpleNamespace(format_for_provider=lambda **kwargs: "started"),
+            delivery=delivery,
+        )
+
+        result = await service.notify(NotificationEvent.TASK_START, task)
+
+        assert result["ch1"] is False
+        assert delivery.outbox.counts()[STATUS_PENDING] == 1
+
+        # The background run keeps retrying after notify() returned
+        for _ in range(50):
+            if provider.sent:
+                break
+            await asyncio.sleep(0.1)
+        assert provider.sent
+        assert delivery.outbox.counts()[STATUS_PENDING] == 0
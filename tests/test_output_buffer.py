@@ -0,0 +1,84 @@
+"""Tests for the execution output ring buffer."""
+
+from datetime import datetime
+
+from codegeass.execution.tracker import ActiveExecution, OutputBuffer
+
+
+class TestOutputBuffer:
+    """Tests for OutputBuffer."""
+
+    def test_line_count_bound(self):
+        buffer = OutputBuffer(max_lines=3)
+        seqs = [buffer.append(str(i)) for i in range(5)]
+
+        assert seqs == [0, 1, 2, 3, 4]
+        assert buffer.snapshot() == ["2", "3", "4"]
+        assert buffer.first_seq == 2
+        assert buffer.next_seq == 5
+
+    def test_byte_bound(self):
+        buffer = OutputBuffer(max_lines=100, max_bytes=10)
+        for line in ["aaaa", "bbbb", "cccc"]:
+            buffer.append(line)
+
+        assert buffer.snapshot() == ["bbbb", "cccc"]
+        assert buffer.size_bytes == 8
+
+    def test_long_line_is_truncated(self):
+        buffer = OutputBuffer(max_line_bytes=10)
+        buffer.append("é" * 20)
+
+        line = buffer.snapshot()[0]
+        assert line.startswith("ééééé ...")
+        assert "30 bytes truncated" in line
+
+    def test_since_resumes_without_duplicates(self):
+        buffer = OutputBuffer(max_lines=3)
+        for i in range(5):
+            buffer.append(str(i))
+
+        assert buffer.since(3) == [(3, "3"), (4, "4")]
+        assert buffer.since(5) == []
+        # Older than what is kept: everything still available
+        assert buffer.since(0) == [(2, "2"), (3, "3"), (4, "4")]
+
+    def test_snapshot_last(self):
+        buffer = OutputBuffer()
+        for i in range(5):
+            buffer.append(str(i))
+
+        assert buffer.snapshot(last=2) == ["3", "4"]
+        assert buffer.snapshot(last=10) == ["0", "1", "2", "3", "4"]
+
+    def test_mirrored_sequence_numbers(self):
+        buffer = OutputBuffer()
+        buffer.append("a", seq=7)
+        buffer.append("a", seq=7)
+        buffer.append("b", seq=8)
+        buffer.append("d", seq=10)
+
+        assert buffer.since(0) == [(10, "d")]
+        assert buffer.next_seq == 11
+
+
+class TestActiveExecutionOutput:
+    """Tests for the output of ActiveExecution across serialization."""
+
+    def test_round_trip_keeps_sequence(self):
+        execution = ActiveExecution(
+            execution_id="e1",
+            task_id="t1",
+            task_name="Task",
+            session_id=None,
+            started_at=datetime(2024, 1, 15, 9, 0),
+        )
+        for i in range(30):
+            execution.append_output(str(i))
+
+        data = execution.to_dict()
+        restored = ActiveExecution.from_dict(data)
+
+        assert data["output_lines"] == [str(i) for i in range(10, 30)]
+        assert restored.output.since(28) == [(28, "28"), (29, "29")]
+        assert restored.append_output("next") == 30
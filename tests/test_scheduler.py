@@ -1,11 +1,26 @@
 """Tests for scheduling layer."""
 
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from pathlib import Path
+from unittest.mock import MagicMock, patch
+
 import pytest
 
 from codegeass.core.entities import Task
+from codegeass.core.exceptions import ValidationError
+from codegeass.core.value_objects import ExecutionResult, ExecutionStatus, MisfirePolicy
 from codegeass.scheduling.cron_parser import CronParser
+from codegeass.scheduling.daemon import MAINTENANCE_INTERVAL, SchedulerDaemon
+from codegeass.scheduling.liveness import SchedulerLiveness
+from codegeass.scheduling.scheduler import Scheduler
+from codegeass.scheduling.task_pool import ConcurrencyLimits, SingleFlight, TaskPool
+from codegeass.storage import yaml_backend
+from codegeass.storage.fire_ledger import FireLedger
+from codegeass.storage.task_repository import TaskRepository
 
 
 class TestCronParser:
@@ -57,6 +72,14 @@ class TestCronParser:
         # Every minute expression should always be "due"
         assert CronParser.is_due("* * * * *", window_seconds=120) is True
 
+    def test_get_between(self):
+        times = CronParser.get_between(
+            "0 * * * *", datetime(2024, 1, 15, 6, 0), datetime(2024, 1, 15, 9, 0), limit=10
+        )
+
+        assert times == [datetime(2024, 1, 15, h, 0) for h in (9, 8, 7)]
+        assert len(CronParser.get_between("* * * * *", datetime.min, datetime.now(), 5)) == 5
+
     def test_parse_field_star(self):
         values = CronParser.parse_field("*", 0, 59)
         assert values == list(range(0, 60))
@@ -102,3 +125,499 @@ class TestSchedulerIntegration:
 
         assert test_task.last_status == "success"
         assert test_task.last_run is not None
+
+
+def make_task(tmp_path, name: str, project: str = "repo", code_source: str = "claude") -> Task:
+    """Create a task in a per-project working directory."""
+    working_dir = tmp_path / project
+    working_dir.mkdir(exist_ok=True)
+    return Task.create(
+        name=name,
+        schedule="* * * * *",
+        working_dir=working_dir,
+        prompt="hi",
+        code_source=code_source,
+    )
+
+
+class TestTaskPool:
+    """Tests for concurrent task execution."""
+
+    @staticmethod
+    def tracking_runner(delay: float = 0.05):
+        """Return a run function recording peak concurrency per key."""
+        lock = threading.Lock()
+        active: Counter = Counter()
+        peak: Counter = Counter()
+
+        def run(task: Task) -> ExecutionResult:
+            keys = ["all", f"project:{task.working_dir.name}", f"provider:{task.code_source}"]
+            with lock:
+                for key in keys:
+                    active[key] += 1
+                    peak[key] = max(peak[key], active[key])
+            time.sleep(delay)
+            with lock:
+                for key in keys:
+                    active[key] -= 1
+            now = datetime.now()
+            return ExecutionResult(
+                task_id=task.id, session_id=None, status=ExecutionStatus.SUCCESS,
+                output=task.name, started_at=now, finished_at=now,
+            )
+
+        return run, peak
+
+    def test_runs_up_to_max_concurrent_in_input_order(self, tmp_path):
+        tasks = [make_task(tmp_path, f"t{i}", project=f"p{i}") for i in range(6)]
+        run, peak = self.tracking_runner()
+        finished = []
+
+        results = TaskPool(ConcurrencyLimits(max_concurrent=3)).map(
+            tasks, run, on_result=lambda task, _: finished.append(task.name)
+        )
+
+        assert [r.output for r in results] == [f"t{i}" for i in range(6)]
+        assert sorted(finished) == [f"t{i}" for i in range(6)]
+        assert peak["all"] == 3
+
+    def test_per_project_and_provider_caps(self, tmp_path):
+        tasks = [make_task(tmp_path, f"a{i}", project="a") for i in range(3)]
+        tasks += [make_task(tmp_path, f"b{i}", project="b", code_source="codex") for i in range(3)]
+        run, peak = self.tracking_runner()
+        limits = ConcurrencyLimits(max_concurrent=4, per_project=1, per_provider=1)
+
+        results = TaskPool(limits).map(tasks, run)
+
+        assert len(results) == 6
+        assert peak["project:a"] == 1
+        assert peak["provider:codex"] == 1
+        assert peak["all"] == 2
+
+    def test_task_never_overlaps_itself(self, tmp_path):
+        task = make_task(tmp_path, "dup")
+        run, peak = self.tracking_runner()
+
+        results = TaskPool(ConcurrencyLimits(max_concurrent=4)).map([task, task, task], run)
+
+        assert len(results) == 3
+        assert peak["all"] == 1
+
+    def test_exception_becomes_failure(self, tmp_path):
+        task = make_task(tmp_path, "boom")
+
+        def run(task: Task) -> ExecutionResult:
+            raise RuntimeError("callback failed")
+
+        [result] = TaskPool(ConcurrencyLimits()).map([task], run)
+
+        assert result.status == ExecutionStatus.FAILURE
+        assert result.error == "callback failed"
+
+    def test_shutdown_drops_queued_tasks_and_closes_pool(self, tmp_path):
+        tasks = [make_task(tmp_path, f"t{i}", project=f"p{i}") for i in range(3)]
+        run, _ = self.tracking_runner(delay=0.3)
+        pool = TaskPool(ConcurrencyLimits(max_concurrent=1))
+        finished = []
+
+        threading.Timer(0.1, pool.shutdown, kwargs={"wait": False}).start()
+        results = pool.map(tasks, run, on_result=lambda task, _: finished.append(task.name))
+
+        assert [r.status for r in results] == [
+            ExecutionStatus.SUCCESS, ExecutionStatus.SKIPPED, ExecutionStatus.SKIPPED,
+        ]
+        assert finished == ["t0"]
+        # The finishing worker did not bring the executor back
+        assert pool._executor is None
+        with pytest.raises(RuntimeError):
+            pool.submit(tasks[0], run)
+
+    def test_limits_from_settings(self, tmp_path):
+        settings = tmp_path / "settings.yaml"
+        settings.write_text("scheduler:\n  max_concurrent: 4\n  max_concurrent_per_project: 2\n")
+
+        limits = ConcurrencyLimits.from_settings(settings)
+
+        assert limits == ConcurrencyLimits(max_concurrent=4, per_project=2, per_provider=0)
+
+
+class TestSingleFlight:
+    """Tests for per-task overlap protection."""
+
+    def test_in_process(self):
+        flight = SingleFlight()
+
+        assert flight.acquire("a") is True
+        assert flight.acquire("a") is False
+        assert flight.acquire("b") is True
+        flight.release("a")
+        assert flight.acquire("a") is True
+
+    def test_lock_files_exclude_other_holders(self, tmp_path):
+        first = SingleFlight(tmp_path / "locks")
+        second = SingleFlight(tmp_path / "locks")
+
+        assert first.acquire("a") is True
+        assert second.acquire("a") is False
+        first.release("a")
+        assert second.acquire("a") is True
+
+
+class FakeScheduler:
+    """Records submitted tasks instead of running them."""
+
+    def __init__(self):
+        self.submitted: list[str] = []
+        self.liveness = SchedulerLiveness(probe=lambda: False)
+
+    def submit_task(self, task: Task):
+        self.submitted.append(task.name)
+        future: Future = Future()
+        future.set_result(None)
+        return future
+
+    def run_maintenance(self):
+        return None
+
+    def warm_worktrees(self, now=None):
+        return 0
+
+    def claim_fires(self, task: Task, now: datetime):
+        return [now]
+
+    def claim_due_tasks(self, now: datetime):
+        return []
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class TestSchedulerDaemon:
+    """Tests for the next-fire-time heap."""
+
+    @pytest.fixture
+    def setup(self, tmp_path):
+        schedules = tmp_path / "schedules.yaml"
+        repo = TaskRepository(schedules)
+        clock = {"now": datetime(2024, 1, 15, 8, 59, 30)}
+        scheduler = FakeScheduler()
+        daemon = SchedulerDaemon(scheduler, repo, schedules, clock=lambda: clock["now"])
+        return repo, clock, scheduler, daemon
+
+    def add_task(self, repo, tmp_path, name, schedule, enabled=True):
+        task = Task.create(name=name, schedule=schedule, working_dir=tmp_path, prompt="hi")
+        task.enabled = enabled
+        repo.save(task)
+        return task
+
+    def test_fires_at_next_time_and_reschedules(self, tmp_path, setup):
+        repo, clock, scheduler, daemon = setup
+        self.add_task(repo, tmp_path, "hourly", "0 * * * *")
+        self.add_task(repo, tmp_path, "quarter", "*/15 * * * *")
+        self.add_task(repo, tmp_path, "off", "* * * * *", enabled=False)
+        daemon.reload()
+
+        assert daemon.next_fire[0] == datetime(2024, 1, 15, 9, 0)
+        assert daemon.tick() == []
+
+        clock["now"] = datetime(2024, 1, 15, 9, 0, 1)
+        assert sorted(t.name for t in daemon.tick()) == ["hourly", "quarter"]
+        assert daemon.next_fire[0] == datetime(2024, 1, 15, 9, 15)
+
+        heartbeat = scheduler.liveness.read()
+        assert heartbeat.source == "daemon"
+        assert heartbeat.last_tick == datetime(2024, 1, 15, 9, 0, 1)
+        assert heartbeat.next_tick == datetime(2024, 1, 15, 9, 15)
+        assert heartbeat.lag_seconds == 1.0
+
+        clock["now"] = datetime(2024, 1, 15, 9, 15)
+        assert [t.name for t in daemon.tick()] == ["quarter"]
+        assert scheduler.submitted.count("quarter") == 2
+
+    def test_reload_keeps_pending_fire_times(self, tmp_path, setup):
+        repo, clock, scheduler, daemon = setup
+        task = self.add_task(repo, tmp_path, "hourly", "0 * * * *")
+        daemon.reload()
+
+        # A reload after the fire time (e.g. triggered by another write) must not skip it
+        clock["now"] = datetime(2024, 1, 15, 9, 0, 5)
+        daemon.reload()
+        assert [t.name for t in daemon.tick()] == ["hourly"]
+
+        task.schedule = "30 * * * *"
+        repo.update(task)
+        daemon.reload()
+        assert daemon.next_fire[0] == datetime(2024, 1, 15, 9, 30)
+
+    def test_disabled_after_load_is_not_fired(self, tmp_path, setup):
+        repo, clock, scheduler, daemon = setup
+        task = self.add_task(repo, tmp_path, "hourly", "0 * * * *")
+        daemon.reload()
+        repo.disable(task.id)
+
+        clock["now"] = datetime(2024, 1, 15, 9, 0)
+
+        assert daemon.tick() == []
+        assert daemon.next_fire is None
+
+    def test_maintenance_runs_off_the_loop_thread(self, setup):
+        _, clock, scheduler, daemon = setup
+        release = threading.Event()
+        threads: list[str] = []
+
+        def run_maintenance():
+            threads.append(threading.current_thread().name)
+            release.wait(5)
+
+        scheduler.run_maintenance = run_maintenance
+        daemon._maybe_run_maintenance()
+        # Still compacting an interval later, so no second run is started
+        clock["now"] += MAINTENANCE_INTERVAL
+        daemon._maybe_run_maintenance()
+        release.set()
+        daemon._maintainer.join(timeout=5)
+
+        assert threads == ["codegeass-log-maintenance"]
+
+    def test_run_stops_and_wakes_on_schedule_change(self, tmp_path):
+        schedules = tmp_path / "schedules.yaml"
+        repo = TaskRepository(schedules)
+        scheduler = FakeScheduler()
+        daemon = SchedulerDaemon(scheduler, repo, schedules, watch_interval=0.01)
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+
+        self.add_task(repo, tmp_path, "minutely", "* * * * *")
+        deadline = time.monotonic() + 5
+        while daemon.next_fire is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        daemon.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert daemon.next_fire is not None
+        # A stopped daemon removes its heartbeat
+        assert scheduler.liveness.read() is None
+
+
+class TestFireLedger:
+    """Tests for the ledger of fired schedule instants."""
+
+    def test_each_instant_is_claimed_once(self, tmp_path):
+        path = tmp_path / "fire_ledger.json"
+        seed = datetime(2024, 1, 15, 8, 0)
+        nine = datetime(2024, 1, 15, 9, 0)
+
+        assert FireLedger(path).claim("a", nine, seed) == seed
+        # A second process sees the claim
+        assert FireLedger(path).claim("a", nine, seed) is None
+        assert FireLedger(path).claim("a", nine + timedelta(hours=1), seed) == nine
+        assert FireLedger(path).last_fired("a") == nine + timedelta(hours=1)
+
+    def test_prune(self, tmp_path):
+        ledger = FireLedger()
+        ledger.claim("a", datetime(2024, 1, 15, 9, 0), datetime.min)
+        ledger.claim("b", datetime(2024, 1, 15, 9, 0), datetime.min)
+
+        assert ledger.prune({"a"}) == 1
+        assert ledger.last_fired("b") is None
+        assert ledger.last_fired("a") is not None
+
+
+class TestMisfirePolicy:
+    """Tests for claiming schedule instants under each misfire policy."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        return TaskRepository(tmp_path / "schedules.yaml")
+
+    def make_scheduler(self, repo, ledger):
+        return Scheduler(
+            task_repository=repo,
+            skill_registry=MagicMock(),
+            session_manager=MagicMock(),
+            log_repository=MagicMock(),
+            fire_ledger=ledger,
+        )
+
+    def add_task(self, repo, tmp_path, schedule, policy=None, last_run=None):
+        task = Task.create(
+            name=f"task-{len(repo.find_all())}",
+            schedule=schedule,
+            working_dir=tmp_path,
+            prompt="hi",
+            misfire_policy=policy or MisfirePolicy(),
+            last_run=last_run,
+        )
+        repo.save(task)
+        return task
+
+    def test_run_once_after_downtime(self, tmp_path, repo):
+        task = self.add_task(repo, tmp_path, "0 9 * * *", last_run="2024-01-12T09:01:00")
+        scheduler = self.make_scheduler(repo, FireLedger())
+        now = datetime(2024, 1, 15, 14, 0)
+
+        assert scheduler.claim_fires(task, now) == [datetime(2024, 1, 15, 9, 0)]
+        assert scheduler.claim_fires(task, now) == []
+
+    def test_run_all_is_capped(self, tmp_path, repo):
+        policy = MisfirePolicy(mode="run-all", max_catch_up=2)
+        task = self.add_task(repo, tmp_path, "0 9 * * *", policy, "2024-01-10T09:01:00")
+        scheduler = self.make_scheduler(repo, FireLedger())
+
+        fires = scheduler.claim_fires(task, datetime(2024, 1, 15, 14, 0))
+
+        assert fires == [datetime(2024, 1, 14, 9, 0), datetime(2024, 1, 15, 9, 0)]
+
+    def test_skip_drops_missed_runs(self, tmp_path, repo):
+        task = self.add_task(
+            repo, tmp_path, "0 9 * * *", MisfirePolicy(mode="skip"), "2024-01-12T09:01:00"
+        )
+        scheduler = self.make_scheduler(repo, FireLedger())
+
+        assert scheduler.claim_fires(task, datetime(2024, 1, 15, 14, 0)) == []
+        # The next instant, picked up on time, runs
+        assert scheduler.claim_fires(task, datetime(2024, 1, 16, 9, 10)) == [
+            datetime(2024, 1, 16, 9, 0)
+        ]
+
+    def test_threshold_below_default_applies(self, tmp_path, repo):
+        policy = MisfirePolicy(mode="skip")
+        task = self.add_task(repo, tmp_path, "0 9 * * *", policy, "2024-01-15T08:00:00")
+        now = datetime(2024, 1, 15, 9, 10)
+
+        # Ten minutes late is on time by default, but missed with a 5 minute threshold
+        assert self.make_scheduler(repo, FireLedger()).claim_fires(task, now) != []
+        assert self.make_scheduler(repo, FireLedger()).claim_fires(task, now, 300) == []
+
+    def test_slow_runner_fires_every_instant_once(self, tmp_path, repo):
+        self.add_task(repo, tmp_path, "5,10 * * * *", last_run="2024-01-15T08:00:00")
+        scheduler = self.make_scheduler(repo, FireLedger())
+
+        # A runner every 15 minutes still catches instants between its ticks
+        assert len(scheduler.claim_due_tasks(now=datetime(2024, 1, 15, 9, 0))) == 1
+        assert len(scheduler.claim_due_tasks(now=datetime(2024, 1, 15, 9, 15))) == 1
+        assert len(scheduler.claim_due_tasks(now=datetime(2024, 1, 15, 9, 30))) == 0
+
+    def test_overlapping_schedulers_share_the_ledger(self, tmp_path, repo):
+        task = self.add_task(repo, tmp_path, "*/15 * * * *")
+        path = tmp_path / "fire_ledger.json"
+        first = self.make_scheduler(repo, FireLedger(path))
+        second = self.make_scheduler(repo, FireLedger(path))
+        now = datetime.now()
+
+        assert len(first.claim_fires(task, now)) == 1
+        assert second.claim_fires(task, now) == []
+
+    def test_policy_round_trip(self, tmp_path):
+        policy = MisfirePolicy(mode="run-all", max_catch_up=5)
+        task = Task.create(
+            name="t", schedule="0 9 * * *", working_dir=tmp_path, prompt="p",
+            misfire_policy=policy,
+        )
+
+        assert task.to_dict()["misfire_policy"] == {"mode": "run-all", "max_catch_up": 5}
+        assert Task.from_dict(task.to_dict()).misfire_policy == policy
+        assert MisfirePolicy.from_dict("skip") == MisfirePolicy(mode="skip")
+        assert "misfire_policy" not in Task.create(
+            name="u", schedule="0 9 * * *", working_dir=tmp_path, prompt="p"
+        ).to_dict()
+
+    @pytest.mark.parametrize("data", [{"mode": "later"}, {"max_catch_up": 0}, {"cap": 3}])
+    def test_invalid_policy(self, data):
+        with pytest.raises(ValidationError):
+            MisfirePolicy.from_dict(data)
+
+
+class TestRunBookkeeping:
+    """Tests for recording finished runs on the stored task."""
+
+    def test_run_is_recorded_in_one_write_keeping_edits(self, tmp_path):
+        repo = TaskRepository(tmp_path / "schedules.yaml")
+        task = Task.create(name="t", schedule="0 9 * * *", working_dir=tmp_path, prompt="old")
+        repo.save(task)
+        scheduler = Scheduler(
+            task_repository=repo,
+            skill_registry=MagicMock(),
+            session_manager=MagicMock(),
+            log_repository=MagicMock(),
+            fire_ledger=FireLedger(),
+        )
+
+        def execute(run_task):
+            # The user edits the task while it runs
+            edited = repo.find_by_id(run_task.id)
+            edited.prompt = "new"
+            repo.update(edited)
+            now = datetime.now()
+            return ExecutionResult(
+                task_id=run_task.id, session_id=None, status=ExecutionStatus.SUCCESS,
+                output="", started_at=now, finished_at=now,
+            )
+
+        scheduler._executor = MagicMock(execute=execute)
+        with patch(
+            "codegeass.storage.yaml_backend.atomic_write",
+            wraps=yaml_backend.atomic_write,
+        ) as write:
+            scheduler.run_task(task)
+
+        # One write for the edit, one for recording the run
+        assert write.call_count == 2
+        stored = repo.find_by_id(task.id)
+        assert stored.prompt == "new"
+        assert stored.last_status == "success"
+
+
+class TestSchedulerLiveness:
+    """Tests for scheduler heartbeats and the cached service probe."""
+
+    def test_cron_runner_interval_is_learned(self, tmp_path):
+        liveness = SchedulerLiveness(tmp_path, probe=lambda: pytest.fail("probed"))
+        first = datetime(2024, 1, 15, 9, 0)
+
+        liveness.beat("cron", now=first)
+        heartbeat = liveness.beat("cron", now=first + timedelta(minutes=5, seconds=20))
+
+        assert heartbeat.next_tick == first + timedelta(minutes=10, seconds=40)
+        # A second process reads the same heartbeat without probing
+        status = SchedulerLiveness(tmp_path, probe=lambda: pytest.fail("probed")).status(
+            now=first + timedelta(minutes=6)
+        )
+        assert status["alive"] and status["running"]
+        assert status["source"] == "cron"
+        assert status["last_check"] == "2024-01-15T09:05:20"
+        assert status["lag_seconds"] == 0
+
+        heartbeat = liveness.beat("cron", now=first + timedelta(minutes=11))
+        assert heartbeat.lag_seconds == 20.0
+
+    def test_stale_heartbeat_falls_back_to_cached_probe(self, tmp_path):
+        probes = []
+        liveness = SchedulerLiveness(tmp_path, probe=lambda: probes.append(1) or True)
+        start = datetime(2024, 1, 15, 9, 0)
+        liveness.beat("cron", next_tick=start + timedelta(minutes=1), now=start)
+
+        status = liveness.status(now=start + timedelta(hours=1))
+        assert not status["alive"]
+        assert status["running"]
+        assert status["lag_seconds"] == 59 * 60
+
+        # Other processes reuse the probe result until the TTL expires
+        other = SchedulerLiveness(tmp_path, probe=lambda: probes.append(1) or True)
+        other.status(now=start + timedelta(hours=1, minutes=1))
+        assert len(probes) == 1
+        other.status(now=start + timedelta(hours=2))
+        assert len(probes) == 2
+
+    def test_dead_daemon_is_not_alive(self, tmp_path):
+        liveness = SchedulerLiveness(tmp_path, probe=lambda: False)
+        now = datetime.now()
+        heartbeat = liveness.beat("daemon", now=now)
+
+        assert liveness.is_alive(heartbeat, now)
+        heartbeat.pid = 2**22 + 12345  # Above the default pid_max, so never in use
+        assert not liveness.is_alive(heartbeat, now)
+
+        liveness.clear()
+        assert liveness.status(now)["running"] is False
@@ -0,0 +1,165 @@
+"""Tests for the agent process supervisor."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from codegeass.execution.supervisor import ProcessSupervisor
+from codegeass.execution.tracker import ExecutionTracker
+from codegeass.execution.tracker import tracker as tracker_module
+
+# Starts a grandchild that stays in the process group, prints its PID, then waits
+PARENT_WITH_CHILD = (
+    "import subprocess, sys, time; "
+    "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+    "print(child.pid, flush=True); time.sleep(60)"
+)
+
+IGNORE_TERM = (
+    "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+    "print('ready', flush=True); time.sleep(60)"
+)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reparented zombies still answer kill(0); treat them as dead
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(") ")[1][0] != "Z"
+    except OSError:
+        return True
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def supervisor():
+    return ProcessSupervisor(grace=0.5)
+
+
+def spawn(supervisor, script: str):
+    process = supervisor.spawn([sys.executable, "-c", script], stdout=subprocess.PIPE)
+    first_line = process.stdout.readline().decode().strip()
+    return process, first_line
+
+
+class TestProcessSupervisor:
+    """Tests for ProcessSupervisor."""
+
+    def test_spawn_starts_new_process_group(self, supervisor):
+        process, child = spawn(supervisor, PARENT_WITH_CHILD)
+
+        assert os.getpgid(process.pid) == process.pid
+        assert os.getpgid(int(child)) == process.pid
+        supervisor.release(process)
+
+    def test_terminate_returns_immediately_and_kills_tree(self, supervisor):
+        process, child = spawn(supervisor, PARENT_WITH_CHILD)
+
+        started = time.monotonic()
+        assert supervisor.terminate(process.pid)
+        assert time.monotonic() - started < 0.2
+
+        assert process.wait(5) is not None
+        assert wait_until(lambda: not alive(int(child)))
+        supervisor.release(process)
+
+    def test_terminate_escalates_to_kill(self, supervisor):
+        process, _ = spawn(supervisor, IGNORE_TERM)
+
+        assert supervisor.terminate(process.pid)
+        assert process.wait(0.2) is None
+
+        assert process.wait(5) == -9
+        supervisor.release(process)
+
+    def test_escalation_reaps_unowned_process(self, supervisor):
+        process, _ = spawn(supervisor, IGNORE_TERM)
+
+        supervisor.terminate(process.pid)
+
+        # Nobody waits on the process; the escalation timer reaps it
+        assert wait_until(lambda: process.returncode is not None)
+        with pytest.raises(ChildProcessError):
+            os.waitpid(process.pid, os.WNOHANG)
+        supervisor.release(process)
+
+    def test_stop_waits_for_grace_then_kills(self, supervisor):
+        process, _ = spawn(supervisor, IGNORE_TERM)
+
+        started = time.monotonic()
+        assert supervisor.stop(process, grace=0.3) == -9
+        assert 0.3 <= time.monotonic() - started < 5
+
+    def test_release_stops_leftover_children(self, supervisor):
+        script = (
+            "import subprocess, sys; "
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'], "
+            "stdout=subprocess.DEVNULL); print(child.pid, flush=True)"
+        )
+        process, child = spawn(supervisor, script)
+        assert process.wait(5) == 0
+        assert alive(int(child))
+
+        supervisor.release(process)
+
+        assert wait_until(lambda: not alive(int(child)))
+        assert supervisor.active_count == 0
+
+    def test_resource_usage(self, supervisor):
+        script = "data = bytearray(50 * 1024 * 1024); sum(range(3_000_000)); print('done')"
+        process, _ = spawn(supervisor, script)
+
+        assert process.wait(10) == 0
+        usage = process.resource_usage()
+
+        assert usage["cpu_user_seconds"] + usage["cpu_system_seconds"] > 0
+        assert usage["peak_rss_bytes"] >= 50 * 1024 * 1024
+        supervisor.release(process)
+
+    def test_terminate_unknown_pid(self, supervisor):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+
+        assert supervisor.terminate(process.pid) is False
+
+
+class TestTrackerStop:
+    """Tests for stopping executions through the tracker."""
+
+    @pytest.fixture
+    def tracker(self, tmp_path):
+        ExecutionTracker._instance = None
+        tracker = ExecutionTracker(tmp_path / "data")
+        yield tracker
+        ExecutionTracker._instance = None
+
+    def test_stop_does_not_block_caller(self, tracker, monkeypatch):
+        supervisor = ProcessSupervisor(grace=0.5)
+        monkeypatch.setattr(tracker_module, "get_process_supervisor", lambda: supervisor)
+        process, child = spawn(supervisor, PARENT_WITH_CHILD)
+        execution_id = tracker.start_execution("task-1", "Task")
+        tracker.set_pid(execution_id, process.pid)
+
+        started = time.monotonic()
+        assert tracker.stop_execution(execution_id)
+        assert time.monotonic() - started < 0.2
+
+        assert tracker.get_execution(execution_id) is None
+        assert process.wait(5) is not None
+        assert wait_until(lambda: not alive(int(child)))
+        supervisor.release(process)
@@ -292,6 +292,33 @@ class TestTeamsProvider:
                 await provider.send(channel, valid_credentials_logic_azure, "Test message")
 
             assert "Teams API error" in str(exc_info.value)
+            assert exc_info.value.retryable is False
+
+    @pytest.mark.asyncio
+    async def test_send_rate_limited(self, provider, channel, valid_credentials_logic_azure):
+        """Test that a 429 carries the Retry-After delay."""
+        import httpx
+
+        mock_response = MagicMock()
+        mock_response.status_code = 429
+        mock_response.text = "Too Many Requests"
+        mock_response.headers = {"Retry-After": "7"}
+        mock_response.json.side_effect = ValueError("not JSON")
+        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            "Too Many Requests", request=MagicMock(), response=mock_response
+        )
+
+        mock_client = AsyncMock()
+        mock_client.post = AsyncMock(return_value=mock_response)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+
+        with patch("httpx.AsyncClient", return_value=mock_client):
+            with pytest.raises(ProviderError) as exc_info:
+                await provider.send(channel, valid_credentials_logic_azure, "Test message")
+
+            assert exc_info.value.retryable is True
+            assert exc_info.value.retry_after == 7.0
 
     @pytest.mark.asyncio
     async def test_send_general_error(self, provider, channel, valid_credentials_logic_azure):
@@ -0,0 +1,137 @@
+"""Tests for write-behind persistence of active executions."""
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from codegeass.execution.tracker import persistence as persistence_module
+from codegeass.execution.tracker.execution import ActiveExecution
+from codegeass.execution.tracker.persistence import ExecutionPersistence
+
+
+def make_execution(execution_id: str, phase: str = "initializing") -> ActiveExecution:
+    return ActiveExecution(
+        execution_id=execution_id,
+        task_id=f"task-{execution_id}",
+        task_name=f"Task {execution_id}",
+        session_id=None,
+        started_at=datetime(2024, 1, 15, 9, 0),
+        current_phase=phase,
+    )
+
+
+class TestExecutionPersistence:
+    """Tests for ExecutionPersistence."""
+
+    @pytest.fixture
+    def journal(self, tmp_path):
+        return tmp_path / "active_executions.journal"
+
+    def test_changes_are_coalesced_until_flush(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        execution = make_execution("a")
+
+        for i in range(100):
+            execution.current_phase = f"tool: {i}"
+            persistence.mark_dirty(execution)
+        assert not journal.exists()
+
+        persistence.flush()
+
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert len(records) == 1
+        assert records[0]["execution"]["current_phase"] == "tool: 99"
+
+    def test_timer_flushes_in_background(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=0.05)
+        persistence.mark_dirty(make_execution("a"))
+
+        deadline = time.monotonic() + 5
+        while not journal.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert journal.exists()
+
+    def test_load_replays_journal_over_checkpoint(self, tmp_path):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        persistence.save({"a": make_execution("a"), "b": make_execution("b")})
+
+        persistence.mark_removed("a")
+        persistence.mark_dirty(make_execution("b", phase="thinking"))
+        persistence.mark_dirty(make_execution("c"))
+        persistence.flush()
+
+        loaded = ExecutionPersistence(tmp_path).load()
+
+        assert sorted(loaded) == ["b", "c"]
+        assert loaded["b"].current_phase == "thinking"
+
+    def test_torn_journal_line_is_ignored(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        persistence.mark_dirty(make_execution("a"))
+        persistence.flush()
+        with open(journal, "a") as f:
+            f.write('{"op":"put","execution":{"exec')
+
+        assert list(ExecutionPersistence(tmp_path).load()) == ["a"]
+
+    def test_journal_is_folded_into_checkpoint(self, tmp_path, journal, monkeypatch):
+        monkeypatch.setattr(persistence_module, "CHECKPOINT_RECORDS", 5)
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+
+        for i in range(7):
+            persistence.mark_dirty(make_execution(str(i)))
+            persistence.flush()
+
+        checkpoint = json.loads((tmp_path / "active_executions.json").read_text())
+        assert len(checkpoint["executions"]) == 5
+        assert len(journal.read_text().splitlines()) == 2
+        assert len(ExecutionPersistence(tmp_path).load()) == 7
+
+    def test_remove_of_unpersisted_execution_writes_nothing(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        persistence.mark_dirty(make_execution("a"))
+        persistence.mark_removed("a")
+        persistence.flush()
+
+        assert not journal.exists()
+
+    def test_clear_drops_pending_changes(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        persistence.mark_dirty(make_execution("a"))
+        persistence.flush()
+        persistence.mark_dirty(make_execution("b"))
+
+        persistence.clear()
+        persistence.flush()
+
+        assert not journal.exists()
+        assert ExecutionPersistence(tmp_path).load() == {}
+
+    def test_flush_writes_the_snapshot_taken_when_marked(self, tmp_path, journal):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        execution = make_execution("a")
+        execution.append_output("before")
+        persistence.mark_dirty(execution)
+
+        # Output appended by another thread after marking is not read by flush
+        execution.append_output("after")
+        persistence.flush()
+
+        record = json.loads(journal.read_text())
+        assert record["execution"]["output_lines"] == ["before"]
+
+    def test_unserializable_execution_is_skipped(self, tmp_path, journal, monkeypatch):
+        persistence = ExecutionPersistence(tmp_path, flush_interval=60)
+        execution = make_execution("a")
+
+        def broken_to_dict():
+            raise RuntimeError("deque mutated during iteration")
+
+        monkeypatch.setattr(execution, "to_dict", broken_to_dict)
+        persistence.mark_dirty(execution)
+        persistence.flush()
+
+        assert not journal.exists()
@@ -0,0 +1,281 @@
+"""Tests for WebSocket fan-out to dashboard clients."""
+
+import asyncio
+import json
+
+from codegeass.dashboard import websocket as websocket_module
+from codegeass.dashboard.websocket import ConnectionManager
+
+
+class FakeWebSocket:
+    """Records frames; optionally blocks until released."""
+
+    def __init__(self, blocked: bool = False):
+        self.frames: list[str] = []
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        await self.unblocked.wait()
+        self.frames.append(data)
+
+    async def close(self) -> None:
+        pass
+
+    def events(self) -> list[dict]:
+        events = []
+        for frame in self.frames:
+            data = json.loads(frame)
+            events.extend(data if isinstance(data, list) else [data])
+        return events
+
+
+def event(type_: str, task_id: str = "t1", **data) -> dict:
+    return {"type": type_, "execution_id": "e1", "task_id": task_id, "data": data}
+
+
+async def settle(manager: ConnectionManager) -> None:
+    """Let writer tasks drain their queues."""
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if all(not c["queued"] for c in manager.get_stats()["clients"]):
+            return
+
+
+class TestConnectionManager:
+    """Tests for ConnectionManager."""
+
+    async def test_task_clients_receive_each_event_once(self):
+        manager = ConnectionManager()
+        everything, task_only, other_task = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(everything)
+        await manager.connect(task_only, task_id="t1")
+        await manager.connect(other_task, task_id="t2")
+
+        await manager.broadcast(event("execution.started"))
+        await settle(manager)
+
+        assert len(everything.frames) == 1
+        assert len(task_only.frames) == 1
+        assert other_task.frames == []
+        await manager.close()
+
+    async def test_slow_client_does_not_block_others(self):
+        manager = ConnectionManager()
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+
+        for i in range(5):
+            await manager.broadcast(event("execution.output", line=str(i)))
+        await settle(manager)
+
+        assert [e["data"]["line"] for e in fast.events()] == ["0", "1", "2", "3", "4"]
+        slow.unblocked.set()
+        await manager.close()
+
+    async def test_backpressure_drops_output_but_not_lifecycle(self, monkeypatch):
+        monkeypatch.setattr(websocket_module, "MAX_QUEUED_MESSAGES", 3)
+        manager = ConnectionManager()
+        slow = FakeWebSocket(blocked=True)
+        await manager.connect(slow)
+        await asyncio.sleep(0)
+
+        for i in range(10):
+            await manager.broadcast(event("execution.output", line=str(i)))
+        await manager.broadcast(event("execution.completed"))
+
+        stats = manager.get_stats()
+        assert stats["dropped_total"] >= 6
+        assert stats["clients"][0]["dropped"] == stats["dropped_total"]
+
+        slow.unblocked.set()
+        await settle(manager)
+        types = [e["type"] for e in slow.events()]
+        assert types[-1] == "execution.completed"
+        assert types.count("execution.output") <= 4
+        await manager.close()
+
+    async def test_batching_sends_one_frame(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client, batch=True)
+
+        for i in range(20):
+            await manager.broadcast(event("execution.output", line=str(i)))
+        await asyncio.sleep(websocket_module.BATCH_INTERVAL * 4)
+
+        assert len(client.frames) == 1
+        assert [e["data"]["line"] for e in client.events()] == [str(i) for i in range(20)]
+        await manager.close()
+
+    async def test_failed_client_is_removed(self):
+        manager = ConnectionManager()
+
+        class BrokenWebSocket(FakeWebSocket):
+            async def send_text(self, data: str) -> None:
+                raise RuntimeError("connection reset")
+
+        await manager.connect(BrokenWebSocket())
+        await manager.broadcast(event("execution.started"))
+        await settle(manager)
+
+        assert manager.connection_count == 0
+        await manager.close()
+
+    async def test_failed_client_leaves_no_subscriptions(self):
+        manager = ConnectionManager()
+
+        class BrokenWebSocket(FakeWebSocket):
+            async def send_text(self, data: str) -> None:
+                raise RuntimeError("connection reset")
+
+        broken, healthy = BrokenWebSocket(), FakeWebSocket()
+        await manager.connect(broken, task_id="t1")
+        await manager.connect(healthy, task_id="t1")
+        await manager.broadcast(event("execution.started"))
+        await settle(manager)
+
+        # Later events for the same task still reach the healthy client
+        await manager.broadcast(event("execution.completed"))
+        await manager.disconnect(broken, task_id="t1")
+        await settle(manager)
+
+        assert manager.connection_count == 1
+        assert all(broken not in subscribers for subscribers in manager._index.values())
+        assert [e["type"] for e in healthy.events()] == [
+            "execution.started",
+            "execution.completed",
+        ]
+        await manager.close()
+
+    async def test_disconnect_cancels_writer(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket(blocked=True)
+        await manager.connect(client)
+        await manager.broadcast(event("execution.started"))
+        await asyncio.sleep(0)
+
+        await manager.disconnect(client)
+
+        assert manager.connection_count == 0
+        await manager.close()
+
+
+class TestSubscriptions:
+    """Tests for client subscriptions."""
+
+    async def subscribe(self, manager, client, **message) -> dict:
+        await manager.handle_message(client, json.dumps({"action": "subscribe", **message}))
+        await settle(manager)
+        return client.events()[-1]
+
+    async def test_subscribe_narrows_implicit_all(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+
+        ack = await self.subscribe(manager, client, execution_id="e2")
+        await manager.broadcast(event("execution.started"))
+        await manager.broadcast({**event("execution.started"), "execution_id": "e2"})
+        await settle(manager)
+
+        assert ack["type"] == "subscription.ack"
+        assert [e.get("execution_id") for e in client.events()[1:]] == ["e2"]
+        await manager.close()
+
+    async def test_modes_filter_event_types(self):
+        manager = ConnectionManager()
+        lifecycle, progress = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(lifecycle)
+        await manager.connect(progress)
+        await self.subscribe(manager, lifecycle, mode="lifecycle")
+        await self.subscribe(manager, progress, task_id="t1", mode="progress")
+
+        for type_ in ("execution.started", "execution.progress", "execution.output"):
+            await manager.broadcast(event(type_))
+        await settle(manager)
+
+        assert [e["type"] for e in lifecycle.events()[1:]] == ["execution.started"]
+        assert [e["type"] for e in progress.events()[1:]] == [
+            "execution.started",
+            "execution.progress",
+        ]
+        await manager.close()
+
+    async def test_output_rate_limit(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        await self.subscribe(manager, client, max_lines_per_second=5)
+
+        for i in range(50):
+            await manager.broadcast(event("execution.output", line=str(i)))
+        await manager.broadcast(event("execution.completed"))
+        await settle(manager)
+
+        types = [e["type"] for e in client.events()[1:]]
+        assert types.count("execution.output") == 5
+        assert types[-1] == "execution.completed"
+        assert manager.get_stats()["clients"][0]["rate_limited"] == 45
+        await manager.close()
+
+    async def test_overlapping_subscriptions_deliver_once(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        await self.subscribe(manager, client, mode="lifecycle")
+        await self.subscribe(manager, client, execution_id="e1")
+        await self.subscribe(manager, client, type="execution.started")
+
+        await manager.broadcast(event("execution.started"))
+        await manager.broadcast(event("execution.output", line="x"))
+        await settle(manager)
+
+        assert [e["type"] for e in client.events()[3:]] == [
+            "execution.started",
+            "execution.output",
+        ]
+        await manager.close()
+
+    async def test_unsubscribe_and_errors(self):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client, task_id="t1")
+
+        await self.subscribe(manager, client, task_id="t1", mode="lifecycle")
+        await manager.handle_message(
+            client, json.dumps({"action": "unsubscribe", "task_id": "t1"})
+        )
+        await manager.handle_message(client, "not json")
+        await manager.handle_message(client, json.dumps({"action": "subscribe", "mode": "all"}))
+        await manager.broadcast(event("execution.started"))
+        await settle(manager)
+
+        types = [e["type"] for e in client.events()]
+        assert types == [
+            "subscription.ack",
+            "subscription.ack",
+            "subscription.error",
+            "subscription.error",
+        ]
+        assert manager.get_stats()["clients"][0]["subscriptions"] == []
+        await manager.close()
+
+    async def test_unsubscribed_events_are_not_serialized(self, monkeypatch):
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        await self.subscribe(manager, client, execution_id="e2")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("serialized an event nobody wants")
+
+        monkeypatch.setattr(websocket_module.json, "dumps", fail)
+        await manager.broadcast(event("execution.output", line="x"))
+        monkeypatch.undo()
+        await manager.close()
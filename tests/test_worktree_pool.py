@@ -0,0 +1,141 @@
+"""Tests for the pool of reusable worktrees."""
+
+import subprocess
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from codegeass.core.entities import Task
+from codegeass.execution.worktree_pool import PooledWorktree, WorktreePool
+from codegeass.scheduling.scheduler import Scheduler
+
+
+def git(cwd, *args) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+def commit(repo, name: str, content: str) -> str:
+    (repo / name).write_text(content)
+    git(repo, "add", name)
+    git(repo, "commit", "-q", "-m", f"Update {name}")
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "project"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    (repo / ".gitignore").write_text(".codegeass-worktrees/\n")
+    git(repo, "add", ".gitignore")
+    commit(repo, "README.md", "v1\n")
+    return repo
+
+
+class TestWorktreePool:
+    """Tests for WorktreePool."""
+
+    def test_reused_worktree_is_reset(self, repo):
+        pool = WorktreePool(size=1)
+        first = pool.acquire(repo, "task-1")
+        assert isinstance(first, PooledWorktree)
+        (first.path / "README.md").write_text("changed\n")
+        (first.path / "build").mkdir()
+        (first.path / "build" / "out.o").write_text("junk")
+        first.cleanup()
+
+        head = commit(repo, "README.md", "v2\n")
+        second = pool.acquire(repo, "task-2")
+
+        assert second.path == first.path
+        assert git(second.path, "rev-parse", "HEAD") == head
+        assert (second.path / "README.md").read_text() == "v2\n"
+        assert not (second.path / "build").exists()
+        second.cleanup()
+
+    def test_busy_slots_are_not_shared(self, repo):
+        pool = WorktreePool(size=1)
+        first = pool.acquire(repo, "task-1")
+        overflow = pool.acquire(repo, "task-2")
+
+        assert not isinstance(overflow, PooledWorktree)
+        assert overflow.path != first.path
+
+        overflow.cleanup()
+        assert not overflow.path.exists()
+        first.cleanup()
+        assert first.path.exists()
+
+    def test_warm_prepares_free_slots(self, repo, monkeypatch):
+        pool = WorktreePool(size=2)
+        held = pool.acquire(repo, "task-1")
+
+        assert pool.warm(repo) == 1
+        held.cleanup()
+        assert pool.warm(repo) == 2
+
+        # Clean slots at HEAD are not touched again
+        monkeypatch.setattr(pool, "_prepare", lambda *args: pytest.fail("slot was reset"))
+        assert pool.warm(repo) == 2
+        worktree = pool.acquire(repo, "task-2")
+        assert isinstance(worktree, PooledWorktree)
+        worktree.cleanup()
+
+    def test_not_a_git_repo(self, tmp_path):
+        pool = WorktreePool()
+
+        assert pool.acquire(tmp_path, "task-1") is None
+        assert pool.warm(tmp_path) == 0
+
+    def test_disabled_pool_creates_fresh_worktrees(self, repo):
+        worktree = WorktreePool(size=0).acquire(repo, "task-1")
+
+        assert not isinstance(worktree, PooledWorktree)
+        assert worktree.cleanup()
+        assert not worktree.path.exists()
+
+    def test_from_settings(self, tmp_path):
+        settings = tmp_path / "settings.yaml"
+        settings.write_text("scheduler:\n  worktree_pool_size: 4\n")
+
+        assert WorktreePool.from_settings(settings).size == 4
+        assert WorktreePool.from_settings(tmp_path / "missing.yaml").size == 2
+
+
+class RecordingPool:
+    def __init__(self):
+        self.warmed = []
+
+    def warm(self, project_dir):
+        self.warmed.append(project_dir)
+        return 1
+
+
+def test_scheduler_warms_projects_with_upcoming_runs(tmp_path):
+    soon = tmp_path / "soon"
+    later = tmp_path / "later"
+    tasks = [
+        Task.create(name="a", schedule="5 9 * * *", working_dir=soon, prompt="p"),
+        Task.create(name="b", schedule="8 9 * * *", working_dir=soon, prompt="p"),
+        Task.create(name="c", schedule="0 18 * * *", working_dir=later, prompt="p"),
+        Task.create(
+            name="d", schedule="5 9 * * *", working_dir=later, prompt="p", plan_mode=True
+        ),
+    ]
+    pool = RecordingPool()
+    scheduler = SimpleNamespace(
+        _task_repo=SimpleNamespace(find_enabled=lambda: tasks), _worktree_pool=pool
+    )
+
+    warmed = Scheduler.warm_worktrees(scheduler, now=datetime(2026, 1, 5, 9, 0))
+
+    assert warmed == 1
+    assert pool.warmed == [soon]
@@ -0,0 +1,181 @@
+"""Tests for the cached YAML backends."""
+
+import multiprocessing
+import stat
+import threading
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from codegeass.storage.credential_manager import CredentialManager
+from codegeass.storage.task_repository import TaskRepository
+from codegeass.storage.yaml_backend import YAMLBackend, YAMLListBackend
+
+
+def write_yaml(path, data) -> None:
+    path.write_text(yaml.dump(data))
+
+
+def append_items(path, worker: int, count: int) -> None:
+    """Append items from a separate process."""
+    backend = YAMLListBackend(path, list_key="items")
+    for i in range(count):
+        backend.append({"id": f"{worker}-{i}"})
+
+
+class TestYAMLBackend:
+    """Tests for YAMLBackend caching."""
+
+    def test_unchanged_file_is_parsed_once(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        write_yaml(path, {"a": 1})
+        backend = YAMLBackend(path)
+
+        with patch("codegeass.storage.yaml_backend.yaml.load", side_effect=yaml.load) as load:
+            for _ in range(5):
+                assert backend.read() == {"a": 1}
+
+        assert load.call_count == 1
+
+    def test_external_change_is_reloaded(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        write_yaml(path, {"a": 1})
+        backend = YAMLBackend(path)
+        assert backend.read() == {"a": 1}
+
+        write_yaml(path, {"a": 1, "b": 22})
+
+        assert backend.read() == {"a": 1, "b": 22}
+
+    def test_write_through_and_copies(self, tmp_path):
+        backend = YAMLBackend(tmp_path / "config.yaml")
+        data = {"items": [1, 2]}
+        backend.write(data)
+        data["items"].append(3)
+
+        with patch("codegeass.storage.yaml_backend.yaml.load") as load:
+            result = backend.read()
+            result["items"].append(4)
+            assert backend.read() == {"items": [1, 2]}
+
+        load.assert_not_called()
+
+
+class TestYAMLListBackend:
+    """Tests for indexed list lookups."""
+
+    def test_find_update_delete(self, tmp_path):
+        backend = YAMLListBackend(tmp_path / "items.yaml", list_key="items")
+        backend.append({"id": "a", "name": "first"})
+        backend.append({"id": "b", "name": "second"})
+
+        assert backend.find_by_key("name", "second")["id"] == "b"
+        assert backend.update_by_key("id", "b", {"id": "b", "name": "renamed"})
+        assert backend.find_by_key("name", "second") is None
+        assert backend.find_by_key("name", "renamed")["id"] == "b"
+        assert backend.delete_by_key("id", "a")
+        assert backend.find_by_key("id", "a") is None
+        assert backend.find_by_key("id", "b") is not None
+        assert not backend.update_by_key("id", "missing", {})
+
+    def test_sees_writes_from_other_instances(self, tmp_path):
+        path = tmp_path / "items.yaml"
+        reader = YAMLListBackend(path, list_key="items")
+        writer = YAMLListBackend(path, list_key="items")
+        writer.append({"id": "a"})
+        assert reader.find_by_key("id", "a") is not None
+
+        writer.append({"id": "b"})
+
+        assert reader.find_by_key("id", "b") is not None
+
+
+class TestTaskRepositoryCache:
+    """Tests for TaskRepository lookups served from the cache."""
+
+    def test_find_by_id_does_not_reparse(self, tmp_path):
+        schedules = tmp_path / "schedules.yaml"
+        tasks = [
+            {"id": f"t{i}", "name": f"task-{i}", "schedule": "0 * * * *",
+             "working_dir": str(tmp_path), "prompt": "hi"}
+            for i in range(50)
+        ]
+        write_yaml(schedules, {"tasks": tasks})
+        repo = TaskRepository(schedules)
+
+        with patch("codegeass.storage.yaml_backend.yaml.load", side_effect=yaml.load) as load:
+            for i in range(50):
+                assert repo.find_by_id(f"t{i}").name == f"task-{i}"
+            assert repo.find_by_name("task-7").id == "t7"
+
+        assert load.call_count == 1
+
+
+class TestAtomicWrites:
+    """Tests for locked, atomic and batched writes."""
+
+    def test_concurrent_appends_from_threads_are_not_lost(self, tmp_path):
+        path = tmp_path / "items.yaml"
+        threads = [
+            threading.Thread(target=append_items, args=(path, worker, 20)) for worker in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(YAMLListBackend(path, list_key="items").read_all()) == 80
+
+    def test_concurrent_appends_from_processes_are_not_lost(self, tmp_path):
+        path = tmp_path / "items.yaml"
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=append_items, args=(path, worker, 10)) for worker in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+
+        assert len(YAMLListBackend(path, list_key="items").read_all()) == 30
+
+    def test_transaction_batches_writes(self, tmp_path):
+        backend = YAMLListBackend(tmp_path / "items.yaml", list_key="items")
+
+        with patch("codegeass.storage.yaml_backend.atomic_write") as write:
+            with backend.transaction():
+                for i in range(5):
+                    backend.append({"id": str(i)})
+                assert len(backend.read_all()) == 5
+
+        write.assert_called_once()
+
+    def test_failed_transaction_discards_staged_writes(self, tmp_path):
+        backend = YAMLListBackend(tmp_path / "items.yaml", list_key="items")
+        backend.append({"id": "kept"})
+
+        with pytest.raises(RuntimeError):
+            with backend.transaction():
+                backend.append({"id": "discarded"})
+                raise RuntimeError("boom")
+
+        assert [item["id"] for item in backend.read_all()] == ["kept"]
+
+    def test_write_preserves_mode_and_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        write_yaml(path, {"a": 1})
+        path.chmod(0o640)
+
+        YAMLBackend(path).write({"a": 2})
+
+        assert stat.S_IMODE(path.stat().st_mode) == 0o640
+        assert sorted(p.name for p in tmp_path.iterdir()) == [".config.yaml.lock", "config.yaml"]
+
+    def test_credentials_are_owner_only(self, tmp_path):
+        manager = CredentialManager(tmp_path / "credentials.yaml")
+
+        manager.save("telegram", {"bot_token": "secret"})
+
+        assert stat.S_IMODE((tmp_path / "credentials.yaml").stat().st_mode) == 0o600
+        assert manager.get("telegram") == {"bot_token": "secret"}